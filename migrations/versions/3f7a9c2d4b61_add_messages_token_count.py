@@ -0,0 +1,44 @@
+"""add messages token_count
+
+Revision ID: 3f7a9c2d4b61
+Revises: 22e3ac57861b
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f7a9c2d4b61"
+down_revision: Union[str, Sequence[str], None] = "22e3ac57861b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add token_count estimate to messages for token-budget history windows."""
+    op.add_column(
+        "messages",
+        sa.Column("token_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    # Backfill: estimate from char_length (~2 chars per token for Cyrillic text,
+    # see src/bot/token_estimator.py) plus 1600 tokens per image and 4 overhead tokens
+    op.execute("""
+        UPDATE messages
+        SET token_count = CEIL(char_length / 2.0) + 4 + CASE
+            WHEN jsonb_typeof(content) = 'array' THEN 1600 * (
+                SELECT COUNT(*) FROM jsonb_array_elements(content) AS part
+                WHERE part->>'type' = 'image_url'
+            )
+            ELSE 0
+        END
+    """)
+
+
+def downgrade() -> None:
+    """Remove token_count from messages."""
+    op.drop_column("messages", "token_count")
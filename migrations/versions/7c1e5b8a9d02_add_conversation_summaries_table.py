@@ -0,0 +1,42 @@
+"""add conversation_summaries table
+
+Revision ID: 7c1e5b8a9d02
+Revises: 3f7a9c2d4b61
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c1e5b8a9d02"
+down_revision: Union[str, Sequence[str], None] = "3f7a9c2d4b61"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create conversation_summaries table (one running summary per user)."""
+    op.create_table(
+        "conversation_summaries",
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("summary", sa.Text(), nullable=False),
+        sa.Column("summarized_until_id", sa.Integer(), nullable=False),
+        sa.Column("token_count", sa.Integer(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+
+def downgrade() -> None:
+    """Drop conversation_summaries table."""
+    op.drop_table("conversation_summaries")
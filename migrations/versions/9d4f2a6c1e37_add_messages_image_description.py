@@ -0,0 +1,30 @@
+"""add messages.image_description and described_token_count
+
+Revision ID: 9d4f2a6c1e37
+Revises: 7c1e5b8a9d02
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9d4f2a6c1e37"
+down_revision: Union[str, Sequence[str], None] = "7c1e5b8a9d02"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add image_description (text replacement for aged images) and its token estimate."""
+    op.add_column("messages", sa.Column("image_description", sa.Text(), nullable=True))
+    op.add_column("messages", sa.Column("described_token_count", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop image_description and described_token_count columns."""
+    op.drop_column("messages", "described_token_count")
+    op.drop_column("messages", "image_description")
@@ -0,0 +1,44 @@
+"""add faq_entries table
+
+Revision ID: b5e8c3f1a7d4
+Revises: 9d4f2a6c1e37
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b5e8c3f1a7d4"
+down_revision: Union[str, Sequence[str], None] = "9d4f2a6c1e37"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create faq_entries table (approved Q&A pairs for first-turn answers)."""
+    op.create_table(
+        "faq_entries",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("question", sa.Text(), nullable=False),
+        sa.Column("answer", sa.Text(), nullable=False),
+        sa.Column("is_approved", sa.Boolean(), server_default="false", nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("approved_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("idx_faq_entries_is_approved", "faq_entries", ["is_approved"], unique=False)
+
+
+def downgrade() -> None:
+    """Drop faq_entries table."""
+    op.drop_index("idx_faq_entries_is_approved", table_name="faq_entries")
+    op.drop_table("faq_entries")
@@ -0,0 +1,168 @@
+"""
+Детерминированное форматирование результатов admin режима без LLM.
+
+Скаляр (например, COUNT) и короткие таблицы превращаются в текст по локализованным
+шаблонам (ru/en - по языку вопроса). Сложные результаты и вопросы, требующие анализа,
+рендерер не обрабатывает - для них ChatService делает второй запрос к LLM.
+"""
+
+import logging
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_TEMPLATES: dict[str, dict[str, str]] = {
+    "ru": {
+        "empty": "По вашему запросу данных не найдено.",
+        "scalar": "{label}: {value}",
+        "rows_header": "Найдено записей: {count}",
+        "row": "{index}. {cells}",
+        "yes": "да",
+        "no": "нет",
+    },
+    "en": {
+        "empty": "No data found for your question.",
+        "scalar": "{label}: {value}",
+        "rows_header": "Rows found: {count}",
+        "row": "{index}. {cells}",
+        "yes": "yes",
+        "no": "no",
+    },
+}
+
+# Подписи для типовых колонок (алиасы из SQL шаблонов и text2sql prompt)
+_COLUMN_LABELS: dict[str, dict[str, str]] = {
+    "ru": {
+        "count": "Количество",
+        "total_users": "Всего пользователей",
+        "new_users": "Новых пользователей",
+        "active_users": "Активных пользователей",
+        "total_messages": "Всего сообщений",
+        "messages_last_week": "Сообщений за неделю",
+        "message_count": "Количество сообщений",
+        "day": "День",
+        "username": "Пользователь",
+        "first_name": "Имя",
+        "user_type": "Тип",
+        "role": "Роль",
+        "created_at": "Создано",
+        "char_length": "Длина",
+    },
+    "en": {
+        "count": "Count",
+        "total_users": "Total users",
+        "new_users": "New users",
+        "active_users": "Active users",
+        "total_messages": "Total messages",
+        "messages_last_week": "Messages last week",
+        "message_count": "Messages",
+        "day": "Day",
+        "username": "User",
+        "first_name": "First name",
+        "user_type": "Type",
+        "role": "Role",
+        "created_at": "Created",
+        "char_length": "Length",
+    },
+}
+
+# Вопросы, для которых нужен анализ данных, а не просто вывод
+_ANALYSIS_PATTERN = re.compile(
+    r"анализ|проанализ|почему|объясн|сравн|тренд|динамик|вывод|рекоменд|оцени|интерпрет"
+    r"|analy|why|explain|compar|trend|insight|recommend|interpret",
+    re.IGNORECASE,
+)
+
+_CYRILLIC_PATTERN = re.compile(r"[а-яё]", re.IGNORECASE)
+
+
+class AnswerRenderer:
+    """
+    Форматирование скалярных и небольших табличных результатов SQL без LLM.
+
+    Использование:
+        renderer = AnswerRenderer()
+        answer = renderer.render("Сколько пользователей?", [{"total_users": 42}])
+        if answer is None:
+            ...  # результат сложный - нужен LLM
+    """
+
+    def __init__(self, max_rows: int = 10, max_columns: int = 5) -> None:
+        """
+        Инициализация рендерера.
+
+        Args:
+            max_rows: Максимум строк результата для форматирования без LLM
+            max_columns: Максимум колонок результата для форматирования без LLM
+        """
+        self.max_rows = max_rows
+        self.max_columns = max_columns
+
+    def render(self, question: str, results: list[dict[str, Any]]) -> str | None:
+        """
+        Сформировать ответ по шаблону.
+
+        Args:
+            question: Вопрос пользователя (определяет язык и необходимость анализа)
+            results: Результаты выполнения SQL
+
+        Returns:
+            Текст ответа или None, если результат нужно отдать LLM
+        """
+        if _ANALYSIS_PATTERN.search(question):
+            return None
+
+        if len(results) > self.max_rows:
+            return None
+        if results and len(results[0]) > self.max_columns:
+            return None
+        if any(isinstance(value, dict | list) for row in results for value in row.values()):
+            return None
+
+        lang = "ru" if _CYRILLIC_PATTERN.search(question) else "en"
+        templates = _TEMPLATES[lang]
+
+        if not results:
+            return templates["empty"]
+
+        if len(results) == 1 and len(results[0]) == 1:
+            column, value = next(iter(results[0].items()))
+            return templates["scalar"].format(
+                label=self._label(column, lang), value=self._format_value(value, lang)
+            )
+
+        lines = [templates["rows_header"].format(count=len(results)), ""]
+        for index, row in enumerate(results, 1):
+            cells = ", ".join(
+                f"{self._label(column, lang)}: {self._format_value(value, lang)}"
+                for column, value in row.items()
+            )
+            lines.append(templates["row"].format(index=index, cells=cells))
+
+        logger.debug(f"Rendered {len(results)} rows without LLM")
+        return "\n".join(lines)
+
+    def _label(self, column: str, lang: str) -> str:
+        """Подпись колонки: из словаря типовых колонок или само имя колонки."""
+        return _COLUMN_LABELS[lang].get(column, column)
+
+    def _format_value(self, value: Any, lang: str) -> str:
+        """Форматирование значения ячейки."""
+        if value is None:
+            return "—"
+        if isinstance(value, bool):
+            return _TEMPLATES[lang]["yes" if value else "no"]
+        if isinstance(value, datetime):
+            if (value.hour, value.minute, value.second) == (0, 0, 0):
+                return value.strftime("%Y-%m-%d")
+            return value.strftime("%Y-%m-%d %H:%M")
+        if isinstance(value, date):
+            return value.strftime("%Y-%m-%d")
+        if isinstance(value, float | Decimal):
+            return f"{float(value):.2f}".rstrip("0").rstrip(".")
+        if hasattr(value, "value") and isinstance(value.value, str):  # Enum
+            return str(value.value)
+        return str(value)
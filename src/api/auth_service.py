@@ -2,7 +2,7 @@
 Auth Service для веб-аутентификации.
 
 Предоставляет функции для:
-- Хеширования и проверки паролей (bcrypt)
+- Хеширования и проверки паролей (bcrypt в пуле потоков, вне event loop)
 - Создания и валидации JWT токенов (30 дней TTL)
 - Аутентификации веб-пользователей
 """
@@ -12,7 +12,6 @@ import os
 from datetime import datetime, timedelta
 from typing import Any
 
-import bcrypt
 import jwt
 from jwt.exceptions import DecodeError, ExpiredSignatureError, InvalidSignatureError
 from sqlalchemy import select
@@ -20,6 +19,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.bot.models import User, UserRole, UserType
 
+from .password_hasher import PasswordHasher, hash_password_sync, verify_password_sync
+
 logger = logging.getLogger(__name__)
 
 # JWT Configuration
@@ -28,12 +29,19 @@ JWT_ALGORITHM = "HS256"
 JWT_ACCESS_TOKEN_EXPIRE_DAYS = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_DAYS", "30"))
 
 # Password hashing configuration
-BCRYPT_ROUNDS = 12
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+BCRYPT_MAX_WORKERS = int(os.getenv("BCRYPT_MAX_WORKERS", "2"))
+BCRYPT_MAX_QUEUE = int(os.getenv("BCRYPT_MAX_QUEUE", "100"))
+
+# Пул для bcrypt: хеширование не блокирует event loop
+password_hasher = PasswordHasher(
+    rounds=BCRYPT_ROUNDS, max_workers=BCRYPT_MAX_WORKERS, max_queue=BCRYPT_MAX_QUEUE
+)
 
 
 def hash_password(password: str) -> str:
     """
-    Хеширует пароль с помощью bcrypt.
+    Хеширует пароль с помощью bcrypt (синхронно; в async коде - password_hasher.hash).
 
     Args:
         password: Пароль в открытом виде
@@ -41,15 +49,12 @@ def hash_password(password: str) -> str:
     Returns:
         Хеш пароля в виде строки
     """
-    password_bytes = password.encode("utf-8")
-    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
-    password_hash = bcrypt.hashpw(password_bytes, salt)
-    return password_hash.decode("utf-8")
+    return hash_password_sync(password, BCRYPT_ROUNDS)
 
 
 def verify_password(password: str, password_hash: str) -> bool:
     """
-    Проверяет пароль против хеша.
+    Проверяет пароль против хеша (синхронно; в async коде - password_hasher.verify).
 
     Args:
         password: Пароль в открытом виде
@@ -58,13 +63,7 @@ def verify_password(password: str, password_hash: str) -> bool:
     Returns:
         True если пароль верный, False иначе
     """
-    try:
-        password_bytes = password.encode("utf-8")
-        password_hash_bytes = password_hash.encode("utf-8")
-        return bcrypt.checkpw(password_bytes, password_hash_bytes)
-    except Exception as e:
-        logger.error(f"Error verifying password: {e}")
-        return False
+    return verify_password_sync(password, password_hash)
 
 
 async def authenticate_web_user(username: str, password: str, session: AsyncSession) -> User | None:
@@ -97,10 +96,15 @@ async def authenticate_web_user(username: str, password: str, session: AsyncSess
         logger.error(f"User {username} has no password_hash")
         return None
 
-    if not verify_password(password, user.password_hash):
+    if not await password_hasher.verify(password, user.password_hash):
         logger.warning(f"Failed login attempt for user: {username}")
         return None
 
+    # Перехешируем пароль, если BCRYPT_ROUNDS изменился с момента создания хеша
+    if password_hasher.needs_rehash(user.password_hash):
+        user.password_hash = await password_hasher.hash(password)
+        logger.info(f"Rehashed password for user {username} with rounds={BCRYPT_ROUNDS}")
+
     # Обновляем last_login
     user.last_login = datetime.utcnow()
     await session.commit()
@@ -204,7 +208,7 @@ async def register_web_user(
         raise ValueError(f"Username {username} is already taken")
 
     # Создаем пользователя
-    password_hash_str = hash_password(password)
+    password_hash_str = await password_hasher.hash(password)
 
     new_user = User(
         user_type=UserType.web,
@@ -17,6 +17,14 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from src.bot.dialogue_manager import DialogueManager
 from src.bot.llm_client import LLMClient
+from src.bot.llm_limiter import PRIORITY_ANALYTICS
+from src.bot.llm_router import LLMRouter
+from src.bot.unit_of_work import release_connection, unit_of_work
+
+from .answer_renderer import AnswerRenderer
+from .intent_matcher import IntentMatcher
+from .schema_prompt import compile_text2sql_prompt, prompt_fingerprint
+from .sql_validator import SQLValidator
 
 logger = logging.getLogger(__name__)
 
@@ -28,25 +36,36 @@ class ChatService:
 
     def __init__(
         self,
-        llm_client: LLMClient,
+        llm_client: LLMRouter,
         dialogue_manager: DialogueManager,
         session_factory: async_sessionmaker[AsyncSession],
         text2sql_prompt: str,
+        text2sql_client: LLMRouter | LLMClient | None = None,
     ) -> None:
         """
         Инициализация сервиса.
 
         Args:
-            llm_client: Клиент для работы с LLM
+            llm_client: Маршрутизатор запросов к моделям LLM
             dialogue_manager: Менеджер диалогов для хранения истории
             session_factory: Фабрика для создания сессий БД
             text2sql_prompt: System prompt для преобразования text → SQL
+            text2sql_client: LLM клиент с text2sql prompt (по умолчанию создается
+                при первом text2sql запросе с моделями llm_client)
         """
         self.llm_client = llm_client
         self.dialogue_manager = dialogue_manager
         self.session_factory = session_factory
         self.text2sql_prompt = text2sql_prompt
-        logger.info("ChatService initialized")
+        self.text2sql_prompt_fingerprint = prompt_fingerprint(text2sql_prompt)
+        self._text2sql_client = text2sql_client
+        self.sql_validator = SQLValidator()
+        self.intent_matcher = IntentMatcher(self.sql_validator)
+        self.answer_renderer = AnswerRenderer()
+        logger.info(
+            f"ChatService initialized (text2sql prompt fingerprint: "
+            f"{self.text2sql_prompt_fingerprint})"
+        )
 
     async def process_message(
         self, message: str, mode: str, user_id: int
@@ -97,8 +116,11 @@ class ChatService:
         # Получаем историю для контекста
         history = await self.dialogue_manager.get_history(user_id)
 
-        # Отправляем в LLM
-        response = self.llm_client.get_response(history)
+        # Сообщение фиксируется до запроса к LLM: соединение не ждет ответа модели
+        await release_connection()
+
+        # Отправляем в LLM (первый вопрос без истории - ответ из кэша, если он уже задавался)
+        response = await self.llm_client.get_response(history, use_cache=len(history) == 1)
 
         # Сохраняем ответ ассистента
         await self.dialogue_manager.add_message(user_id, "assistant", response)
@@ -111,13 +133,14 @@ class ChatService:
         Обработка админ режима: text2sql → SQL → результат → LLM → ответ.
 
         Pipeline:
-        1. Преобразовать вопрос в SQL через LLM с text2sql prompt
-        2. Валидировать SQL (только SELECT)
+        1. Преобразовать вопрос в SQL: типовые вопросы - по шаблону (IntentMatcher),
+           остальные - через LLM с text2sql prompt
+        2. Валидировать SQL по AST (только SELECT, allowlist таблиц/функций, LIMIT)
         3. Выполнить SQL запрос
-        4. Форматировать результаты
-        5. Отправить результаты в LLM для генерации ответа
-        6. Сохранить в историю
-        7. Вернуть ответ + SQL
+        4. Сформулировать ответ: скаляр и короткие таблицы - по шаблону (AnswerRenderer),
+           остальные результаты и аналитические вопросы - через LLM
+        5. Сохранить в историю
+        6. Вернуть ответ + SQL
 
         Args:
             message: Вопрос пользователя
@@ -128,8 +151,13 @@ class ChatService:
         """
         logger.info("Admin mode: starting text2sql pipeline")
 
-        # Шаг 1: Преобразуем вопрос в SQL
-        sql_query = await self._text_to_sql(message)
+        # Шаг 1: Преобразуем вопрос в SQL (типовые вопросы - без обращения к LLM)
+        sql_query: str | None
+        intent_match = self.intent_matcher.match(message)
+        if intent_match is not None:
+            _intent, sql_query = intent_match
+        else:
+            sql_query = await self._text_to_sql(message)
 
         # Если не удалось сгенерировать SQL (вопрос не связан с БД)
         if sql_query is None or sql_query.strip().upper() == "NULL":
@@ -142,12 +170,14 @@ class ChatService:
             await self.dialogue_manager.add_message(user_id, "assistant", response)
             return response, sql_query or ""
 
-        # Шаг 2: Валидация SQL
-        if not self._validate_sql(sql_query):
+        # Шаг 2: Валидация SQL (дальше выполняется SQL, собранный из проверенного AST)
+        try:
+            sql_query = self.sql_validator.validate(sql_query)
+        except ValueError as e:
             error_msg = (
                 "Ошибка: SQL запрос содержит запрещенные операции. Разрешены только SELECT запросы."
             )
-            logger.warning("Invalid SQL query: %s", sql_query)
+            logger.warning("Invalid SQL query: %s (%s)", sql_query, e)
             await self.dialogue_manager.add_message(user_id, "user", message)
             await self.dialogue_manager.add_message(user_id, "assistant", error_msg)
             return error_msg, sql_query
@@ -162,10 +192,38 @@ class ChatService:
             await self.dialogue_manager.add_message(user_id, "assistant", error_msg)
             return error_msg, sql_query
 
-        # Шаг 4: Форматируем результаты для LLM
+        # Шаг 4: Скаляр и короткие таблицы форматируем по шаблону, без второго запроса к LLM
+        rendered = self.answer_renderer.render(message, results)
+        if rendered is not None:
+            response = rendered
+        else:
+            response = await self._generate_answer(message, sql_query, results, user_id)
+
+        # Шаг 5: Сохраняем в историю
+        await self.dialogue_manager.add_message(user_id, "user", message)
+        await self.dialogue_manager.add_message(user_id, "assistant", response)
+
+        logger.info(f"Admin mode: generated response with SQL query")
+        return response, sql_query
+
+    async def _generate_answer(
+        self, message: str, sql_query: str, results: list[dict[str, Any]], user_id: int
+    ) -> str:
+        """
+        Сформулировать ответ по результатам SQL через LLM (анализ и сложные результаты).
+
+        Args:
+            message: Вопрос пользователя
+            sql_query: Выполненный SQL запрос
+            results: Результаты выполнения SQL
+            user_id: ID пользователя (история диалога для контекста)
+
+        Returns:
+            Ответ LLM
+        """
+        # Форматируем результаты для LLM
         formatted_results = self._format_sql_results(results, sql_query)
 
-        # Шаг 5: Отправляем результаты в LLM для генерации ответа
         llm_prompt = f"""Пользователь задал вопрос: "{message}"
 
 SQL запрос: {sql_query}
@@ -180,15 +238,12 @@ SQL запрос: {sql_query}
         # Получаем историю для контекста
         history = await self.dialogue_manager.get_history(user_id)
         history.append({"role": "user", "content": llm_prompt})
+        await release_connection()
 
-        response = self.llm_client.get_response(history)
-
-        # Шаг 6: Сохраняем в историю
-        await self.dialogue_manager.add_message(user_id, "user", message)
-        await self.dialogue_manager.add_message(user_id, "assistant", response)
-
-        logger.info(f"Admin mode: generated response with SQL query")
-        return response, sql_query
+        # Тот же вопрос с теми же результатами и историей - ответ из кэша
+        return await self.llm_client.get_response(
+            history, priority=PRIORITY_ANALYTICS, use_cache=True
+        )
 
     async def _text_to_sql(self, question: str) -> str | None:
         """
@@ -201,16 +256,13 @@ SQL запрос: {sql_query}
             SQL запрос или None если не удалось преобразовать
         """
         messages = [{"role": "user", "content": question}]
-
-        # Создаем временный LLM клиент с text2sql prompt
-        text2sql_client = LLMClient(
-            api_key=self.llm_client.client.api_key,  # type: ignore[arg-type]
-            model=self.llm_client.model,
-            system_prompt=self.text2sql_prompt,
-        )
+        await release_connection()
 
         try:
-            sql_query = text2sql_client.get_response(messages)
+            # SQL определяется вопросом и схемой в prompt: повторный вопрос - из кэша
+            sql_query = await self._get_text2sql_client().get_response(
+                messages, priority=PRIORITY_ANALYTICS, use_cache=True
+            )
             # Очищаем от markdown если есть
             sql_query = self._clean_sql(sql_query)
             logger.debug(f"Generated SQL: {sql_query}")
@@ -219,6 +271,12 @@ SQL запрос: {sql_query}
             logger.error(f"Error generating SQL: {e}", exc_info=True)
             return None
 
+    def _get_text2sql_client(self) -> LLMRouter | LLMClient:
+        """LLM клиент с text2sql prompt (создается один раз и переиспользуется)."""
+        if self._text2sql_client is None:
+            self._text2sql_client = self.llm_client.with_system_prompt(self.text2sql_prompt)
+        return self._text2sql_client
+
     def _clean_sql(self, sql: str) -> str:
         """
         Очистка SQL от markdown и лишних символов.
@@ -236,46 +294,6 @@ SQL запрос: {sql_query}
         sql = sql.strip()
         return sql
 
-    def _validate_sql(self, sql: str) -> bool:
-        """
-        Валидация SQL запроса (только SELECT).
-
-        Args:
-            sql: SQL запрос для проверки
-
-        Returns:
-            True если запрос безопасный, False иначе
-        """
-        sql_upper = sql.upper().strip()
-
-        # Проверяем что это SELECT
-        if not sql_upper.startswith("SELECT"):
-            return False
-
-        # Запрещенные SQL команды (только как отдельные слова)
-        forbidden_patterns = [
-            r"\bINSERT\b",
-            r"\bUPDATE\b",
-            r"\bDELETE\b(?!\s+FROM)",  # DELETE без FROM (DML)
-            r"\bDROP\b",
-            r"\bALTER\b",
-            r"\bTRUNCATE\b",
-            r"\bCREATE\b",
-            r"\bGRANT\b",
-            r"\bREVOKE\b",
-            r"\bEXEC(?:UTE)?\b",
-            r"\b--",  # SQL комментарии могут быть использованы для injection
-            r"/\*",  # Многострочные комментарии
-        ]
-
-        # Проверяем отсутствие запрещенных паттернов
-        for pattern in forbidden_patterns:
-            if re.search(pattern, sql_upper):
-                logger.warning(f"SQL validation failed: found forbidden pattern '{pattern}'")
-                return False
-
-        return True
-
     async def _execute_sql_query(self, sql: str) -> list[dict[str, Any]]:
         """
         Выполнение SQL запроса.
@@ -289,9 +307,11 @@ SQL запрос: {sql_query}
         Raises:
             Exception: При ошибке выполнения запроса
         """
-        async with self.session_factory() as session:
-            result = await session.execute(text(sql))
-            rows = result.fetchall()
+        async with unit_of_work(self.session_factory) as session:
+            # SAVEPOINT: ошибка запроса не прерывает транзакцию unit of work запроса
+            async with session.begin_nested():
+                result = await session.execute(text(sql))
+                rows = result.fetchall()
 
             # Преобразуем Row объекты в словари
             if rows:
@@ -343,7 +363,7 @@ SQL запрос: {sql_query}
 
 
 def create_chat_service(
-    llm_client: LLMClient,
+    llm_client: LLMRouter,
     dialogue_manager: DialogueManager,
     session_factory: async_sessionmaker[AsyncSession],
 ) -> ChatService:
@@ -351,15 +371,15 @@ def create_chat_service(
     Factory функция для создания ChatService.
 
     Args:
-        llm_client: LLM клиент
+        llm_client: Маршрутизатор запросов к моделям LLM
         dialogue_manager: Менеджер диалогов
         session_factory: Фабрика сессий БД
 
     Returns:
         Инициализированный ChatService
     """
-    # Загружаем text2sql prompt
+    # Загружаем шаблон text2sql prompt и подставляем схему БД из моделей (один раз при старте)
     prompt_path = Path(__file__).parent / "text2sql_prompt.txt"
-    text2sql_prompt = prompt_path.read_text(encoding="utf-8")
+    text2sql_prompt = compile_text2sql_prompt(prompt_path.read_text(encoding="utf-8"))
 
     return ChatService(llm_client, dialogue_manager, session_factory, text2sql_prompt)
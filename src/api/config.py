@@ -67,18 +67,10 @@ def create_collector(config: APIConfig) -> StatCollector:
         return MockStatCollector()
 
     elif config.collector_mode == CollectorMode.REAL:
-        # Создаем database engine и session factory для RealStatCollector
-        from ..bot.database import create_engine, create_session_factory
-
-        # Создаем временную конфигурацию для database
-        # (в реальности можно использовать существующую Config из bot.config)
-        class _DBConfig:
-            def __init__(self, database_url: str):
-                self.database_url = database_url
-
-        db_config = _DBConfig(config.database_url)
-        engine = create_engine(db_config)
-        session_factory = create_session_factory(engine)
+        # Общий engine из реестра: тот же пул используют ChatService и аутентификация
+        from ..bot.database import get_session_factory
+
+        session_factory = get_session_factory(config.database_url)
 
         return RealStatCollector(session_factory)
 
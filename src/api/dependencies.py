@@ -7,13 +7,20 @@ FastAPI dependencies для всего API.
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.bot.unit_of_work import unit_of_work
+
 # Global database session factory (инициализируется в main.py)
 db_session_factory = None
 
 
 async def get_db_session():
     """
-    Dependency для получения database session.
+    Dependency для получения database session (unit of work на время запроса).
+
+    Сессия становится текущим unit of work: DialogueManager и ChatService внутри
+    запроса используют ее же вместо отдельных сессий из пула. Commit выполняется
+    после обработчика, rollback - при исключении. Перед запросами к LLM ChatService
+    фиксирует транзакцию (release_connection), чтобы соединение не ждало ответа модели.
 
     Yields:
         AsyncSession: Database session
@@ -22,7 +29,7 @@ async def get_db_session():
         HTTPException 503: Если database недоступна
     """
     if db_session_factory is not None:
-        async with db_session_factory() as session:
+        async with unit_of_work(db_session_factory) as session:
             yield session
     else:
         raise HTTPException(
@@ -0,0 +1,27 @@
+"""
+Pydantic модели для FAQ Admin API endpoints.
+"""
+
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class FAQEntryRequest(BaseModel):
+    """Запрос на добавление пары вопрос-ответ администратором."""
+
+    question: str = Field(..., min_length=1, description="Вопрос пользователя")
+    answer: str = Field(..., min_length=1, description="Ответ на вопрос")
+
+
+class FAQEntryResponse(BaseModel):
+    """Пара вопрос-ответ FAQ."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(..., description="ID записи")
+    question: str = Field(..., description="Вопрос пользователя")
+    answer: str = Field(..., description="Ответ на вопрос")
+    is_approved: bool = Field(..., description="Одобрена ли запись (используется ботом)")
+    created_at: datetime = Field(..., description="Время создания")
+    approved_at: datetime | None = Field(None, description="Время одобрения")
@@ -0,0 +1,223 @@
+"""
+Быстрый путь admin режима: распознавание типовых вопросов без LLM.
+
+Типовые вопросы по статистике (количество пользователей и сообщений за период,
+топ-N пользователей, сообщения по дням, последние N сообщений) распознаются
+регулярными выражениями и превращаются в заранее написанный SQL шаблон.
+Все шаблоны проверяются SQLValidator при создании IntentMatcher.
+Нераспознанные вопросы уходят в text2sql через LLM.
+"""
+
+import logging
+import re
+from collections.abc import Callable
+
+from .sql_validator import SQLValidator
+
+logger = logging.getLogger(__name__)
+
+# Количество дней в единице периода (по началу слова)
+_PERIOD_UNITS: list[tuple[str, int]] = [
+    ("сут", 1),
+    ("ден", 1),
+    ("дн", 1),
+    ("нед", 7),
+    ("мес", 30),
+    ("год", 365),
+    ("лет", 365),
+]
+
+# Необязательные слова в начале и в конце вопроса
+_PREFIX = r"(?:(?:а|и|ну|покажи|скажи|подскажи|посчитай|выведи|мне|пожалуйста)\s+)*"
+_SUFFIX = r"(?:\s+(?:всего|у нас|в системе|в базе|в боте|пожалуйста))*"
+
+# Период: "за неделю", "за последние 3 дня", "за последний месяц", "сегодня"
+_PERIOD = (
+    r"(?:(?:за\s+)?(?:последн\w*\s+)?(?:(?P<period_n>\d+)\s+)?"
+    r"(?P<period_unit>сутки|суток|день|дня|дней|недел\w*|месяц\w*|год\w*|лет)"
+    r"|(?P<today>сегодня))"
+)
+_OPT_PERIOD = rf"(?:\s+{_PERIOD})?"
+
+_MAX_TOP_N = 100
+
+_USERS_TOTAL_SQL = "SELECT COUNT(*) AS total_users FROM users WHERE is_active = true"
+
+_USERS_NEW_SQL = (
+    "SELECT COUNT(*) AS new_users FROM users "
+    "WHERE is_active = true AND first_seen >= NOW() - INTERVAL '{days} days'"
+)
+
+_USERS_ACTIVE_SQL = (
+    "SELECT COUNT(*) AS active_users FROM users "
+    "WHERE is_active = true AND last_seen >= NOW() - INTERVAL '{days} days'"
+)
+
+_MESSAGES_TOTAL_SQL = "SELECT COUNT(*) AS total_messages FROM messages WHERE is_deleted = false"
+
+_MESSAGES_PERIOD_SQL = (
+    "SELECT COUNT(*) AS message_count FROM messages "
+    "WHERE is_deleted = false AND created_at >= NOW() - INTERVAL '{days} days'"
+)
+
+_MESSAGES_PER_DAY_SQL = (
+    "SELECT DATE_TRUNC('day', created_at) AS day, COUNT(*) AS message_count FROM messages "
+    "WHERE is_deleted = false AND created_at >= NOW() - INTERVAL '{days} days' "
+    "GROUP BY day ORDER BY day DESC"
+)
+
+_TOP_USERS_SQL = (
+    "SELECT u.id, u.username, u.first_name, u.user_type, COUNT(m.id) AS message_count "
+    "FROM users u JOIN messages m ON u.id = m.user_id "
+    "WHERE m.is_deleted = false AND u.is_active = true{period_filter} "
+    "GROUP BY u.id, u.username, u.first_name, u.user_type "
+    "ORDER BY message_count DESC LIMIT {n}"
+)
+
+_RECENT_MESSAGES_SQL = (
+    "SELECT m.id, u.username, m.role, m.created_at, m.char_length "
+    "FROM messages m JOIN users u ON m.user_id = u.id "
+    "WHERE m.is_deleted = false ORDER BY m.created_at DESC LIMIT {n}"
+)
+
+# Верхняя граница периода (10 лет)
+_MAX_PERIOD_DAYS = 3650
+
+Params = dict[str, str | None]
+
+
+def _period_days(params: Params, default: int) -> int:
+    """Количество дней в периоде из вопроса (или default, если период не указан)."""
+    if params.get("today"):
+        return 1
+    unit = params.get("period_unit")
+    if not unit:
+        return default
+    unit_days = next(days for prefix, days in _PERIOD_UNITS if unit.startswith(prefix))
+    count = int(params.get("period_n") or 1)
+    return max(1, min(count * unit_days, _MAX_PERIOD_DAYS))
+
+
+def _period_filter(params: Params, column: str) -> str:
+    """Условие " AND column >= NOW() - INTERVAL ..." или пустая строка, если период не указан."""
+    if not params.get("period_unit") and not params.get("today"):
+        return ""
+    days = _period_days(params, default=1)
+    return f" AND {column} >= NOW() - INTERVAL '{days} days'"
+
+
+def _top_n(params: Params, default: int) -> int:
+    """N из вопроса ("топ-10", "последние 5"), ограниченное 1.._MAX_TOP_N."""
+    n = params.get("n")
+    return max(1, min(int(n), _MAX_TOP_N)) if n else default
+
+
+# (имя intent, regex полного вопроса, построение SQL по именованным группам совпадения)
+_INTENTS: list[tuple[str, str, Callable[[Params], str]]] = [
+    (
+        "users_total",
+        r"сколько\s+(?:у нас\s+)?(?:всего\s+)?(?:у нас\s+)?пользователей",
+        lambda p: _USERS_TOTAL_SQL,
+    ),
+    (
+        "users_new",
+        rf"(?:сколько|количество|число)\s+(?:было\s+)?новых\s+пользователей{_OPT_PERIOD}",
+        lambda p: _USERS_NEW_SQL.format(days=_period_days(p, default=7)),
+    ),
+    (
+        "users_active",
+        rf"(?:сколько|количество|число)\s+(?:было\s+)?активных\s+пользователей\s+{_PERIOD}",
+        lambda p: _USERS_ACTIVE_SQL.format(days=_period_days(p, default=7)),
+    ),
+    (
+        "messages_total",
+        r"сколько\s+(?:всего\s+)?сообщений(?:\s+(?:было\s+)?отправлено)?",
+        lambda p: _MESSAGES_TOTAL_SQL,
+    ),
+    (
+        "messages_period",
+        rf"(?:сколько|количество|число)\s+(?:всего\s+)?сообщений"
+        rf"(?:\s+(?:было\s+)?отправлено)?(?:\s+было)?\s+{_PERIOD}",
+        lambda p: _MESSAGES_PERIOD_SQL.format(days=_period_days(p, default=7)),
+    ),
+    (
+        "messages_per_day",
+        rf"(?:(?:статистика|количество|число|сколько)\s+)?сообщений\s+(?:по дням|в день)"
+        rf"{_OPT_PERIOD}",
+        lambda p: _MESSAGES_PER_DAY_SQL.format(days=_period_days(p, default=30)),
+    ),
+    (
+        "top_users",
+        rf"топ(?:[\s-]*(?P<n>\d+))?\s+(?:самых\s+)?(?:активных\s+)?пользователей"
+        rf"(?:\s+по\s+(?:количеству\s+)?сообщений)?{_OPT_PERIOD}",
+        lambda p: _TOP_USERS_SQL.format(
+            n=_top_n(p, default=5), period_filter=_period_filter(p, "m.created_at")
+        ),
+    ),
+    (
+        "top_user",
+        rf"(?:кто\s+)?самый\s+активный\s+пользователь{_OPT_PERIOD}",
+        lambda p: _TOP_USERS_SQL.format(n=1, period_filter=_period_filter(p, "m.created_at")),
+    ),
+    (
+        "recent_messages",
+        r"последние(?:\s+(?P<n>\d+))?\s+сообщени[йя]",
+        lambda p: _RECENT_MESSAGES_SQL.format(n=_top_n(p, default=10)),
+    ),
+]
+
+
+class IntentMatcher:
+    """
+    Распознавание типовых admin вопросов и подстановка SQL шаблонов.
+
+    Использование:
+        matcher = IntentMatcher(SQLValidator())
+        match = matcher.match("Сколько сообщений за неделю?")
+        if match is not None:
+            intent, sql = match
+    """
+
+    def __init__(self, sql_validator: SQLValidator) -> None:
+        """
+        Инициализация и проверка всех шаблонов через SQLValidator.
+
+        Args:
+            sql_validator: Валидатор SQL (шаблоны с параметрами по умолчанию должны проходить)
+
+        Raises:
+            ValueError: Если какой-либо шаблон не проходит валидацию
+        """
+        self._intents = [
+            (name, re.compile(rf"{_PREFIX}{pattern}{_SUFFIX}"), build)
+            for name, pattern, build in _INTENTS
+        ]
+        for _name, _pattern, build in _INTENTS:
+            sql_validator.validate(build({}))
+        logger.info(f"IntentMatcher initialized with {len(self._intents)} intents")
+
+    def match(self, question: str) -> tuple[str, str] | None:
+        """
+        Распознать вопрос и вернуть SQL по шаблону.
+
+        Args:
+            question: Вопрос пользователя на естественном языке
+
+        Returns:
+            Tuple (intent, sql) или None, если вопрос не распознан
+        """
+        normalized = self._normalize(question)
+        for name, pattern, build in self._intents:
+            match = pattern.fullmatch(normalized)
+            if match is not None:
+                sql = build(match.groupdict())
+                logger.info(f"Admin question matched intent '{name}' without LLM")
+                return name, sql
+        return None
+
+    def _normalize(self, question: str) -> str:
+        """Нижний регистр, ё → е, без пунктуации и лишних пробелов (дефис сохраняется)."""
+        text = question.lower().replace("ё", "е")
+        text = re.sub(r"[^\w\s-]", " ", text)
+        text = re.sub(r"\s*-\s*", "-", text)
+        return re.sub(r"\s+", " ", text).strip()
@@ -16,15 +16,18 @@ Environment Variables:
     DATABASE_URL: URL для подключения к PostgreSQL (для COLLECTOR_MODE=real)
     ADMIN_PASSWORD: Пароль для админ режима чата (по умолчанию "admin123")
     OPENROUTER_API_KEY: API ключ для OpenRouter
-    LLM_MODEL: Модель LLM (по умолчанию "anthropic/claude-3.5-sonnet")
+    LLM_MODEL: Модели LLM через запятую (по умолчанию "anthropic/claude-3.5-sonnet")
+    LLM_FAST_MODEL: Быстрая модель для простых ходов (опционально)
 """
 
 import logging
 import os
-from contextlib import asynccontextmanager
+import time
+from collections.abc import Iterator
+from contextlib import asynccontextmanager, contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Annotated
+from typing import TYPE_CHECKING, Annotated, Any
 
 from dotenv import load_dotenv
 
@@ -33,11 +36,16 @@ load_dotenv()
 
 from fastapi import Depends, FastAPI, HTTPException, Query  # noqa: E402
 from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker  # noqa: E402
 
-from src.bot.dialogue_manager import DialogueManager  # noqa: E402
-from src.bot.llm_client import LLMClient  # noqa: E402
+from src.bot.database import (  # noqa: E402
+    dispose_engines,
+    get_all_pool_stats,
+    get_session_factory,
+    warm_up_engines,
+)
 from src.bot.models import User  # noqa: E402
+from src.bot.repository import FAQRepository  # noqa: E402
 
 from . import dependencies  # noqa: E402
 from .auth import create_access_token, verify_admin_password  # noqa: E402
@@ -53,6 +61,7 @@ from .auth_models import (
 from .auth_service import (  # noqa: E402
     authenticate_web_user,
     create_session_token,
+    password_hasher,
     register_web_user,
     verify_session_token,
 )
@@ -63,31 +72,175 @@ from .chat_models import (  # noqa: E402
     ChatRequest,
     ChatResponse,
 )
-from .chat_service import create_chat_service  # noqa: E402
-from .config import get_collector, get_config  # noqa: E402
+from .config import CollectorMode, get_collector, get_config  # noqa: E402
+from .faq_models import FAQEntryRequest, FAQEntryResponse  # noqa: E402
+from .interfaces import StatCollector  # noqa: E402
 from .middleware import get_current_web_user, require_admin  # noqa: E402
 from .models import StatsResponse  # noqa: E402
+from .password_hasher import HasherOverloadedError  # noqa: E402
+
+if TYPE_CHECKING:
+    from .chat_service import ChatService
 
 logger = logging.getLogger(__name__)
 
+STATS_CACHE_TTL = 60  # TTL кэша статистики в секундах
+WEB_CHAT_USERS_COUNT = 10  # Количество виртуальных пользователей веб-чата
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Lifespan event для инициализации и очистки ресурсов при старте/остановке приложения."""
-    # Startup: инициализируем виртуальных пользователей для веб-чата
-    global chat_service
-    config = get_config()
+# Сервисы создаются в lifespan (не при импорте): модуль безопасно импортировать
+# в master-процессе с preload, engine и клиенты LLM создаются в каждом worker
+collector: StatCollector | None = None
+chat_service = None
+db_session_factory: async_sessionmaker | None = None  # Global database session factory
+session_id_to_user_id: dict[str, int] = {}  # Маппинг session_id → user_id
+next_web_user_id = -1  # Начальный ID для веб-пользователей
+
+
+@contextmanager
+def _startup_phase(name: str, timings: dict[str, float]) -> Iterator[None]:
+    """Замерить длительность фазы старта (мс) и сохранить в timings."""
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = (time.perf_counter() - started_at) * 1000
+
+
+def get_stats_collector() -> StatCollector:
+    """
+    Получить StatCollector (создается при первом вызове).
+
+    Returns:
+        StatCollector (Mock или Real в зависимости от COLLECTOR_MODE)
+    """
+    global collector
+    if collector is None:
+        collector = get_collector()
+    return collector
+
+
+def _create_chat_service(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> "ChatService | None":
+    """
+    Создать ChatService, если задан OPENROUTER_API_KEY.
+
+    Тяжелые модули (openai, sqlglot) импортируются только здесь,
+    в mock режиме и без API ключа они не загружаются.
 
-    if config.collector_mode.value == "real" and chat_service is not None:
+    Args:
+        session_factory: Общая фабрика сессий БД
+
+    Returns:
+        ChatService или None
+    """
+    openrouter_api_key = os.getenv("OPENROUTER_API_KEY")
+    if not openrouter_api_key:
+        logger.warning("OPENROUTER_API_KEY not set, chat API will be disabled")
+        return None
+
+    from src.bot.dialogue_manager import DialogueManager
+    from src.bot.llm_router import create_llm_router
+
+    from .chat_service import create_chat_service
+
+    llm_model = os.getenv("LLM_MODEL", "anthropic/claude-3.5-sonnet")
+    # Загружаем system prompt для HomeGuru
+    system_prompt_path = Path(__file__).parent.parent / "bot" / "system_prompt.txt"
+    system_prompt = system_prompt_path.read_text(encoding="utf-8")
+
+    # LLM_MODEL - модели через запятую в порядке fallback, LLM_FAST_MODEL - для простых ходов
+    llm_client = create_llm_router(
+        openrouter_api_key, llm_model, system_prompt, os.getenv("LLM_FAST_MODEL") or None
+    )
+    dialogue_manager = DialogueManager(
+        session_factory=session_factory,
+        max_history=50,
+        token_budget=int(os.getenv("CONTEXT_TOKEN_BUDGET", "8000")),
+        system_prompt=system_prompt,
+    )
+    return create_chat_service(llm_client, dialogue_manager, session_factory)
+
+
+async def _start_real_mode(timings: dict[str, float]) -> None:
+    """
+    Инициализировать БД, ChatService и виртуальных пользователей (режим real).
+
+    Args:
+        timings: Словарь длительностей фаз старта
+    """
+    global chat_service, db_session_factory
+
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        logger.warning("DATABASE_URL not set, database-dependent APIs will be disabled")
+        return
+
+    try:
+        with _startup_phase("database", timings):
+            # GLOBAL session factory поверх общего engine (тот же пул, что у StatCollector)
+            db_session_factory = get_session_factory(database_url)
+            # Присваиваем session factory в dependencies модуль для использования в middleware
+            dependencies.db_session_factory = db_session_factory
+
+        with _startup_phase("chat_service", timings):
+            chat_service = _create_chat_service(db_session_factory)
+    except Exception as e:
+        logger.error(f"Failed to initialize services: {e}", exc_info=True)
+        chat_service = None
+        db_session_factory = None
+        dependencies.db_session_factory = None
+        return
+
+    with _startup_phase("pool_warm_up", timings):
         try:
-            # Получаем session factory из chat_service
-            if hasattr(chat_service, "session_factory"):
-                await create_web_chat_users(chat_service.session_factory, count=10)
+            # Открываем соединения заранее, чтобы первые запросы не ждали connect
+            await warm_up_engines()
         except Exception as e:
-            logger.error(f"Failed to create web chat users on startup: {e}", exc_info=True)
+            logger.error(f"Failed to warm up database pool: {e}", exc_info=True)
+
+    if chat_service is not None:
+        with _startup_phase("web_chat_users", timings):
+            await create_web_chat_users(db_session_factory, count=WEB_CHAT_USERS_COUNT)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Lifespan: граф инициализации при старте и очистка ресурсов при остановке.
+
+    Фазы старта: config → collector → cache → database → chat_service →
+    pool_warm_up → web_chat_users. Длительность каждой фазы логируется.
+    """
+    global chat_service, db_session_factory
+    timings: dict[str, float] = {}
+
+    with _startup_phase("config", timings):
+        config = get_config()
+    # Выбор между Mock и Real определяется через COLLECTOR_MODE env var
+    with _startup_phase("collector", timings):
+        get_stats_collector()
+    with _startup_phase("cache", timings):
+        get_cache(ttl_seconds=STATS_CACHE_TTL)
+
+    if config.collector_mode == CollectorMode.REAL:
+        await _start_real_mode(timings)
+    else:
+        logger.info("Database-dependent APIs disabled in mock mode")
+
+    phases = ", ".join(f"{name}={ms:.1f}ms" for name, ms in timings.items())
+    logger.info(
+        f"Stats API started in {config.collector_mode.value.upper()} mode "
+        f"in {sum(timings.values()):.1f}ms ({phases})"
+    )
 
     yield
-    # Shutdown: здесь можно добавить очистку ресурсов при необходимости
+    # Shutdown: останавливаем пул потоков bcrypt и закрываем соединения с БД
+    password_hasher.shutdown()
+    await dispose_engines()
+    chat_service = None
+    db_session_factory = None
+    dependencies.db_session_factory = None
 
 
 # Создаем FastAPI приложение
@@ -109,45 +262,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Инициализация StatCollector через factory pattern
-# Выбор между Mock и Real определяется через COLLECTOR_MODE env var
-collector = get_collector()
-
-# Инициализация кэша с TTL 60 секунд
-cache = get_cache(ttl_seconds=60)
-
-# Логируем режим работы при старте
-config = get_config()
-logger.info(f"Stats API started in {config.collector_mode.value.upper()} mode")
-
-# Инициализация Chat Service и Database Session Factory
-chat_service = None
-db_session_factory: async_sessionmaker | None = None  # Global database session factory
-session_id_to_user_id: dict[str, int] = {}  # Маппинг session_id → user_id
-next_web_user_id = -1  # Начальный ID для веб-пользователей
-
 
 async def create_web_chat_users(session_factory: async_sessionmaker, count: int = 10) -> None:
-    """Создать виртуальных пользователей для веб-чата."""
-    from sqlalchemy import text
+    """Создать виртуальных пользователей для веб-чата одним multi-row INSERT."""
+    from sqlalchemy.dialects.postgresql import insert
+
+    # count пользователей с telegram_id от -1 до -count
+    rows = [
+        {
+            "telegram_id": -i,
+            "username": f"web_user_{i}",
+            "first_name": f"Web User {i}",
+            "is_active": True,
+        }
+        for i in range(1, count + 1)
+    ]
+    statement = insert(User).values(rows).on_conflict_do_nothing(index_elements=["telegram_id"])
 
     async with session_factory() as session:
         try:
-            # Создаем count пользователей с telegram_id от -1 до -count
-            for i in range(1, count + 1):
-                telegram_id = -i
-                await session.execute(
-                    text("""
-                        INSERT INTO users (telegram_id, username, first_name, is_active)
-                        VALUES (:telegram_id, :username, :first_name, true)
-                        ON CONFLICT (telegram_id) DO NOTHING
-                    """),
-                    {
-                        "telegram_id": telegram_id,
-                        "username": f"web_user_{i}",
-                        "first_name": f"Web User {i}",
-                    },
-                )
+            await session.execute(statement)
             await session.commit()
             logger.info(
                 f"Ensured {count} virtual web chat users exist (telegram_id from -1 to -{count})"
@@ -166,54 +300,6 @@ def get_or_create_web_user_id(session_id: str) -> int:
     return session_id_to_user_id[session_id]
 
 
-if config.collector_mode.value == "real":
-    # Инициализируем ChatService и Database Session Factory для real режима
-    try:
-        # Получаем DATABASE_URL и API keys из environment
-        database_url = os.getenv("DATABASE_URL")
-        openrouter_api_key = os.getenv("OPENROUTER_API_KEY")
-        llm_model = os.getenv("LLM_MODEL", "anthropic/claude-3.5-sonnet")
-
-        if not database_url:
-            logger.warning("DATABASE_URL not set, database-dependent APIs will be disabled")
-        else:
-            # Создаем engine и GLOBAL session factory
-            chat_engine = create_async_engine(database_url, echo=False)
-            db_session_factory = async_sessionmaker(chat_engine, expire_on_commit=False)
-            # Присваиваем session factory в dependencies модуль для использования в middleware
-            dependencies.db_session_factory = db_session_factory
-            logger.info("Database session factory initialized")
-
-            # Создаем ChatService если есть OpenRouter API key
-            if openrouter_api_key:
-                # Загружаем system prompt для HomeGuru
-                system_prompt_path = Path(__file__).parent.parent / "bot" / "system_prompt.txt"
-                system_prompt = system_prompt_path.read_text(encoding="utf-8")
-
-                # Создаем LLM client и DialogueManager
-                llm_client = LLMClient(
-                    api_key=openrouter_api_key, model=llm_model, system_prompt=system_prompt
-                )
-                dialogue_manager = DialogueManager(
-                    session_factory=db_session_factory, max_history=50
-                )
-
-                # Создаем ChatService
-                chat_service = create_chat_service(llm_client, dialogue_manager, db_session_factory)
-                # Сохраняем session_factory в chat_service для доступа из lifespan
-                chat_service.session_factory = db_session_factory
-                logger.info("Chat service initialized (web users will be created on startup)")
-            else:
-                logger.warning("OPENROUTER_API_KEY not set, chat API will be disabled")
-
-    except Exception as e:
-        logger.error(f"Failed to initialize services: {e}", exc_info=True)
-        chat_service = None
-        db_session_factory = None
-else:
-    logger.info("Database-dependent APIs disabled in mock mode")
-
-
 @app.get("/", tags=["root"])
 async def root() -> dict[str, str]:
     """
@@ -225,7 +311,7 @@ async def root() -> dict[str, str]:
     return {
         "message": "HomeGuru Stats API",
         "version": "0.2.0",
-        "mode": config.collector_mode.value,
+        "mode": get_config().collector_mode.value,
         "docs": "/docs",
     }
 
@@ -268,6 +354,7 @@ async def get_stats(
     try:
         # Проверяем кэш
         cache_key = f"stats:{period}"
+        cache = get_cache(ttl_seconds=STATS_CACHE_TTL)
         cached_stats = await cache.get(cache_key)
 
         if cached_stats is not None:
@@ -276,7 +363,7 @@ async def get_stats(
 
         # Кэш промахнулся, получаем данные из collector
         logger.debug(f"Cache miss for period={period}, fetching from collector")
-        stats = await collector.get_stats(period)
+        stats = await get_stats_collector().get_stats(period)
 
         # Сохраняем в кэш
         await cache.set(cache_key, stats)
@@ -308,6 +395,7 @@ async def cache_info() -> dict[str, int]:
     Returns:
         Размер кэша и количество удаленных истекших записей
     """
+    cache = get_cache(ttl_seconds=STATS_CACHE_TTL)
     size = cache.get_size()
     cleaned = await cache.cleanup_expired()
     return {
@@ -324,10 +412,110 @@ async def clear_cache() -> dict[str, str]:
     Returns:
         Статус операции
     """
-    await cache.clear()
+    await get_cache(ttl_seconds=STATS_CACHE_TTL).clear()
     return {"status": "cache cleared"}
 
 
+@app.get("/api/auth/hasher/info", tags=["auth"])
+async def password_hasher_info() -> dict[str, float | int]:
+    """
+    Метрики пула хеширования паролей (bcrypt).
+
+    Returns:
+        Загрузка пула, размер очереди ожидания и средние времена ожидания/вычисления (мс)
+    """
+    return password_hasher.get_stats()
+
+
+@app.get("/db/pool/info", tags=["health"])
+async def db_pool_info() -> dict[str, dict[str, float | int]]:
+    """
+    Метрики пулов соединений с БД.
+
+    Returns:
+        Для каждого engine: размер пула, занятые соединения, overflow,
+        количество checkout, таймауты и время ожидания соединения (мс)
+    """
+    return get_all_pool_stats()
+
+
+@app.get("/llm/limiter/info", tags=["health"])
+async def llm_limiter_info() -> dict[str, float | int]:
+    """
+    Метрики адаптивного лимита запросов к LLM процесса API.
+
+    Returns:
+        Текущий лимит, запросы в работе и в очереди, количество 429 и перегрузок,
+        уменьшений лимита и оставшаяся пауза Retry-After (секунды)
+    """
+    # Импорт здесь: openai загружается только при первом обращении к LLM
+    from src.bot.llm_limiter import get_llm_limiter
+
+    return get_llm_limiter().get_stats()
+
+
+@app.get("/llm/circuit/info", tags=["health"])
+async def llm_circuit_info() -> dict[str, dict[str, str | int]]:
+    """
+    Состояние circuit breaker моделей LLM процесса API.
+
+    Returns:
+        Для каждой модели: состояние (closed, open, half_open), ошибок подряд,
+        сколько раз breaker размыкался и сколько запросов отклонено
+    """
+    # Импорт здесь: openai загружается только при первом обращении к LLM
+    from src.bot.llm_client import get_all_circuit_stats
+
+    return get_all_circuit_stats()
+
+
+@app.get("/llm/usage/info", tags=["health"])
+async def llm_usage_info() -> dict[str, dict[str, int | float]]:
+    """
+    Расход токенов моделей LLM процесса API и попадания в кэш префикса.
+
+    Returns:
+        Для каждой модели: запросы, входные токены, из них прочитанные из кэша,
+        выходные токены и доля входных токенов из кэша
+    """
+    # Импорт здесь: openai загружается только при первом обращении к LLM
+    from src.bot.llm_client import get_all_usage_stats
+
+    return get_all_usage_stats()
+
+
+@app.get("/llm/cache/info", tags=["health"])
+async def llm_cache_info() -> dict[str, int | float]:
+    """
+    Метрики кэша ответов LLM процесса API (text2sql, ответы по результатам SQL).
+
+    Returns:
+        Записи и байты в памяти, попадания (из них с диска), промахи,
+        доля попаданий, вытеснения и сэкономленные токены (оценка)
+    """
+    # Импорт здесь: openai загружается только при первом обращении к LLM
+    from src.bot.llm_response_cache import get_llm_response_cache
+
+    return get_llm_response_cache().get_stats()
+
+
+@app.get("/llm/models/info", tags=["health"])
+async def llm_models_info() -> dict[str, Any]:
+    """
+    Статистика маршрутизации чата по моделям LLM (fallback, быстрая модель).
+
+    Returns:
+        Количество fallback и ходов, отправленных быстрой модели; для каждой модели -
+        запросы в окне, доля ошибок и медианная задержка (секунды)
+
+    Raises:
+        HTTPException 503: Chat service недоступен
+    """
+    if chat_service is None:
+        raise HTTPException(status_code=503, detail="Chat service unavailable")
+    return chat_service.llm_client.get_stats()
+
+
 # ============================================================================
 # Note: Database Session Dependency теперь в dependencies.py
 # ============================================================================
@@ -353,6 +541,7 @@ async def register_user(
 
     Raises:
         HTTPException 400: Username занят или слабый пароль
+        HTTPException 503: Очередь на хеширование паролей переполнена
         HTTPException 500: Внутренняя ошибка
     """
     try:
@@ -377,6 +566,8 @@ async def register_user(
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
+    except HasherOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
     except Exception as e:
         logger.error("Error registering user: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}") from e
@@ -397,6 +588,7 @@ async def login_user(
 
     Raises:
         HTTPException 401: Неверные credentials
+        HTTPException 503: Очередь на хеширование паролей переполнена
         HTTPException 500: Внутренняя ошибка
     """
     try:
@@ -421,6 +613,8 @@ async def login_user(
 
     except HTTPException:
         raise
+    except HasherOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
     except Exception as e:
         logger.error("Error logging in user: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}") from e
@@ -622,3 +816,110 @@ async def clear_chat_history(
     except Exception as e:
         logger.error("Error clearing chat history: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error clearing history: {str(e)}") from e
+
+
+# ============================================================================
+# FAQ Admin API Endpoints
+# ============================================================================
+
+
+@app.get("/api/admin/faq", response_model=list[FAQEntryResponse], tags=["faq"])
+async def list_faq_entries(
+    session: Annotated[AsyncSession, Depends(dependencies.get_db_session)],
+    _admin: Annotated[User, Depends(require_admin)],
+    status: str = Query(
+        "pending",
+        pattern="^(pending|approved|all)$",
+        description="Записи: 'pending' (кандидаты), 'approved' (одобренные), 'all'",
+    ),
+) -> list[FAQEntryResponse]:
+    """
+    Получить записи FAQ (новые первыми).
+
+    Кандидаты - ответы LLM на первые вопросы пользователей (FAQ_COLLECT_CANDIDATES);
+    бот отвечает только одобренными записями.
+
+    Args:
+        status: Какие записи вернуть
+
+    Returns:
+        Список записей FAQ
+
+    Raises:
+        HTTPException 403: Нет прав администратора
+    """
+    approved = {"pending": False, "approved": True, "all": None}[status]
+    entries = await FAQRepository(session, auto_commit=False).get_entries(approved)
+    return [FAQEntryResponse.model_validate(entry) for entry in entries]
+
+
+@app.post("/api/admin/faq", response_model=FAQEntryResponse, tags=["faq"])
+async def create_faq_entry(
+    request: FAQEntryRequest,
+    session: Annotated[AsyncSession, Depends(dependencies.get_db_session)],
+    _admin: Annotated[User, Depends(require_admin)],
+) -> FAQEntryResponse:
+    """
+    Добавить одобренную пару вопрос-ответ.
+
+    Args:
+        request: Вопрос и ответ
+
+    Returns:
+        Созданная запись FAQ
+
+    Raises:
+        HTTPException 403: Нет прав администратора
+    """
+    repository = FAQRepository(session, auto_commit=False)
+    entry = await repository.add_entry(request.question, request.answer, approved=True)
+    return FAQEntryResponse.model_validate(entry)
+
+
+@app.post("/api/admin/faq/{entry_id}/approve", response_model=FAQEntryResponse, tags=["faq"])
+async def approve_faq_entry(
+    entry_id: int,
+    session: Annotated[AsyncSession, Depends(dependencies.get_db_session)],
+    _admin: Annotated[User, Depends(require_admin)],
+) -> FAQEntryResponse:
+    """
+    Одобрить кандидата: бот начнет отвечать им после синхронизации индекса.
+
+    Args:
+        entry_id: ID записи
+
+    Returns:
+        Одобренная запись FAQ
+
+    Raises:
+        HTTPException 403: Нет прав администратора
+        HTTPException 404: Запись не найдена
+    """
+    entry = await FAQRepository(session, auto_commit=False).approve(entry_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="FAQ entry not found")
+    return FAQEntryResponse.model_validate(entry)
+
+
+@app.delete("/api/admin/faq/{entry_id}", tags=["faq"])
+async def delete_faq_entry(
+    entry_id: int,
+    session: Annotated[AsyncSession, Depends(dependencies.get_db_session)],
+    _admin: Annotated[User, Depends(require_admin)],
+) -> dict[str, str]:
+    """
+    Удалить запись: отклонить кандидата или убрать ответ из FAQ.
+
+    Args:
+        entry_id: ID записи
+
+    Returns:
+        Статус операции
+
+    Raises:
+        HTTPException 403: Нет прав администратора
+        HTTPException 404: Запись не найдена
+    """
+    if not await FAQRepository(session, auto_commit=False).delete_entry(entry_id):
+        raise HTTPException(status_code=404, detail="FAQ entry not found")
+    return {"status": "deleted", "entry_id": str(entry_id)}
@@ -4,10 +4,14 @@ RBAC Middleware для защиты endpoints.
 Предоставляет FastAPI dependencies для:
 - Извлечения текущего пользователя из JWT токена
 - Проверки роли администратора
+
+Декодированные токены и активные пользователи кэшируются (WebUserCache),
+поэтому повторные запросы с тем же токеном не обращаются к БД.
 """
 
 import logging
-from typing import Annotated
+import os
+from typing import Annotated, Any
 
 from fastapi import Depends, Header, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
@@ -18,12 +22,57 @@ from src.bot.models import User, UserRole, UserType
 
 from .auth_service import verify_session_token
 from .dependencies import get_db_session
+from .user_cache import get_user_cache
 
 logger = logging.getLogger(__name__)
 
 # HTTP Bearer security scheme
 security = HTTPBearer()
 
+# Кэш аутентификации (TTL ограничивает задержку применения изменений из других процессов)
+WEB_USER_CACHE_TTL = float(os.getenv("WEB_USER_CACHE_TTL", "30"))
+WEB_USER_CACHE_SIZE = int(os.getenv("WEB_USER_CACHE_SIZE", "1000"))
+user_cache = get_user_cache(ttl_seconds=WEB_USER_CACHE_TTL, max_size=WEB_USER_CACHE_SIZE)
+
+
+def _decode_token(token: str) -> dict[str, Any]:
+    """
+    Проверить токен с кэшированием payload по хешу токена.
+
+    Raises:
+        ExpiredSignatureError, DecodeError, InvalidSignatureError: Если токен невалидный
+    """
+    payload = user_cache.get_token_payload(token)
+    if payload is None:
+        payload = verify_session_token(token)
+        user_cache.set_token_payload(token, payload)
+    return payload
+
+
+async def _get_active_web_user(session: AsyncSession, user_id: int) -> User | None:
+    """
+    Активный веб-пользователь из кэша или из БД (с сохранением в кэш).
+
+    Загруженный объект отсоединяется от сессии, чтобы его можно было
+    безопасно отдавать в следующих запросах.
+    """
+    user = user_cache.get_user(user_id)
+    if user is not None:
+        return user
+
+    stmt = select(User).where(
+        User.id == user_id,
+        User.user_type == UserType.web,
+        User.is_active == True,  # noqa: E712
+    )
+    result = await session.execute(stmt)
+    user = result.scalar_one_or_none()
+
+    if user is not None:
+        session.expunge(user)
+        user_cache.set_user(user)
+    return user
+
 
 async def get_current_web_user(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
@@ -47,21 +96,15 @@ async def get_current_web_user(
 
     try:
         # Верифицируем токен
-        payload = verify_session_token(token)
+        payload = _decode_token(token)
 
         # Получаем user_id из payload
         user_id = payload.get("user_id")
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid token: missing user_id")
 
-        # Загружаем пользователя из БД
-        stmt = select(User).where(
-            User.id == user_id,
-            User.user_type == UserType.web,
-            User.is_active == True,  # noqa: E712
-        )
-        result = await session.execute(stmt)
-        user = result.scalar_one_or_none()
+        # Загружаем пользователя (из кэша или из БД)
+        user = await _get_active_web_user(session, user_id)
 
         if user is None:
             logger.warning(f"User not found for user_id={user_id} from token")
@@ -126,21 +169,13 @@ async def get_current_user_optional(
     token = authorization.replace("Bearer ", "")
 
     try:
-        payload = verify_session_token(token)
+        payload = _decode_token(token)
         user_id = payload.get("user_id")
 
         if user_id is None or session is None:
             return None
 
-        stmt = select(User).where(
-            User.id == user_id,
-            User.user_type == UserType.web,
-            User.is_active == True,  # noqa: E712
-        )
-        result = await session.execute(stmt)
-        user = result.scalar_one_or_none()
-
-        return user
+        return await _get_active_web_user(session, user_id)
 
     except Exception:
         return None
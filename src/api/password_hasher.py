@@ -0,0 +1,177 @@
+"""
+Асинхронное хеширование паролей (bcrypt) вне event loop.
+
+bcrypt с cost 12 занимает ~250 мс CPU и блокирует uvicorn loop, если вызывать его
+напрямую из async endpoint. PasswordHasher выполняет bcrypt в ограниченном пуле
+потоков (bcrypt освобождает GIL), ограничивает число одновременных вычислений
+и собирает метрики очереди.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypeVar
+
+import bcrypt
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class HasherOverloadedError(Exception):
+    """Очередь на хеширование паролей переполнена."""
+
+
+def hash_password_sync(password: str, rounds: int) -> str:
+    """Синхронное хеширование bcrypt (блокирует поток на время вычисления)."""
+    salt = bcrypt.gensalt(rounds=rounds)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+
+def verify_password_sync(password: str, password_hash: str) -> bool:
+    """Синхронная проверка пароля bcrypt (блокирует поток на время вычисления)."""
+    try:
+        return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
+    except Exception as e:
+        logger.error(f"Error verifying password: {e}")
+        return False
+
+
+class PasswordHasher:
+    """
+    Хеширование и проверка паролей bcrypt в ограниченном пуле потоков.
+
+    Пул создается при первом вычислении и после shutdown создается заново,
+    поэтому общий экземпляр переживает несколько lifespan приложения.
+
+    Использование:
+        hasher = PasswordHasher(rounds=12, max_workers=2)
+        password_hash = await hasher.hash("secret")
+        ok = await hasher.verify("secret", password_hash)
+        if ok and hasher.needs_rehash(password_hash):
+            password_hash = await hasher.hash("secret")
+    """
+
+    def __init__(self, rounds: int = 12, max_workers: int = 2, max_queue: int = 100) -> None:
+        """
+        Инициализация пула.
+
+        Args:
+            rounds: Cost factor bcrypt для новых хешей
+            max_workers: Максимум одновременных bcrypt вычислений (потоков)
+            max_queue: Максимум запросов, ожидающих свободный поток
+
+        Raises:
+            ValueError: Если параметры вне допустимого диапазона
+        """
+        if not 4 <= rounds <= 31:
+            raise ValueError(f"bcrypt rounds must be between 4 and 31, got {rounds}")
+        if max_workers < 1 or max_queue < 0:
+            raise ValueError("max_workers must be >= 1 and max_queue must be >= 0")
+
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: ThreadPoolExecutor | None = None
+        self._semaphore = asyncio.Semaphore(max_workers)
+
+        # Метрики
+        self._in_flight = 0
+        self._waiting = 0
+        self._max_waiting = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._total_run = 0.0
+
+        logger.info(f"PasswordHasher initialized: rounds={rounds}, max_workers={max_workers}")
+
+    async def hash(self, password: str) -> str:
+        """
+        Захешировать пароль с текущим cost factor.
+
+        Raises:
+            HasherOverloadedError: Если очередь на хеширование переполнена
+        """
+        return await self._run(hash_password_sync, password, self.rounds)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        """
+        Проверить пароль против хеша.
+
+        Raises:
+            HasherOverloadedError: Если очередь на хеширование переполнена
+        """
+        return await self._run(verify_password_sync, password, password_hash)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Проверить, создан ли хеш с другим cost factor (формат $2b$<rounds>$...)."""
+        try:
+            return int(password_hash.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    def get_stats(self) -> dict[str, float | int]:
+        """
+        Метрики пула.
+
+        Returns:
+            Словарь с текущей загрузкой, размером очереди и средними временами (мс)
+        """
+        completed = self._completed or 1
+        return {
+            "rounds": self.rounds,
+            "max_workers": self.max_workers,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "max_waiting": self._max_waiting,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "avg_wait_ms": round(self._total_wait / completed * 1000, 2),
+            "avg_run_ms": round(self._total_run / completed * 1000, 2),
+        }
+
+    def shutdown(self) -> None:
+        """Остановить пул потоков (следующее вычисление создаст новый пул)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._in_flight == 0 and self._waiting == 0:
+            # Семафор привязывается к event loop при ожидании: новый для следующего loop
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+
+    async def _run(self, func: Callable[..., T], *args: object) -> T:
+        """Выполнить функцию в пуле с ограничением параллелизма и учетом метрик."""
+        if self._semaphore.locked() and self._waiting >= self.max_queue:
+            self._rejected += 1
+            raise HasherOverloadedError("Password hashing queue is full")
+
+        queued_at = time.perf_counter()
+        if self._semaphore.locked():
+            self._waiting += 1
+            self._max_waiting = max(self._max_waiting, self._waiting)
+            try:
+                await self._semaphore.acquire()
+            finally:
+                self._waiting -= 1
+        else:
+            await self._semaphore.acquire()
+
+        started_at = time.perf_counter()
+        self._in_flight += 1
+        try:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="bcrypt"
+                )
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+            self._completed += 1
+            self._total_wait += started_at - queued_at
+            self._total_run += time.perf_counter() - started_at
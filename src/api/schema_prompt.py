@@ -0,0 +1,105 @@
+"""
+Сборка text2sql prompt со схемой БД из SQLAlchemy моделей.
+
+Описание схемы генерируется из Base.metadata (типы колонок, PK/FK, значения enum,
+индексы, doc колонок), поэтому не расходится с src/bot/models.py.
+Prompt собирается один раз при старте: он одинаков для всех запросов,
+что позволяет upstream кэшировать префикс prompt.
+"""
+
+import hashlib
+import logging
+
+from sqlalchemy import Column, Enum, MetaData, Table
+from sqlalchemy.dialects import postgresql
+
+from src.bot.models import Base
+
+from .sql_validator import EXCLUDED_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Плейсхолдер в шаблоне text2sql_prompt.txt, вместо которого подставляется схема
+SCHEMA_PLACEHOLDER = "{schema}"
+
+_DIALECT = postgresql.dialect()  # type: ignore[no-untyped-call]
+
+
+def _column_type(column: Column) -> str:  # type: ignore[type-arg]
+    """Тип колонки в нотации PostgreSQL (enum - со списком значений)."""
+    if isinstance(column.type, Enum):
+        values = ", ".join(f"'{value}'" for value in column.type.enums)
+        return f"ENUM({values})"
+    return str(column.type.compile(dialect=_DIALECT)).replace(
+        "TIMESTAMP WITH TIME ZONE", "TIMESTAMPTZ"
+    )
+
+
+def _describe_column(column: Column) -> str:  # type: ignore[type-arg]
+    """Одна строка описания колонки: имя, тип, ограничения и doc."""
+    parts = [column.name, _column_type(column)]
+    if column.primary_key:
+        parts.append("PK")
+    parts.extend(f"FK→{fk.target_fullname}" for fk in column.foreign_keys)
+    if not column.primary_key and not column.nullable:
+        parts.append("NOT NULL")
+    line = "- " + " ".join(parts)
+    if column.doc:
+        line += f" -- {column.doc}"
+    return line
+
+
+def _describe_table(table: Table) -> str:
+    """Описание таблицы: колонки и индексы."""
+    lines = [f"Таблица {table.name}:"]
+    lines.extend(
+        _describe_column(column)
+        for column in table.columns
+        if (table.name, column.name) not in EXCLUDED_COLUMNS
+    )
+    for index in sorted(table.indexes, key=lambda idx: idx.name or ""):
+        columns = ", ".join(column.name for column in index.columns)
+        unique = "UNIQUE " if index.unique else ""
+        lines.append(f"- {unique}INDEX {index.name} ({columns})")
+    return "\n".join(lines)
+
+
+def describe_schema(metadata: MetaData = Base.metadata) -> str:
+    """
+    Компактное описание схемы БД для LLM.
+
+    Args:
+        metadata: Метаданные SQLAlchemy (по умолчанию Base.metadata)
+
+    Returns:
+        Описание всех таблиц в детерминированном порядке
+    """
+    return "\n\n".join(_describe_table(table) for table in metadata.sorted_tables)
+
+
+def compile_text2sql_prompt(template: str, metadata: MetaData = Base.metadata) -> str:
+    """
+    Подставить описание схемы в шаблон text2sql prompt.
+
+    Args:
+        template: Шаблон prompt с плейсхолдером {schema}
+        metadata: Метаданные SQLAlchemy (по умолчанию Base.metadata)
+
+    Returns:
+        Готовый system prompt
+
+    Raises:
+        ValueError: Если в шаблоне нет плейсхолдера {schema}
+    """
+    if SCHEMA_PLACEHOLDER not in template:
+        raise ValueError(f"text2sql prompt template has no {SCHEMA_PLACEHOLDER} placeholder")
+    prompt = template.replace(SCHEMA_PLACEHOLDER, describe_schema(metadata))
+    logger.info(
+        f"text2sql prompt compiled: {len(prompt)} chars, fingerprint={prompt_fingerprint(prompt)}"
+    )
+    return prompt
+
+
+def prompt_fingerprint(prompt: str) -> str:
+    """Короткий sha256 отпечаток prompt (для логов и контроля кэширования префикса)."""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
@@ -0,0 +1,262 @@
+"""
+Валидатор SQL запросов для text2sql pipeline.
+
+Разбирает SQL в AST (sqlglot, диалект PostgreSQL) и проверяет дерево по allowlist:
+- только один SELECT / WITH ... SELECT statement
+- только разрешенные таблицы (по умолчанию - таблицы из Base.metadata) и функции
+- без SELECT ... INTO, FOR UPDATE/SHARE и DML внутри CTE
+- без скрытых колонок (EXCLUDED_COLUMNS, например users.password_hash): они не
+  описаны в text2sql prompt и недоступны и в запросе - ни по имени, ни через
+  SELECT * или ссылку на строку таблицы целиком
+
+Если LIMIT отсутствует, он добавляется автоматически.
+На выполнение отдается SQL, сгенерированный из проверенного AST (без комментариев),
+поэтому выполняется ровно то, что было проверено.
+"""
+
+import logging
+from functools import lru_cache
+from typing import cast
+
+import sqlglot
+from sqlglot import exp
+from sqlglot.errors import ParseError
+
+from src.bot.models import Base
+
+logger = logging.getLogger(__name__)
+
+# Разрешенные функции (имена в нотации sqlglot: sql_name() для известных функций,
+# имя в верхнем регистре для остальных)
+DEFAULT_ALLOWED_FUNCTIONS = frozenset(
+    {
+        # Агрегаты
+        "COUNT",
+        "SUM",
+        "AVG",
+        "MIN",
+        "MAX",
+        "ARRAY_AGG",
+        "GROUP_CONCAT",  # STRING_AGG
+        "PERCENTILE_CONT",
+        "PERCENTILE_DISC",
+        # Оконные функции
+        "ROW_NUMBER",
+        "RANK",
+        "DENSE_RANK",
+        "LAG",
+        "LEAD",
+        # Условные выражения и приведение типов
+        "CASE",
+        "IF",
+        "CAST",
+        "TRY_CAST",
+        "COALESCE",
+        "NULLIF",
+        "GREATEST",
+        "LEAST",
+        # Числа
+        "ROUND",
+        "FLOOR",
+        "CEIL",
+        "ABS",
+        # Строки
+        "LENGTH",
+        "LOWER",
+        "UPPER",
+        "TRIM",
+        "SUBSTRING",
+        "CONCAT",
+        # Даты и время
+        "TIMESTAMP_TRUNC",  # DATE_TRUNC
+        "DATE_TRUNC",
+        "EXTRACT",
+        "CURRENT_TIMESTAMP",  # NOW()
+        "CURRENT_DATE",
+        "DATE",
+        "TIME_TO_STR",  # TO_CHAR
+        "AGE",
+        # JSONB
+        "JSON_EXTRACT",
+        "JSON_EXTRACT_SCALAR",
+        "JSONB_TYPEOF",
+        "JSONB_ARRAY_LENGTH",
+    }
+)
+
+# Узлы AST, которые запрещены в любом месте запроса
+_FORBIDDEN_NODES: tuple[type[exp.Expression], ...] = (
+    exp.Insert,
+    exp.Update,
+    exp.Delete,
+    exp.Merge,
+    exp.Create,
+    exp.Drop,
+    exp.Alter,
+    exp.Command,
+    exp.Into,
+    exp.Lock,
+)
+
+# Колонки, которые не нужны для аналитики и не должны попадать в SQL (table, column)
+EXCLUDED_COLUMNS = frozenset({("users", "password_hash")})
+
+DEFAULT_LIMIT = 100
+
+# Размер кэшей разбора и результатов проверки (по строке SQL)
+_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _parse_sql(sql: str) -> tuple[exp.Expression | None, ...]:
+    """
+    Разобрать SQL в AST с кэшированием по строке запроса.
+
+    Возвращаемые деревья разделяются между вызовами - их нельзя изменять на месте.
+
+    Raises:
+        ParseError: Если SQL не удалось разобрать
+    """
+    statements = cast(list[exp.Expression | None], sqlglot.parse(sql, read="postgres"))
+    return tuple(statements)
+
+
+class SQLValidator:
+    """
+    Проверка SQL запросов по AST с allowlist таблиц и функций.
+
+    Использование:
+        validator = SQLValidator()
+        safe_sql = validator.validate("SELECT COUNT(*) FROM users")
+    """
+
+    def __init__(
+        self,
+        allowed_tables: frozenset[str] | None = None,
+        allowed_functions: frozenset[str] = DEFAULT_ALLOWED_FUNCTIONS,
+        default_limit: int = DEFAULT_LIMIT,
+        excluded_columns: frozenset[tuple[str, str]] = EXCLUDED_COLUMNS,
+    ) -> None:
+        """
+        Инициализация валидатора.
+
+        Args:
+            allowed_tables: Разрешенные таблицы (по умолчанию все таблицы Base.metadata)
+            allowed_functions: Разрешенные функции
+            default_limit: LIMIT, добавляемый к запросам без LIMIT
+            excluded_columns: Скрытые колонки (table, column), недоступные в запросах
+        """
+        if allowed_tables is None:
+            allowed_tables = frozenset(Base.metadata.tables.keys())
+        self.allowed_tables = allowed_tables
+        self.allowed_functions = allowed_functions
+        self.excluded_columns = excluded_columns
+        self.default_limit = default_limit
+        # Результат проверки по строке SQL: повторная проверка - один поиск в словаре
+        self._validated: dict[str, str] = {}
+
+    def validate(self, sql: str) -> str:
+        """
+        Проверить SQL запрос и вернуть безопасную версию для выполнения.
+
+        Args:
+            sql: SQL запрос
+
+        Returns:
+            SQL, сгенерированный из проверенного AST (с LIMIT, если его не было)
+
+        Raises:
+            ValueError: Если запрос не прошел проверку
+        """
+        cached = self._validated.get(sql)
+        if cached is not None:
+            return cached
+
+        try:
+            statements = [statement for statement in _parse_sql(sql) if statement is not None]
+        except ParseError as e:
+            raise ValueError(f"SQL parse error: {e}") from e
+
+        if len(statements) != 1:
+            raise ValueError(f"Expected exactly one statement, got {len(statements)}")
+
+        tree = statements[0]
+        if not isinstance(tree, exp.Query):
+            raise ValueError(f"Only SELECT queries are allowed, got {tree.key.upper()}")
+
+        for node in tree.walk():
+            if isinstance(node, _FORBIDDEN_NODES):
+                raise ValueError(f"Forbidden SQL construct: {node.key.upper()}")
+
+        self._check_tables(tree)
+        self._check_excluded_columns(tree)
+        self._check_functions(tree)
+
+        if tree.args.get("limit") is None:
+            tree = tree.limit(self.default_limit)  # copy=True: кэшированное дерево не меняется
+
+        safe_sql = tree.sql(dialect="postgres", comments=False)
+        if len(self._validated) >= _CACHE_SIZE:
+            self._validated.clear()
+        self._validated[sql] = safe_sql
+        return safe_sql
+
+    def _check_tables(self, tree: exp.Expression) -> None:
+        """Проверить что запрос обращается только к разрешенным таблицам (или своим CTE)."""
+        cte_names = {cte.alias_or_name.lower() for cte in tree.find_all(exp.CTE)}
+
+        for table in tree.find_all(exp.Table):
+            name = table.name.lower()
+            schema = table.db.lower()
+            if schema and schema != "public":
+                raise ValueError(f"Table {schema}.{name} is not allowed")
+            if name not in self.allowed_tables and name not in cte_names:
+                raise ValueError(f"Table {name} is not allowed")
+
+    def _check_excluded_columns(self, tree: exp.Expression) -> None:
+        """
+        Проверить что запрос не читает скрытые колонки.
+
+        Колонка по имени запрещена в любом месте запроса. Если запрос обращается
+        к таблице со скрытыми колонками, запрещены и SELECT * (в том числе alias.*),
+        и ссылка на строку таблицы целиком (SELECT users FROM users).
+        """
+        if not self.excluded_columns:
+            return
+        excluded_names = {column for _, column in self.excluded_columns}
+        tables = {table for table, _ in self.excluded_columns}
+        # Таблицы со скрытыми колонками в запросе и их alias
+        referenced = {
+            name
+            for table in tree.find_all(exp.Table)
+            if table.name.lower() in tables
+            for name in (table.name.lower(), table.alias_or_name.lower())
+        }
+
+        for column in tree.find_all(exp.Column):
+            name = column.name.lower()
+            if name in excluded_names:
+                raise ValueError(f"Column {name} is not allowed")
+            if not column.table and name in referenced:
+                raise ValueError(f"Whole-row reference to {name} is not allowed")
+
+        if not referenced:
+            return
+        for select in tree.find_all(exp.Select):
+            for projection in select.expressions:
+                if isinstance(projection, exp.Star) or (
+                    isinstance(projection, exp.Column) and isinstance(projection.this, exp.Star)
+                ):
+                    raise ValueError(
+                        "SELECT * is not allowed for tables with hidden columns, list the columns"
+                    )
+
+    def _check_functions(self, tree: exp.Expression) -> None:
+        """Проверить что запрос вызывает только разрешенные функции."""
+        for func in tree.find_all(exp.Func):
+            # AND/OR, JSONB-операторы, EXISTS и т.п. в sqlglot тоже наследуют Func
+            if isinstance(func, exp.Binary | exp.Predicate):
+                continue
+            name = func.name.upper() if isinstance(func, exp.Anonymous) else func.sql_name()
+            if name not in self.allowed_functions:
+                raise ValueError(f"Function {name} is not allowed")
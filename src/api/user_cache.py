@@ -0,0 +1,191 @@
+"""
+Кэш аутентификации веб-пользователей.
+
+get_current_web_user вызывается на каждый аутентифицированный запрос (включая
+периодический опрос /stats дашбордом). Кэш хранит:
+- декодированные JWT payload по sha256 хешу токена (без повторной проверки подписи)
+- активных веб-пользователей по user_id (без SELECT в БД)
+
+Обе части ограничены по размеру (LRU) и по времени жизни (TTL). Пользователь
+удаляется из кэша при изменении is_active или role через ORM (события SQLAlchemy)
+или явным вызовом invalidate_user. Изменения из других процессов видны не позже TTL.
+"""
+
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, TypeVar
+
+from sqlalchemy import event
+
+from src.bot.models import User
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class WebUserCache:
+    """
+    TTL + LRU кэш веб-пользователей и декодированных токенов.
+
+    Использование:
+        cache = WebUserCache(ttl_seconds=30, max_size=1000)
+        payload = cache.get_token_payload(token)
+        user = cache.get_user(user_id)
+        cache.invalidate_user(user_id)
+    """
+
+    def __init__(self, ttl_seconds: float = 30, max_size: int = 1000) -> None:
+        """
+        Инициализация кэша.
+
+        Args:
+            ttl_seconds: Время жизни записи в секундах
+            max_size: Максимум записей в каждой из частей кэша (пользователи, токены)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._users: OrderedDict[int, tuple[User, float]] = OrderedDict()
+        self._tokens: OrderedDict[str, tuple[dict[str, Any], float]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get_user(self, user_id: int) -> User | None:
+        """
+        Получить пользователя из кэша.
+
+        Args:
+            user_id: ID пользователя
+
+        Returns:
+            User (detached от сессии) или None, если нет в кэше или истек TTL
+        """
+        return self._get(self._users, user_id)
+
+    def set_user(self, user: User) -> None:
+        """
+        Сохранить пользователя в кэш.
+
+        Args:
+            user: User, отсоединенный от сессии (session.expunge), с загруженными полями
+        """
+        self._set(self._users, user.id, user, time.monotonic() + self.ttl_seconds)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """
+        Удалить пользователя из кэша (деактивация, смена роли).
+
+        Args:
+            user_id: ID пользователя
+        """
+        if self._users.pop(user_id, None) is not None:
+            logger.debug(f"Web user {user_id} invalidated in auth cache")
+
+    def get_token_payload(self, token: str) -> dict[str, Any] | None:
+        """
+        Получить декодированный payload токена из кэша.
+
+        Args:
+            token: JWT токен
+
+        Returns:
+            Payload или None, если нет в кэше или истек TTL/срок действия токена
+        """
+        return self._get(self._tokens, self._token_key(token))
+
+    def set_token_payload(self, token: str, payload: dict[str, Any]) -> None:
+        """
+        Сохранить декодированный payload токена (не дольше срока действия токена).
+
+        Args:
+            token: JWT токен
+            payload: Проверенный payload токена
+        """
+        expires_at = time.monotonic() + self.ttl_seconds
+        exp = payload.get("exp")
+        if isinstance(exp, int | float):
+            expires_at = min(expires_at, time.monotonic() + exp - time.time())
+        self._set(self._tokens, self._token_key(token), payload, expires_at)
+
+    def clear(self) -> None:
+        """Очистить кэш."""
+        self._users.clear()
+        self._tokens.clear()
+
+    def get_stats(self) -> dict[str, int]:
+        """
+        Статистика кэша.
+
+        Returns:
+            Размеры частей кэша, попадания и промахи
+        """
+        return {
+            "users": len(self._users),
+            "tokens": len(self._tokens),
+            "hits": self._hits,
+            "misses": self._misses,
+        }
+
+    def _get(self, storage: OrderedDict[K, tuple[V, float]], key: K) -> V | None:
+        """Получить значение с проверкой TTL и обновлением LRU порядка."""
+        entry = storage.get(key)
+        if entry is None or time.monotonic() >= entry[1]:
+            if entry is not None:
+                del storage[key]
+            self._misses += 1
+            return None
+        storage.move_to_end(key)
+        self._hits += 1
+        return entry[0]
+
+    def _set(
+        self,
+        storage: OrderedDict[K, tuple[V, float]],
+        key: K,
+        value: V,
+        expires_at: float,
+    ) -> None:
+        """Сохранить значение, вытеснив самые старые записи при превышении max_size."""
+        storage[key] = (value, expires_at)
+        storage.move_to_end(key)
+        while len(storage) > self.max_size:
+            storage.popitem(last=False)
+
+    @staticmethod
+    def _token_key(token: str) -> str:
+        """Ключ кэша токена: sha256 (сам токен в памяти кэша не хранится)."""
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+# Глобальный экземпляр кэша (singleton)
+_user_cache: WebUserCache | None = None
+
+
+def get_user_cache(ttl_seconds: float = 30, max_size: int = 1000) -> WebUserCache:
+    """
+    Получить глобальный экземпляр кэша пользователей (singleton pattern).
+
+    Args:
+        ttl_seconds: TTL в секундах (используется только при первом вызове)
+        max_size: Максимум записей (используется только при первом вызове)
+
+    Returns:
+        WebUserCache instance
+    """
+    global _user_cache
+    if _user_cache is None:
+        _user_cache = WebUserCache(ttl_seconds=ttl_seconds, max_size=max_size)
+    return _user_cache
+
+
+def _invalidate_on_change(target: User, value: Any, oldvalue: Any, initiator: Any) -> None:  # noqa: ANN401
+    """ORM событие: изменение is_active или role сбрасывает пользователя в кэше."""
+    if _user_cache is not None and target.id is not None and value != oldvalue:
+        _user_cache.invalidate_user(target.id)
+
+
+event.listen(User.is_active, "set", _invalidate_on_change)
+event.listen(User.role, "set", _invalidate_on_change)
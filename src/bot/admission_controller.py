@@ -0,0 +1,123 @@
+"""
+Контроль допуска (admission control) обработки сообщений.
+
+Каждый обработчик держит соединение из пула БД и запрос к LLM. Без ограничения
+всплеск сообщений запускает сотни обработчиков одновременно, и пул соединений
+(DB_POOL_SIZE + DB_MAX_OVERFLOW) начинает отдавать timeout всем сразу.
+Контроллер пропускает не больше max_concurrency обработок, держит ограниченную
+очередь ожидающих и отклоняет обработку сразу (очередь заполнена) или по истечении
+queue_timeout: пользователь быстро получает "попробуйте позже" вместо долгого
+ожидания и ошибки.
+"""
+
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionController:
+    """
+    Ограничение одновременных обработок с ограниченной очередью ожидания.
+
+    Использование:
+        admission = AdmissionController(max_concurrency=10, max_queue=50, queue_timeout=10)
+        if not await admission.acquire():
+            ...  # перегрузка: ответить "попробуйте позже"
+        try:
+            ...  # обработка
+        finally:
+            admission.release()
+    """
+
+    def __init__(
+        self, max_concurrency: int = 10, max_queue: int = 50, queue_timeout: float = 10.0
+    ) -> None:
+        """
+        Инициализация контроллера.
+
+        Args:
+            max_concurrency: Максимум одновременных обработок
+            max_queue: Максимум ожидающих обработок (сверх него - отказ сразу)
+            queue_timeout: Максимальное ожидание в очереди в секундах
+
+        Raises:
+            ValueError: Если max_concurrency < 1 или max_queue < 0
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must not be negative")
+
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = 0
+        self._waiting = 0
+        self._max_waiting = 0
+        self._admitted = 0
+        self._rejected_queue_full = 0
+        self._rejected_timeout = 0
+
+    async def acquire(self) -> bool:
+        """
+        Занять место для обработки, при необходимости дождавшись его в очереди.
+
+        Returns:
+            True, если обработка допущена (после нее обязателен release),
+            False при перегрузке
+        """
+        if not self._semaphore.locked():
+            # Свободное место есть: acquire завершается без ожидания
+            await self._semaphore.acquire()
+        elif not await self._wait_in_queue():
+            return False
+
+        self._in_flight += 1
+        self._admitted += 1
+        return True
+
+    async def _wait_in_queue(self) -> bool:
+        """Дождаться места в очереди; False, если очередь заполнена или истек timeout."""
+        if self._waiting >= self.max_queue:
+            self._rejected_queue_full += 1
+            logger.warning(
+                f"Admission rejected: queue is full ({self._waiting} waiting, "
+                f"{self._in_flight} in flight)"
+            )
+            return False
+
+        self._waiting += 1
+        self._max_waiting = max(self._max_waiting, self._waiting)
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except TimeoutError:
+            self._rejected_timeout += 1
+            logger.warning(f"Admission rejected: waited more than {self.queue_timeout}s in queue")
+            return False
+        finally:
+            self._waiting -= 1
+        return True
+
+    def release(self) -> None:
+        """Освободить место после завершения допущенной обработки."""
+        self._in_flight -= 1
+        self._semaphore.release()
+
+    def get_stats(self) -> dict[str, int]:
+        """
+        Статистика контроллера.
+
+        Returns:
+            Обработки в работе и в очереди, максимальная длина очереди,
+            количество допущенных и отклоненных (очередь заполнена / timeout ожидания)
+        """
+        return {
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "max_waiting": self._max_waiting,
+            "admitted": self._admitted,
+            "rejected_queue_full": self._rejected_queue_full,
+            "rejected_timeout": self._rejected_timeout,
+        }
@@ -0,0 +1,52 @@
+"""
+Aiogram middleware: допуск update к обработке через AdmissionController.
+
+Регистрируется после UserLockMiddleware и до DatabaseSessionMiddleware:
+update, ожидающий места, не держит соединение БД, а при перегрузке
+пользователь сразу получает ответ "попробуйте позже".
+"""
+
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from .admission_controller import AdmissionController
+
+BUSY_MESSAGE = "⏳ Сейчас слишком много запросов. Пожалуйста, повторите через минуту."
+
+
+class AdmissionMiddleware(BaseMiddleware):
+    """
+    Middleware с ограничением одновременно обрабатываемых updates.
+
+    Использование:
+        dp.update.outer_middleware(AdmissionMiddleware(AdmissionController()))
+    """
+
+    def __init__(self, admission: AdmissionController) -> None:
+        """
+        Инициализация middleware.
+
+        Args:
+            admission: Контроллер допуска
+        """
+        self.admission = admission
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:  # noqa: ANN401
+        """Вызвать обработчик, если есть место, иначе ответить о перегрузке."""
+        if not await self.admission.acquire():
+            if isinstance(event, Update) and event.message is not None:
+                await event.message.answer(BUSY_MESSAGE)
+            return None
+
+        try:
+            return await handler(event, data)
+        finally:
+            self.admission.release()
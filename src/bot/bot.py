@@ -1,17 +1,47 @@
 import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
 
 from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.filters import Command
 from aiogram.types import Message
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from .admission_controller import AdmissionController
+from .admission_middleware import BUSY_MESSAGE, AdmissionMiddleware
 from .command_handler import CommandHandler
+from .conversation_summarizer import ConversationSummarizer
+from .database_middleware import DatabaseSessionMiddleware
+from .llm_client import get_all_circuit_stats, get_all_usage_stats
+from .llm_limiter import get_llm_limiter
+from .llm_response_cache import get_llm_response_cache
 from .message_handler import MessageHandler
 from .repository import UserRepository
+from .unit_of_work import unit_of_work
+from .user_lock_middleware import UserLockMiddleware
+from .user_lock_registry import UserLockRegistry
 
 logger = logging.getLogger(__name__)
 
 
+def create_aiogram_bot(token: str, api_url: str | None = None) -> Bot:
+    """
+    Создать aiogram Bot.
+
+    Args:
+        token: Токен Telegram бота
+        api_url: Адрес Bot API (None - api.telegram.org), например локальный fake Telegram
+
+    Returns:
+        aiogram Bot
+    """
+    if api_url is None:
+        return Bot(token=token)
+    return Bot(token=token, session=AiohttpSession(api=TelegramAPIServer.from_base(api_url)))
+
+
 class TelegramBot:
     """
     Telegram бот - отвечает только за инфраструктуру aiogram.
@@ -19,6 +49,9 @@ class TelegramBot:
     Делегирует обработку команд в CommandHandler,
     обработку сообщений в MessageHandler.
     Автоматически отслеживает пользователей через UserRepository.
+    Каждый update обрабатывается в одной сессии БД (DatabaseSessionMiddleware).
+    Updates одного пользователя обрабатываются по очереди (UserLockMiddleware),
+    разных пользователей - параллельно, но не больше лимита AdmissionController.
     """
 
     bot: Bot
@@ -26,6 +59,9 @@ class TelegramBot:
     message_handler: MessageHandler
     command_handler: CommandHandler
     session_factory: async_sessionmaker[AsyncSession]
+    user_locks: UserLockRegistry
+    admission: AdmissionController
+    summarizer: ConversationSummarizer | None
 
     def __init__(
         self,
@@ -33,6 +69,10 @@ class TelegramBot:
         message_handler: MessageHandler,
         command_handler: CommandHandler,
         session_factory: async_sessionmaker[AsyncSession],
+        api_url: str | None = None,
+        cancel_on_message: bool = False,
+        admission: AdmissionController | None = None,
+        summarizer: ConversationSummarizer | None = None,
     ) -> None:
         """
         Инициализация Telegram бота.
@@ -42,12 +82,26 @@ class TelegramBot:
             message_handler: Обработчик пользовательских сообщений
             command_handler: Обработчик команд бота
             session_factory: Фабрика сессий для создания UserRepository
+            api_url: Адрес Bot API (None - api.telegram.org)
+            cancel_on_message: Отменять ответ на предыдущее сообщение, если пользователь
+                прислал новое до его получения (/reset отменяет всегда)
+            admission: Ограничение одновременных обработок (по умолчанию - AdmissionController())
+            summarizer: Фоновое сжатие ранней части диалога после ответа (None - выключено)
         """
-        self.bot = Bot(token=token)
+        self.bot = create_aiogram_bot(token, api_url)
         self.dp = Dispatcher()
         self.message_handler = message_handler
         self.command_handler = command_handler
         self.session_factory = session_factory
+        self.user_locks = UserLockRegistry()
+        self.cancel_on_message = cancel_on_message
+        self.admission = admission if admission is not None else AdmissionController()
+        self.summarizer = summarizer
+        # Порядок важен: блокировка пользователя и место в AdmissionController
+        # захватываются до открытия сессии БД
+        self.dp.update.outer_middleware(UserLockMiddleware(self.user_locks, cancel_on_message))
+        self.dp.update.outer_middleware(AdmissionMiddleware(self.admission))
+        self.dp.update.outer_middleware(DatabaseSessionMiddleware(session_factory))
         self._register_handlers()
         logger.info("TelegramBot instance created")
 
@@ -76,8 +130,8 @@ class TelegramBot:
         if message.from_user is None:
             return None
 
-        async with self.session_factory() as session:
-            user_repo = UserRepository(session)
+        async with unit_of_work(self.session_factory) as session:
+            user_repo = UserRepository(session, auto_commit=False)
             user = await user_repo.get_or_create_user(
                 telegram_id=message.from_user.id,
                 username=message.from_user.username,
@@ -146,6 +200,9 @@ class TelegramBot:
         username = message.from_user.username or "unknown"
         logger.info(f"User {telegram_id} (@{username}) executed /reset command")
 
+        # Ход в обработке отменен UserLockMiddleware, накопленные для debounce сообщения
+        # относятся к старому диалогу
+        self.message_handler.cancel_pending(user_id)
         response = await self.command_handler.reset_dialogue(user_id)
         await message.answer(response)
 
@@ -162,12 +219,20 @@ class TelegramBot:
         telegram_id = message.from_user.id
         username = message.from_user.username or "unknown"
 
+        if self.message_handler.debounce_ms > 0:
+            # Быстрые сообщения подряд объединяются в один ход, ответ отправляется один раз
+            self.message_handler.debounce(
+                user_id, message.text, self._debounced_reply(message, user_id)
+            )
+            return
+
         try:
             # Делегируем обработку в MessageHandler
             response = await self.message_handler.handle_user_message(
                 user_id, username, message.text
             )
             await message.answer(response)
+            self._schedule_summary(user_id)
 
         except Exception as e:
             logger.error(f"Error handling message from user {telegram_id}: {e}", exc_info=True)
@@ -204,6 +269,7 @@ class TelegramBot:
                 user_id, username, photo_file_id, caption, self.bot
             )
             await message.answer(response)
+            self._schedule_summary(user_id)
 
         except Exception as e:
             logger.error(f"Error handling photo from user {telegram_id}: {e}", exc_info=True)
@@ -229,12 +295,26 @@ class TelegramBot:
 
         logger.info(f"User {telegram_id} (@{username}) sent voice: file_id={voice_file_id}")
 
+        # Модель распознавания еще загружается: сообщение дождется ее готовности
+        media_provider = self.message_handler.media_provider
+        if media_provider is not None and not media_provider.is_ready:
+            await message.answer("Распознавание речи загружается, отвечу через несколько секунд...")
+
         try:
+            if self.message_handler.debounce_ms > 0:
+                # Распознанный текст объединяется с соседними сообщениями в один ход
+                text = await self.message_handler.transcribe_voice(user_id, voice_file_id, self.bot)
+                self.message_handler.debounce(
+                    user_id, text, self._debounced_reply(message, user_id)
+                )
+                return
+
             # Делегируем обработку в MessageHandler
             response = await self.message_handler.handle_voice_message(
                 user_id, username, voice_file_id, self.bot
             )
             await message.answer(response)
+            self._schedule_summary(user_id)
 
         except Exception as e:
             logger.error(f"Error handling voice from user {telegram_id}: {e}", exc_info=True)
@@ -243,5 +323,90 @@ class TelegramBot:
                 "Попробуйте еще раз или используйте /reset для очистки истории."
             )
 
+    def _debounced_reply(self, message: Message, user_id: int) -> Callable[[str], Awaitable[None]]:
+        """
+        Создать обработчик объединенного текста для MessageHandler.debounce.
+
+        Вызывается вне обработки update, поэтому сам захватывает блокировку
+        пользователя и открывает unit of work. Если ход отменен новым сообщением
+        до сохранения текста, текст возвращается в пачку и объединяется с новым;
+        сохраненный текст остается в истории и учитывается следующим ходом.
+
+        Args:
+            message: Последнее сообщение пачки (на него отправляется ответ)
+            user_id: Внутренний user.id из базы данных
+        """
+        telegram_id = message.from_user.id if message.from_user else user_id
+        username = message.from_user.username if message.from_user else None
+
+        async def turn(text: str, saved: list[bool]) -> bool:
+            # Ход выполняется вне update: место в AdmissionController занимаем здесь
+            if not await self.admission.acquire():
+                await message.answer(BUSY_MESSAGE)
+                return True
+            try:
+                async with unit_of_work(self.session_factory):
+                    try:
+                        await self.message_handler.save_user_message(user_id, text)
+                        saved.append(True)
+                        response = await self.message_handler.handle_user_message(
+                            user_id, username or "unknown", text, user_message_saved=True
+                        )
+                        await message.answer(response)
+                        self._schedule_summary(user_id)
+                    except Exception as e:
+                        logger.error(
+                            f"Error handling messages from user {telegram_id}: {e}", exc_info=True
+                        )
+                        await message.answer(
+                            "Извините, произошла ошибка при обработке вашего сообщения. "
+                            "Попробуйте еще раз или используйте /reset для очистки истории."
+                        )
+            finally:
+                self.admission.release()
+            return True
+
+        async def reply(text: str) -> None:
+            saved: list[bool] = []
+            if await self.user_locks.run(telegram_id, turn(text, saved)) is None and not saved:
+                # Ход отменен до сохранения текста: после /reset пачку очистит cmd_reset
+                self.message_handler.debounce(user_id, text, reply)
+
+        return reply
+
+    def _schedule_summary(self, user_id: int) -> None:
+        """После отправки ответа сжать вышедшую за окно часть диалога в фоне."""
+        if self.summarizer is not None:
+            self.summarizer.schedule(user_id)
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Статистика нагрузки бота.
+
+        Returns:
+            Статистика блокировок пользователей (очереди, отмены), admission control
+            (обработки в работе, глубина очереди, отказы), лимита запросов к LLM,
+            circuit breaker моделей, расход токенов (с кэшем префикса), кэша ответов LLM
+            и фонового сжатия диалогов
+        """
+        return {
+            "user_locks": self.user_locks.get_stats(),
+            "admission": self.admission.get_stats(),
+            "llm": get_llm_limiter().get_stats(),
+            "llm_circuits": get_all_circuit_stats(),
+            "llm_usage": get_all_usage_stats(),
+            "llm_cache": get_llm_response_cache().get_stats(),
+            "summarizer": self.summarizer.get_stats() if self.summarizer is not None else {},
+        }
+
     async def start(self) -> None:
         await self.dp.start_polling(self.bot)
+
+    async def feed_update(self, update: dict[str, Any]) -> None:
+        """
+        Обработать update, полученный через webhook.
+
+        Args:
+            update: Update от Telegram (JSON)
+        """
+        await self.dp.feed_raw_update(self.bot, update)
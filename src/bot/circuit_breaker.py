@@ -0,0 +1,137 @@
+"""
+Circuit breaker для вызовов внешнего сервиса (провайдера LLM).
+
+Пока провайдер недоступен, каждый запрос ждал бы timeout и retries, занимая
+обработчик на минуты. После failure_threshold ошибок подряд breaker размыкается
+(open) и вызовы сразу завершаются CircuitOpenError. Через reset_timeout breaker
+пропускает один пробный вызов (half_open): успех замыкает его (closed),
+ошибка снова размыкает.
+"""
+
+import logging
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Вызов отклонен: breaker разомкнут, сервис считается недоступным."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker со счетчиком ошибок подряд и пробным вызовом.
+
+    Использование:
+        breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+        with breaker.call():
+            response = await client.request(...)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        is_failure: Callable[[Exception], bool] = lambda error: True,
+    ) -> None:
+        """
+        Инициализация breaker.
+
+        Args:
+            name: Имя защищаемого сервиса (для логов и ошибок)
+            failure_threshold: Ошибок подряд до размыкания
+            reset_timeout: Секунд до пробного вызова после размыкания
+            is_failure: Считать ли исключение отказом сервиса (ошибки запроса - нет)
+
+        Raises:
+            ValueError: Если failure_threshold < 1
+        """
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probe_in_flight = False
+        self._opened = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        """Текущее состояние: closed, open или half_open (можно сделать пробный вызов)."""
+        if self._opened_at is None:
+            return STATE_CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return STATE_HALF_OPEN
+        return STATE_OPEN
+
+    @contextmanager
+    def call(self) -> Iterator[None]:
+        """
+        Выполнить вызов под защитой breaker.
+
+        Raises:
+            CircuitOpenError: Если breaker разомкнут или пробный вызов уже выполняется
+        """
+        state = self.state
+        if state == STATE_OPEN or (state == STATE_HALF_OPEN and self._probe_in_flight):
+            self._rejected += 1
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit {state})")
+
+        probe = state == STATE_HALF_OPEN
+        if probe:
+            self._probe_in_flight = True
+        try:
+            yield
+        except Exception as e:
+            if self.is_failure(e):
+                self._record_failure(probe)
+            elif probe:
+                # Ошибка запроса, а не сервиса: сервис отвечает
+                self._record_success()
+            raise
+        else:
+            self._record_success()
+        finally:
+            if probe:
+                self._probe_in_flight = False
+
+    def _record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info(f"Circuit {self.name} closed: probe request succeeded")
+        self._failures = 0
+        self._opened_at = None
+
+    def _record_failure(self, probe: bool) -> None:
+        self._failures += 1
+        if probe or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._opened += 1
+            logger.warning(
+                f"Circuit {self.name} opened after {self._failures} failures, "
+                f"next probe in {self.reset_timeout}s"
+            )
+
+    def get_stats(self) -> dict[str, str | int]:
+        """
+        Состояние breaker.
+
+        Returns:
+            Состояние, ошибок подряд, сколько раз размыкался и сколько вызовов отклонено
+        """
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "opened": self._opened,
+            "rejected": self._rejected,
+        }
@@ -0,0 +1,180 @@
+"""
+Фоновое сжатие ранней части диалога в summary.
+
+Длинная консультация выходит за окно истории (MAX_HISTORY_MESSAGES,
+CONTEXT_TOKEN_BUDGET), и ранний контекст (размеры, бюджет, стиль) теряется,
+а увеличение окна удорожает каждый ход. После отправки ответа summarizer
+в фоне сворачивает вышедшие за окно сообщения в summary пользователя;
+DialogueManager добавляет его в начало истории. Размер запроса остается
+ограниченным, а долгосрочная память сохраняется.
+"""
+
+import asyncio
+import contextvars
+import logging
+from pathlib import Path
+from typing import Any
+
+from .dialogue_manager import DialogueManager
+from .interfaces import LLMProvider
+from .llm_limiter import PRIORITY_ANALYTICS
+
+logger = logging.getLogger(__name__)
+
+# Максимальная длина одного сообщения в запросе на сжатие
+MAX_MESSAGE_CHARS = 2000
+
+ROLE_NAMES = {"user": "Клиент", "assistant": "Дизайнер"}
+
+
+def load_summary_prompt() -> str:
+    """Загрузить system prompt для сжатия диалога из summary_prompt.txt."""
+    return (Path(__file__).parent / "summary_prompt.txt").read_text(encoding="utf-8").strip()
+
+
+def format_transcript(messages: list[dict[str, Any]]) -> str:
+    """
+    Текст переписки для запроса на сжатие.
+
+    Изображения заменяются пометкой, длинные сообщения обрезаются.
+
+    Args:
+        messages: Сообщения в формате [{"role": "user", "content": ...}]
+
+    Returns:
+        Переписка построчно "Клиент: ..." / "Дизайнер: ..."
+    """
+    lines = []
+    for message in messages:
+        content = message["content"]
+        if isinstance(content, dict):
+            text = str(content.get("text", ""))
+        elif isinstance(content, list):
+            parts = [
+                "[изображение]" if part.get("type") == "image_url" else str(part.get("text", ""))
+                for part in content
+            ]
+            text = " ".join(parts)
+        else:
+            text = str(content)
+        if len(text) > MAX_MESSAGE_CHARS:
+            text = text[:MAX_MESSAGE_CHARS] + "..."
+        lines.append(f"{ROLE_NAMES.get(message['role'], message['role'])}: {text}")
+    return "\n".join(lines)
+
+
+class ConversationSummarizer:
+    """
+    Фоновое обновление summary диалога после ответа пользователю.
+
+    Использование:
+        summarizer = ConversationSummarizer(llm.with_system_prompt(load_summary_prompt()), dm)
+        await message.answer(response)
+        summarizer.schedule(user_id)
+    """
+
+    def __init__(
+        self,
+        llm_provider: LLMProvider,
+        dialogue_manager: DialogueManager,
+        min_messages: int = 6,
+        batch_size: int = 40,
+    ) -> None:
+        """
+        Инициализация summarizer.
+
+        Args:
+            llm_provider: LLM провайдер с system prompt для сжатия (summary_prompt.txt)
+            dialogue_manager: Менеджер диалогов (окно истории и хранение summary)
+            min_messages: Сжимать, когда за окном накопилось столько сообщений
+                (реже запросы к LLM)
+            batch_size: Максимум сообщений за одно сжатие
+
+        Raises:
+            ValueError: Если min_messages < 1 или batch_size < min_messages
+        """
+        if min_messages < 1 or batch_size < min_messages:
+            raise ValueError("Summarizer requires 1 <= min_messages <= batch_size")
+
+        self.llm_provider = llm_provider
+        self.dialogue_manager = dialogue_manager
+        self.min_messages = min_messages
+        self.batch_size = batch_size
+        self._tasks: dict[int, asyncio.Task[bool]] = {}
+        self._summarized = 0
+        self._failed = 0
+
+    def schedule(self, user_id: int) -> None:
+        """
+        Запустить сжатие диалога пользователя в фоне (если оно еще не выполняется).
+
+        Args:
+            user_id: Внутренний user.id
+        """
+        if user_id in self._tasks:
+            return
+        # Пустой контекст: задача не должна использовать unit of work текущего update
+        task = asyncio.create_task(self._run(user_id), context=contextvars.Context())
+        self._tasks[user_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(user_id, None))
+
+    async def _run(self, user_id: int) -> bool:
+        try:
+            return await self.summarize(user_id)
+        except Exception as e:
+            self._failed += 1
+            logger.error(f"Error summarizing dialogue of user {user_id}: {e}", exc_info=True)
+            return False
+
+    async def summarize(self, user_id: int) -> bool:
+        """
+        Свернуть вышедшие за окно сообщения в summary.
+
+        Args:
+            user_id: Внутренний user.id
+
+        Returns:
+            True, если summary обновлен
+        """
+        summary, messages = await self.dialogue_manager.get_messages_to_summarize(
+            user_id, self.batch_size
+        )
+        if len(messages) < self.min_messages:
+            return False
+
+        # Запрос к LLM выполняется без открытой сессии БД
+        request = (
+            f"Текущий конспект:\n{summary or '(пока нет)'}\n\n"
+            f"Следующая часть переписки:\n{format_transcript(messages)}"
+        )
+        new_summary = await self.llm_provider.get_response(
+            [{"role": "user", "content": request}], priority=PRIORITY_ANALYTICS
+        )
+
+        if not await self.dialogue_manager.save_summary(
+            user_id, new_summary.strip(), messages[-1]["id"]
+        ):
+            return False
+        self._summarized += 1
+        logger.info(f"Summarized {len(messages)} messages of user {user_id}")
+        return True
+
+    async def stop(self) -> None:
+        """Отменить выполняющиеся сжатия (при остановке бота)."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_stats(self) -> dict[str, int]:
+        """
+        Статистика summarizer.
+
+        Returns:
+            Выполняющиеся сжатия, обновленные summary и ошибки
+        """
+        return {
+            "running": len(self._tasks),
+            "summarized": self._summarized,
+            "failed": self._failed,
+        }
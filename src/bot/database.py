@@ -2,9 +2,15 @@
 Настройка подключения к базе данных.
 
 Использует async engine и session factory для работы с PostgreSQL.
+Engine создается один раз на DATABASE_URL (реестр): бот, StatCollector,
+ChatService и аутентификация в одном процессе используют общий пул соединений.
+Параметры пула задаются через переменные окружения DB_*.
 """
 
 import logging
+import os
+import uuid
+from typing import Any
 
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -12,11 +18,104 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.pool import QueuePool
 
 from .config import Config
+from .timed_pool import TimedQueuePool
 
 logger = logging.getLogger(__name__)
 
+# Реестр engine и session factory по DATABASE_URL
+_engines: dict[str, AsyncEngine] = {}
+_session_factories: dict[str, async_sessionmaker[AsyncSession]] = {}
+
+
+def _env_flag(name: str, default: str) -> bool:
+    """Прочитать булеву переменную окружения (true/1/yes)."""
+    return os.getenv(name, default).strip().lower() in ("true", "1", "yes")
+
+
+def get_engine_options(database_url: str) -> dict[str, Any]:
+    """
+    Собрать параметры create_async_engine из переменных окружения.
+
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT - размер пула и ожидание соединения,
+    DB_POOL_PRE_PING - проверка соединения перед выдачей из пула,
+    DB_POOL_RECYCLE - пересоздание соединений старше N секунд,
+    DB_STATEMENT_CACHE_SIZE - кэш prepared statements asyncpg,
+    DB_PGBOUNCER - совместимость с PgBouncer в transaction mode
+    (кэш prepared statements отключен, имена statements уникальны).
+
+    Args:
+        database_url: URL подключения к БД
+
+    Returns:
+        Словарь параметров для create_async_engine
+    """
+    options: dict[str, Any] = {
+        "echo": False,  # Не логировать SQL запросы (можно включить для отладки)
+        "poolclass": TimedQueuePool,
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_pre_ping": _env_flag("DB_POOL_PRE_PING", "true"),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
+
+    if "+asyncpg" in database_url:
+        if _env_flag("DB_PGBOUNCER", "false"):
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            }
+        else:
+            options["connect_args"] = {
+                "prepared_statement_cache_size": int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100")),
+            }
+
+    return options
+
+
+def get_engine(database_url: str) -> AsyncEngine:
+    """
+    Получить engine для DATABASE_URL (создается при первом вызове).
+
+    Args:
+        database_url: URL подключения к БД
+
+    Returns:
+        Общий AsyncEngine для этого URL
+    """
+    engine = _engines.get(database_url)
+    if engine is None:
+        options = get_engine_options(database_url)
+        engine = create_async_engine(database_url, **options)
+        _engines[database_url] = engine
+        logger.info(
+            f"Database engine created for {engine.url.render_as_string(hide_password=True)}: "
+            f"pool_size={options['pool_size']}, max_overflow={options['max_overflow']}, "
+            f"pre_ping={options['pool_pre_ping']}, recycle={options['pool_recycle']}"
+        )
+    return engine
+
+
+def get_session_factory(database_url: str) -> async_sessionmaker[AsyncSession]:
+    """
+    Получить общую фабрику сессий для DATABASE_URL.
+
+    Args:
+        database_url: URL подключения к БД
+
+    Returns:
+        async_sessionmaker поверх общего engine
+    """
+    session_factory = _session_factories.get(database_url)
+    if session_factory is None:
+        session_factory = create_session_factory(get_engine(database_url))
+        _session_factories[database_url] = session_factory
+    return session_factory
+
 
 def create_engine(config: Config) -> AsyncEngine:
     """
@@ -26,16 +125,9 @@ def create_engine(config: Config) -> AsyncEngine:
         config: Конфигурация приложения с database_url
 
     Returns:
-        AsyncEngine для работы с БД
+        AsyncEngine для работы с БД (общий для всех вызовов с тем же URL)
     """
-    engine = create_async_engine(
-        config.database_url,
-        echo=False,  # Не логировать SQL запросы (можно включить для отладки)
-        pool_size=5,  # Размер пула соединений
-        max_overflow=10,  # Максимальное количество дополнительных соединений
-    )
-    logger.info(f"Database engine created for {config.database_url.split('@')[1]}")
-    return engine
+    return get_engine(config.database_url)
 
 
 def create_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
@@ -53,3 +145,86 @@ def create_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSessi
         class_=AsyncSession,
         expire_on_commit=False,  # Не сбрасывать объекты после commit
     )
+
+
+async def warm_up_pool(engine: AsyncEngine, connections: int | None = None) -> int:
+    """
+    Прогреть пул: заранее открыть соединения, чтобы первые запросы не ждали connect.
+
+    Args:
+        engine: AsyncEngine
+        connections: Сколько соединений открыть (по умолчанию DB_POOL_WARMUP, не больше pool_size)
+
+    Returns:
+        Количество открытых соединений
+    """
+    if connections is None:
+        connections = int(os.getenv("DB_POOL_WARMUP", "2"))
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        connections = min(connections, pool.size())
+
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(await engine.connect())
+    finally:
+        for connection in opened:
+            await connection.close()
+
+    logger.info(f"Database pool warmed up with {len(opened)} connections")
+    return len(opened)
+
+
+async def warm_up_engines() -> None:
+    """Прогреть пулы всех engine из реестра."""
+    for engine in _engines.values():
+        await warm_up_pool(engine)
+
+
+def get_pool_stats(engine: AsyncEngine) -> dict[str, float | int]:
+    """
+    Метрики пула соединений engine.
+
+    Args:
+        engine: AsyncEngine
+
+    Returns:
+        Размер пула, занятые/свободные соединения, overflow и метрики ожидания checkout
+    """
+    pool = engine.pool
+    stats: dict[str, float | int] = {}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            {
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            }
+        )
+    if isinstance(pool, TimedQueuePool):
+        stats.update(pool.get_wait_stats())
+    return stats
+
+
+def get_all_pool_stats() -> dict[str, dict[str, float | int]]:
+    """
+    Метрики пулов всех engine из реестра.
+
+    Returns:
+        Словарь {URL без пароля: метрики пула}
+    """
+    return {
+        engine.url.render_as_string(hide_password=True): get_pool_stats(engine)
+        for engine in _engines.values()
+    }
+
+
+async def dispose_engines() -> None:
+    """Закрыть соединения всех engine и очистить реестр."""
+    for engine in _engines.values():
+        await engine.dispose()
+    _engines.clear()
+    _session_factories.clear()
+    logger.info("Database engines disposed")
@@ -0,0 +1,51 @@
+"""
+Aiogram middleware: одна сессия БД (unit of work) на каждый Telegram update.
+
+Сессия открывается до вызова обработчика и передается ему в data["session"].
+_track_user, DialogueManager и другие хранилища внутри обработчика используют
+ее же через unit_of_work: commit после обработчика, rollback при исключении.
+Перед скачиванием медиа, распознаванием речи и запросом к LLM MessageHandler
+фиксирует транзакцию (release_connection), и соединение возвращается в пул
+на время внешнего вызова; следующие операции update идут в новой транзакции.
+"""
+
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .unit_of_work import unit_of_work
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseSessionMiddleware(BaseMiddleware):
+    """
+    Middleware с unit of work на время обработки update.
+
+    Использование:
+        dp.update.outer_middleware(DatabaseSessionMiddleware(session_factory))
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        """
+        Инициализация middleware.
+
+        Args:
+            session_factory: Фабрика сессий БД
+        """
+        self.session_factory = session_factory
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:  # noqa: ANN401
+        """Вызвать обработчик внутри unit of work."""
+        async with unit_of_work(self.session_factory) as session:
+            data["session"] = session
+            return await handler(event, data)
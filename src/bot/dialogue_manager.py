@@ -3,10 +3,21 @@ from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from .repository import MessageRepository
+from .models import ConversationSummary
+from .repository import MessageRepository, SummaryRepository
+from .token_estimator import estimate_tokens
+from .unit_of_work import release_connection, unit_of_work
 
 logger = logging.getLogger(__name__)
 
+# Максимальная длина сохраняемого описания изображения (символов)
+IMAGE_DESCRIPTION_MAX_CHARS = 500
+
+
+def format_summary(summary: str) -> str:
+    """Текст system сообщения с summary ранней части диалога."""
+    return f"Краткое содержание предыдущей части разговора с пользователем:\n{summary}"
+
 
 class DialogueManager:
     """
@@ -14,22 +25,58 @@ class DialogueManager:
 
     Использует MessageRepository для работы с базой данных.
     Реализует интерфейс DialogueStorage Protocol.
+
+    Операции выполняются в текущем unit of work (если он открыт вызывающим кодом,
+    например на время API запроса) или в собственном коротком unit of work.
+
+    С use_summary история начинается с сжатого содержания ранней части диалога
+    (его обновляет ConversationSummarizer).
+
+    С image_history_turns изображения старше заданного числа ходов пользователя
+    заменяются в истории сохраненным описанием (первым ответом модели на фото).
     """
 
     session_factory: async_sessionmaker[AsyncSession]
     max_history: int
-
-    def __init__(self, session_factory: async_sessionmaker[AsyncSession], max_history: int) -> None:
+    history_token_budget: int | None
+    use_summary: bool
+    image_history_turns: int | None
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        max_history: int,
+        token_budget: int = 0,
+        system_prompt: str = "",
+        use_summary: bool = False,
+        image_history_turns: int = 0,
+    ) -> None:
         """
         Инициализация менеджера диалогов.
 
         Args:
             session_factory: Фабрика для создания сессий БД
             max_history: Максимальное количество сообщений в истории
+            token_budget: Бюджет токенов контекста (system prompt + история),
+                0 - история ограничивается только количеством сообщений
+            system_prompt: System prompt, токены которого резервируются в бюджете
+            use_summary: Добавлять в начало истории summary ранней части диалога
+            image_history_turns: Сколько последних ходов пользователя изображения
+                отправляются как есть (0 - изображения не заменяются описанием)
         """
         self.session_factory = session_factory
         self.max_history = max_history
-        logger.info(f"DialogueManager initialized with max_history={max_history}")
+        # Истории достается бюджет за вычетом system prompt, который отправляется всегда
+        self.history_token_budget = (
+            max(token_budget - estimate_tokens(system_prompt), 0) if token_budget > 0 else None
+        )
+        self.use_summary = use_summary
+        self.image_history_turns = image_history_turns if image_history_turns > 0 else None
+        logger.info(
+            f"DialogueManager initialized with max_history={max_history}, "
+            f"history_token_budget={self.history_token_budget}, use_summary={use_summary}, "
+            f"image_history_turns={self.image_history_turns}"
+        )
 
     async def add_message(
         self, user_id: int, role: str, content: dict[str, Any] | str | list[dict[str, Any]]
@@ -44,8 +91,8 @@ class DialogueManager:
             role: роль отправителя ("user" или "assistant")
             content: текст сообщения или мультимодальный контент
         """
-        async with self.session_factory() as session:
-            repository = MessageRepository(session)
+        async with unit_of_work(self.session_factory) as session:
+            repository = MessageRepository(session, auto_commit=False)
             await repository.add_message(user_id, role, content)
         logger.debug(f"Added {role} message for user {user_id} to database")
 
@@ -53,7 +100,10 @@ class DialogueManager:
         """
         Возвращает историю диалога для пользователя из БД.
 
-        Поддерживает текстовые и мультимодальные сообщения.
+        Поддерживает текстовые и мультимодальные сообщения. При заданном бюджете
+        токенов возвращаются самые новые сообщения, которые в него помещаются.
+        Summary (если есть) идет первым system сообщением, его токены вычитаются
+        из бюджета. Старые изображения с описанием заменяются текстом.
 
         Args:
             user_id: ID пользователя
@@ -61,11 +111,110 @@ class DialogueManager:
         Returns:
             Список сообщений в формате [{"role": "user", "content": "..." | [...]}]
         """
-        async with self.session_factory() as session:
-            repository = MessageRepository(session)
-            history = await repository.get_history(user_id, limit=self.max_history)
+        async with unit_of_work(self.session_factory) as session:
+            summary = None
+            if self.use_summary:
+                summary = await SummaryRepository(session, auto_commit=False).get_summary(user_id)
+            repository = MessageRepository(session, auto_commit=False)
+            history = await repository.get_history(
+                user_id,
+                limit=self.max_history,
+                token_budget=self._get_window_budget(summary),
+                image_turns=self.image_history_turns,
+            )
+        if summary is not None:
+            history.insert(0, {"role": "system", "content": format_summary(summary.summary)})
         return history
 
+    async def describe_last_image(self, user_id: int, description: str) -> None:
+        """
+        Сохранить описание последнего изображения пользователя.
+
+        Описанием служит первый ответ модели на фото: отдельный запрос к LLM
+        не нужен. В старой истории изображение заменяется этим описанием.
+
+        Args:
+            user_id: ID пользователя
+            description: Ответ модели на сообщение с изображением
+        """
+        if self.image_history_turns is None:
+            return
+        async with unit_of_work(self.session_factory) as session:
+            repository = MessageRepository(session, auto_commit=False)
+            saved = await repository.set_image_description(
+                user_id, description[:IMAGE_DESCRIPTION_MAX_CHARS]
+            )
+        if saved:
+            logger.debug(f"Saved image description for user {user_id}")
+
+    async def release_connection(self) -> None:
+        """
+        Зафиксировать текущий unit of work и вернуть соединение в пул.
+
+        Вызывается перед запросом к LLM и распознаванием речи: транзакция update
+        не держит соединение, пока ждет внешний сервис.
+        """
+        await release_connection()
+
+    async def get_messages_to_summarize(
+        self, user_id: int, batch_size: int
+    ) -> tuple[str | None, list[dict[str, Any]]]:
+        """
+        Получить текущий summary и еще не учтенные в нем сообщения вне окна истории.
+
+        Args:
+            user_id: ID пользователя
+            batch_size: Максимальное количество сообщений
+
+        Returns:
+            Текст summary (None - еще нет) и сообщения от старых к новым
+            в формате [{"id": 1, "role": "user", "content": ...}]
+        """
+        async with unit_of_work(self.session_factory) as session:
+            summary = await SummaryRepository(session, auto_commit=False).get_summary(user_id)
+            repository = MessageRepository(session, auto_commit=False)
+            messages = await repository.get_messages_before_window(
+                user_id,
+                limit=self.max_history,
+                token_budget=self._get_window_budget(summary),
+                after_id=summary.summarized_until_id if summary is not None else 0,
+                batch_size=batch_size,
+                image_turns=self.image_history_turns,
+            )
+        return (
+            summary.summary if summary is not None else None,
+            [{"id": msg.id, "role": msg.role, "content": msg.content} for msg in messages],
+        )
+
+    async def save_summary(self, user_id: int, summary: str, summarized_until_id: int) -> bool:
+        """
+        Сохранить summary, если история не была очищена, пока он составлялся.
+
+        Args:
+            user_id: ID пользователя
+            summary: Новый текст summary
+            summarized_until_id: id последнего учтенного сообщения
+
+        Returns:
+            True, если summary сохранен
+        """
+        async with unit_of_work(self.session_factory) as session:
+            if not await MessageRepository(session, auto_commit=False).is_message_active(
+                summarized_until_id
+            ):
+                logger.info(f"History of user {user_id} was cleared, summary discarded")
+                return False
+            await SummaryRepository(session, auto_commit=False).save_summary(
+                user_id, summary, summarized_until_id
+            )
+        return True
+
+    def _get_window_budget(self, summary: ConversationSummary | None) -> int | None:
+        """Бюджет токенов окна истории за вычетом summary."""
+        if self.history_token_budget is None or summary is None:
+            return self.history_token_budget
+        return max(self.history_token_budget - summary.token_count, 0)
+
     async def clear_history(self, user_id: int) -> None:
         """
         Очищает историю диалога для пользователя (soft delete).
@@ -73,7 +222,8 @@ class DialogueManager:
         Args:
             user_id: ID пользователя
         """
-        async with self.session_factory() as session:
-            repository = MessageRepository(session)
+        async with unit_of_work(self.session_factory) as session:
+            repository = MessageRepository(session, auto_commit=False)
             await repository.clear_history(user_id)
+            await SummaryRepository(session, auto_commit=False).delete_summary(user_id)
         logger.info(f"Cleared history for user {user_id} (soft delete)")
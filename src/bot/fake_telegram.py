@@ -0,0 +1,214 @@
+"""
+Локальный fake Telegram для тестирования webhook режима.
+
+FakeTelegram отправляет updates на webhook бота (как Telegram, с секретным
+заголовком) и сам работает как Bot API сервер: записывает отправленные ботом
+сообщения. Бот направляется на него через TELEGRAM_API_URL.
+
+Запуск вручную (бот в BOT_MODE=webhook, TELEGRAM_API_URL=http://127.0.0.1:8081):
+    python -m src.bot.fake_telegram --webhook http://127.0.0.1:8080/webhook \\
+        --secret <WEBHOOK_SECRET> --chat-id 1 "Привет"
+"""
+
+import argparse
+import asyncio
+import itertools
+import logging
+import time
+from typing import Any
+
+from aiohttp import ClientSession, web
+
+from .webhook_server import SECRET_TOKEN_HEADER
+
+logger = logging.getLogger(__name__)
+
+
+class FakeTelegram:
+    """
+    Fake Telegram: источник updates для webhook и приемник вызовов Bot API.
+
+    Использование:
+        fake = FakeTelegram("http://127.0.0.1:8080/webhook", secret_token="secret")
+        await fake.start()  # Bot API на fake.api_url
+        await fake.send_text(chat_id=1, text="Привет")
+        messages = await fake.wait_for_messages(1)
+    """
+
+    def __init__(self, webhook_url: str, secret_token: str | None = None) -> None:
+        """
+        Инициализация fake Telegram.
+
+        Args:
+            webhook_url: URL webhook бота
+            secret_token: Секретный токен для заголовка X-Telegram-Bot-Api-Secret-Token
+        """
+        self.webhook_url = webhook_url
+        self.secret_token = secret_token
+        self.sent_messages: list[dict[str, Any]] = []
+        self.api_calls: list[tuple[str, dict[str, Any]]] = []
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+        self._messages_changed = asyncio.Condition()
+        self._runner: web.AppRunner | None = None
+        self._client: ClientSession | None = None
+        self.api_url = ""
+
+    def make_message_update(
+        self, chat_id: int, text: str, user_id: int | None = None, username: str = "test_user"
+    ) -> dict[str, Any]:
+        """
+        Создать update с текстовым сообщением в личном чате.
+
+        Args:
+            chat_id: ID чата
+            text: Текст сообщения
+            user_id: ID отправителя (по умолчанию равен chat_id)
+            username: Username отправителя
+
+        Returns:
+            Update в формате Telegram Bot API
+        """
+        user_id = user_id if user_id is not None else chat_id
+        return {
+            "update_id": next(self._update_ids),
+            "message": {
+                "message_id": next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private", "username": username},
+                "from": {
+                    "id": user_id,
+                    "is_bot": False,
+                    "first_name": "Test",
+                    "username": username,
+                    "language_code": "ru",
+                },
+                "text": text,
+            },
+        }
+
+    async def post_update(self, update: dict[str, Any]) -> int:
+        """
+        Отправить update на webhook бота.
+
+        Args:
+            update: Update в формате Telegram Bot API
+
+        Returns:
+            HTTP статус ответа webhook
+        """
+        if self._client is None:
+            self._client = ClientSession()
+        headers = {SECRET_TOKEN_HEADER: self.secret_token} if self.secret_token else {}
+        async with self._client.post(self.webhook_url, json=update, headers=headers) as response:
+            return response.status
+
+    async def send_text(self, chat_id: int, text: str) -> int:
+        """
+        Отправить текстовое сообщение от пользователя на webhook бота.
+
+        Args:
+            chat_id: ID чата
+            text: Текст сообщения
+
+        Returns:
+            HTTP статус ответа webhook
+        """
+        return await self.post_update(self.make_message_update(chat_id, text))
+
+    async def _handle_api_call(self, request: web.Request) -> web.Response:
+        """Обработать вызов Bot API от бота."""
+        method = request.match_info["method"]
+        if request.content_type == "application/json":
+            params = await request.json()
+        else:
+            params = dict(await request.post())
+        self.api_calls.append((method, params))
+
+        if method.lower() != "sendmessage":
+            return web.json_response({"ok": True, "result": True})
+
+        chat_id = int(params["chat_id"])
+        message = {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "text": params.get("text", ""),
+        }
+        async with self._messages_changed:
+            self.sent_messages.append(message)
+            self._messages_changed.notify_all()
+        return web.json_response({"ok": True, "result": message})
+
+    async def wait_for_messages(self, count: int, timeout: float = 5.0) -> list[dict[str, Any]]:
+        """
+        Дождаться, пока бот отправит count сообщений.
+
+        Args:
+            count: Ожидаемое количество сообщений
+            timeout: Таймаут в секундах
+
+        Returns:
+            Отправленные ботом сообщения
+        """
+        async with self._messages_changed:
+            await asyncio.wait_for(
+                self._messages_changed.wait_for(lambda: len(self.sent_messages) >= count),
+                timeout,
+            )
+        return list(self.sent_messages)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """
+        Запустить Bot API сервер.
+
+        Args:
+            host: Адрес для прослушивания
+            port: Порт (0 - выбрать свободный)
+
+        Returns:
+            Базовый URL Bot API (значение для TELEGRAM_API_URL)
+        """
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self._handle_api_call)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        self.api_url = f"http://{host}:{self._runner.addresses[0][1]}"
+        logger.info(f"Fake Telegram Bot API listening on {self.api_url}")
+        return self.api_url
+
+    async def stop(self) -> None:
+        """Остановить сервер и закрыть HTTP клиент."""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def _main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Telegram для webhook режима бота")
+    parser.add_argument("text", nargs="+", help="Сообщения пользователя")
+    parser.add_argument("--webhook", required=True, help="URL webhook бота")
+    parser.add_argument("--secret", required=True, help="WEBHOOK_SECRET")
+    parser.add_argument("--chat-id", type=int, default=1)
+    parser.add_argument("--api-port", type=int, default=8081, help="Порт Bot API")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    fake = FakeTelegram(args.webhook, secret_token=args.secret)
+    await fake.start(port=args.api_port)
+    try:
+        for text in args.text:
+            status = await fake.send_text(args.chat_id, text)
+            print(f"> {text} [{status}]")
+        for message in await fake.wait_for_messages(len(args.text), timeout=args.timeout):
+            print(f"< {message['text']}")
+    finally:
+        await fake.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,153 @@
+"""
+Ответы на первый вопрос пользователя из одобренных пар вопрос-ответ (FAQ).
+
+Новые пользователи часто начинают с почти одинаковых вопросов ("какой стиль
+подойдет маленькой кухне"), и каждый стоит отдельного запроса к LLM. FAQCache
+держит в процессе BM25 индекс одобренных записей faq_entries и отвечает из него,
+если сходство вопроса не ниже порога.
+
+Записи одобряет администратор через API (другой процесс), поэтому индекс
+синхронизируется с БД не чаще раза в reload_interval: новые записи добавляются,
+удаленные - убираются, без перестроения индекса. Ошибка синхронизации не мешает
+ответу: поиск идет по прежнему индексу, следующая попытка - через reload_interval.
+При collect_candidates первые ответы LLM сохраняются кандидатами на одобрение.
+"""
+
+import logging
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .faq_index import FAQIndex
+from .repository import FAQRepository
+from .unit_of_work import unit_of_work
+
+logger = logging.getLogger(__name__)
+
+
+class FAQCache:
+    """
+    FAQ провайдер: BM25 индекс одобренных ответов, синхронизируемый с БД.
+
+    Использование:
+        faq_cache = FAQCache(session_factory, min_similarity=0.7)
+        await faq_cache.load()
+        answer = await faq_cache.match("Какой стиль подойдет для маленькой кухни?")
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        min_similarity: float = 0.7,
+        reload_interval: float = 300.0,
+        collect_candidates: bool = False,
+    ) -> None:
+        """
+        Инициализация FAQ.
+
+        Args:
+            session_factory: Фабрика сессий БД
+            min_similarity: Минимальное сходство вопроса (0-1) для ответа из FAQ
+            reload_interval: Секунд между синхронизациями индекса с БД
+            collect_candidates: Сохранять первые ответы LLM кандидатами на одобрение
+
+        Raises:
+            ValueError: Если min_similarity вне (0, 1]
+        """
+        if not 0 < min_similarity <= 1:
+            raise ValueError("min_similarity must be in (0, 1]")
+
+        self.session_factory = session_factory
+        self.min_similarity = min_similarity
+        self.reload_interval = reload_interval
+        self.collect_candidates = collect_candidates
+        self.index = FAQIndex()
+        self._loaded_at: float | None = None
+        self._lookups = 0
+        self._hits = 0
+        self._candidates = 0
+        self._reload_errors = 0
+
+    async def load(self) -> None:
+        """Синхронизировать индекс с одобренными записями БД."""
+        self._loaded_at = time.monotonic()
+        async with unit_of_work(self.session_factory) as session:
+            entries = await FAQRepository(session, auto_commit=False).get_entries(approved=True)
+
+        approved_ids = {entry.id for entry in entries}
+        removed = [entry_id for entry_id in self.index.entry_ids() if entry_id not in approved_ids]
+        for entry_id in removed:
+            self.index.remove(entry_id)
+        added = [entry for entry in entries if entry.id not in self.index]
+        for entry in added:
+            self.index.add(entry.id, entry.question, entry.answer)
+        if added or removed:
+            logger.info(
+                f"FAQ index synced: +{len(added)} -{len(removed)}, {len(self.index)} entries"
+            )
+
+    async def match(self, question: str) -> str | None:
+        """
+        Найти ответ на вопрос в FAQ.
+
+        Args:
+            question: Первый вопрос пользователя
+
+        Returns:
+            Ответ из FAQ или None, если похожего одобренного вопроса нет
+        """
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.reload_interval:
+            try:
+                await self.load()
+            except Exception as e:
+                # Сбой БД не должен ронять ответ: ищем по прежнему индексу
+                self._reload_errors += 1
+                logger.warning(
+                    f"FAQ index reload failed, using {len(self.index)} cached entries: {e}"
+                )
+
+        self._lookups += 1
+        result = self.index.search(question)
+        if result is None or result[2] < self.min_similarity:
+            return None
+
+        entry_id, answer, similarity = result
+        self._hits += 1
+        logger.info(f"FAQ answer {entry_id} matched with similarity {similarity:.2f}")
+        return answer
+
+    async def add_candidate(self, question: str, answer: str) -> None:
+        """
+        Сохранить ответ LLM на первый вопрос кандидатом в FAQ (при collect_candidates).
+
+        Повторный вопрос с тем же текстом не сохраняется.
+
+        Args:
+            question: Первый вопрос пользователя
+            answer: Ответ LLM
+        """
+        if not self.collect_candidates:
+            return
+        async with unit_of_work(self.session_factory) as session:
+            repository = FAQRepository(session, auto_commit=False)
+            if await repository.has_question(question):
+                return
+            await repository.add_entry(question, answer)
+        self._candidates += 1
+
+    def get_stats(self) -> dict[str, int | float]:
+        """
+        Статистика FAQ.
+
+        Returns:
+            Записи в индексе, поиски, ответы из FAQ, доля ответов, сохраненные кандидаты
+            и ошибки синхронизации индекса
+        """
+        return {
+            "entries": len(self.index),
+            "lookups": self._lookups,
+            "hits": self._hits,
+            "hit_ratio": round(self._hits / self._lookups, 3) if self._lookups else 0.0,
+            "candidates": self._candidates,
+            "reload_errors": self._reload_errors,
+        }
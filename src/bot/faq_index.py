@@ -0,0 +1,170 @@
+"""
+Локальный BM25 индекс вопросов FAQ.
+
+Строится в процессе, без внешних сервисов. Текст нормализуется: нижний регистр,
+ё -> е, слова без стоп-слов, у слов отрезается окончание (легкий стемминг для
+русского языка), чтобы "маленькой кухни" и "маленькая кухня" совпадали.
+
+Оценка BM25 не ограничена сверху, поэтому для порога она нормируется: делится
+на идеальную оценку (сумму idf терминов) более длинного из вопросов - запроса
+или записи. Так короткий запрос "кухня" не совпадает с длинным вопросом, в
+котором это слово лишь встречается. Индекс поддерживает добавление и удаление
+записей без перестроения.
+"""
+
+import math
+import re
+from collections import Counter
+
+# Частые служебные слова (не несут смысла вопроса)
+_STOP_WORDS_TEXT = (
+    "а без бы был была были было быть в вам вас весь во вот все всех вы где да даже для до "
+    "его ее ей если есть еще же за и из или им их к как какая какие какое каким какой ко "
+    "когда кто ли либо мне мной можно мы на над надо не нет ни но ну о об от по под при про "
+    "с со так также там то тоже только ты у уже хотя чем через что чтобы это этот эта эти я"
+)
+STOP_WORDS = frozenset(_STOP_WORDS_TEXT.split())
+
+# Окончания для легкого стемминга (проверяются от длинных к коротким)
+_ENDINGS_TEXT = (
+    "иями ями ами его ого ему ому ыми ими ией ий ый ой ей ая яя ое ее ые ие ую юю ах ях ам "
+    "ям ом ем ов ев ать ять ить еть уть ешь ишь ет ит ут ют ат ят ла ли ло ся сь а я о е ы и "
+    "у ю ь й"
+)
+ENDINGS = sorted(_ENDINGS_TEXT.split(), key=len, reverse=True)
+MIN_STEM_LENGTH = 3
+
+WORD_PATTERN = re.compile(r"[a-zа-я0-9]+")
+
+
+def stem(word: str) -> str:
+    """Отрезать окончание слова, если остается не меньше MIN_STEM_LENGTH символов."""
+    for ending in ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= MIN_STEM_LENGTH:
+            return word[: -len(ending)]
+    return word
+
+
+def normalize_text(text: str) -> list[str]:
+    """
+    Термины текста для индекса.
+
+    Args:
+        text: Исходный текст
+
+    Returns:
+        Основы слов без стоп-слов в порядке следования
+    """
+    words = WORD_PATTERN.findall(text.lower().replace("ё", "е"))
+    return [stem(word) for word in words if word not in STOP_WORDS]
+
+
+class FAQIndex:
+    """
+    Инкрементальный BM25 индекс вопросов с ответами.
+
+    Использование:
+        index = FAQIndex()
+        index.add(1, "Какой стиль подойдет для маленькой кухни?", "Скандинавский...")
+        match = index.search("стиль для маленькой кухни")  # (1, "Скандинавский...", 0.93)
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        """
+        Инициализация индекса.
+
+        Args:
+            k1: Насыщение частоты термина
+            b: Влияние длины вопроса
+        """
+        self.k1 = k1
+        self.b = b
+        # Термин -> {id записи: частота термина в вопросе}
+        self._postings: dict[str, dict[int, int]] = {}
+        self._terms: dict[int, Counter[str]] = {}
+        self._answers: dict[int, str] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def __contains__(self, entry_id: object) -> bool:
+        return entry_id in self._terms
+
+    def entry_ids(self) -> list[int]:
+        """ID записей в индексе."""
+        return list(self._terms)
+
+    def add(self, entry_id: int, question: str, answer: str) -> None:
+        """
+        Добавить (или заменить) запись.
+
+        Args:
+            entry_id: ID записи FAQ
+            question: Вопрос
+            answer: Ответ
+        """
+        if entry_id in self._terms:
+            self.remove(entry_id)
+        terms = Counter(normalize_text(question))
+        if not terms:
+            return
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[entry_id] = frequency
+        self._terms[entry_id] = terms
+        self._answers[entry_id] = answer
+        self._total_length += terms.total()
+
+    def remove(self, entry_id: int) -> None:
+        """Удалить запись (если есть)."""
+        terms = self._terms.pop(entry_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            del postings[entry_id]
+            if not postings:
+                del self._postings[term]
+        del self._answers[entry_id]
+        self._total_length -= terms.total()
+
+    def search(self, query: str) -> tuple[int, str, float] | None:
+        """
+        Найти запись с наиболее похожим вопросом.
+
+        Args:
+            query: Вопрос пользователя
+
+        Returns:
+            (id записи, ответ, сходство от 0 до 1) или None, если общих терминов нет
+        """
+        query_terms = set(normalize_text(query))
+        candidates = {entry_id for term in query_terms for entry_id in self._postings.get(term, {})}
+        if not candidates:
+            return None
+
+        average_length = self._total_length / len(self._terms)
+        query_weight = sum(self._idf(term) for term in query_terms)
+        best: tuple[int, str, float] | None = None
+        for entry_id in candidates:
+            terms = self._terms[entry_id]
+            length_norm = 1 - self.b + self.b * terms.total() / average_length
+            score = 0.0
+            for term in query_terms & terms.keys():
+                frequency = terms[term]
+                score += (
+                    self._idf(term)
+                    * frequency
+                    * (self.k1 + 1)
+                    / (frequency + self.k1 * length_norm)
+                )
+            entry_weight = sum(self._idf(term) for term in terms)
+            similarity = min(score / max(query_weight, entry_weight), 1.0)
+            if best is None or similarity > best[2]:
+                best = (entry_id, self._answers[entry_id], similarity)
+        return best
+
+    def _idf(self, term: str) -> float:
+        """IDF термина (BM25 с +1, всегда положительный; неизвестный термин - максимальный)."""
+        frequency = len(self._postings.get(term, {}))
+        return math.log(1 + (len(self._terms) - frequency + 0.5) / (frequency + 0.5))
@@ -0,0 +1,96 @@
+"""
+Consistent hashing для распределения updates по worker процессам.
+
+Каждый worker представлен на кольце replicas виртуальными узлами, ключ (chat id)
+попадает на ближайший по часовой стрелке узел. Один чат всегда обрабатывается
+одним worker (сохраняется порядок сообщений пользователя), а при изменении числа
+worker перераспределяется только ~1/N ключей.
+"""
+
+import bisect
+import hashlib
+
+
+class ConsistentHashRing:
+    """
+    Кольцо consistent hashing.
+
+    Использование:
+        ring = ConsistentHashRing(["worker-0", "worker-1"])
+        ring.get_node("123456")  # -> "worker-1"
+    """
+
+    def __init__(self, nodes: list[str] | None = None, replicas: int = 100) -> None:
+        """
+        Инициализация кольца.
+
+        Args:
+            nodes: Имена узлов (worker)
+            replicas: Количество виртуальных узлов на каждый узел (равномерность распределения)
+        """
+        if replicas < 1:
+            raise ValueError("replicas must be at least 1")
+        self.replicas = replicas
+        self._hashes: list[int] = []
+        self._ring: dict[int, str] = {}
+        self._nodes: set[str] = set()
+        for node in nodes or []:
+            self.add_node(node)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        """Стабильный между процессами хеш ключа (в отличие от встроенного hash())."""
+        return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+    @property
+    def nodes(self) -> set[str]:
+        """Узлы кольца."""
+        return set(self._nodes)
+
+    def add_node(self, node: str) -> None:
+        """
+        Добавить узел на кольцо.
+
+        Args:
+            node: Имя узла
+        """
+        if node in self._nodes:
+            return
+        self._nodes.add(node)
+        for replica in range(self.replicas):
+            point = self._hash(f"{node}#{replica}")
+            self._ring[point] = node
+            bisect.insort(self._hashes, point)
+
+    def remove_node(self, node: str) -> None:
+        """
+        Удалить узел с кольца (его ключи переходят к соседним узлам).
+
+        Args:
+            node: Имя узла
+        """
+        if node not in self._nodes:
+            return
+        self._nodes.discard(node)
+        for replica in range(self.replicas):
+            point = self._hash(f"{node}#{replica}")
+            del self._ring[point]
+            self._hashes.remove(point)
+
+    def get_node(self, key: str) -> str:
+        """
+        Получить узел для ключа.
+
+        Args:
+            key: Ключ маршрутизации (chat id)
+
+        Returns:
+            Имя узла
+
+        Raises:
+            ValueError: Если на кольце нет узлов
+        """
+        if not self._hashes:
+            raise ValueError("Hash ring has no nodes")
+        index = bisect.bisect(self._hashes, self._hash(key)) % len(self._hashes)
+        return self._ring[self._hashes[index]]
@@ -7,6 +7,8 @@
 
 from typing import TYPE_CHECKING, Any, Protocol
 
+from .llm_limiter import PRIORITY_CHAT
+
 if TYPE_CHECKING:
     from .models import User
 
@@ -19,7 +21,12 @@ class LLMProvider(Protocol):
     Поддерживает мультимодальные сообщения (текст + изображения).
     """
 
-    def get_response(self, messages: list[dict[str, Any]]) -> str:
+    async def get_response(
+        self,
+        messages: list[dict[str, Any]],
+        priority: int = PRIORITY_CHAT,
+        use_cache: bool = False,
+    ) -> str:
         """
         Получить ответ от LLM на основе истории сообщений.
 
@@ -30,6 +37,8 @@ class LLMProvider(Protocol):
                     {"type": "text", "text": "..."},
                     {"type": "image_url", "image_url": {"url": "data:image/jpeg;base64,..."}}
                   ]}]
+            priority: Приоритет запроса (интерактивный чат раньше голосовых и аналитики)
+            use_cache: Ответ детерминирован входом и может браться из кэша ответов
 
         Returns:
             Текст ответа от LLM
@@ -80,6 +89,27 @@ class DialogueStorage(Protocol):
         """
         ...
 
+    async def describe_last_image(self, user_id: int, description: str) -> None:
+        """
+        Сохранить описание последнего изображения пользователя.
+
+        В старой истории изображение может заменяться этим описанием.
+
+        Args:
+            user_id: ID пользователя Telegram
+            description: Описание изображения (ответ модели на фото)
+        """
+        ...
+
+    async def release_connection(self) -> None:
+        """
+        Зафиксировать сохраненные сообщения перед долгим внешним вызовом.
+
+        Хранилище в БД возвращает соединение в пул, пока ждет LLM или
+        распознавание речи.
+        """
+        ...
+
     async def clear_history(self, user_id: int) -> None:
         """
         Очистить историю диалога пользователя.
@@ -97,6 +127,11 @@ class MediaProvider(Protocol):
     Любой класс, реализующий эти методы, может использоваться для работы с медиа.
     """
 
+    @property
+    def is_ready(self) -> bool:
+        """Готово ли распознавание речи (модель загружена)."""
+        ...
+
     async def download_photo(self, file_id: str, bot: Any) -> bytes:
         """
         Скачать фото из Telegram.
@@ -157,6 +192,36 @@ class MediaProvider(Protocol):
         ...
 
 
+class FAQProvider(Protocol):
+    """
+    Контракт для ответов на первый вопрос из одобренных пар вопрос-ответ.
+
+    Ответ из FAQ заменяет запрос к LLM, когда у пользователя еще нет истории.
+    """
+
+    async def match(self, question: str) -> str | None:
+        """
+        Найти ответ на вопрос.
+
+        Args:
+            question: Первый вопрос пользователя
+
+        Returns:
+            Ответ или None, если похожего вопроса нет
+        """
+        ...
+
+    async def add_candidate(self, question: str, answer: str) -> None:
+        """
+        Предложить ответ LLM на первый вопрос кандидатом в FAQ.
+
+        Args:
+            question: Первый вопрос пользователя
+            answer: Ответ LLM
+        """
+        ...
+
+
 class UserStorage(Protocol):
     """
     Контракт для хранилищ пользователей.
@@ -1,27 +1,211 @@
+import asyncio
 import logging
+import os
+import random
+import time
+from collections import deque
 from typing import Any
 
-from openai import OpenAI
+import openai
+from openai import AsyncOpenAI
+
+from .circuit_breaker import CircuitBreaker
+from .llm_limiter import PRIORITY_CHAT, LLMLimiter, get_llm_limiter
+from .llm_response_cache import LLMResponseCache, get_llm_response_cache, make_cache_key
+from .token_estimator import estimate_tokens
 
 logger = logging.getLogger(__name__)
 
+# Потолок паузы между повторами и минимум замеров задержки для hedged запросов
+RETRY_MAX_DELAY = 10.0
+HEDGE_MIN_SAMPLES = 20
+
+# Модели, которым OpenRouter передает точки cache_control (у OpenAI, DeepSeek и других
+# префикс кэшируется автоматически, достаточно стабильного порядка сообщений)
+CACHE_CONTROL_MODEL_PREFIXES = ("anthropic/", "google/gemini")
+EPHEMERAL_CACHE: dict[str, str] = {"type": "ephemeral"}
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Временная ошибка, после которой запрос можно повторить: timeout, соединение, 429, 5xx."""
+    if isinstance(error, openai.APIConnectionError | TimeoutError):
+        return True
+    status_code = getattr(error, "status_code", None)
+    return isinstance(status_code, int) and (status_code == 429 or status_code >= 500)
+
+
+def is_provider_failure(error: Exception) -> bool:
+    """Отказ провайдера (для circuit breaker): timeout, соединение, 5xx."""
+    if isinstance(error, openai.APIConnectionError | TimeoutError):
+        return True
+    status_code = getattr(error, "status_code", None)
+    return isinstance(status_code, int) and status_code >= 500
+
+
+def supports_cache_control(model: str) -> bool:
+    """Провайдер модели кэширует префикс запроса только по явным точкам cache_control."""
+    return model.startswith(CACHE_CONTROL_MODEL_PREFIXES)
+
+
+def add_cache_breakpoint(message: dict[str, Any]) -> dict[str, Any]:
+    """
+    Копия сообщения с точкой cache_control на последней части контента.
+
+    Префикс запроса до этой точки (включительно) кэшируется провайдером.
+    """
+    content = message["content"]
+    if isinstance(content, str):
+        parts: list[dict[str, Any]] = [{"type": "text", "text": content}]
+    else:
+        parts = list(content)
+    parts[-1] = {**parts[-1], "cache_control": EPHEMERAL_CACHE}
+    return {**message, "content": parts}
+
+
+_usage: dict[str, dict[str, int]] = {}
+
+
+def record_usage(model: str, response: Any) -> None:
+    """Учесть токены ответа модели, в том числе прочитанные из кэша префикса."""
+    usage = getattr(response, "usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    if not isinstance(prompt_tokens, int):
+        return
+    completion_tokens = getattr(usage, "completion_tokens", None)
+    cached_tokens = getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None)
+
+    stats = _usage.setdefault(
+        model, {"requests": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+    )
+    stats["requests"] += 1
+    stats["prompt_tokens"] += prompt_tokens
+    stats["cached_tokens"] += cached_tokens if isinstance(cached_tokens, int) else 0
+    stats["completion_tokens"] += completion_tokens if isinstance(completion_tokens, int) else 0
+
+
+def get_all_usage_stats() -> dict[str, dict[str, int | float]]:
+    """Токены каждой модели и доля входных токенов, прочитанных из кэша префикса."""
+    return {
+        model: {
+            **stats,
+            "cache_hit_ratio": (
+                round(stats["cached_tokens"] / stats["prompt_tokens"], 3)
+                if stats["prompt_tokens"]
+                else 0.0
+            ),
+        }
+        for model, stats in _usage.items()
+    }
+
+
+_circuit_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_llm_circuit_breaker(model: str) -> CircuitBreaker:
+    """
+    Общий на процесс circuit breaker модели (создается при первом вызове).
+
+    Параметры: LLM_BREAKER_FAILURES (5 ошибок подряд), LLM_BREAKER_RESET_TIMEOUT (30 секунд).
+    """
+    breaker = _circuit_breakers.get(model)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            f"LLM {model}",
+            failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+            reset_timeout=float(os.getenv("LLM_BREAKER_RESET_TIMEOUT", "30")),
+            is_failure=is_provider_failure,
+        )
+        _circuit_breakers[model] = breaker
+    return breaker
+
+
+def get_all_circuit_stats() -> dict[str, dict[str, str | int]]:
+    """Состояние circuit breaker каждой модели."""
+    return {model: breaker.get_stats() for model, breaker in _circuit_breakers.items()}
+
 
 class LLMClient:
-    client: OpenAI
+    client: AsyncOpenAI
     model: str
     system_prompt: str
+    limiter: LLMLimiter
+    circuit_breaker: CircuitBreaker
+    response_cache: LLMResponseCache
 
-    def __init__(self, api_key: str, model: str, system_prompt: str) -> None:
-        self.client = OpenAI(base_url="https://openrouter.ai/api/v1", api_key=api_key)
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        system_prompt: str,
+        limiter: LLMLimiter | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        response_cache: LLMResponseCache | None = None,
+    ) -> None:
+        # Повторы выполняет get_response (с учетом breaker и лимитера), а не SDK
+        self.client = AsyncOpenAI(
+            base_url="https://openrouter.ai/api/v1", api_key=api_key, max_retries=0
+        )
         self.model = model
         self.system_prompt = system_prompt
+        # Общий на процесс лимит запросов к провайдеру (все LLMClient делят его)
+        self.limiter = limiter if limiter is not None else get_llm_limiter()
+        self.circuit_breaker = (
+            circuit_breaker if circuit_breaker is not None else get_llm_circuit_breaker(model)
+        )
+        # Общий на процесс кэш ответов (используется только при use_cache)
+        self.response_cache = (
+            response_cache if response_cache is not None else get_llm_response_cache()
+        )
+        # Timeout попытки и всего запроса с повторами, повторы и hedged запросы
+        self.attempt_timeout = float(os.getenv("LLM_ATTEMPT_TIMEOUT", "60"))
+        self.total_timeout = float(os.getenv("LLM_TOTAL_TIMEOUT", "120"))
+        self.max_retries = int(os.getenv("LLM_MAX_RETRIES", "2"))
+        self.retry_base_delay = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+        self.hedge_percentile = float(os.getenv("LLM_HEDGE_PERCENTILE", "0"))
+        prompt_cache = os.getenv("LLM_PROMPT_CACHE", "true").strip().lower()
+        self.prompt_cache = prompt_cache in ("true", "1", "yes") and supports_cache_control(model)
+        self._latencies: deque[float] = deque(maxlen=100)
         logger.info(f"LLMClient initialized with model: {model}")
 
-    def get_response(self, messages: list[dict[str, Any]]) -> str:
+    def with_system_prompt(self, system_prompt: str) -> "LLMClient":
+        """Клиент той же модели с другим system prompt (общие клиент, лимитер, кэш, breaker)."""
+        client = LLMClient(
+            api_key=self.client.api_key,
+            model=self.model,
+            system_prompt=system_prompt,
+            limiter=self.limiter,
+            circuit_breaker=self.circuit_breaker,
+            response_cache=self.response_cache,
+        )
+        client.client = self.client
+        return client
+
+    async def get_response(
+        self,
+        messages: list[dict[str, Any]],
+        priority: int = PRIORITY_CHAT,
+        use_cache: bool = False,
+    ) -> str:
         """
         Отправляет запрос в OpenRouter и возвращает ответ LLM.
 
         Поддерживает текстовые и мультимодальные сообщения (с изображениями).
+        Запрос асинхронный: отмена задачи (/reset, новое сообщение) прерывает
+        HTTP запрос к OpenRouter, и за недополученный ответ токены не тратятся.
+        Запрос ждет места в LLMLimiter в порядке приоритета.
+
+        Устойчивость к сбоям провайдера:
+        - timeout каждой попытки (LLM_ATTEMPT_TIMEOUT) и всего запроса (LLM_TOTAL_TIMEOUT)
+        - повторы временных ошибок (timeout, соединение, 429, 5xx) с экспоненциальной
+          паузой и jitter (LLM_MAX_RETRIES)
+        - hedged запрос: если ответ медленнее перцентиля LLM_HEDGE_PERCENTILE последних
+          ответов, отправляется второй запрос и используется первый полученный ответ
+        - circuit breaker: пока провайдер недоступен, запрос сразу завершается ошибкой
+
+        Кэш префикса: system prompt всегда идет первым и не меняется, поэтому
+        провайдер кэширует его между запросами. Моделям с явным кэшированием
+        (LLM_PROMPT_CACHE) точки cache_control ставятся на system prompt и на
+        последнее сообщение истории: следующий ход читает диалог из кэша.
 
         Args:
             messages: список сообщений в формате:
@@ -30,31 +214,128 @@ class LLMClient:
                     {"type": "text", "text": "..."},
                     {"type": "image_url", "image_url": {"url": "data:image/jpeg;base64,..."}}
                   ]}]
+            priority: Приоритет запроса в LLMLimiter (PRIORITY_CHAT, PRIORITY_VOICE,
+                PRIORITY_ANALYTICS)
+            use_cache: Запрос детерминирован входом: ответ на такой же запрос
+                (модель, system prompt, сообщения) берется из LLMResponseCache
 
         Returns:
             Текст ответа от LLM
+
+        Raises:
+            CircuitOpenError: Если провайдер недоступен (breaker разомкнут)
+            TimeoutError: Если ответ не получен за LLM_TOTAL_TIMEOUT
         """
+        cache_key = None
+        if use_cache:
+            cache_key = make_cache_key(self.model, self.system_prompt, messages)
+            cached_response = await self.response_cache.get(cache_key)
+            if cached_response is not None:
+                logger.info(f"LLM response served from cache: model={self.model}")
+                return cached_response
+
         # Добавляем system prompt в начало
         full_messages: list[dict[str, Any]] = [
             {"role": "system", "content": self.system_prompt}
         ] + messages
+        if self.prompt_cache:
+            full_messages = self._add_cache_breakpoints(full_messages)
 
         logger.info(f"Sending request to LLM: model={self.model}, messages_count={len(messages)}")
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=full_messages,  # type: ignore[arg-type]
-            )
-
-            response_text = response.choices[0].message.content
-            if response_text is None:
-                raise ValueError("LLM returned empty response")
+            async with asyncio.timeout(self.total_timeout):
+                response_text = await self._request_with_retries(full_messages, priority)
 
             logger.info(f"Received response from LLM: length={len(response_text)} chars")
 
+            if cache_key is not None:
+                tokens = estimate_tokens(self.system_prompt) + estimate_tokens(response_text)
+                tokens += sum(estimate_tokens(message["content"]) for message in messages)
+                await self.response_cache.set(cache_key, response_text, tokens)
+
             return response_text
 
+        except asyncio.CancelledError:
+            logger.info(f"LLM request cancelled: model={self.model}")
+            raise
         except Exception as e:
             logger.error(f"Error getting response from LLM: {e}", exc_info=True)
             raise
+
+    @staticmethod
+    def _add_cache_breakpoints(full_messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Точки cache_control на system prompt и (при наличии истории) на последнем сообщении."""
+        marked = [add_cache_breakpoint(full_messages[0]), *full_messages[1:]]
+        # Одиночный запрос (text2sql) не повторится: кэшировать его целиком нет смысла
+        if len(marked) > 2:
+            marked[-1] = add_cache_breakpoint(marked[-1])
+        return marked
+
+    async def _request_with_retries(
+        self, full_messages: list[dict[str, Any]], priority: int
+    ) -> str:
+        """Выполнить запрос, повторяя временные ошибки с паузой full jitter."""
+        attempt = 0
+        while True:
+            try:
+                return await self._request_hedged(full_messages, priority)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable_error(e):
+                    raise
+                delay = random.uniform(0, min(RETRY_MAX_DELAY, self.retry_base_delay * 2**attempt))
+                attempt += 1
+                logger.warning(
+                    f"LLM request failed ({type(e).__name__}: {e}), "
+                    f"retry {attempt}/{self.max_retries} in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+
+    async def _request_hedged(self, full_messages: list[dict[str, Any]], priority: int) -> str:
+        """Выполнить попытку; если она медленнее перцентиля, продублировать ее."""
+        hedge_delay = self._get_hedge_delay()
+        tasks = {asyncio.create_task(self._attempt(full_messages, priority))}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if not done:
+                logger.info(f"LLM response slower than {hedge_delay:.1f}s, sending hedged request")
+                tasks.add(asyncio.create_task(self._attempt(full_messages, priority)))
+
+            while True:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                if not tasks:
+                    # Все попытки завершились ошибкой: пробрасываем ошибку последней
+                    return done.pop().result()
+        finally:
+            # Ответ получен (или запрос отменен): оставшаяся попытка не нужна
+            for task in tasks:
+                task.cancel()
+
+    def _get_hedge_delay(self) -> float | None:
+        """Задержка до hedged запроса: перцентиль последних ответов (None - без hedging)."""
+        if self.hedge_percentile <= 0 or len(self._latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        latencies = sorted(self._latencies)
+        index = min(int(len(latencies) * self.hedge_percentile / 100), len(latencies) - 1)
+        return latencies[index]
+
+    async def _attempt(self, full_messages: list[dict[str, Any]], priority: int) -> str:
+        """Одна попытка: circuit breaker, место в лимитере и HTTP запрос с timeout."""
+        with self.circuit_breaker.call():
+            async with self.limiter.slot(priority):
+                started_at = time.monotonic()
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=full_messages,  # type: ignore[arg-type]
+                    timeout=self.attempt_timeout,
+                )
+                self._latencies.append(time.monotonic() - started_at)
+        record_usage(self.model, response)
+
+        response_text = response.choices[0].message.content
+        if response_text is None:
+            raise ValueError("LLM returned empty response")
+        return response_text
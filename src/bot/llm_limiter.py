@@ -0,0 +1,226 @@
+"""
+Общий адаптивный лимит одновременных запросов к LLM (OpenRouter) с приоритетами.
+
+Telegram чат, веб-чат и text2sql админа обращаются к одному провайдеру. Лимитер
+пропускает запросы по приоритету (интерактивный чат раньше голосовых и аналитики)
+и подстраивает лимит по схеме AIMD: +1/limit за быстрый успешный ответ,
+вдвое меньше при 429/5xx, ошибке соединения или ответе медленнее latency_target.
+Retry-After из ответа 429 приостанавливает выдачу новых запросов до указанного
+времени. Так при троттлинге провайдера запросы ждут в очереди, а не получают
+429 все вместе, и p99 остается стабильным.
+
+Лимитер общий на процесс (get_llm_limiter): бот и API ограничиваются отдельно.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+
+import openai
+
+logger = logging.getLogger(__name__)
+
+# Приоритеты запросов (меньше - раньше)
+PRIORITY_CHAT = 0
+PRIORITY_VOICE = 1
+PRIORITY_ANALYTICS = 2
+
+# Лимит уменьшается не чаще раза в секунду: одна волна 429 - одно уменьшение
+DECREASE_COOLDOWN = 1.0
+
+
+def _get_retry_after(error: Exception) -> float | None:
+    """Секунды из заголовка Retry-After ответа (число или HTTP дата)."""
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMLimiter:
+    """
+    Приоритетная очередь запросов к LLM с адаптивным (AIMD) лимитом.
+
+    Использование:
+        async with get_llm_limiter().slot(PRIORITY_CHAT):
+            response = await client.chat.completions.create(...)
+    """
+
+    def __init__(
+        self, max_limit: int = 8, min_limit: int = 1, latency_target: float = 30.0
+    ) -> None:
+        """
+        Инициализация лимитера.
+
+        Args:
+            max_limit: Максимальный (и начальный) лимит одновременных запросов
+            min_limit: Лимит не опускается ниже этого значения
+            latency_target: Ответ дольше (в секундах) считается признаком перегрузки
+
+        Raises:
+            ValueError: Если min_limit < 1 или max_limit < min_limit
+        """
+        if min_limit < 1 or max_limit < min_limit:
+            raise ValueError("LLM limiter requires 1 <= min_limit <= max_limit")
+
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.latency_target = latency_target
+        self.limit = float(max_limit)
+        self._in_flight = 0
+        self._queue: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self._blocked_until = 0.0
+        self._wake_handle: asyncio.TimerHandle | None = None
+        self._last_decrease = 0.0
+        self._throttled = 0
+        self._overloaded = 0
+        self._decreases = 0
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_CHAT) -> AsyncIterator[None]:
+        """
+        Выполнить запрос к LLM в пределах лимита.
+
+        Исключение запроса (429, 5xx, ошибка соединения) уменьшает лимит
+        и пробрасывается дальше.
+
+        Args:
+            priority: Приоритет запроса (PRIORITY_CHAT, PRIORITY_VOICE, PRIORITY_ANALYTICS)
+        """
+        await self._acquire(priority)
+        started_at = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self._on_failure(e)
+            raise
+        else:
+            self._on_success(time.monotonic() - started_at)
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: int) -> None:
+        """Дождаться места: по приоритету, затем в порядке поступления."""
+        if not self._queue and self._has_capacity():
+            self._in_flight += 1
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), future))
+        self._wake()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Место уже выдано, но запрос отменен - возвращаем его
+                self._release()
+            raise
+
+    def _has_capacity(self) -> bool:
+        return self._in_flight < int(self.limit) and time.monotonic() >= self._blocked_until
+
+    def _wake(self) -> None:
+        """Выдать места ожидающим запросам в порядке приоритета."""
+        while self._queue and self._has_capacity():
+            _, _, future = heapq.heappop(self._queue)
+            if future.done():
+                continue  # запрос отменен, пока ждал
+            self._in_flight += 1
+            future.set_result(None)
+
+        delay = self._blocked_until - time.monotonic()
+        if self._queue and delay > 0 and self._wake_handle is None:
+            self._wake_handle = asyncio.get_running_loop().call_later(delay, self._wake_after_pause)
+
+    def _wake_after_pause(self) -> None:
+        self._wake_handle = None
+        self._wake()
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._wake()
+
+    def _on_success(self, latency: float) -> None:
+        """Аддитивное увеличение лимита или уменьшение при медленном ответе."""
+        if latency > self.latency_target:
+            self._overloaded += 1
+            self._decrease(f"slow response {latency:.1f}s")
+            return
+        self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+
+    def _on_failure(self, error: Exception) -> None:
+        """Мультипликативное уменьшение лимита при признаках перегрузки провайдера."""
+        status_code = getattr(error, "status_code", None)
+        if status_code == 429:
+            self._throttled += 1
+            retry_after = _get_retry_after(error)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+                logger.warning(f"LLM provider asked to retry after {retry_after:.1f}s")
+            self._decrease("rate limited (429)")
+        elif (isinstance(status_code, int) and status_code >= 500) or isinstance(
+            error, openai.APIConnectionError
+        ):
+            self._overloaded += 1
+            self._decrease(f"provider error {status_code or type(error).__name__}")
+
+    def _decrease(self, reason: str) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < DECREASE_COOLDOWN:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_limit), self.limit / 2)
+        self._decreases += 1
+        logger.warning(f"LLM concurrency limit decreased to {int(self.limit)}: {reason}")
+
+    def get_stats(self) -> dict[str, int | float]:
+        """
+        Статистика лимитера.
+
+        Returns:
+            Текущий лимит, запросы в работе и в очереди, количество 429,
+            других признаков перегрузки, уменьшений лимита и оставшаяся пауза Retry-After
+        """
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self._in_flight,
+            "waiting": sum(1 for _, _, future in self._queue if not future.done()),
+            "throttled": self._throttled,
+            "overloaded": self._overloaded,
+            "decreases": self._decreases,
+            "retry_after_remaining": round(max(self._blocked_until - time.monotonic(), 0.0), 2),
+        }
+
+
+_limiter: LLMLimiter | None = None
+
+
+def get_llm_limiter() -> LLMLimiter:
+    """
+    Общий лимитер запросов к LLM процесса (создается при первом вызове).
+
+    Параметры: LLM_MAX_CONCURRENCY (8), LLM_MIN_CONCURRENCY (1), LLM_LATENCY_TARGET (30 секунд).
+    """
+    global _limiter
+    if _limiter is None:
+        _limiter = LLMLimiter(
+            max_limit=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+            min_limit=int(os.getenv("LLM_MIN_CONCURRENCY", "1")),
+            latency_target=float(os.getenv("LLM_LATENCY_TARGET", "30")),
+        )
+    return _limiter
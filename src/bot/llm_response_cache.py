@@ -0,0 +1,278 @@
+"""
+Кэш ответов LLM на полностью совпадающие запросы.
+
+Часть запросов детерминирована входом: text2sql, форматирование результатов
+в админ режиме, первый вопрос пользователя без истории. Ответ на такой запрос
+хранится по sha256 хешу (модель, system prompt, сообщения) и повторный запрос
+не отправляется в OpenRouter. Кэш включается на месте вызова (use_cache).
+
+Память ограничена по объему (LRU) и по времени жизни записи (TTL). Опционально
+записи дублируются на диск (LLM_CACHE_DIR): кэш переживает перезапуск и общий
+для процессов бота и API на одной машине. Каталог ограничен по объему
+(LLM_CACHE_DISK_MAX_BYTES): не чаще раза в DISK_SWEEP_INTERVAL запись на диск
+удаляет истекшие файлы и самые старые по mtime сверх лимита.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Секунд между очистками дискового уровня (истекшие файлы и сверх лимита объема)
+DISK_SWEEP_INTERVAL = 60.0
+
+
+def make_cache_key(model: str, system_prompt: str, messages: list[dict[str, Any]]) -> str:
+    """
+    Ключ запроса: sha256 канонического JSON модели, system prompt и сообщений.
+
+    Args:
+        model: Модель LLM
+        system_prompt: System prompt запроса
+        messages: Сообщения запроса (без system prompt)
+
+    Returns:
+        Hex строка sha256
+    """
+    payload = json.dumps(
+        {"model": model, "system_prompt": system_prompt, "messages": messages},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    TTL + LRU кэш ответов LLM с ограничением по байтам и опциональным диском.
+
+    Использование:
+        cache = LLMResponseCache(ttl_seconds=3600, max_bytes=16 * 1024 * 1024)
+        response = await cache.get(key)
+        await cache.set(key, response, tokens=1200)
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 3600,
+        max_bytes: int = 16 * 1024 * 1024,
+        disk_dir: str = "",
+        disk_max_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        """
+        Инициализация кэша.
+
+        Args:
+            ttl_seconds: Время жизни записи в секундах
+            max_bytes: Максимальный объем ответов в памяти (байт UTF-8 вместе с ключами)
+            disk_dir: Каталог дискового уровня ("" - только память)
+            disk_max_bytes: Максимальный объем файлов дискового уровня
+
+        Raises:
+            ValueError: Если ttl_seconds, max_bytes или disk_max_bytes не положительные
+        """
+        if ttl_seconds <= 0 or max_bytes <= 0 or disk_max_bytes <= 0:
+            raise ValueError(
+                "LLM response cache requires positive ttl_seconds, max_bytes and disk_max_bytes"
+            )
+
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        # key -> (ответ, время истечения, оценка токенов запроса и ответа)
+        self._entries: OrderedDict[str, tuple[str, float, int]] = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._tokens_saved = 0
+        self._disk_evictions = 0
+        self._disk_swept_at: float | None = None
+
+    async def get(self, key: str) -> str | None:
+        """
+        Получить ответ из памяти или с диска.
+
+        Args:
+            key: Ключ запроса (make_cache_key)
+
+        Returns:
+            Ответ LLM или None, если записи нет или истек TTL
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] <= time.time():
+            self._remove(key)
+            entry = None
+        if entry is None and self.disk_dir is not None:
+            entry = await asyncio.to_thread(self._read_disk, self.disk_dir / f"{key}.json")
+            if entry is not None:
+                self._disk_hits += 1
+                self._put(key, entry)
+
+        if entry is None:
+            self._misses += 1
+            return None
+
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        self._hits += 1
+        self._tokens_saved += entry[2]
+        return entry[0]
+
+    async def set(self, key: str, response: str, tokens: int) -> None:
+        """
+        Сохранить ответ.
+
+        Args:
+            key: Ключ запроса (make_cache_key)
+            response: Ответ LLM
+            tokens: Оценка токенов запроса и ответа (экономия при попадании)
+        """
+        entry = (response, time.time() + self.ttl_seconds, tokens)
+        self._put(key, entry)
+        if self.disk_dir is not None:
+            await asyncio.to_thread(self._write_disk, self.disk_dir / f"{key}.json", entry)
+            now = time.monotonic()
+            if self._disk_swept_at is None or now - self._disk_swept_at >= DISK_SWEEP_INTERVAL:
+                self._disk_swept_at = now
+                await asyncio.to_thread(self._sweep_disk, self.disk_dir)
+
+    def _put(self, key: str, entry: tuple[str, float, int]) -> None:
+        """Записать в память и вытеснить давно не использованные записи сверх max_bytes."""
+        size = self._entry_size(key, entry[0])
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self._evictions += 1
+
+    def _remove(self, key: str) -> None:
+        response, _, _ = self._entries.pop(key)
+        self._bytes -= self._entry_size(key, response)
+
+    @staticmethod
+    def _entry_size(key: str, response: str) -> int:
+        return len(key) + len(response.encode("utf-8"))
+
+    @staticmethod
+    def _read_disk(path: Path) -> tuple[str, float, int] | None:
+        """Прочитать запись с диска (истекшая и поврежденная записи удаляются)."""
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            response, expires_at, tokens = data["response"], data["expires_at"], data["tokens"]
+            if not isinstance(response, str):
+                raise TypeError(f"response is {type(response).__name__}")
+            entry = (response, float(expires_at), int(tokens))
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Failed to read LLM cache entry {path.name}: {e}")
+            return None
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Removing malformed LLM cache entry {path.name}: {e!r}")
+            path.unlink(missing_ok=True)
+            return None
+        if entry[1] <= time.time():
+            path.unlink(missing_ok=True)
+            return None
+        return entry
+
+    @staticmethod
+    def _write_disk(path: Path, entry: tuple[str, float, int]) -> None:
+        """Записать запись на диск атомарно (временный файл и replace)."""
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        response, expires_at, tokens = entry
+        try:
+            tmp_path.write_text(
+                json.dumps(
+                    {"response": response, "expires_at": expires_at, "tokens": tokens},
+                    ensure_ascii=False,
+                ),
+                encoding="utf-8",
+            )
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"Failed to write LLM cache entry {path.name}: {e}")
+
+    def _sweep_disk(self, disk_dir: Path) -> None:
+        """Удалить истекшие файлы (по mtime и TTL) и самые старые сверх disk_max_bytes."""
+        files: list[tuple[float, int, Path]] = []
+        for path in disk_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort(key=lambda file: file[0])
+
+        expired_before = time.time() - self.ttl_seconds
+        total = sum(size for _, size, _ in files)
+        for mtime, size, path in files:
+            if mtime > expired_before and total <= self.disk_max_bytes:
+                break
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Failed to remove LLM cache entry {path.name}: {e}")
+                continue
+            total -= size
+            self._disk_evictions += 1
+
+    def get_stats(self) -> dict[str, int | float]:
+        """
+        Статистика кэша.
+
+        Returns:
+            Записи и байты в памяти, попадания (из них с диска), промахи,
+            доля попаданий, вытеснения (в памяти и на диске) и сэкономленные
+            токены (оценка)
+        """
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self._hits,
+            "disk_hits": self._disk_hits,
+            "misses": self._misses,
+            "hit_ratio": round(self._hits / lookups, 3) if lookups else 0.0,
+            "evictions": self._evictions,
+            "disk_evictions": self._disk_evictions,
+            "tokens_saved": self._tokens_saved,
+        }
+
+
+_cache: LLMResponseCache | None = None
+
+
+def get_llm_response_cache() -> LLMResponseCache:
+    """
+    Общий кэш ответов LLM процесса (создается при первом вызове).
+
+    Параметры: LLM_CACHE_TTL (3600 секунд), LLM_CACHE_MAX_BYTES (16 МБ),
+    LLM_CACHE_DIR (пусто - без дискового уровня), LLM_CACHE_DISK_MAX_BYTES (256 МБ).
+    """
+    global _cache
+    if _cache is None:
+        _cache = LLMResponseCache(
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL", "3600")),
+            max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+            disk_dir=os.getenv("LLM_CACHE_DIR", ""),
+            disk_max_bytes=int(os.getenv("LLM_CACHE_DISK_MAX_BYTES", str(256 * 1024 * 1024))),
+        )
+    return _cache
@@ -0,0 +1,322 @@
+"""
+Маршрутизатор запросов к нескольким моделям LLM с fallback.
+
+OPENROUTER_MODEL задает упорядоченный список моделей через запятую. Запрос
+отправляется первой здоровой модели; при ошибке или ответе дольше
+LLM_FALLBACK_TIMEOUT - следующей. Для каждой модели считаются задержка и доля
+ошибок последних запросов: модель с разомкнутым circuit breaker или частыми
+ошибками опускается в конец списка. Здоровые модели с достаточной статистикой
+упорядочиваются по медианной задержке: медленная основная модель уступает место
+более быстрой; модели без статистики остаются на своих местах.
+
+Статистика модели обновляется только ее запросами, поэтому опущенная модель раз в
+probe_interval получает пробный запрос первой (если breaker не разомкнут; при ошибке
+запрос уходит следующей). Успешная проба сбрасывает статистику модели: она
+возвращается на свое место в конфигурации.
+
+Короткие простые ходы (одно текстовое сообщение без изображений и истории)
+можно отправлять быстрой дешевой модели LLM_FAST_MODEL; при ее ошибке запрос
+уходит основным моделям.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Any
+
+from .circuit_breaker import STATE_OPEN
+from .llm_client import LLMClient
+from .llm_limiter import PRIORITY_CHAT
+
+logger = logging.getLogger(__name__)
+
+# Окно статистики модели и порог доли ошибок, после которого модель опускается в конец
+STATS_WINDOW = 50
+UNHEALTHY_MIN_SAMPLES = 5
+UNHEALTHY_ERROR_RATE = 0.5
+# Минимум успешных ответов в окне, чтобы учитывать задержку модели при маршрутизации
+LATENCY_MIN_SAMPLES = 5
+# Секунд между пробными запросами к опущенной в списке модели
+PROBE_INTERVAL = 30.0
+
+
+def parse_models(value: str) -> list[str]:
+    """Список моделей из строки через запятую (пустые элементы пропускаются)."""
+    return [model.strip() for model in value.split(",") if model.strip()]
+
+
+def is_simple_turn(messages: list[dict[str, Any]], max_chars: int) -> bool:
+    """
+    Простой ход для быстрой модели: одно короткое текстовое сообщение без истории.
+
+    Args:
+        messages: Сообщения запроса (без system prompt)
+        max_chars: Максимальная длина текста простого хода
+
+    Returns:
+        True, если ход можно отправить быстрой модели
+    """
+    if len(messages) != 1:
+        return False
+    content = messages[0].get("content")
+    return isinstance(content, str) and len(content) <= max_chars
+
+
+class LLMRouter:
+    """
+    LLM провайдер поверх нескольких LLMClient: fallback и быстрая модель.
+
+    Использование:
+        router = create_llm_router(api_key, "model-a,model-b", system_prompt)
+        response = await router.get_response(messages)
+    """
+
+    def __init__(
+        self,
+        clients: list[LLMClient],
+        fast_client: LLMClient | None = None,
+        fallback_timeout: float = 30.0,
+        fast_max_chars: int = 200,
+        probe_interval: float = PROBE_INTERVAL,
+    ) -> None:
+        """
+        Инициализация маршрутизатора.
+
+        Args:
+            clients: Клиенты моделей в порядке предпочтения
+            fast_client: Клиент быстрой модели для простых ходов (None - не используется)
+            fallback_timeout: Секунд ожидания ответа модели, после которых запрос
+                уходит следующей (последняя модель ждет свой LLM_TOTAL_TIMEOUT)
+            fast_max_chars: Максимальная длина текста простого хода
+            probe_interval: Секунд между пробными запросами к опущенной модели
+
+        Raises:
+            ValueError: Если список клиентов пуст
+        """
+        if not clients:
+            raise ValueError("LLMRouter requires at least one model")
+
+        self.clients = clients
+        self.fast_client = fast_client
+        self.fallback_timeout = fallback_timeout
+        self.fast_max_chars = fast_max_chars
+        self.probe_interval = probe_interval
+        # Последние исходы запросов каждой модели: (успех, задержка в секундах)
+        self._outcomes: dict[str, deque[tuple[bool, float]]] = {
+            client.model: deque(maxlen=STATS_WINDOW)
+            for client in [*clients, *([fast_client] if fast_client else [])]
+        }
+        # Время последнего запроса (или выбора для пробы) каждой модели и модели в пробе
+        self._last_called = {client.model: time.monotonic() for client in clients}
+        self._probing: set[str] = set()
+        self._fallbacks = 0
+        self._fast_routed = 0
+        self._probes = 0
+        logger.info(
+            f"LLMRouter initialized: models={[client.model for client in clients]}, "
+            f"fast_model={fast_client.model if fast_client else None}"
+        )
+
+    @property
+    def model(self) -> str:
+        """Основная (первая) модель."""
+        return self.clients[0].model
+
+    async def get_response(
+        self,
+        messages: list[dict[str, Any]],
+        priority: int = PRIORITY_CHAT,
+        use_cache: bool = False,
+    ) -> str:
+        """
+        Получить ответ первой ответившей модели в порядке маршрутизации.
+
+        Args:
+            messages: Сообщения запроса (см. LLMClient.get_response)
+            priority: Приоритет запроса в LLMLimiter
+            use_cache: Брать ответ на такой же запрос из LLMResponseCache
+
+        Returns:
+            Текст ответа от LLM
+
+        Raises:
+            Exception: Ошибка последней модели, если не ответила ни одна
+        """
+        candidates = self._get_candidates(messages)
+        for index, client in enumerate(candidates[:-1]):
+            timeout = asyncio.timeout(self.fallback_timeout)
+            try:
+                async with timeout:
+                    return await self._request(client, messages, priority, use_cache)
+            except Exception as e:
+                if timeout.expired():
+                    # Модель не ответила за fallback_timeout: запрос к ней отменен
+                    self._record(client, ok=False, latency=self.fallback_timeout)
+                self._fallbacks += 1
+                logger.warning(
+                    f"LLM model {client.model} failed ({type(e).__name__}: {e}), "
+                    f"falling back to {candidates[index + 1].model}"
+                )
+
+        return await self._request(candidates[-1], messages, priority, use_cache)
+
+    async def _request(
+        self, client: LLMClient, messages: list[dict[str, Any]], priority: int, use_cache: bool
+    ) -> str:
+        """Запрос к модели с записью исхода и задержки в статистику."""
+        started_at = time.monotonic()
+        self._last_called[client.model] = started_at
+        probe = client.model in self._probing
+        self._probing.discard(client.model)
+        try:
+            response = await client.get_response(messages, priority=priority, use_cache=use_cache)
+        except Exception:
+            self._record(client, ok=False, latency=time.monotonic() - started_at)
+            raise
+        if probe:
+            # Модель восстановилась: прежние ошибки и задержки больше не показательны
+            self._outcomes[client.model].clear()
+            logger.info(f"LLM model {client.model} probe succeeded, restored to its position")
+        self._record(client, ok=True, latency=time.monotonic() - started_at)
+        return response
+
+    def _record(self, client: LLMClient, ok: bool, latency: float) -> None:
+        self._outcomes[client.model].append((ok, latency))
+
+    def _get_candidates(self, messages: list[dict[str, Any]]) -> list[LLMClient]:
+        """
+        Порядок моделей: быстрая для простого хода, затем здоровые, затем остальные.
+
+        Здоровые модели с задержкой в статистике занимают свои позиции в порядке
+        медианной задержки (быстрее - раньше), остальные сохраняют порядок из конфигурации.
+        """
+        healthy = [client for client in self.clients if not self._is_unhealthy(client)]
+        unhealthy = [client for client in self.clients if self._is_unhealthy(client)]
+        measured = [
+            (index, latency)
+            for index, client in enumerate(healthy)
+            if (latency := self._get_latency(client)) is not None
+        ]
+        by_latency = sorted(measured, key=lambda item: item[1])
+        reordered = list(healthy)
+        for (slot, _), (index, _) in zip(measured, by_latency, strict=True):
+            reordered[slot] = healthy[index]
+        candidates = reordered + unhealthy
+        if self.fast_client is not None and is_simple_turn(messages, self.fast_max_chars):
+            self._fast_routed += 1
+            candidates.insert(0, self.fast_client)
+            return candidates
+
+        probe = self._get_probe(candidates)
+        if probe is not None:
+            candidates.remove(probe)
+            candidates.insert(0, probe)
+        return candidates
+
+    def _get_probe(self, candidates: list[LLMClient]) -> LLMClient | None:
+        """
+        Опущенная модель для пробного запроса.
+
+        Это модель, стоящая дальше, чем в конфигурации, с неразомкнутым breaker,
+        к которой не было запросов дольше probe_interval.
+        """
+        now = time.monotonic()
+        for position, client in enumerate(candidates):
+            demoted = position > self.clients.index(client)
+            if (
+                demoted
+                and client.circuit_breaker.state != STATE_OPEN
+                and now - self._last_called[client.model] >= self.probe_interval
+            ):
+                # Одна проба на интервал, даже при параллельных запросах
+                self._last_called[client.model] = now
+                self._probing.add(client.model)
+                self._probes += 1
+                logger.info(f"Probing demoted LLM model {client.model}")
+                return client
+        return None
+
+    def _is_unhealthy(self, client: LLMClient) -> bool:
+        """Модель недоступна: breaker разомкнут или ошибок не меньше UNHEALTHY_ERROR_RATE."""
+        if client.circuit_breaker.state == STATE_OPEN:
+            return True
+        outcomes = self._outcomes[client.model]
+        if len(outcomes) < UNHEALTHY_MIN_SAMPLES:
+            return False
+        errors = sum(1 for ok, _ in outcomes if not ok)
+        return errors / len(outcomes) >= UNHEALTHY_ERROR_RATE
+
+    def _get_latency(self, client: LLMClient) -> float | None:
+        """Медианная задержка успешных ответов (None, если их меньше LATENCY_MIN_SAMPLES)."""
+        latencies = sorted(latency for ok, latency in self._outcomes[client.model] if ok)
+        if len(latencies) < LATENCY_MIN_SAMPLES:
+            return None
+        return latencies[len(latencies) // 2]
+
+    def with_system_prompt(self, system_prompt: str) -> "LLMRouter":
+        """
+        Маршрутизатор тех же моделей с другим system prompt (например, text2sql).
+
+        Быстрая модель не используется: для специальных промптов важнее качество.
+        """
+        return LLMRouter(
+            [client.with_system_prompt(system_prompt) for client in self.clients],
+            fallback_timeout=self.fallback_timeout,
+            probe_interval=self.probe_interval,
+        )
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Статистика маршрутизации.
+
+        Returns:
+            Количество fallback, запросов к быстрой модели и проб; для каждой модели -
+            запросы в окне, доля ошибок и медианная задержка успешных ответов
+        """
+        models: dict[str, dict[str, int | float]] = {}
+        for model, outcomes in self._outcomes.items():
+            latencies = sorted(latency for ok, latency in outcomes if ok)
+            errors = sum(1 for ok, _ in outcomes if not ok)
+            models[model] = {
+                "requests": len(outcomes),
+                "error_rate": round(errors / len(outcomes), 2) if outcomes else 0.0,
+                "p50_latency": round(latencies[len(latencies) // 2], 2) if latencies else 0.0,
+            }
+        return {
+            "fallbacks": self._fallbacks,
+            "fast_routed": self._fast_routed,
+            "probes": self._probes,
+            "models": models,
+        }
+
+
+def create_llm_router(
+    api_key: str, models: str, system_prompt: str, fast_model: str | None = None
+) -> LLMRouter:
+    """
+    Создать маршрутизатор по списку моделей через запятую.
+
+    Параметры: LLM_FALLBACK_TIMEOUT (30 секунд), LLM_FAST_MAX_CHARS (200).
+
+    Args:
+        api_key: API ключ OpenRouter
+        models: Модели в порядке предпочтения через запятую
+        system_prompt: System prompt для всех моделей
+        fast_model: Быстрая модель для простых ходов (None - не используется)
+
+    Returns:
+        LLMRouter
+
+    Raises:
+        ValueError: Если список моделей пуст
+    """
+    clients = [LLMClient(api_key, model, system_prompt) for model in parse_models(models)]
+    fast_client = LLMClient(api_key, fast_model, system_prompt) if fast_model else None
+    return LLMRouter(
+        clients,
+        fast_client=fast_client,
+        fallback_timeout=float(os.getenv("LLM_FALLBACK_TIMEOUT", "30")),
+        fast_max_chars=int(os.getenv("LLM_FAST_MAX_CHARS", "200")),
+    )
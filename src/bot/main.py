@@ -1,14 +1,21 @@
 import asyncio
 import logging
+import multiprocessing
+from typing import Any
 
-from .bot import TelegramBot
+from .admission_controller import AdmissionController
+from .bot import TelegramBot, create_aiogram_bot
 from .command_handler import CommandHandler
 from .config import Config
-from .database import create_engine, create_session_factory
+from .conversation_summarizer import ConversationSummarizer, load_summary_prompt
+from .database import create_engine, create_session_factory, dispose_engines, warm_up_pool
 from .dialogue_manager import DialogueManager
-from .llm_client import LLMClient
+from .faq_cache import FAQCache
+from .llm_router import create_llm_router
 from .media_processor import MediaProcessor
 from .message_handler import MessageHandler
+from .webhook_server import WebhookServer
+from .webhook_worker import run_worker_process
 
 
 def setup_logging() -> None:
@@ -41,61 +48,179 @@ def setup_logging() -> None:
     logging.info("Logging configured successfully")
 
 
-async def main() -> None:
-    setup_logging()
-
-    logging.info("Starting bot initialization...")
+async def create_telegram_bot(config: Config) -> TelegramBot:
+    """
+    Собрать бота со всеми зависимостями (БД, LLM, медиа, обработчики).
 
-    config = Config()
+    Args:
+        config: Конфигурация приложения
 
+    Returns:
+        TelegramBot, готовый к polling или обработке webhook updates
+    """
     # Создаем database engine и session factory
     engine = create_engine(config)
     session_factory = create_session_factory(engine)
+    await warm_up_pool(engine)
     logging.info("Database engine and session factory initialized")
 
-    # Создаем LLM клиент
-    llm_client = LLMClient(
+    # Создаем маршрутизатор LLM (модели в порядке fallback и быстрая модель)
+    llm_client = create_llm_router(
         api_key=config.openrouter_api_key,
-        model=config.openrouter_model,
+        models=config.openrouter_model,
         system_prompt=config.system_prompt,
+        fast_model=config.fast_model,
     )
-    logging.info("LLM client initialized")
+    logging.info("LLM router initialized")
 
     # Создаем менеджер диалогов с session factory (создает сессию для каждого запроса)
+    # История ограничена количеством сообщений и бюджетом токенов (за вычетом system prompt)
     dialogue_manager = DialogueManager(
-        session_factory=session_factory, max_history=config.max_history
+        session_factory=session_factory,
+        max_history=config.max_history,
+        token_budget=config.context_token_budget,
+        system_prompt=config.system_prompt,
+        use_summary=config.conversation_summary,
+        image_history_turns=config.image_history_turns,
     )
     logging.info(f"Dialogue manager initialized with max_history={config.max_history}")
 
-    # Создаем обработчик медиа с параметрами Whisper
+    # Создаем обработчик медиа с параметрами Whisper (модель загружается в фоне после старта)
     media_processor = MediaProcessor(
         whisper_model=config.whisper_model, whisper_device=config.whisper_device
     )
     logging.info(
         f"MediaProcessor initialized with Whisper model={config.whisper_model}, "
-        f"device={config.whisper_device}"
+        f"device={config.whisper_device} (model will be loaded in background)"
     )
 
+    # FAQ: ответ на первый вопрос из одобренных пар вопрос-ответ (индекс загружается лениво)
+    faq_cache = None
+    if config.faq_cache:
+        faq_cache = FAQCache(
+            session_factory,
+            min_similarity=config.faq_min_similarity,
+            collect_candidates=config.faq_collect_candidates,
+        )
+        logging.info(f"FAQ cache enabled with min_similarity={config.faq_min_similarity}")
+
     # Создаем обработчики
-    message_handler = MessageHandler(llm_client, dialogue_manager, media_provider=media_processor)
+    message_handler = MessageHandler(
+        llm_client,
+        dialogue_manager,
+        media_provider=media_processor,
+        debounce_ms=config.message_debounce_ms,
+        faq_provider=faq_cache,
+    )
     logging.info("MessageHandler initialized with MediaProcessor")
 
     command_handler = CommandHandler(dialogue_manager)
     logging.info("CommandHandler initialized")
 
+    # Фоновое сжатие вышедшей за окно части диалога (отдельный prompt, те же модели)
+    summarizer = None
+    if config.conversation_summary:
+        summarizer = ConversationSummarizer(
+            llm_client.with_system_prompt(load_summary_prompt()),
+            dialogue_manager,
+            min_messages=config.summary_min_messages,
+        )
+        logging.info(
+            f"ConversationSummarizer initialized with min_messages={config.summary_min_messages}"
+        )
+
     # Создаем бота с session_factory для отслеживания пользователей
     telegram_bot = TelegramBot(
-        config.telegram_token, message_handler, command_handler, session_factory
+        config.telegram_token,
+        message_handler,
+        command_handler,
+        session_factory,
+        api_url=config.telegram_api_url,
+        cancel_on_message=config.cancel_on_message,
+        admission=AdmissionController(
+            max_concurrency=config.admission_max_concurrency,
+            max_queue=config.admission_max_queue,
+            queue_timeout=config.admission_queue_timeout,
+        ),
+        summarizer=summarizer,
     )
     logging.info("Telegram bot initialized with user tracking")
 
+    async def load_whisper_in_background() -> None:
+        """Начать загрузку модели Whisper, не задерживая старт polling."""
+        media_processor.start_loading()
+
+    telegram_bot.dp.startup.register(load_whisper_in_background)
+    if summarizer is not None:
+        telegram_bot.dp.shutdown.register(summarizer.stop)
+    return telegram_bot
+
+
+async def run_webhook(config: Config) -> None:
+    """
+    Webhook режим: сервер принимает updates и распределяет их по worker процессам.
+
+    Updates одного чата всегда попадают в один worker (consistent hashing по chat id).
+
+    Args:
+        config: Конфигурация приложения (BOT_MODE=webhook)
+    """
+    if config.webhook_url is None or config.webhook_secret is None:
+        raise ValueError("WEBHOOK_URL and WEBHOOK_SECRET are required for webhook mode")
+
+    context = multiprocessing.get_context("spawn")
+    names = [f"worker-{index}" for index in range(config.webhook_workers)]
+    queues: dict[str, Any] = {name: context.Queue() for name in names}
+    processes = [
+        context.Process(target=run_worker_process, args=(name, queues[name]), name=name)
+        for name in names
+    ]
+    for process in processes:
+        process.start()
+    logging.info(f"Started {len(processes)} webhook workers")
+
+    def dispatch(worker: str, update: dict[str, Any]) -> None:
+        queues[worker].put(update)
+
+    server = WebhookServer(config.webhook_secret, dispatch, names, path=config.webhook_path)
+    bot = create_aiogram_bot(config.telegram_token, config.telegram_api_url)
+    try:
+        await server.start(config.webhook_host, config.webhook_port)
+        await bot.set_webhook(url=config.webhook_url, secret_token=config.webhook_secret)
+        logging.info(f"Webhook set to {config.webhook_url}")
+        await asyncio.Event().wait()
+    finally:
+        # Graceful shutdown: worker дообрабатывают принятые updates
+        logging.info("Shutting down webhook server...")
+        await server.stop()
+        await bot.session.close()
+        for name in names:
+            queues[name].put(None)
+        for process in processes:
+            await asyncio.to_thread(process.join, 30)
+        logging.info("Webhook workers stopped")
+
+
+async def main() -> None:
+    setup_logging()
+
+    logging.info("Starting bot initialization...")
+
+    config = Config()
+
+    if config.bot_mode == "webhook":
+        await run_webhook(config)
+        return
+
+    telegram_bot = await create_telegram_bot(config)
+
     try:
         logging.info("Bot is starting polling...")
         await telegram_bot.start()
     finally:
         # Graceful shutdown
-        logging.info("Shutting down...")
-        await engine.dispose()
+        logging.info(f"Shutting down... Load stats: {telegram_bot.get_stats()}")
+        await dispose_engines()
         logging.info("Database connections closed")
 
 
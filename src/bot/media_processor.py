@@ -2,33 +2,87 @@
 Обработчик медиа-файлов (фото, аудио).
 
 Реализует MediaProvider Protocol для работы с изображениями и аудио.
+Модель Faster-Whisper (и сам модуль faster_whisper) загружается лениво
+в фоновом потоке: старт бота и текстовые сообщения ее не ждут.
 """
 
+import asyncio
 import base64
 import logging
 import tempfile
+import time
 from pathlib import Path
 from typing import Any, cast
 
-from faster_whisper import WhisperModel
-
 logger = logging.getLogger(__name__)
 
 
 class MediaProcessor:
     """Обработчик медиа-файлов для Telegram бота."""
 
+    whisper: Any | None
+    _load_task: "asyncio.Task[None] | None"
+
     def __init__(self, whisper_model: str = "base", whisper_device: str = "cpu") -> None:
         """
         Инициализация MediaProcessor с Faster-Whisper.
 
+        Модель не загружается: загрузку запускает start_loading() (в фоне после
+        старта polling) или первое голосовое сообщение.
+
         Args:
             whisper_model: Модель Faster-Whisper ('tiny', 'base', 'small', 'medium', 'large')
             whisper_device: Устройство для выполнения ('cpu', 'cuda')
         """
-        logger.info(f"Loading Faster-Whisper model: {whisper_model} on {whisper_device}")
-        self.whisper = WhisperModel(whisper_model, device=whisper_device, compute_type="int8")
-        logger.info("Faster-Whisper model loaded successfully")
+        self.whisper_model = whisper_model
+        self.whisper_device = whisper_device
+        self.whisper = None
+        self._load_task = None
+
+    @property
+    def is_ready(self) -> bool:
+        """Загружена ли модель Faster-Whisper."""
+        return self.whisper is not None
+
+    def _load_model(self) -> Any:  # noqa: ANN401
+        """Импортировать faster_whisper и загрузить модель (блокирующая операция)."""
+        from faster_whisper import WhisperModel
+
+        return WhisperModel(self.whisper_model, device=self.whisper_device, compute_type="int8")
+
+    async def _load(self) -> None:
+        """Загрузить модель в отдельном потоке, не блокируя event loop."""
+        logger.info(f"Loading Faster-Whisper model: {self.whisper_model} on {self.whisper_device}")
+        started_at = time.perf_counter()
+        self.whisper = await asyncio.to_thread(self._load_model)
+        logger.info(
+            f"Faster-Whisper model loaded successfully in {time.perf_counter() - started_at:.1f}s"
+        )
+
+    def start_loading(self) -> "asyncio.Task[None]":
+        """
+        Запустить фоновую загрузку модели (повторный вызов возвращает ту же задачу).
+
+        Returns:
+            Задача загрузки модели
+        """
+        if self._load_task is None or (
+            self._load_task.done()
+            and not self._load_task.cancelled()
+            and self._load_task.exception() is not None
+        ):
+            self._load_task = asyncio.create_task(self._load())
+        return self._load_task
+
+    async def wait_ready(self) -> None:
+        """
+        Дождаться загрузки модели (запускает загрузку, если она еще не начата).
+
+        Голосовые сообщения, пришедшие до готовности модели, ждут здесь.
+        При ошибке загрузки исключение пробрасывается, следующий вызов повторит загрузку.
+        """
+        if self.whisper is None:
+            await asyncio.shield(self.start_loading())
 
     async def download_photo(self, file_id: str, bot: Any) -> bytes:
         """
@@ -123,11 +177,11 @@ class MediaProcessor:
                 temp_path = temp_file.name
 
             try:
-                # Транскрибация через Faster-Whisper
-                segments, info = self.whisper.transcribe(temp_path, language="ru")
-                text = " ".join([segment.text for segment in segments])
+                # Транскрибация через Faster-Whisper в отдельном потоке
+                await self.wait_ready()
+                text, language = await asyncio.to_thread(self._transcribe_file, temp_path)
 
-                logger.info(f"Transcription complete: {len(text)} chars, language: {info.language}")
+                logger.info(f"Transcription complete: {len(text)} chars, language: {language}")
                 return text.strip()
 
             finally:
@@ -138,3 +192,18 @@ class MediaProcessor:
         except Exception as e:
             logger.error(f"Error transcribing audio: {e}", exc_info=True)
             raise
+
+    def _transcribe_file(self, path: str) -> tuple[str, str]:
+        """
+        Распознать аудио файл (блокирующая операция).
+
+        Args:
+            path: Путь к аудио файлу
+
+        Returns:
+            Распознанный текст и язык
+        """
+        segments, info = self.whisper.transcribe(path, language="ru")  # type: ignore[union-attr]
+        # segments - генератор: распознавание выполняется при итерации
+        text = " ".join([segment.text for segment in segments])
+        return text, info.language
@@ -4,10 +4,14 @@
 Отвечает только за бизнес-логику обработки пользовательских сообщений.
 """
 
+import asyncio
+import contextvars
 import logging
+from collections.abc import Awaitable, Callable
 from typing import Any
 
-from .interfaces import DialogueStorage, LLMProvider, MediaProvider
+from .interfaces import DialogueStorage, FAQProvider, LLMProvider, MediaProvider
+from .llm_limiter import PRIORITY_CHAT, PRIORITY_VOICE
 
 logger = logging.getLogger(__name__)
 
@@ -18,12 +22,16 @@ class MessageHandler:
     llm_provider: LLMProvider
     dialogue_storage: DialogueStorage
     media_provider: MediaProvider | None
+    faq_provider: FAQProvider | None
+    debounce_ms: int
 
     def __init__(
         self,
         llm_provider: LLMProvider,
         dialogue_storage: DialogueStorage,
         media_provider: MediaProvider | None = None,
+        debounce_ms: int = 0,
+        faq_provider: FAQProvider | None = None,
     ) -> None:
         """
         Инициализация обработчика сообщений.
@@ -32,20 +40,116 @@ class MessageHandler:
             llm_provider: Провайдер LLM для генерации ответов
             dialogue_storage: Хранилище истории диалогов
             media_provider: Обработчик медиа-файлов (опционально для фото/аудио)
+            debounce_ms: Окно объединения быстрых сообщений пользователя (0 - выключено)
+            faq_provider: Ответы на первый вопрос без обращения к LLM (опционально)
         """
         self.llm_provider = llm_provider
         self.dialogue_storage = dialogue_storage
         self.media_provider = media_provider
-        logger.info("MessageHandler initialized")
+        self.faq_provider = faq_provider
+        self.debounce_ms = debounce_ms
+        # Debounce: накопленные тексты, callback последнего сообщения и таймер по user_id
+        self._pending_texts: dict[int, list[str]] = {}
+        self._pending_callbacks: dict[int, Callable[[str], Awaitable[None]]] = {}
+        self._debounce_timers: dict[int, asyncio.Task[None]] = {}
+        self._debounce_tasks: set[asyncio.Task[None]] = set()
+        logger.info(f"MessageHandler initialized (debounce_ms={debounce_ms})")
+
+    def debounce(self, user_id: int, text: str, on_ready: Callable[[str], Awaitable[None]]) -> None:
+        """
+        Добавить текст в пачку сообщений пользователя.
+
+        Каждое новое сообщение перезапускает окно debounce_ms. Когда пользователь
+        молчит дольше окна, on_ready последнего сообщения вызывается один раз
+        с текстами пачки, объединенными через перевод строки (один ход диалога).
+        on_ready выполняется в фоновой задаче с чистым контекстом: сессия БД
+        текущего update к этому моменту уже закрыта.
+
+        Args:
+            user_id: ID пользователя
+            text: Текст сообщения (или распознанного голосового)
+            on_ready: Обработка объединенного текста (ход диалога и ответ пользователю)
+        """
+        self._pending_texts.setdefault(user_id, []).append(text)
+        self._pending_callbacks[user_id] = on_ready
+
+        timer = self._debounce_timers.get(user_id)
+        if timer is not None:
+            timer.cancel()
+        timer = asyncio.create_task(
+            self._flush_after_window(user_id), context=contextvars.Context()
+        )
+        self._debounce_timers[user_id] = timer
+        self._debounce_tasks.add(timer)
+        timer.add_done_callback(self._debounce_tasks.discard)
+
+    def cancel_pending(self, user_id: int) -> None:
+        """
+        Отменить накопленную пачку сообщений пользователя (например, при /reset).
+
+        Args:
+            user_id: ID пользователя
+        """
+        timer = self._debounce_timers.pop(user_id, None)
+        if timer is not None:
+            timer.cancel()
+        texts = self._pending_texts.pop(user_id, [])
+        self._pending_callbacks.pop(user_id, None)
+        if texts:
+            logger.info(f"Dropped {len(texts)} pending messages of user {user_id}")
+
+    async def _flush_after_window(self, user_id: int) -> None:
+        """Дождаться окончания окна и передать объединенный текст в on_ready."""
+        await asyncio.sleep(self.debounce_ms / 1000)
+
+        # Окно закрыто: забираем пачку, новые сообщения начнут следующую
+        del self._debounce_timers[user_id]
+        texts = self._pending_texts.pop(user_id)
+        on_ready = self._pending_callbacks.pop(user_id)
+        if len(texts) > 1:
+            logger.info(f"Merged {len(texts)} messages from user {user_id} into one turn")
+
+        try:
+            await on_ready("\n".join(texts))
+        except Exception as e:
+            logger.error(
+                f"Error processing debounced messages of user {user_id}: {e}", exc_info=True
+            )
+
+    async def save_user_message(self, user_id: int, text: str) -> None:
+        """
+        Сохранить сообщение пользователя и зафиксировать его.
+
+        Сообщение остается в истории, даже если ход затем отменен новым
+        сообщением: следующий ответ учитывает его в контексте.
+
+        Args:
+            user_id: ID пользователя Telegram
+            text: Текст сообщения от пользователя
+        """
+        await self.dialogue_storage.add_message(user_id, "user", text)
+        await self.dialogue_storage.release_connection()
 
-    async def handle_user_message(self, user_id: int, username: str, text: str) -> str:
+    async def handle_user_message(
+        self,
+        user_id: int,
+        username: str,
+        text: str,
+        priority: int = PRIORITY_CHAT,
+        user_message_saved: bool = False,
+    ) -> str:
         """
         Обработать сообщение пользователя и получить ответ.
 
+        Сообщение пользователя фиксируется до запроса к LLM: отмена хода
+        (UserLockMiddleware) откатывает только несохраненный ответ.
+
         Args:
             user_id: ID пользователя Telegram
             username: Имя пользователя Telegram
             text: Текст сообщения от пользователя
+            priority: Приоритет запроса к LLM (голосовые - после текстовых)
+            user_message_saved: Сообщение уже сохранено через save_user_message
 
         Returns:
             Текст ответа от LLM
@@ -57,14 +161,29 @@ class MessageHandler:
 
         try:
             # Добавляем сообщение пользователя в историю
-            await self.dialogue_storage.add_message(user_id, "user", text)
+            if not user_message_saved:
+                await self.dialogue_storage.add_message(user_id, "user", text)
 
             # Получаем историю диалога
             history = await self.dialogue_storage.get_history(user_id)
 
-            # Получаем ответ от LLM с учетом истории
-            logger.info(f"Requesting LLM response for user {user_id}")
-            response = self.llm_provider.get_response(history)
+            # Первый вопрос без истории не зависит от пользователя: ответ из FAQ или кэша
+            first_turn = len(history) == 1
+            response = None
+            if first_turn and self.faq_provider is not None:
+                response = await self.faq_provider.match(text)
+
+            if response is None:
+                # Сообщение фиксируется до запроса к LLM: соединение не ждет ответа модели
+                await self.dialogue_storage.release_connection()
+
+                # Получаем ответ от LLM с учетом истории
+                logger.info(f"Requesting LLM response for user {user_id}")
+                response = await self.llm_provider.get_response(
+                    history, priority=priority, use_cache=first_turn
+                )
+                if first_turn and self.faq_provider is not None:
+                    await self.faq_provider.add_candidate(text, response)
 
             # Добавляем ответ ассистента в историю
             await self.dialogue_storage.add_message(user_id, "assistant", response)
@@ -110,7 +229,8 @@ class MessageHandler:
         )
 
         try:
-            # Скачиваем фото
+            # Скачиваем фото (соединение с БД на время скачивания возвращается в пул)
+            await self.dialogue_storage.release_connection()
             photo_bytes = await self.media_provider.download_photo(photo_file_id, bot)
 
             # Конвертируем в base64
@@ -133,11 +253,14 @@ class MessageHandler:
             history = await self.dialogue_storage.get_history(user_id)
 
             # Получаем ответ от LLM с учетом истории
+            await self.dialogue_storage.release_connection()
             logger.info(f"Requesting LLM response for photo from user {user_id}")
-            response = self.llm_provider.get_response(history)
+            response = await self.llm_provider.get_response(history)
 
             # Добавляем ответ ассистента в историю
             await self.dialogue_storage.add_message(user_id, "assistant", response)
+            # Ответ на фото - его описание для замены изображения в старой истории
+            await self.dialogue_storage.describe_last_image(user_id, response)
 
             logger.info(f"Generated response for photo from user {user_id}: {response[:50]}...")
             return response
@@ -175,16 +298,40 @@ class MessageHandler:
         logger.info(f"Processing voice from user {user_id} (@{username}), file_id: {voice_file_id}")
 
         try:
-            # Скачиваем аудио
-            audio_bytes = await self.media_provider.download_audio(voice_file_id, bot)
+            transcribed_text = await self.transcribe_voice(user_id, voice_file_id, bot)
 
-            # Транскрибируем аудио в текст
-            transcribed_text = await self.media_provider.transcribe_audio(audio_bytes)
-            logger.info(f"Transcribed text from user {user_id}: {transcribed_text[:50]}...")
-
-            # Обрабатываем как обычное текстовое сообщение
-            return await self.handle_user_message(user_id, username, transcribed_text)
+            # Обрабатываем как обычное текстовое сообщение, но с приоритетом голосовых
+            return await self.handle_user_message(
+                user_id, username, transcribed_text, priority=PRIORITY_VOICE
+            )
 
         except Exception as e:
             logger.error(f"Error processing voice from user {user_id}: {e}", exc_info=True)
             raise
+
+    async def transcribe_voice(self, user_id: int, voice_file_id: str, bot: Any) -> str:
+        """
+        Скачать голосовое сообщение и распознать текст.
+
+        Args:
+            user_id: ID пользователя Telegram
+            voice_file_id: ID файла голосового сообщения в Telegram
+            bot: Экземпляр aiogram Bot для скачивания
+
+        Returns:
+            Распознанный текст
+
+        Raises:
+            ValueError: Если MediaProvider не инициализирован
+        """
+        if self.media_provider is None:
+            raise ValueError("MediaProvider is required to handle voice messages")
+
+        # Скачиваем аудио (соединение с БД на время скачивания и распознавания - в пуле)
+        await self.dialogue_storage.release_connection()
+        audio_bytes = await self.media_provider.download_audio(voice_file_id, bot)
+
+        # Транскрибируем аудио в текст
+        transcribed_text = await self.media_provider.transcribe_audio(audio_bytes)
+        logger.info(f"Transcribed text from user {user_id}: {transcribed_text[:50]}...")
+        return transcribed_text
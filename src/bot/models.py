@@ -8,7 +8,18 @@ import enum
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import BigInteger, Boolean, DateTime, Enum, ForeignKey, Index, Integer, String, func
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -125,7 +136,7 @@ class Message(Base):
     Хранит историю диалогов пользователей с поддержкой:
     - Мультимодального контента (текст + изображения) в JSONB
     - Soft delete стратегии (is_deleted)
-    - Метаданных (created_at, char_length)
+    - Метаданных (created_at, char_length, token_count)
     - Связи с пользователем (foreign key)
     """
 
@@ -146,6 +157,18 @@ class Message(Base):
         DateTime(timezone=True), server_default=func.now(), doc="Время создания сообщения"
     )
     char_length: Mapped[int] = mapped_column(Integer, doc="Длина сообщения в символах")
+    token_count: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+        doc="Оценка токенов сообщения (с изображениями) для окна истории",
+    )
+    image_description: Mapped[str | None] = mapped_column(
+        Text, doc="Описание изображения (первый анализ модели) для замены в старой истории"
+    )
+    described_token_count: Mapped[int | None] = mapped_column(
+        Integer, doc="Оценка токенов сообщения с описанием вместо изображений"
+    )
     is_deleted: Mapped[bool] = mapped_column(
         Boolean, default=False, server_default="false", doc="Флаг soft delete"
     )
@@ -160,3 +183,67 @@ class Message(Base):
             f"Message(id={self.id}, user_id={self.user_id}, role={self.role}, "
             f"char_length={self.char_length}, is_deleted={self.is_deleted})"
         )
+
+
+class ConversationSummary(Base):
+    """
+    Сжатое содержание ранней части диалога пользователя.
+
+    Сообщения, вышедшие за окно истории, сворачиваются в текст summary;
+    summarized_until_id - id последнего учтенного сообщения. Одна запись на пользователя.
+    """
+
+    __tablename__ = "conversation_summaries"
+
+    user_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+        doc="User ID (foreign key to users.id)",
+    )
+    summary: Mapped[str] = mapped_column(Text, doc="Сжатое содержание ранней части диалога")
+    summarized_until_id: Mapped[int] = mapped_column(
+        Integer, doc="id последнего сообщения, учтенного в summary"
+    )
+    token_count: Mapped[int] = mapped_column(Integer, doc="Оценка токенов summary")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        doc="Время последнего обновления",
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"ConversationSummary(user_id={self.user_id}, "
+            f"summarized_until_id={self.summarized_until_id}, token_count={self.token_count})"
+        )
+
+
+class FAQEntry(Base):
+    """
+    Пара вопрос-ответ для ответа на первый вопрос пользователя без обращения к LLM.
+
+    Кандидаты (is_approved=False) собираются из первых ответов LLM или добавляются
+    администратором; в индекс FAQ попадают только одобренные записи.
+    """
+
+    __tablename__ = "faq_entries"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    question: Mapped[str] = mapped_column(Text, doc="Вопрос пользователя")
+    answer: Mapped[str] = mapped_column(Text, doc="Ответ на вопрос")
+    is_approved: Mapped[bool] = mapped_column(
+        Boolean, default=False, server_default="false", doc="Одобрен администратором"
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), doc="Время создания"
+    )
+    approved_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), doc="Время одобрения"
+    )
+
+    __table_args__ = (Index("idx_faq_entries_is_approved", "is_approved"),)
+
+    def __repr__(self) -> str:
+        return f"FAQEntry(id={self.id}, is_approved={self.is_approved})"
@@ -8,14 +8,45 @@ import logging
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import func, select, update
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    SQLColumnExpression,
+    and_,
+    case,
+    delete,
+    func,
+    or_,
+    select,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .models import Message, User
+from .models import ConversationSummary, FAQEntry, Message, User
+from .token_estimator import estimate_tokens
 
 logger = logging.getLogger(__name__)
 
 
+def replace_images(content: list[dict[str, Any]], description: str) -> list[dict[str, Any]]:
+    """
+    Заменить изображения мультимодального сообщения текстовым описанием.
+
+    Args:
+        content: Мультимодальный контент [{"type": "text", ...}, {"type": "image_url", ...}]
+        description: Описание изображения (первый анализ модели)
+
+    Returns:
+        Контент, в котором каждое изображение заменено текстовой частью
+    """
+    return [
+        {"type": "text", "text": f"[Фото, отправленное ранее. Его анализ: {description}]"}
+        if part.get("type") == "image_url"
+        else part
+        for part in content
+    ]
+
+
 class MessageRepository:
     """
     Репозиторий для работы с сообщениями диалогов.
@@ -26,14 +57,24 @@ class MessageRepository:
     - Soft delete истории
     """
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(self, session: AsyncSession, auto_commit: bool = True) -> None:
         """
         Инициализация репозитория.
 
         Args:
             session: Async сессия SQLAlchemy
+            auto_commit: Коммитить после каждой записи (False - только flush,
+                commit выполняет unit of work)
         """
         self.session = session
+        self.auto_commit = auto_commit
+
+    async def _commit(self) -> None:
+        """Commit (или flush внутри unit of work)."""
+        if self.auto_commit:
+            await self.session.commit()
+        else:
+            await self.session.flush()
 
     async def add_message(
         self, user_id: int, role: str, content: dict[str, Any] | str | list[dict[str, Any]]
@@ -59,56 +100,218 @@ class MessageRepository:
             content_dict = content
 
         char_length = self._calculate_char_length(content_dict)
+        token_count = estimate_tokens(content_dict)
 
         message = Message(
             user_id=user_id,
             role=role,
             content=content_dict,
             char_length=char_length,
+            token_count=token_count,
         )
 
         self.session.add(message)
-        await self.session.commit()
+        await self._commit()
         await self.session.refresh(message)
 
         logger.debug(f"Added message for user {user_id}: role={role}, char_length={char_length}")
         return message
 
-    async def get_history(self, user_id: int, limit: int) -> list[dict[str, Any]]:
+    async def get_history(
+        self,
+        user_id: int,
+        limit: int,
+        token_budget: int | None = None,
+        image_turns: int | None = None,
+    ) -> list[dict[str, Any]]:
         """
         Получить историю сообщений пользователя (только не удаленные).
 
+        С token_budget возвращаются самые новые сообщения, сумма токенов
+        которых не превышает бюджет (сумма считается оконной функцией в БД).
+        Старое изображение с описанием учитывается по described_token_count.
+        Последнее сообщение возвращается всегда, даже если оно больше бюджета.
+
         Args:
             user_id: ID пользователя Telegram
             limit: Максимальное количество сообщений
+            token_budget: Бюджет токенов истории (None - без ограничения)
+            image_turns: Изображения из последних image_turns сообщений пользователя
+                отправляются как есть, более старые с описанием - заменяются им
+                (None - изображения не заменяются)
 
         Returns:
             Список сообщений в формате [{"role": "user", "content": "..."}]
         """
-        stmt = (
-            select(Message)
-            .where(Message.user_id == user_id, Message.is_deleted == False)  # noqa: E712
-            .order_by(Message.created_at.desc())
-            .limit(limit)
+        result = await self.session.execute(
+            self._window_query(user_id, limit, token_budget, image_turns)
         )
-
-        result = await self.session.execute(stmt)
         messages = result.scalars().all()
 
         # Возвращаем в прямом порядке (от старых к новым)
         # Распаковываем текст из {"text": "..."} обратно в строку для LLM API
         history = []
+        # Сообщений пользователя новее текущего (возраст в ходах)
+        user_turns = sum(1 for msg in messages if msg.role == "user")
         for msg in reversed(messages):
             content = msg.content
+            if msg.role == "user":
+                user_turns -= 1
             # Если это простое текстовое сообщение в формате {"text": "..."}
             if isinstance(content, dict) and "text" in content and len(content) == 1:
                 content = content["text"]
+            # Старое изображение заменяем описанием: не отправляем его повторно
+            elif (
+                image_turns is not None
+                and msg.image_description is not None
+                and user_turns >= image_turns
+            ):
+                content = replace_images(content, msg.image_description)
             # Иначе (список для мультимодального) оставляем как есть
             history.append({"role": msg.role, "content": content})
 
         logger.debug(f"Retrieved {len(history)} messages for user {user_id}")
         return history
 
+    async def get_messages_before_window(
+        self,
+        user_id: int,
+        limit: int,
+        token_budget: int | None,
+        after_id: int,
+        batch_size: int,
+        image_turns: int | None = None,
+    ) -> list[Message]:
+        """
+        Получить сообщения, вышедшие за окно истории (для сжатия в summary).
+
+        Args:
+            user_id: ID пользователя
+            limit: Максимальное количество сообщений окна (как в get_history)
+            token_budget: Бюджет токенов окна (как в get_history)
+            after_id: Вернуть только сообщения с id больше этого (еще не учтенные в summary)
+            batch_size: Максимальное количество возвращаемых сообщений
+            image_turns: Возраст замены изображений описанием (как в get_history)
+
+        Returns:
+            Сообщения от старых к новым
+        """
+        window_ids = self._window_query(
+            user_id, limit, token_budget, image_turns
+        ).with_only_columns(Message.id)
+        stmt = (
+            select(Message)
+            .where(
+                Message.user_id == user_id,
+                Message.is_deleted == False,  # noqa: E712
+                Message.id > after_id,
+                Message.id.not_in(window_ids),
+            )
+            .order_by(Message.created_at, Message.id)
+            .limit(batch_size)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def set_image_description(self, user_id: int, description: str) -> bool:
+        """
+        Сохранить описание последнего еще не описанного изображения пользователя.
+
+        described_token_count - оценка контента с описанием вместо изображения:
+        по ней окно истории учитывает изображение, когда оно заменяется описанием.
+        token_count (с изображением) не меняется: недавнее фото отправляется как есть.
+
+        Args:
+            user_id: ID пользователя
+            description: Описание изображения
+
+        Returns:
+            True, если изображение найдено и описание сохранено
+        """
+        stmt = (
+            select(Message)
+            .where(
+                Message.user_id == user_id,
+                Message.is_deleted == False,  # noqa: E712
+                Message.role == "user",
+                Message.image_description.is_(None),
+                Message.content.contains([{"type": "image_url"}]),
+            )
+            .order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(1)
+        )
+        message = (await self.session.execute(stmt)).scalar_one_or_none()
+        if message is None:
+            return False
+
+        message.image_description = description
+        message.described_token_count = estimate_tokens(
+            replace_images(message.content, description)
+        )
+        await self._commit()
+        logger.debug(f"Saved image description for message {message.id}")
+        return True
+
+    async def is_message_active(self, message_id: int) -> bool:
+        """Сообщение существует и не удалено (история не очищена через /reset)."""
+        stmt = select(Message.is_deleted).where(Message.id == message_id)
+        is_deleted = (await self.session.execute(stmt)).scalar_one_or_none()
+        return is_deleted is False
+
+    def _window_query(
+        self, user_id: int, limit: int, token_budget: int | None, image_turns: int | None = None
+    ) -> Select[Any]:
+        """
+        Запрос окна истории: последние limit сообщений, помещающиеся в token_budget.
+
+        Сумма токенов считается оконной функцией от новых к старым; последнее
+        сообщение попадает в окно всегда. Сообщение с описанным изображением старше
+        image_turns ходов пользователя учитывается по described_token_count.
+        """
+        # id различает сообщения с одинаковым created_at (одна транзакция)
+        newest_first = (Message.created_at.desc(), Message.id.desc())
+        active = (Message.user_id == user_id, Message.is_deleted == False)  # noqa: E712
+        stmt = select(Message).where(*active).order_by(*newest_first).limit(limit)
+        if token_budget is not None:
+            # Стоимость зависит от возраста сообщения (оконная функция): сумма - уровнем выше
+            costs = (
+                select(
+                    Message.id,
+                    Message.created_at,
+                    self._token_cost(newest_first, image_turns).label("tokens"),
+                )
+                .where(*active)
+                .subquery()
+            )
+            costs_newest_first = (costs.c.created_at.desc(), costs.c.id.desc())
+            window = select(
+                costs.c.id,
+                func.sum(costs.c.tokens).over(order_by=costs_newest_first).label("tokens"),
+                func.row_number().over(order_by=costs_newest_first).label("position"),
+            ).subquery()
+            stmt = stmt.join(window, window.c.id == Message.id).where(
+                or_(window.c.tokens <= token_budget, window.c.position == 1)
+            )
+        return stmt
+
+    @staticmethod
+    def _token_cost(
+        newest_first: tuple[ColumnElement[Any], ...], image_turns: int | None
+    ) -> SQLColumnExpression[int]:
+        """Токены сообщения в окне: с описанием вместо изображения, если оно заменяется."""
+        if image_turns is None:
+            return Message.token_count
+        is_user = case((Message.role == "user", 1), else_=0)
+        # Сообщений пользователя новее текущего (возраст в ходах, как в get_history)
+        user_turns = func.sum(is_user).over(order_by=newest_first) - is_user
+        return case(
+            (
+                and_(Message.described_token_count.is_not(None), user_turns >= image_turns),
+                Message.described_token_count,
+            ),
+            else_=Message.token_count,
+        )
+
     async def clear_history(self, user_id: int) -> None:
         """
         Soft delete всех сообщений пользователя.
@@ -124,7 +327,7 @@ class MessageRepository:
 
         result = await self.session.execute(stmt)
         rows_affected = result.rowcount  # type: ignore[attr-defined]
-        await self.session.commit()
+        await self._commit()
 
         logger.info(f"Soft deleted {rows_affected} messages for user {user_id}")
 
@@ -154,6 +357,195 @@ class MessageRepository:
         return len(str(content))
 
 
+class SummaryRepository:
+    """
+    Репозиторий сжатого содержания диалогов (conversation_summaries).
+
+    Одна запись на пользователя: summary обновляется по мере выхода
+    сообщений за окно истории и удаляется вместе с историей (/reset).
+    """
+
+    def __init__(self, session: AsyncSession, auto_commit: bool = True) -> None:
+        """
+        Инициализация репозитория.
+
+        Args:
+            session: Async сессия SQLAlchemy
+            auto_commit: Коммитить после каждой записи (False - только flush,
+                commit выполняет unit of work)
+        """
+        self.session = session
+        self.auto_commit = auto_commit
+
+    async def _commit(self) -> None:
+        """Commit (или flush внутри unit of work)."""
+        if self.auto_commit:
+            await self.session.commit()
+        else:
+            await self.session.flush()
+
+    async def get_summary(self, user_id: int) -> ConversationSummary | None:
+        """
+        Получить summary пользователя.
+
+        Args:
+            user_id: ID пользователя
+
+        Returns:
+            ConversationSummary или None, если диалог еще не сжимался
+        """
+        return await self.session.get(ConversationSummary, user_id)
+
+    async def save_summary(
+        self, user_id: int, summary: str, summarized_until_id: int
+    ) -> ConversationSummary:
+        """
+        Создать или обновить summary пользователя.
+
+        Args:
+            user_id: ID пользователя
+            summary: Текст summary
+            summarized_until_id: id последнего учтенного сообщения
+
+        Returns:
+            Сохраненный ConversationSummary
+        """
+        record = await self.get_summary(user_id)
+        if record is None:
+            record = ConversationSummary(user_id=user_id)
+            self.session.add(record)
+        record.summary = summary
+        record.summarized_until_id = summarized_until_id
+        record.token_count = estimate_tokens(summary)
+        await self._commit()
+
+        logger.debug(
+            f"Saved summary for user {user_id}: until message {summarized_until_id}, "
+            f"{record.token_count} tokens"
+        )
+        return record
+
+    async def delete_summary(self, user_id: int) -> None:
+        """
+        Удалить summary пользователя.
+
+        Args:
+            user_id: ID пользователя
+        """
+        await self.session.execute(
+            delete(ConversationSummary).where(ConversationSummary.user_id == user_id)
+        )
+        await self._commit()
+
+
+class FAQRepository:
+    """
+    Репозиторий пар вопрос-ответ FAQ (faq_entries).
+
+    Кандидаты создаются неодобренными; администратор одобряет или удаляет их.
+    """
+
+    def __init__(self, session: AsyncSession, auto_commit: bool = True) -> None:
+        """
+        Инициализация репозитория.
+
+        Args:
+            session: Async сессия SQLAlchemy
+            auto_commit: Коммитить после каждой записи (False - только flush,
+                commit выполняет unit of work)
+        """
+        self.session = session
+        self.auto_commit = auto_commit
+
+    async def _commit(self) -> None:
+        """Commit (или flush внутри unit of work)."""
+        if self.auto_commit:
+            await self.session.commit()
+        else:
+            await self.session.flush()
+
+    async def add_entry(self, question: str, answer: str, approved: bool = False) -> FAQEntry:
+        """
+        Добавить пару вопрос-ответ.
+
+        Args:
+            question: Вопрос
+            answer: Ответ
+            approved: Сразу одобрить (запись добавляет администратор)
+
+        Returns:
+            Созданный FAQEntry
+        """
+        entry = FAQEntry(
+            question=question,
+            answer=answer,
+            is_approved=approved,
+            approved_at=datetime.now() if approved else None,
+        )
+        self.session.add(entry)
+        await self._commit()
+        await self.session.refresh(entry)
+        logger.debug(f"Added FAQ entry {entry.id} (approved={approved})")
+        return entry
+
+    async def has_question(self, question: str) -> bool:
+        """Есть ли запись (одобренная или кандидат) с таким же вопросом."""
+        stmt = select(FAQEntry.id).where(FAQEntry.question == question).limit(1)
+        return (await self.session.execute(stmt)).scalar_one_or_none() is not None
+
+    async def get_entries(self, approved: bool | None = None) -> list[FAQEntry]:
+        """
+        Получить записи FAQ (новые первыми).
+
+        Args:
+            approved: True - одобренные, False - кандидаты, None - все
+
+        Returns:
+            Список FAQEntry
+        """
+        stmt = select(FAQEntry).order_by(FAQEntry.id.desc())
+        if approved is not None:
+            stmt = stmt.where(FAQEntry.is_approved == approved)
+        return list((await self.session.execute(stmt)).scalars().all())
+
+    async def approve(self, entry_id: int) -> FAQEntry | None:
+        """
+        Одобрить запись.
+
+        Args:
+            entry_id: ID записи
+
+        Returns:
+            Одобренный FAQEntry или None, если записи нет
+        """
+        entry = await self.session.get(FAQEntry, entry_id)
+        if entry is None:
+            return None
+        if not entry.is_approved:
+            entry.is_approved = True
+            entry.approved_at = datetime.now()
+            await self._commit()
+        logger.info(f"Approved FAQ entry {entry_id}")
+        return entry
+
+    async def delete_entry(self, entry_id: int) -> bool:
+        """
+        Удалить запись (отклонить кандидата или убрать ответ из FAQ).
+
+        Args:
+            entry_id: ID записи
+
+        Returns:
+            True, если запись удалена
+        """
+        result = await self.session.execute(delete(FAQEntry).where(FAQEntry.id == entry_id))
+        await self._commit()
+        deleted: bool = result.rowcount > 0  # type: ignore[attr-defined]
+        if deleted:
+            logger.info(f"Deleted FAQ entry {entry_id}")
+        return deleted
+
+
 class UserRepository:
     """
     Репозиторий для работы с пользователями.
@@ -165,14 +557,24 @@ class UserRepository:
     - Получения статистики
     """
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(self, session: AsyncSession, auto_commit: bool = True) -> None:
         """
         Инициализация репозитория.
 
         Args:
             session: Async сессия SQLAlchemy
+            auto_commit: Коммитить после каждой записи (False - только flush,
+                commit выполняет unit of work)
         """
         self.session = session
+        self.auto_commit = auto_commit
+
+    async def _commit(self) -> None:
+        """Commit (или flush внутри unit of work)."""
+        if self.auto_commit:
+            await self.session.commit()
+        else:
+            await self.session.flush()
 
     async def get_or_create_user(
         self,
@@ -212,7 +614,7 @@ class UserRepository:
                 language_code=language_code,
             )
             self.session.add(user)
-            await self.session.commit()
+            await self._commit()
             await self.session.refresh(user)
             logger.info(f"Created new user: telegram_id={telegram_id}, username={username}")
         else:
@@ -236,7 +638,7 @@ class UserRepository:
             updated = True
 
             if updated:
-                await self.session.commit()
+                await self._commit()
                 await self.session.refresh(user)
                 logger.debug(f"Updated user data for telegram_id={telegram_id}")
 
@@ -265,7 +667,7 @@ class UserRepository:
         """
         stmt = update(User).where(User.telegram_id == telegram_id).values(last_seen=datetime.now())
         await self.session.execute(stmt)
-        await self.session.commit()
+        await self._commit()
         logger.debug(f"Updated last_seen for telegram_id={telegram_id}")
 
     async def get_active_users_count(self) -> int:
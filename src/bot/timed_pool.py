@@ -0,0 +1,60 @@
+"""
+Пул соединений SQLAlchemy с метриками ожидания checkout.
+
+TimedQueuePool - AsyncAdaptedQueuePool (пул по умолчанию для async engine),
+который замеряет время получения соединения из пула: ожидание свободного
+соединения или создание нового (overflow). Метрики показывают, хватает ли
+DB_POOL_SIZE / DB_MAX_OVERFLOW под нагрузку.
+"""
+
+import time
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool с подсчетом checkout и времени ожидания.
+
+    Использование:
+        engine = create_async_engine(url, poolclass=TimedQueuePool)
+        engine.pool.get_wait_stats()
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:  # noqa: ANN401
+        super().__init__(*args, **kwargs)
+        self._checkouts = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        """Получить соединение из пула с замером времени ожидания."""
+        started_at = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except exc.TimeoutError:
+            self._timeouts += 1
+            raise
+        wait = time.perf_counter() - started_at
+        self._checkouts += 1
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+        return entry
+
+    def get_wait_stats(self) -> dict[str, float | int]:
+        """
+        Метрики получения соединений.
+
+        Returns:
+            Количество checkout и таймаутов, среднее и максимальное ожидание (мс)
+        """
+        checkouts = self._checkouts or 1
+        return {
+            "checkouts": self._checkouts,
+            "timeouts": self._timeouts,
+            "avg_wait_ms": round(self._total_wait / checkouts * 1000, 3),
+            "max_wait_ms": round(self._max_wait * 1000, 3),
+        }
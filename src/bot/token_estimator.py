@@ -0,0 +1,60 @@
+"""
+Локальная оценка количества токенов сообщения без обращения к LLM.
+
+Токенизатор у каждой модели свой, поэтому точный подсчет невозможен без
+ее API. Для окна истории достаточно оценки сверху: латиница в среднем
+дает ~4 символа на токен, кириллица и другие не-ASCII символы - ~2.
+Изображение оценивается по стоимости в vision токенах: фото Telegram
+(до 1280 px по большей стороне) стоит у Claude и GPT-4o до ~1600 токенов.
+"""
+
+import math
+from typing import Any
+
+# Символов на токен для ASCII и остальных символов (кириллица токенизируется хуже)
+ASCII_CHARS_PER_TOKEN = 4.0
+OTHER_CHARS_PER_TOKEN = 2.0
+# Служебные токены сообщения (роль, разделители)
+MESSAGE_OVERHEAD_TOKENS = 4
+# Стоимость изображения в vision токенах (фото до 1280x1280 после масштабирования моделью)
+IMAGE_TOKENS = 1600
+
+
+def estimate_text_tokens(text: str) -> int:
+    """
+    Оценка токенов текста.
+
+    Args:
+        text: Текст
+
+    Returns:
+        Оценка количества токенов (с запасом)
+    """
+    ascii_chars = sum(1 for char in text if char.isascii())
+    other_chars = len(text) - ascii_chars
+    return math.ceil(ascii_chars / ASCII_CHARS_PER_TOKEN + other_chars / OTHER_CHARS_PER_TOKEN)
+
+
+def estimate_tokens(content: dict[str, Any] | str | list[dict[str, Any]]) -> int:
+    """
+    Оценка токенов сообщения вместе со служебными токенами.
+
+    Args:
+        content: Текст, {"text": "..."} или мультимодальный контент
+            [{"type": "text", ...}, {"type": "image_url", ...}]
+
+    Returns:
+        Оценка количества токенов сообщения
+    """
+    if isinstance(content, str):
+        tokens = estimate_text_tokens(content)
+    elif isinstance(content, dict):
+        tokens = estimate_text_tokens(str(content.get("text", content)))
+    else:
+        tokens = 0
+        for part in content:
+            if part.get("type") == "image_url":
+                tokens += IMAGE_TOKENS
+            else:
+                tokens += estimate_text_tokens(str(part.get("text", "")))
+    return tokens + MESSAGE_OVERHEAD_TOKENS
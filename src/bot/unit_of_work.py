@@ -0,0 +1,76 @@
+"""
+Unit of Work: одна сессия БД и одна транзакция на логическую операцию.
+
+unit_of_work открывает сессию и делает ее текущей (ContextVar) для всего
+async контекста: вложенные unit_of_work (DialogueManager, ChatService, UserRepository
+через вызывающий код) переиспользуют эту же сессию вместо новой сессии из пула.
+Commit выполняется один раз при выходе из внешнего unit_of_work, rollback - при ошибке.
+
+Перед долгим внешним вызовом (LLM, распознавание речи) вызывающий код делает
+release_connection: транзакция фиксируется и соединение возвращается в пул, а не
+простаивает десятки секунд. Следующая операция с БД берет соединение заново.
+
+Использование:
+    async with unit_of_work(session_factory) as session:
+        repository = MessageRepository(session, auto_commit=False)
+        await repository.add_message(user_id, "user", "Hello")
+"""
+
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+_current_session: ContextVar[AsyncSession | None] = ContextVar("current_session", default=None)
+
+
+def current_session() -> AsyncSession | None:
+    """Текущая сессия unit of work (None, если unit of work не открыт)."""
+    return _current_session.get()
+
+
+async def release_connection() -> None:
+    """
+    Зафиксировать текущий unit of work и вернуть соединение в пул.
+
+    Сессия остается текущей: следующие операции открывают новую транзакцию,
+    ее фиксирует выход из внешнего unit_of_work. Без unit of work ничего не делает.
+    """
+    session = _current_session.get()
+    if session is not None:
+        await session.commit()
+
+
+@asynccontextmanager
+async def unit_of_work(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> AsyncIterator[AsyncSession]:
+    """
+    Открыть unit of work или присоединиться к текущему.
+
+    Args:
+        session_factory: Фабрика сессий (используется, если unit of work еще не открыт)
+
+    Yields:
+        Сессия текущего unit of work
+    """
+    session = _current_session.get()
+    if session is not None:
+        # Вложенный unit of work: commit/rollback выполнит внешний
+        yield session
+        return
+
+    async with session_factory() as session:
+        token = _current_session.set(session)
+        try:
+            yield session
+            await session.commit()
+        except BaseException:
+            await session.rollback()
+            raise
+        finally:
+            _current_session.reset(token)
@@ -0,0 +1,82 @@
+"""
+Aiogram middleware: последовательная обработка updates одного пользователя.
+
+Aiogram обрабатывает updates конкурентно, и два быстрых сообщения пользователя
+иначе выполнялись бы параллельно: оба добавляли бы сообщение в историю и
+отправляли в LLM перемешанный контекст. Middleware регистрируется до
+DatabaseSessionMiddleware, поэтому ожидающий update не держит сессию БД.
+
+/reset (и, если включено, любое новое сообщение) отменяет выполняющуюся
+обработку пользователя до ожидания блокировки: запрос к LLM прерывается, и старый
+ответ не попадает в очищенную историю. Сообщение пользователя к этому моменту
+уже зафиксировано (MessageHandler сохраняет его до запроса к LLM): следующий
+ответ учитывает его в контексте, а /reset очищает вместе с историей.
+"""
+
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update, User
+
+from .user_lock_registry import UserLockRegistry
+
+
+def get_cancel_reason(text: str | None, cancel_on_message: bool) -> str | None:
+    """
+    Причина отмены выполняющейся обработки пользователя новым сообщением.
+
+    Args:
+        text: Текст нового сообщения (None для фото, голосовых и других updates)
+        cancel_on_message: Отменять ли обработку любым новым сообщением
+
+    Returns:
+        "reset", "superseded" или None, если отменять не нужно
+    """
+    # Команда может быть с именем бота: /reset@HomeGuruBot
+    command = text.split(maxsplit=1)[0].split("@")[0] if text else None
+    if command == "/reset":
+        return "reset"
+    if cancel_on_message:
+        return "superseded"
+    return None
+
+
+class UserLockMiddleware(BaseMiddleware):
+    """
+    Middleware с блокировкой пользователя на время обработки update.
+
+    Использование:
+        dp.update.outer_middleware(UserLockMiddleware(UserLockRegistry()))
+    """
+
+    def __init__(self, registry: UserLockRegistry, cancel_on_message: bool = False) -> None:
+        """
+        Инициализация middleware.
+
+        Args:
+            registry: Реестр блокировок пользователей
+            cancel_on_message: Отменять выполняющуюся обработку любым новым сообщением
+                (/reset отменяет всегда)
+        """
+        self.registry = registry
+        self.cancel_on_message = cancel_on_message
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:  # noqa: ANN401
+        """Вызвать обработчик под блокировкой отправителя update."""
+        # event_from_user заполняет встроенный UserContextMiddleware aiogram
+        user: User | None = data.get("event_from_user")
+        if user is None:
+            return await handler(event, data)
+
+        if isinstance(event, Update) and event.message is not None:
+            reason = get_cancel_reason(event.message.text, self.cancel_on_message)
+            if reason is not None:
+                self.registry.cancel(user.id, reason)
+
+        return await self.registry.run(user.id, handler(event, data))
@@ -0,0 +1,136 @@
+"""
+Реестр блокировок пользователей.
+
+Сообщения одного пользователя обрабатываются строго по очереди (в порядке
+поступления, asyncio.Lock - FIFO), разных пользователей - параллельно.
+Блокировка удаляется, как только у пользователя не остается обрабатываемых и
+ожидающих сообщений, поэтому реестр не растет с числом пользователей.
+
+Выполняющуюся под блокировкой обработку (run) можно отменить: /reset или новое
+сообщение не ждут ответа LLM, который уже не нужен пользователю.
+"""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Awaitable
+from contextlib import asynccontextmanager
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class UserLockRegistry:
+    """
+    Блокировки по user_id с удалением неиспользуемых.
+
+    Использование:
+        registry = UserLockRegistry()
+        async with registry.lock(user_id):
+            ...  # один обработчик на пользователя
+    """
+
+    def __init__(self) -> None:
+        """Инициализация пустого реестра."""
+        self._locks: dict[int, asyncio.Lock] = {}
+        # Количество обработчиков пользователя: выполняющийся + ожидающие
+        self._holders: dict[int, int] = {}
+        self._max_waiting = 0
+        # Выполняющаяся обработка пользователя (для отмены) и счетчик отмен по причинам
+        self._running: dict[int, asyncio.Future[Any]] = {}
+        self._cancelled: dict[str, int] = {}
+
+    @asynccontextmanager
+    async def lock(self, user_id: int) -> AsyncIterator[None]:
+        """
+        Захватить блокировку пользователя на время обработки.
+
+        Args:
+            user_id: ID пользователя
+        """
+        user_lock = self._locks.get(user_id)
+        if user_lock is None:
+            user_lock = asyncio.Lock()
+            self._locks[user_id] = user_lock
+        self._holders[user_id] = self._holders.get(user_id, 0) + 1
+        waiting = self._holders[user_id] - 1
+        if waiting:
+            self._max_waiting = max(self._max_waiting, waiting)
+            logger.debug(f"User {user_id} has {waiting} messages waiting")
+
+        try:
+            async with user_lock:
+                yield
+        finally:
+            self._holders[user_id] -= 1
+            if self._holders[user_id] == 0:
+                # Сборка мусора: у пользователя больше нет сообщений в обработке
+                del self._holders[user_id]
+                del self._locks[user_id]
+
+    async def run(self, user_id: int, work: Awaitable[T]) -> T | None:
+        """
+        Выполнить обработку под блокировкой пользователя с возможностью отмены.
+
+        Args:
+            user_id: ID пользователя
+            work: Обработка (update, ход диалога)
+
+        Returns:
+            Результат обработки или None, если она отменена через cancel
+        """
+        async with self.lock(user_id):
+            task = asyncio.ensure_future(work)
+            self._running[user_id] = task
+            try:
+                return await task
+            except asyncio.CancelledError:
+                current = asyncio.current_task()
+                if not task.cancelled() or (current is not None and current.cancelling()):
+                    # Отменена сама вызывающая задача (остановка бота) - пробрасываем
+                    raise
+                return None
+            finally:
+                del self._running[user_id]
+
+    def cancel(self, user_id: int, reason: str) -> bool:
+        """
+        Отменить выполняющуюся обработку пользователя.
+
+        Ожидающие блокировку обработки не отменяются.
+
+        Args:
+            user_id: ID пользователя
+            reason: Причина для статистики ("reset", "superseded")
+
+        Returns:
+            True, если обработка была отменена
+        """
+        task = self._running.get(user_id)
+        if task is None or task.done():
+            return False
+
+        task.cancel()
+        self._cancelled[reason] = self._cancelled.get(reason, 0) + 1
+        logger.info(f"Cancelled in-flight processing of user {user_id} ({reason})")
+        return True
+
+    def get_stats(self) -> dict[str, int]:
+        """
+        Статистика реестра.
+
+        Returns:
+            Количество пользователей с сообщениями в обработке, ожидающих сообщений,
+            максимальная длина очереди одного пользователя и количество отмен
+            (всего и по причинам: cancelled_reset, cancelled_superseded)
+        """
+        stats = {
+            "active_users": len(self._locks),
+            "waiting": sum(holders - 1 for holders in self._holders.values()),
+            "max_waiting": self._max_waiting,
+            "cancelled": sum(self._cancelled.values()),
+        }
+        for reason, count in self._cancelled.items():
+            stats[f"cancelled_{reason}"] = count
+        return stats
@@ -0,0 +1,180 @@
+"""
+Webhook сервер для приема updates от Telegram.
+
+Встроенный aiohttp сервер проверяет секретный токен (заголовок
+X-Telegram-Bot-Api-Secret-Token, задается при setWebhook) и распределяет updates
+по worker процессам через consistent hashing по chat id: все updates одного чата
+попадают в один worker, поэтому порядок сообщений пользователя сохраняется.
+"""
+
+import hmac
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from aiohttp import web
+
+from .hash_ring import ConsistentHashRing
+
+logger = logging.getLogger(__name__)
+
+SECRET_TOKEN_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+# Поля update, содержащие объект с chat (Message, ChatMemberUpdated, ChatJoinRequest)
+_CHAT_FIELDS = (
+    "message",
+    "edited_message",
+    "channel_post",
+    "edited_channel_post",
+    "business_message",
+    "edited_business_message",
+    "my_chat_member",
+    "chat_member",
+    "chat_join_request",
+)
+
+
+def get_route_key(update: dict[str, Any]) -> str:
+    """
+    Получить ключ маршрутизации update: chat id, иначе id отправителя, иначе update_id.
+
+    Args:
+        update: Update от Telegram (JSON)
+
+    Returns:
+        Ключ для consistent hashing
+    """
+    for field in _CHAT_FIELDS:
+        payload = update.get(field)
+        if isinstance(payload, dict) and isinstance(payload.get("chat"), dict):
+            return str(payload["chat"]["id"])
+
+    callback_query = update.get("callback_query")
+    if isinstance(callback_query, dict):
+        message = callback_query.get("message")
+        if isinstance(message, dict) and isinstance(message.get("chat"), dict):
+            return str(message["chat"]["id"])
+
+    # inline_query, poll_answer и т.п.: маршрутизируем по пользователю
+    for payload in update.values():
+        if isinstance(payload, dict):
+            sender = payload.get("from") or payload.get("user")
+            if isinstance(sender, dict) and "id" in sender:
+                return str(sender["id"])
+
+    return str(update.get("update_id", ""))
+
+
+class WebhookServer:
+    """
+    aiohttp сервер webhook: проверка секрета и маршрутизация updates по worker.
+
+    Использование:
+        server = WebhookServer(secret, dispatch, ["worker-0", "worker-1"])
+        await server.start("0.0.0.0", 8080)
+    """
+
+    def __init__(
+        self,
+        secret_token: str,
+        dispatch: Callable[[str, dict[str, Any]], None],
+        workers: list[str],
+        path: str = "/webhook",
+    ) -> None:
+        """
+        Инициализация сервера.
+
+        Args:
+            secret_token: Секретный токен, переданный в setWebhook
+            dispatch: Функция передачи update выбранному worker (имя worker, update)
+            workers: Имена worker процессов
+            path: Путь webhook endpoint
+        """
+        if not secret_token:
+            raise ValueError("secret_token is required for webhook mode")
+        self.secret_token = secret_token
+        self.dispatch = dispatch
+        self.path = path
+        self.ring = ConsistentHashRing(workers)
+        self._runner: web.AppRunner | None = None
+        self._received = 0
+        self._rejected = 0
+        self._routed: dict[str, int] = dict.fromkeys(workers, 0)
+
+    def create_app(self) -> web.Application:
+        """
+        Создать aiohttp приложение с webhook и health endpoints.
+
+        Returns:
+            aiohttp Application
+        """
+        app = web.Application()
+        app.router.add_post(self.path, self.handle_update)
+        app.router.add_get("/health", self.handle_health)
+        return app
+
+    async def handle_update(self, request: web.Request) -> web.Response:
+        """Принять update, проверить секрет и передать worker."""
+        token = request.headers.get(SECRET_TOKEN_HEADER, "")
+        if not hmac.compare_digest(token.encode(), self.secret_token.encode()):
+            self._rejected += 1
+            logger.warning(f"Rejected webhook request with invalid secret from {request.remote}")
+            return web.Response(status=401)
+
+        try:
+            update = await request.json()
+        except ValueError:
+            return web.Response(status=400, text="Invalid JSON")
+        if not isinstance(update, dict):
+            return web.Response(status=400, text="Update must be a JSON object")
+
+        worker = self.ring.get_node(get_route_key(update))
+        self.dispatch(worker, update)
+        self._received += 1
+        self._routed[worker] += 1
+        logger.debug(f"Update {update.get('update_id')} routed to {worker}")
+        # Telegram повторяет доставку при статусе != 200, поэтому отвечаем сразу
+        return web.Response(status=200)
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        """Статистика приема updates."""
+        return web.json_response(self.get_stats())
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Статистика сервера.
+
+        Returns:
+            Количество принятых и отклоненных updates, распределение по worker
+        """
+        return {
+            "received": self._received,
+            "rejected": self._rejected,
+            "routed": dict(self._routed),
+        }
+
+    async def start(self, host: str, port: int) -> int:
+        """
+        Запустить сервер.
+
+        Args:
+            host: Адрес для прослушивания
+            port: Порт (0 - выбрать свободный)
+
+        Returns:
+            Фактический порт сервера
+        """
+        self._runner = web.AppRunner(self.create_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        actual_port = int(self._runner.addresses[0][1])
+        logger.info(f"Webhook server listening on {host}:{actual_port}{self.path}")
+        return actual_port
+
+    async def stop(self) -> None:
+        """Остановить сервер."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+            logger.info("Webhook server stopped")
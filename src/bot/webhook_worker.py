@@ -0,0 +1,143 @@
+"""
+Worker процесс для обработки updates в webhook режиме.
+
+Webhook сервер передает каждому worker updates его чатов через очередь
+multiprocessing. Worker обрабатывает разные чаты конкурентно, а updates одного
+чата - строго по очереди, в порядке поступления.
+"""
+
+import asyncio
+import logging
+import signal
+from multiprocessing.queues import Queue
+from typing import Any
+
+from .bot import TelegramBot
+from .user_lock_middleware import get_cancel_reason
+from .webhook_server import get_route_key
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookWorker:
+    """
+    Обработчик updates с сохранением порядка внутри чата.
+
+    Использование:
+        worker = WebhookWorker(telegram_bot)
+        await worker.run(queue)  # до получения None
+    """
+
+    def __init__(self, telegram_bot: TelegramBot) -> None:
+        """
+        Инициализация worker.
+
+        Args:
+            telegram_bot: Бот, которому передаются updates
+        """
+        self.telegram_bot = telegram_bot
+        # Последняя задача каждого чата: следующий update чата ждет ее завершения
+        self._chat_tails: dict[str, asyncio.Task[None]] = {}
+        self._pending: set[asyncio.Task[None]] = set()
+
+    def submit(self, update: dict[str, Any]) -> asyncio.Task[None]:
+        """
+        Поставить update в обработку после предыдущих updates того же чата.
+
+        Args:
+            update: Update от Telegram (JSON)
+
+        Returns:
+            Задача обработки update
+        """
+        self._cancel_in_flight(update)
+        key = get_route_key(update)
+        previous = self._chat_tails.get(key)
+        task = asyncio.create_task(self._process(update, previous))
+        self._chat_tails[key] = task
+        self._pending.add(task)
+        task.add_done_callback(lambda done: self._forget(key, done))
+        return task
+
+    def _cancel_in_flight(self, update: dict[str, Any]) -> None:
+        """
+        Отменить обработку предыдущего update пользователя, которую заменяет новый.
+
+        Update ставится в очередь чата и дошел бы до UserLockMiddleware только после
+        предыдущего, поэтому /reset отменяет выполняющуюся обработку уже здесь.
+        """
+        message = update.get("message")
+        if message is None or "from" not in message:
+            return
+        reason = get_cancel_reason(message.get("text"), self.telegram_bot.cancel_on_message)
+        if reason is not None:
+            self.telegram_bot.user_locks.cancel(message["from"]["id"], reason)
+
+    def _forget(self, key: str, task: asyncio.Task[None]) -> None:
+        """Удалить завершенную задачу (чат без новых updates не хранится)."""
+        self._pending.discard(task)
+        if self._chat_tails.get(key) is task:
+            del self._chat_tails[key]
+
+    async def _process(self, update: dict[str, Any], previous: asyncio.Task[None] | None) -> None:
+        """Дождаться предыдущего update чата и обработать текущий."""
+        if previous is not None:
+            await asyncio.wait([previous])
+        try:
+            await self.telegram_bot.feed_update(update)
+        except Exception as e:
+            logger.error(f"Error processing update {update.get('update_id')}: {e}", exc_info=True)
+
+    async def drain(self) -> None:
+        """Дождаться обработки всех принятых updates."""
+        while self._pending:
+            await asyncio.wait(list(self._pending))
+
+    async def run(self, queue: "Queue[dict[str, Any] | None]") -> None:
+        """
+        Читать updates из очереди до получения None, затем дождаться обработки.
+
+        Args:
+            queue: Очередь updates от webhook сервера
+        """
+        while True:
+            update = await asyncio.to_thread(queue.get)
+            if update is None:
+                break
+            self.submit(update)
+        await self.drain()
+
+
+def run_worker_process(name: str, queue: "Queue[dict[str, Any] | None]") -> None:
+    """
+    Точка входа worker процесса: собрать бота и обрабатывать updates из очереди.
+
+    Args:
+        name: Имя worker (для логов)
+        queue: Очередь updates от webhook сервера
+    """
+    # Остановкой управляет webhook сервер (None в очереди): Ctrl+C не прерывает обработку
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(_run_worker(name, queue))
+
+
+async def _run_worker(name: str, queue: "Queue[dict[str, Any] | None]") -> None:
+    """Собрать бота из Config и обработать updates из очереди."""
+    # Импорт здесь: main импортирует этот модуль для запуска worker процессов
+    from .config import Config
+    from .database import dispose_engines
+    from .main import create_telegram_bot, setup_logging
+
+    setup_logging()
+    config = Config()
+    telegram_bot = await create_telegram_bot(config)
+    await telegram_bot.dp.emit_startup(bot=telegram_bot.bot)
+    logging.info(f"Webhook worker {name} started")
+
+    try:
+        await WebhookWorker(telegram_bot).run(queue)
+    finally:
+        await telegram_bot.dp.emit_shutdown(bot=telegram_bot.bot)
+        await telegram_bot.bot.session.close()
+        await dispose_engines()
+        logging.info(f"Webhook worker {name} stopped. Load stats: {telegram_bot.get_stats()}")
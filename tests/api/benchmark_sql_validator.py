@@ -0,0 +1,82 @@
+"""
+Бенчмарк SQLValidator против прежней regex-валидации.
+
+Запуск:
+    uv run python -m tests.api.benchmark_sql_validator
+
+Сравнивает время проверки для короткого и длинного запроса:
+- regex: прежний ChatService._validate_sql (дюжина regex по SQL в верхнем регистре)
+- ast (cold): разбор sqlglot и проверка без кэшей
+- ast (cached): повторная проверка того же SQL (результат берется из кэша)
+"""
+
+import re
+import timeit
+
+from src.api.sql_validator import SQLValidator, _parse_sql
+
+_LEGACY_FORBIDDEN_PATTERNS = [
+    r"\bINSERT\b",
+    r"\bUPDATE\b",
+    r"\bDELETE\b(?!\s+FROM)",
+    r"\bDROP\b",
+    r"\bALTER\b",
+    r"\bTRUNCATE\b",
+    r"\bCREATE\b",
+    r"\bGRANT\b",
+    r"\bREVOKE\b",
+    r"\bEXEC(?:UTE)?\b",
+    r"\b--",
+    r"/\*",
+]
+
+SHORT_SQL = "SELECT COUNT(*) AS total_users FROM users WHERE is_active = true"
+
+LONG_SQL = (
+    "WITH daily AS (SELECT DATE_TRUNC('day', m.created_at) AS day, u.user_type, "
+    "COUNT(m.id) AS message_count, AVG(m.char_length) AS avg_length "
+    "FROM messages m JOIN users u ON m.user_id = u.id "
+    "WHERE m.is_deleted = false AND m.created_at >= NOW() - INTERVAL '30 days' "
+    "GROUP BY day, u.user_type) "
+    "SELECT day, user_type, message_count, ROUND(avg_length::numeric, 2) AS avg_length, "
+    "SUM(message_count) OVER (PARTITION BY user_type ORDER BY day) AS running_total "
+    "FROM daily "
+    + " ".join(f"UNION ALL SELECT day, user_type, {i}, 0, 0 FROM daily" for i in range(40))
+)
+
+
+def legacy_validate(sql: str) -> bool:
+    """Прежняя regex-валидация из ChatService._validate_sql."""
+    sql_upper = sql.upper().strip()
+    if not sql_upper.startswith("SELECT"):
+        return False
+    return not any(re.search(pattern, sql_upper) for pattern in _LEGACY_FORBIDDEN_PATTERNS)
+
+
+def ast_validate_cold(validator: SQLValidator, sql: str) -> str:
+    """AST-валидация без кэша разбора и кэша результатов."""
+    _parse_sql.cache_clear()
+    validator._validated.clear()
+    return validator.validate(sql)
+
+
+def run(number: int = 200) -> None:
+    """Запустить бенчмарк и вывести среднее время одной проверки в микросекундах."""
+    validator = SQLValidator()
+
+    for label, sql in (("short", SHORT_SQL), ("long", LONG_SQL)):
+        validator.validate(sql)  # прогрев кэша для cached-варианта
+        timings = {
+            "regex": timeit.timeit(lambda sql=sql: legacy_validate(sql), number=number),
+            "ast (cold)": timeit.timeit(
+                lambda sql=sql: ast_validate_cold(validator, sql), number=number
+            ),
+            "ast (cached)": timeit.timeit(lambda sql=sql: validator.validate(sql), number=number),
+        }
+        print(f"{label} query ({len(sql)} chars):")
+        for name, total in timings.items():
+            print(f"  {name:<13} {total / number * 1_000_000:10.1f} us/query")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,112 @@
+"""
+Тесты для AnswerRenderer.
+
+Проверяем форматирование скалярных и табличных результатов по шаблонам,
+выбор языка и отказ от форматирования (None) для сложных результатов и анализа.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from src.api.answer_renderer import AnswerRenderer
+from src.bot.models import UserType
+
+
+@pytest.fixture
+def renderer() -> AnswerRenderer:
+    """AnswerRenderer с настройками по умолчанию."""
+    return AnswerRenderer()
+
+
+class TestRender:
+    """Тесты для форматирования результатов."""
+
+    def test_scalar_ru(self, renderer):
+        """Тестируем скаляр с подписью известной колонки на русском."""
+        assert renderer.render("Сколько пользователей?", [{"total_users": 42}]) == (
+            "Всего пользователей: 42"
+        )
+
+    def test_scalar_en(self, renderer):
+        """Тестируем выбор английских шаблонов для вопроса без кириллицы."""
+        assert renderer.render("How many users?", [{"count": 42}]) == "Count: 42"
+
+    def test_unknown_column_uses_column_name(self, renderer):
+        """Тестируем что для неизвестной колонки используется ее имя."""
+        assert renderer.render("Средняя длина?", [{"avg_len": Decimal("12.50")}]) == (
+            "avg_len: 12.5"
+        )
+
+    def test_empty_result(self, renderer):
+        """Тестируем ответ для пустого результата."""
+        assert renderer.render("Сколько сообщений вчера?", []) == (
+            "По вашему запросу данных не найдено."
+        )
+
+    def test_small_table(self, renderer):
+        """Тестируем форматирование короткой таблицы построчно."""
+        results = [
+            {"username": "alice", "user_type": UserType.telegram, "message_count": 10},
+            {"username": None, "user_type": UserType.web, "message_count": 3},
+        ]
+
+        answer = renderer.render("Топ пользователей", results)
+
+        assert answer == (
+            "Найдено записей: 2\n"
+            "\n"
+            "1. Пользователь: alice, Тип: telegram, Количество сообщений: 10\n"
+            "2. Пользователь: —, Тип: web, Количество сообщений: 3"
+        )
+
+    def test_datetime_formatting(self, renderer):
+        """Тестируем формат дат: без времени для начала дня."""
+        results = [
+            {"day": datetime(2025, 10, 17), "message_count": 5},
+            {"day": datetime(2025, 10, 16, 14, 30), "message_count": 7},
+        ]
+
+        answer = renderer.render("Messages per day", results)
+
+        assert answer is not None
+        assert "1. Day: 2025-10-17, Messages: 5" in answer
+        assert "2. Day: 2025-10-16 14:30, Messages: 7" in answer
+
+
+class TestFallbackToLLM:
+    """Тесты для случаев, когда ответ должен формулировать LLM."""
+
+    @pytest.mark.parametrize(
+        "question",
+        [
+            "Проанализируй активность пользователей",
+            "Почему упало количество сообщений?",
+            "Сравни активность за две недели",
+            "Explain the message trend",
+        ],
+    )
+    def test_analysis_request(self, renderer, question):
+        """Тестируем что вопросы с просьбой об анализе уходят в LLM."""
+        assert renderer.render(question, [{"count": 42}]) is None
+
+    def test_too_many_rows(self, renderer):
+        """Тестируем что длинные таблицы уходят в LLM."""
+        results = [{"id": i} for i in range(11)]
+        assert renderer.render("Список пользователей", results) is None
+
+    def test_too_many_columns(self, renderer):
+        """Тестируем что широкие таблицы уходят в LLM."""
+        results = [{f"col{i}": i for i in range(6)}]
+        assert renderer.render("Данные пользователя", results) is None
+
+    def test_nested_values(self, renderer):
+        """Тестируем что вложенные значения (JSONB) уходят в LLM."""
+        results = [{"content": {"text": "hi"}}]
+        assert renderer.render("Содержимое сообщения", results) is None
+
+    def test_custom_limits(self):
+        """Тестируем настраиваемые пределы размера таблицы."""
+        renderer = AnswerRenderer(max_rows=1)
+        assert renderer.render("Список", [{"id": 1}, {"id": 2}]) is None
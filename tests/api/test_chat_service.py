@@ -10,13 +10,15 @@ from unittest.mock import AsyncMock, MagicMock, Mock, patch
 import pytest
 
 from src.api.chat_service import ChatService
+from src.bot.llm_limiter import PRIORITY_ANALYTICS
+from src.bot.unit_of_work import unit_of_work
 
 
 @pytest.fixture
 def mock_llm_client():
     """Mock LLM client."""
     mock = Mock()
-    mock.get_response = Mock(return_value="Test LLM response")
+    mock.get_response = AsyncMock(return_value="Test LLM response")
     mock.model = "test-model"
     mock.client = Mock()
     mock.client.api_key = "test-key"
@@ -92,6 +94,25 @@ class TestNormalMode:
         # Проверяем что история была запрошена
         mock_dialogue_manager.get_history.assert_called_once_with(user_id)
 
+    @pytest.mark.asyncio
+    async def test_request_session_released_before_llm(self, chat_service, mock_llm_client):
+        """Тестируем что транзакция запроса фиксируется до ожидания ответа LLM."""
+        session = AsyncMock()
+        context = AsyncMock()
+        context.__aenter__.return_value = session
+        context.__aexit__.return_value = False
+
+        async def get_response(*args, **kwargs):
+            session.commit.assert_awaited_once()
+            return "Test LLM response"
+
+        mock_llm_client.get_response.side_effect = get_response
+
+        async with unit_of_work(MagicMock(return_value=context)):
+            await chat_service.process_message("Hello", "normal", 123)
+
+        assert session.commit.await_count == 2
+
 
 class TestAdminMode:
     """Тесты для админ режима."""
@@ -113,13 +134,59 @@ class TestAdminMode:
                     message, "admin", user_id
                 )
 
-                # Проверяем что SQL был выполнен
-                mock_execute.assert_called_once_with(sql_query)
+                # Проверяем что выполнен проверенный SQL с автоматически добавленным LIMIT
+                mock_execute.assert_called_once_with(f"{sql_query} LIMIT 100")
 
-                # Проверяем что SQL запрос возвращается
-                assert returned_sql == sql_query
+                # Проверяем что возвращается именно выполненный SQL запрос
+                assert returned_sql == f"{sql_query} LIMIT 100"
                 assert response is not None
 
+    @pytest.mark.asyncio
+    async def test_admin_mode_template_fast_path(self, chat_service, mock_llm_client):
+        """Тестируем что типовой вопрос обрабатывается по шаблону без text2sql LLM."""
+        message = "Сколько сообщений за неделю?"
+
+        with (
+            patch.object(chat_service, "_text_to_sql") as mock_text_to_sql,
+            patch.object(
+                chat_service, "_execute_sql_query", return_value=[{"message_count": 42}]
+            ) as mock_execute,
+        ):
+            _, returned_sql = await chat_service.process_message(message, "admin", 789)
+
+        mock_text_to_sql.assert_not_called()
+        mock_execute.assert_called_once_with(returned_sql)
+        assert "INTERVAL '7 DAYS'" in returned_sql
+
+    @pytest.mark.asyncio
+    async def test_admin_mode_scalar_result_without_llm(self, chat_service, mock_llm_client):
+        """Тестируем что скалярный результат форматируется без второго запроса к LLM."""
+        with patch.object(chat_service, "_execute_sql_query", return_value=[{"message_count": 42}]):
+            response, _ = await chat_service.process_message(
+                "Сколько сообщений за неделю?", "admin", 789
+            )
+
+        assert response == "Количество сообщений: 42"
+        mock_llm_client.get_response.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_admin_mode_analysis_request_uses_llm(self, chat_service, mock_llm_client):
+        """Тестируем что при просьбе проанализировать данные ответ формулирует LLM."""
+        sql_query = "SELECT COUNT(*) AS message_count FROM messages"
+
+        with patch.object(chat_service, "_text_to_sql", return_value=sql_query):
+            with patch.object(
+                chat_service, "_execute_sql_query", return_value=[{"message_count": 42}]
+            ):
+                response, _ = await chat_service.process_message(
+                    "Проанализируй активность пользователей", "admin", 789
+                )
+
+        assert response == "Test LLM response"
+        mock_llm_client.get_response.assert_called_once()
+        # Аналитика админа идет к LLM после интерактивного чата
+        assert mock_llm_client.get_response.call_args.kwargs["priority"] == PRIORITY_ANALYTICS
+
     @pytest.mark.asyncio
     async def test_admin_mode_invalid_sql(self, chat_service):
         """Тестируем обработку невалидного SQL (не SELECT)."""
@@ -153,54 +220,17 @@ class TestAdminMode:
         user_id = 222
         sql_query = "SELECT * FROM nonexistent_table"
 
-        with patch.object(chat_service, "_text_to_sql", return_value=sql_query):
-            with patch.object(
+        with (
+            patch.object(chat_service, "_text_to_sql", return_value=sql_query),
+            patch.object(
                 chat_service, "_execute_sql_query", side_effect=Exception("Table not found")
-            ):
-                response, returned_sql = await chat_service.process_message(
-                    message, "admin", user_id
-                )
-
-                # Проверяем что возвращается ошибка
-                assert "Ошибка" in response
-                assert "Table not found" in response or "SQL" in response
-
-
-class TestSQLValidation:
-    """Тесты для валидации SQL запросов."""
-
-    def test_validate_select_query(self, chat_service):
-        """Тестируем что SELECT запросы проходят валидацию."""
-        valid_sql = "SELECT * FROM users WHERE is_active = true"
-        assert chat_service._validate_sql(valid_sql) is True
-
-    def test_validate_select_with_join(self, chat_service):
-        """Тестируем что сложные SELECT с JOIN проходят валидацию."""
-        valid_sql = "SELECT u.username, COUNT(m.id) FROM users u JOIN messages m ON u.telegram_id = m.user_id GROUP BY u.username"
-        assert chat_service._validate_sql(valid_sql) is True
-
-    @pytest.mark.parametrize(
-        "dangerous_sql",
-        [
-            "DELETE FROM users",
-            "UPDATE users SET is_active = false",
-            "DROP TABLE messages",
-            "INSERT INTO users VALUES (1, 'hacker')",
-            "ALTER TABLE users ADD COLUMN hacked boolean",
-            "TRUNCATE TABLE messages",
-            "CREATE TABLE malicious (id INT)",
-            "GRANT ALL ON users TO hacker",
-            "REVOKE SELECT ON messages FROM public",
-        ],
-    )
-    def test_reject_dangerous_queries(self, chat_service, dangerous_sql):
-        """Тестируем что опасные запросы отклоняются."""
-        assert chat_service._validate_sql(dangerous_sql) is False
+            ),
+        ):
+            response, returned_sql = await chat_service.process_message(message, "admin", user_id)
 
-    def test_reject_non_select_query(self, chat_service):
-        """Тестируем что не-SELECT запросы отклоняются."""
-        invalid_sql = "SHOW TABLES"
-        assert chat_service._validate_sql(invalid_sql) is False
+            # Проверяем что возвращается ошибка
+            assert "Ошибка" in response
+            assert "Table not found" in response or "SQL" in response
 
 
 class TestSQLCleaning:
@@ -225,6 +255,34 @@ class TestSQLCleaning:
         assert cleaned == "SELECT * FROM users"
 
 
+class TestText2SQL:
+    """Тесты для генерации SQL через LLM."""
+
+    @pytest.mark.asyncio
+    async def test_text2sql_client_is_reused(
+        self, mock_llm_client, mock_dialogue_manager, mock_session_factory, text2sql_prompt
+    ):
+        """Тестируем что text2sql клиент переиспользуется между запросами."""
+        text2sql_client = Mock()
+        text2sql_client.get_response = AsyncMock(return_value="```sql\nSELECT 1\n```")
+        service = ChatService(
+            mock_llm_client,
+            mock_dialogue_manager,
+            mock_session_factory,
+            text2sql_prompt,
+            text2sql_client=text2sql_client,
+        )
+
+        assert await service._text_to_sql("Вопрос 1") == "SELECT 1"
+        assert await service._text_to_sql("Вопрос 2") == "SELECT 1"
+        assert service._get_text2sql_client() is text2sql_client
+        assert text2sql_client.get_response.call_count == 2
+
+    def test_prompt_fingerprint(self, chat_service):
+        """Тестируем что отпечаток text2sql prompt вычисляется при создании сервиса."""
+        assert len(chat_service.text2sql_prompt_fingerprint) == 16
+
+
 class TestSQLResultsFormatting:
     """Тесты для форматирования результатов SQL."""
 
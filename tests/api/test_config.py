@@ -76,22 +76,18 @@ def test_create_collector_mock(mock_env_mock):
     assert isinstance(collector, MockStatCollector)
 
 
-@patch("src.bot.database.create_engine")
-@patch("src.bot.database.create_session_factory")
-def test_create_collector_real(mock_session_factory, mock_create_engine, mock_env_real):
-    """Тест создания RealStatCollector."""
+@patch("src.bot.database.get_session_factory")
+def test_create_collector_real(mock_get_session_factory, mock_env_real):
+    """Тест создания RealStatCollector на общем engine из реестра."""
     # Мокаем database setup
-    mock_engine = MagicMock()
-    mock_create_engine.return_value = mock_engine
     mock_factory = MagicMock()
-    mock_session_factory.return_value = mock_factory
+    mock_get_session_factory.return_value = mock_factory
 
     config = APIConfig()
     collector = create_collector(config)
 
     assert isinstance(collector, RealStatCollector)
-    mock_create_engine.assert_called_once()
-    mock_session_factory.assert_called_once_with(mock_engine)
+    mock_get_session_factory.assert_called_once_with(config.database_url)
 
 
 def test_get_config_singleton():
@@ -0,0 +1,86 @@
+"""
+Тесты для IntentMatcher.
+
+Проверяем распознавание типовых admin вопросов, извлечение параметров (N, период)
+и то, что нераспознанные вопросы уходят в text2sql.
+"""
+
+import pytest
+
+from src.api.intent_matcher import IntentMatcher
+from src.api.sql_validator import SQLValidator
+
+
+@pytest.fixture
+def matcher() -> IntentMatcher:
+    """IntentMatcher с валидатором по умолчанию."""
+    return IntentMatcher(SQLValidator())
+
+
+@pytest.mark.parametrize(
+    ("question", "intent"),
+    [
+        ("Сколько всего пользователей?", "users_total"),
+        ("Сколько новых пользователей за последние 3 дня?", "users_new"),
+        ("Сколько активных пользователей за неделю", "users_active"),
+        ("Сколько сообщений?", "messages_total"),
+        ("Сколько сообщений было отправлено за последнюю неделю?", "messages_period"),
+        ("Статистика сообщений по дням за последний месяц", "messages_per_day"),
+        ("Топ-5 пользователей по количеству сообщений", "top_users"),
+        ("Кто самый активный пользователь?", "top_user"),
+        ("Покажи последние 10 сообщений", "recent_messages"),
+    ],
+)
+def test_match_intents(matcher, question, intent):
+    """Тестируем распознавание типовых вопросов."""
+    result = matcher.match(question)
+
+    assert result is not None
+    assert result[0] == intent
+
+
+def test_extracts_period(matcher):
+    """Тестируем извлечение периода в днях."""
+    _, sql = matcher.match("Сколько новых пользователей за последние 3 дня?")
+    assert "INTERVAL '3 days'" in sql
+
+    _, sql = matcher.match("Статистика сообщений по дням за последний месяц")
+    assert "INTERVAL '30 days'" in sql
+
+
+def test_extracts_top_n(matcher):
+    """Тестируем извлечение N и его ограничение сверху."""
+    _, sql = matcher.match("Покажи топ 10 самых активных пользователей за месяц")
+    assert sql.endswith("LIMIT 10")
+    assert "INTERVAL '30 days'" in sql
+
+    _, sql = matcher.match("Топ-5000 пользователей")
+    assert sql.endswith("LIMIT 100")
+
+
+def test_top_users_without_period_has_no_date_filter(matcher):
+    """Тестируем что без периода топ считается за все время."""
+    _, sql = matcher.match("Топ-5 пользователей")
+    assert "INTERVAL" not in sql
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "Сколько пользователей из telegram?",
+        "Почему упала активность на прошлой неделе?",
+        "Сравни количество сообщений за эту и прошлую неделю",
+        "Привет",
+    ],
+)
+def test_unmatched_questions(matcher, question):
+    """Тестируем что вопросы с дополнительными условиями не распознаются."""
+    assert matcher.match(question) is None
+
+
+def test_templates_pass_validation(matcher):
+    """Тестируем что SQL по шаблонам проходит SQLValidator."""
+    validator = SQLValidator()
+    for question in ("Топ-3 пользователей за 2 недели", "Последние 5 сообщений"):
+        _, sql = matcher.match(question)
+        validator.validate(sql)
@@ -0,0 +1,134 @@
+"""
+Тесты для PasswordHasher.
+
+Проверяем хеширование в пуле потоков, ограничение параллелизма и очереди,
+метрики и перехеширование при изменении BCRYPT_ROUNDS.
+"""
+
+import asyncio
+from collections.abc import Iterator
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.api import auth_service
+from src.api.password_hasher import HasherOverloadedError, PasswordHasher, hash_password_sync
+from src.bot.models import User, UserRole, UserType
+
+
+@pytest.fixture
+def hasher() -> Iterator[PasswordHasher]:
+    """PasswordHasher с минимальным cost factor для быстрых тестов."""
+    hasher = PasswordHasher(rounds=4, max_workers=1, max_queue=10)
+    yield hasher
+    hasher.shutdown()
+
+
+class TestHashing:
+    """Тесты для хеширования и проверки паролей."""
+
+    @pytest.mark.asyncio
+    async def test_hash_and_verify(self, hasher):
+        """Тестируем что хеш проверяется правильным паролем и не проверяется неверным."""
+        password_hash = await hasher.hash("secret-password")
+
+        assert password_hash.startswith("$2b$04$")
+        assert await hasher.verify("secret-password", password_hash) is True
+        assert await hasher.verify("wrong-password", password_hash) is False
+
+    @pytest.mark.asyncio
+    async def test_verify_invalid_hash(self, hasher):
+        """Тестируем что некорректный хеш не вызывает исключение."""
+        assert await hasher.verify("secret-password", "not-a-hash") is False
+
+    def test_needs_rehash(self, hasher):
+        """Тестируем определение cost factor по хешу."""
+        assert hasher.needs_rehash(hash_password_sync("secret", 4)) is False
+        assert hasher.needs_rehash(hash_password_sync("secret", 5)) is True
+        assert hasher.needs_rehash("not-a-hash") is False
+
+    def test_invalid_rounds(self):
+        """Тестируем ошибку для недопустимого cost factor."""
+        with pytest.raises(ValueError, match="rounds"):
+            PasswordHasher(rounds=3)
+
+
+class TestConcurrency:
+    """Тесты для ограничения параллелизма и метрик."""
+
+    @pytest.mark.asyncio
+    async def test_queue_metrics(self, hasher):
+        """Тестируем что сверх max_workers запросы ждут в очереди и учитываются в метриках."""
+        await asyncio.gather(*(hasher.hash(f"password-{i}") for i in range(3)))
+
+        stats = hasher.get_stats()
+        assert stats["completed"] == 3
+        assert stats["max_waiting"] == 2
+        assert stats["in_flight"] == 0
+        assert stats["waiting"] == 0
+
+    @pytest.mark.asyncio
+    async def test_queue_full(self):
+        """Тестируем отказ при переполненной очереди."""
+        hasher = PasswordHasher(rounds=4, max_workers=1, max_queue=0)
+        try:
+            results = await asyncio.gather(
+                hasher.hash("first"), hasher.hash("second"), return_exceptions=True
+            )
+        finally:
+            hasher.shutdown()
+
+        assert isinstance(results[0], str)
+        assert isinstance(results[1], HasherOverloadedError)
+        assert hasher.get_stats()["rejected"] == 1
+
+
+def test_hasher_works_after_shutdown():
+    """Тестируем что после shutdown (конец lifespan) хеширование работает в новом event loop."""
+    hasher = PasswordHasher(rounds=4, max_workers=1)
+
+    async def hash_concurrently() -> list[str]:
+        # Больше запросов, чем потоков: семафор ожидает и привязывается к loop
+        return await asyncio.gather(hasher.hash("secret-password"), hasher.hash("other"))
+
+    try:
+        first_hash, _ = asyncio.run(hash_concurrently())
+        hasher.shutdown()
+        second_hash, _ = asyncio.run(hash_concurrently())
+    finally:
+        hasher.shutdown()
+
+    assert first_hash.startswith("$2b$04$")
+    assert second_hash.startswith("$2b$04$")
+
+
+class TestRehashOnLogin:
+    """Тесты для перехеширования пароля при логине."""
+
+    @pytest.mark.asyncio
+    async def test_rehash_when_rounds_changed(self, monkeypatch):
+        """Тестируем что хеш со старым cost factor заменяется при успешном логине."""
+        new_hasher = PasswordHasher(rounds=5)
+        monkeypatch.setattr(auth_service, "password_hasher", new_hasher)
+        user = User(
+            user_type=UserType.web,
+            username="alice",
+            password_hash=hash_password_sync("secret-password", 4),
+            role=UserRole.user,
+            is_active=True,
+        )
+        result = Mock()
+        result.scalar_one_or_none.return_value = user
+        session = AsyncMock()
+        session.execute.return_value = result
+
+        try:
+            authenticated = await auth_service.authenticate_web_user(
+                "alice", "secret-password", session
+            )
+        finally:
+            new_hasher.shutdown()
+
+        assert authenticated is user
+        assert user.password_hash.startswith("$2b$05$")
+        session.commit.assert_awaited_once()
@@ -0,0 +1,72 @@
+"""
+Тесты для сборки text2sql prompt со схемой из моделей.
+
+Проверяем что описание схемы содержит типы, enum значения, FK и индексы,
+что prompt собирается детерминированно и что шаблон из репозитория корректен.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from src.api.schema_prompt import compile_text2sql_prompt, describe_schema, prompt_fingerprint
+from src.bot.models import Base
+
+TEMPLATE_PATH = Path(__file__).parents[2] / "src" / "api" / "text2sql_prompt.txt"
+
+
+class TestDescribeSchema:
+    """Тесты для описания схемы."""
+
+    def test_all_tables_described(self):
+        """Тестируем что описаны все таблицы из Base.metadata."""
+        schema = describe_schema()
+        for table_name in Base.metadata.tables:
+            assert f"Таблица {table_name}:" in schema
+
+    def test_column_types_and_enums(self):
+        """Тестируем типы колонок и значения enum."""
+        schema = describe_schema()
+        assert "- user_type ENUM('telegram', 'web') NOT NULL" in schema
+        assert "- role ENUM('user', 'administrator')" in schema
+        assert "- created_at TIMESTAMPTZ NOT NULL" in schema
+        assert "- content JSONB NOT NULL" in schema
+
+    def test_keys_and_indexes(self):
+        """Тестируем PK, FK и индексы."""
+        schema = describe_schema()
+        assert "- id INTEGER PK" in schema
+        assert "- user_id BIGINT FK→users.id NOT NULL" in schema
+        assert "- UNIQUE INDEX ix_users_telegram_id (telegram_id)" in schema
+        assert "- INDEX ix_messages_user_id_created_at (user_id, created_at)" in schema
+
+    def test_column_doc_included(self):
+        """Тестируем что doc колонки попадает в описание."""
+        assert "-- Флаг soft delete" in describe_schema()
+
+    def test_password_hash_excluded(self):
+        """Тестируем что hash пароля не попадает в prompt."""
+        assert "password_hash" not in describe_schema()
+
+
+class TestCompilePrompt:
+    """Тесты для сборки prompt."""
+
+    def test_repository_template(self):
+        """Тестируем что шаблон из репозитория собирается со схемой."""
+        prompt = compile_text2sql_prompt(TEMPLATE_PATH.read_text(encoding="utf-8"))
+        assert "{schema}" not in prompt
+        assert "Таблица messages:" in prompt
+
+    def test_deterministic(self):
+        """Тестируем что prompt и отпечаток стабильны между сборками."""
+        first = compile_text2sql_prompt("Схема:\n{schema}")
+        second = compile_text2sql_prompt("Схема:\n{schema}")
+        assert first == second
+        assert prompt_fingerprint(first) == prompt_fingerprint(second)
+        assert len(prompt_fingerprint(first)) == 16
+
+    def test_missing_placeholder(self):
+        """Тестируем ошибку для шаблона без плейсхолдера."""
+        with pytest.raises(ValueError, match="placeholder"):
+            compile_text2sql_prompt("Без схемы")
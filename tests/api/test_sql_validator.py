@@ -0,0 +1,138 @@
+"""
+Тесты для SQLValidator.
+
+Проверяем AST-валидацию: только SELECT/WITH, allowlist таблиц и функций,
+автоматическое добавление LIMIT и кэширование разбора.
+"""
+
+import pytest
+
+from src.api.sql_validator import SQLValidator, _parse_sql
+
+
+@pytest.fixture
+def validator() -> SQLValidator:
+    """SQLValidator с настройками по умолчанию."""
+    return SQLValidator()
+
+
+class TestAllowedQueries:
+    """Тесты для разрешенных запросов."""
+
+    def test_select_gets_default_limit(self, validator):
+        """Тестируем что к запросу без LIMIT добавляется LIMIT по умолчанию."""
+        assert validator.validate("SELECT id FROM users") == "SELECT id FROM users LIMIT 100"
+
+    def test_existing_limit_is_kept(self, validator):
+        """Тестируем что существующий LIMIT не меняется."""
+        sql = validator.validate("SELECT id FROM users ORDER BY id DESC LIMIT 5")
+        assert sql.endswith("LIMIT 5")
+        assert "LIMIT 100" not in sql
+
+    def test_cte_names_are_allowed(self, validator):
+        """Тестируем что WITH ... SELECT с обращением к CTE проходит проверку."""
+        sql = validator.validate(
+            "WITH active AS (SELECT id FROM users WHERE is_active = true) "
+            "SELECT COUNT(*) FROM active"
+        )
+        assert sql.startswith("WITH active AS")
+
+    def test_typical_analytics_query(self, validator):
+        """Тестируем типичный запрос из text2sql prompt."""
+        sql = validator.validate(
+            "SELECT DATE_TRUNC('day', created_at) AS day, COUNT(*) AS message_count "
+            "FROM messages WHERE is_deleted = false AND created_at >= NOW() - INTERVAL '30 days' "
+            "GROUP BY day ORDER BY day DESC"
+        )
+        assert "DATE_TRUNC" in sql
+        assert sql.endswith("LIMIT 100")
+
+    def test_select_with_join(self, validator):
+        """Тестируем что SELECT с JOIN и GROUP BY проходит проверку."""
+        sql = validator.validate(
+            "SELECT u.username, COUNT(m.id) FROM users u "
+            "JOIN messages m ON u.telegram_id = m.user_id GROUP BY u.username"
+        )
+        assert "JOIN" in sql
+
+    def test_comment_marker_inside_string_literal(self, validator):
+        """Тестируем что '--' внутри строкового литерала не считается комментарием."""
+        sql = validator.validate("SELECT COUNT(*) FROM messages WHERE content->>'text' LIKE '%--%'")
+        assert "'%--%'" in sql
+
+    def test_star_and_count_star_without_hidden_columns(self, validator):
+        """Тестируем что SELECT * без скрытых колонок и COUNT(*) разрешены."""
+        assert validator.validate("SELECT * FROM messages").startswith("SELECT *")
+        assert validator.validate("SELECT COUNT(*) FROM users").startswith("SELECT COUNT(*)")
+
+    def test_comments_are_stripped(self, validator):
+        """Тестируем что комментарии не попадают в выполняемый SQL."""
+        sql = validator.validate("SELECT id FROM users -- trailing comment")
+        assert "comment" not in sql
+
+    def test_custom_default_limit(self):
+        """Тестируем настраиваемый LIMIT по умолчанию."""
+        validator = SQLValidator(default_limit=10)
+        assert validator.validate("SELECT id FROM users").endswith("LIMIT 10")
+
+
+class TestRejectedQueries:
+    """Тесты для отклоняемых запросов."""
+
+    @pytest.mark.parametrize(
+        "sql",
+        [
+            "SELECT * INTO stolen FROM users",
+            "SELECT * FROM users FOR UPDATE",
+            "WITH d AS (DELETE FROM users RETURNING *) SELECT * FROM d",
+            "SELECT 1; DROP TABLE users",
+            "SELECT pg_sleep(10)",
+            "SELECT set_config('role', 'postgres', false)",
+            "SELECT * FROM pg_catalog.pg_user",
+            "SELECT * FROM alembic_version",
+            "DELETE FROM users",
+            "UPDATE users SET is_active = false",
+            "DROP TABLE messages",
+            "INSERT INTO users VALUES (1, 'hacker')",
+            "ALTER TABLE users ADD COLUMN hacked boolean",
+            "TRUNCATE TABLE messages",
+            "CREATE TABLE malicious (id INT)",
+            "GRANT ALL ON users TO hacker",
+            "REVOKE SELECT ON messages FROM public",
+            "SHOW TABLES",
+            "SELECT password_hash FROM users",
+            "SELECT u.password_hash FROM users u",
+            "SELECT COUNT(*) FROM users WHERE password_hash IS NOT NULL",
+            "WITH u AS (SELECT password_hash AS p FROM users) SELECT p FROM u",
+            "SELECT * FROM users",
+            "SELECT u.* FROM users u",
+            "SELECT m.id, u.* FROM messages m JOIN users u ON u.id = m.user_id",
+            "SELECT * FROM (SELECT * FROM users) AS t",
+            "SELECT u FROM users u",
+            "",
+        ],
+    )
+    def test_reject(self, validator, sql):
+        """Тестируем что опасные и неразрешенные запросы отклоняются."""
+        with pytest.raises(ValueError):
+            validator.validate(sql)
+
+    def test_custom_table_allowlist(self):
+        """Тестируем ограничение allowlist таблиц."""
+        validator = SQLValidator(allowed_tables=frozenset({"messages"}))
+        with pytest.raises(ValueError, match="users"):
+            validator.validate("SELECT id FROM users")
+
+
+def test_parse_is_cached(validator):
+    """Тестируем что AST кэшируется по строке SQL и не мутирует при добавлении LIMIT."""
+    sql = "SELECT username FROM users WHERE id = 42"
+    _parse_sql.cache_clear()
+
+    first = validator.validate(sql)
+    second = validator.validate(sql)
+
+    assert first == second
+    assert _parse_sql.cache_info().misses == 1
+    # Кэшированное дерево остается без LIMIT
+    assert _parse_sql(sql)[0].args.get("limit") is None
@@ -0,0 +1,139 @@
+"""
+Тесты для WebUserCache и кэширования в get_current_web_user.
+
+Проверяем TTL и LRU вытеснение, кэш payload токенов, инвалидацию при смене
+роли/деактивации и отсутствие запросов к БД при повторной аутентификации.
+"""
+
+import time
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from fastapi.security import HTTPAuthorizationCredentials
+
+from src.api import middleware
+from src.api.auth_service import create_session_token
+from src.api.user_cache import WebUserCache
+from src.bot.models import User, UserRole, UserType
+
+
+def make_user(user_id: int = 1, role: UserRole = UserRole.administrator) -> User:
+    """Создать веб-пользователя с заданным id."""
+    return User(id=user_id, user_type=UserType.web, username="alice", role=role, is_active=True)
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    """Очищаем глобальный кэш middleware между тестами."""
+    middleware.user_cache.clear()
+    yield
+    middleware.user_cache.clear()
+
+
+class TestWebUserCache:
+    """Тесты для WebUserCache."""
+
+    def test_user_roundtrip(self):
+        """Тестируем сохранение и получение пользователя."""
+        cache = WebUserCache()
+        user = make_user()
+
+        cache.set_user(user)
+
+        assert cache.get_user(1) is user
+        assert cache.get_user(2) is None
+        assert cache.get_stats()["hits"] == 1
+        assert cache.get_stats()["misses"] == 1
+
+    def test_ttl_expiration(self):
+        """Тестируем что запись истекает по TTL."""
+        cache = WebUserCache(ttl_seconds=0.01)
+        cache.set_user(make_user())
+
+        time.sleep(0.02)
+
+        assert cache.get_user(1) is None
+        assert cache.get_stats()["users"] == 0
+
+    def test_lru_eviction(self):
+        """Тестируем вытеснение самой давно использованной записи."""
+        cache = WebUserCache(max_size=2)
+        cache.set_user(make_user(1))
+        cache.set_user(make_user(2))
+        cache.get_user(1)
+
+        cache.set_user(make_user(3))
+
+        assert cache.get_user(1) is not None
+        assert cache.get_user(2) is None
+        assert cache.get_user(3) is not None
+
+    def test_token_payload_not_cached_past_exp(self):
+        """Тестируем что payload не живет в кэше дольше срока действия токена."""
+        cache = WebUserCache(ttl_seconds=60)
+
+        cache.set_token_payload("token", {"user_id": 1, "exp": int(time.time()) - 1})
+
+        assert cache.get_token_payload("token") is None
+
+    def test_invalidate_on_role_change(self):
+        """Тестируем инвалидацию при смене роли через ORM атрибут."""
+        cache = middleware.user_cache
+        user = make_user()
+        cache.set_user(user)
+
+        user.role = UserRole.user
+
+        assert cache.get_user(1) is None
+
+    def test_invalidate_on_deactivation(self):
+        """Тестируем инвалидацию при деактивации пользователя."""
+        cache = middleware.user_cache
+        user = make_user()
+        cache.set_user(user)
+
+        user.is_active = False
+
+        assert cache.get_user(1) is None
+
+
+class TestCurrentWebUser:
+    """Тесты для get_current_web_user с кэшем."""
+
+    @pytest.mark.asyncio
+    async def test_second_request_skips_database(self):
+        """Тестируем что повторный запрос с тем же токеном не обращается к БД."""
+        user = make_user(42)
+        token, _ = create_session_token(user)
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+        result = Mock()
+        result.scalar_one_or_none.return_value = user
+        session = AsyncMock()
+        session.execute.return_value = result
+        session.expunge = Mock()
+
+        first = await middleware.get_current_web_user(credentials, session)
+        second = await middleware.get_current_web_user(credentials, session)
+
+        assert first is user
+        assert second is user
+        session.execute.assert_awaited_once()
+        session.expunge.assert_called_once_with(user)
+
+    @pytest.mark.asyncio
+    async def test_role_change_reloads_user(self):
+        """Тестируем что после смены роли пользователь загружается из БД заново."""
+        user = make_user(42)
+        token, _ = create_session_token(user)
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+        result = Mock()
+        result.scalar_one_or_none.return_value = user
+        session = AsyncMock()
+        session.execute.return_value = result
+        session.expunge = Mock()
+
+        await middleware.get_current_web_user(credentials, session)
+        user.role = UserRole.user
+        await middleware.get_current_web_user(credentials, session)
+
+        assert session.execute.await_count == 2
@@ -139,6 +139,7 @@ def mock_bot_token() -> str:
 def mock_media_provider() -> MediaProvider:
     """Создает мокированный MediaProvider"""
     mock = AsyncMock(spec=MediaProvider)
+    mock.is_ready = True
     mock.download_photo.return_value = b"fake_image_bytes"
     mock.photo_to_base64.return_value = "fake_base64_string"
     mock.download_audio.return_value = b"fake_audio_bytes"
@@ -0,0 +1,88 @@
+"""Тесты для AdmissionController."""
+
+import asyncio
+
+import pytest
+
+from src.bot.admission_controller import AdmissionController
+
+
+async def _work(admission: AdmissionController, delay: float, results: list[bool]) -> None:
+    admitted = await admission.acquire()
+    results.append(admitted)
+    if admitted:
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            admission.release()
+
+
+@pytest.mark.asyncio
+async def test_limits_concurrency() -> None:
+    """Тест что одновременно выполняется не больше max_concurrency обработок"""
+    admission = AdmissionController(max_concurrency=2, max_queue=10, queue_timeout=1)
+    peak = 0
+
+    async def work() -> None:
+        nonlocal peak
+        assert await admission.acquire()
+        try:
+            peak = max(peak, admission.get_stats()["in_flight"])
+            await asyncio.sleep(0.01)
+        finally:
+            admission.release()
+
+    await asyncio.gather(*(work() for _ in range(6)))
+
+    assert peak == 2
+    stats = admission.get_stats()
+    assert stats["admitted"] == 6
+    assert stats["in_flight"] == 0
+    assert stats["max_waiting"] == 4
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_full() -> None:
+    """Тест что при заполненной очереди обработка отклоняется сразу"""
+    admission = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout=1)
+    results: list[bool] = []
+
+    await asyncio.gather(*(_work(admission, 0.05, results) for _ in range(3)))
+
+    assert sorted(results) == [False, True, True]
+    assert admission.get_stats()["rejected_queue_full"] == 1
+
+
+@pytest.mark.asyncio
+async def test_rejects_after_queue_timeout() -> None:
+    """Тест что обработка отклоняется, если место не освободилось за queue_timeout"""
+    admission = AdmissionController(max_concurrency=1, max_queue=10, queue_timeout=0.02)
+    results: list[bool] = []
+
+    await asyncio.gather(_work(admission, 0.2, results), _work(admission, 0, results))
+
+    assert results == [True, False]
+    stats = admission.get_stats()
+    assert stats["rejected_timeout"] == 1
+    assert stats["waiting"] == 0
+
+
+@pytest.mark.asyncio
+async def test_place_released_for_next() -> None:
+    """Тест что после release место получает следующая обработка"""
+    admission = AdmissionController(max_concurrency=1, max_queue=0, queue_timeout=1)
+
+    assert await admission.acquire()
+    admission.release()
+
+    assert await admission.acquire()
+    admission.release()
+    assert admission.get_stats()["admitted"] == 2
+
+
+def test_invalid_parameters() -> None:
+    """Тест валидации параметров"""
+    with pytest.raises(ValueError, match="max_concurrency"):
+        AdmissionController(max_concurrency=0)
+    with pytest.raises(ValueError, match="max_queue"):
+        AdmissionController(max_queue=-1)
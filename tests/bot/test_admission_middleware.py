@@ -0,0 +1,80 @@
+"""
+Тесты для AdmissionMiddleware.
+
+Ответ о перегрузке отправляется через FakeTelegram (Bot API сервер в тесте).
+"""
+
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+
+import pytest
+from aiogram import Bot, Dispatcher
+from aiogram.types import Message
+
+from src.bot.admission_controller import AdmissionController
+from src.bot.admission_middleware import BUSY_MESSAGE, AdmissionMiddleware
+from src.bot.bot import create_aiogram_bot
+from src.bot.fake_telegram import FakeTelegram
+
+
+@pytest.fixture
+async def fake_telegram() -> AsyncIterator[tuple[FakeTelegram, Bot]]:
+    """FakeTelegram и бот, отправляющий в него ответы."""
+    fake = FakeTelegram("", secret_token="secret")
+    api_url = await fake.start()
+    bot = create_aiogram_bot("123456:TEST", api_url)
+    yield fake, bot
+    await bot.session.close()
+    await fake.stop()
+
+
+def _dispatcher(admission: AdmissionController, handled: list[str]) -> Dispatcher:
+    dp = Dispatcher()
+    dp.update.outer_middleware(AdmissionMiddleware(admission))
+
+    @dp.message()
+    async def handler(message: Message) -> None:
+        await asyncio.sleep(0.05)
+        handled.append(str(message.text))
+
+    return dp
+
+
+@pytest.mark.asyncio
+async def test_busy_reply_when_overloaded(fake_telegram) -> None:
+    """Тест что при перегрузке пользователь сразу получает ответ о занятости"""
+    fake, bot = fake_telegram
+    admission = AdmissionController(max_concurrency=1, max_queue=0, queue_timeout=1)
+    handled: list[str] = []
+    dp = _dispatcher(admission, handled)
+    updates: list[dict[str, Any]] = [
+        fake.make_message_update(1, "first"),
+        fake.make_message_update(2, "second"),
+    ]
+
+    await asyncio.gather(*(dp.feed_raw_update(bot, update) for update in updates))
+
+    assert handled == ["first"]
+    messages = await fake.wait_for_messages(1)
+    assert messages[0]["text"] == BUSY_MESSAGE
+    assert messages[0]["chat"]["id"] == 2
+    assert admission.get_stats()["rejected_queue_full"] == 1
+
+
+@pytest.mark.asyncio
+async def test_queued_update_processed(fake_telegram) -> None:
+    """Тест что update из очереди обрабатывается после освобождения места"""
+    fake, bot = fake_telegram
+    admission = AdmissionController(max_concurrency=1, max_queue=5, queue_timeout=1)
+    handled: list[str] = []
+    dp = _dispatcher(admission, handled)
+
+    await asyncio.gather(
+        dp.feed_raw_update(bot, fake.make_message_update(1, "first")),
+        dp.feed_raw_update(bot, fake.make_message_update(2, "second")),
+    )
+
+    assert handled == ["first", "second"]
+    assert fake.sent_messages == []
+    assert admission.get_stats()["in_flight"] == 0
@@ -99,6 +99,59 @@ async def test_handle_message_error(telegram_bot, mock_llm_client, mock_message)
     assert "ошибка" in args[0].lower()
 
 
+@pytest.mark.asyncio
+async def test_handle_message_debounced(
+    telegram_bot, test_users_mapping, dialogue_manager, mock_llm_client, mock_message
+) -> None:
+    """Тест что быстрые сообщения подряд дают один вызов LLM и один ответ"""
+    import asyncio
+
+    telegram_bot.message_handler.debounce_ms = 20
+
+    mock_message.text = "Привет"
+    await telegram_bot.handle_message(mock_message)
+    mock_message.text = "Как обустроить кухню?"
+    await telegram_bot.handle_message(mock_message)
+    await asyncio.sleep(0.1)
+
+    mock_llm_client.get_response.assert_called_once()
+    history = await dialogue_manager.get_history(test_users_mapping[12345])
+    assert history[0]["content"] == "Привет\nКак обустроить кухню?"
+    assert mock_message.answer.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_superseded_turn_keeps_user_message(
+    telegram_bot, test_users_mapping, dialogue_manager, mock_llm_client, mock_message
+) -> None:
+    """Тест что отмененный новым сообщением ход оставляет сообщение пользователя в истории"""
+    import asyncio
+
+    telegram_bot.message_handler.debounce_ms = 20
+    llm_started = asyncio.Event()
+
+    async def slow_response(*args, **kwargs):  # type: ignore[no-untyped-def]
+        llm_started.set()
+        await asyncio.sleep(10)
+
+    mock_llm_client.get_response.side_effect = slow_response
+    mock_message.text = "Привет"
+    await telegram_bot.handle_message(mock_message)
+    await asyncio.wait_for(llm_started.wait(), timeout=1)
+
+    # Новое сообщение отменяет ход (UserLockMiddleware с cancel_on_message)
+    assert telegram_bot.user_locks.cancel(12345, "superseded") is True
+    mock_llm_client.get_response.side_effect = None
+    mock_llm_client.get_response.return_value = "Ответ"
+    mock_message.text = "Как обустроить кухню?"
+    await telegram_bot.handle_message(mock_message)
+    await asyncio.sleep(0.1)
+
+    history = await dialogue_manager.get_history(test_users_mapping[12345])
+    assert [msg["content"] for msg in history] == ["Привет", "Как обустроить кухню?", "Ответ"]
+    assert mock_message.answer.call_count == 1
+
+
 @pytest.mark.asyncio
 async def test_cmd_start_no_user(telegram_bot, mock_message) -> None:
     """Тест команды /start без пользователя"""
@@ -288,6 +341,38 @@ async def test_handle_voice(telegram_bot, message_handler_with_media) -> None:
     mock_voice_message.answer.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_handle_voice_before_model_ready(
+    telegram_bot, message_handler_with_media, mock_media_provider
+) -> None:
+    """Тест уведомления о загрузке модели, если голосовое пришло до ее готовности."""
+    from unittest.mock import AsyncMock, Mock
+
+    mock_media_provider.is_ready = False
+    bot = TelegramBot(
+        telegram_bot.bot.token,
+        message_handler_with_media,
+        telegram_bot.command_handler,
+        telegram_bot.session_factory,
+    )
+
+    mock_voice_message = AsyncMock()
+    mock_voice_message.from_user = Mock()
+    mock_voice_message.from_user.id = 12345
+    mock_voice_message.from_user.username = "testuser"
+    mock_voice_message.from_user.first_name = "Test"
+    mock_voice_message.from_user.last_name = "User"
+    mock_voice_message.from_user.language_code = "en"
+    mock_voice_message.voice = Mock(file_id="voice_file_id_123")
+    mock_voice_message.answer = AsyncMock()
+
+    await bot.handle_voice(mock_voice_message)
+
+    # Сначала уведомление о загрузке, затем ответ на сообщение
+    assert mock_voice_message.answer.call_count == 2
+    assert "Распознавание речи" in mock_voice_message.answer.call_args_list[0].args[0]
+
+
 @pytest.mark.asyncio
 async def test_handle_voice_no_user(telegram_bot, message_handler_with_media) -> None:
     """Тест обработки голосового сообщения без пользователя."""
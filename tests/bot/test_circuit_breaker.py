@@ -0,0 +1,93 @@
+"""Тесты для CircuitBreaker."""
+
+import asyncio
+
+import pytest
+
+from src.bot.circuit_breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+
+
+def _fail(breaker: CircuitBreaker, error: Exception) -> None:
+    with pytest.raises(type(error)), breaker.call():
+        raise error
+
+
+def test_opens_after_threshold() -> None:
+    """Тест что breaker размыкается после failure_threshold ошибок подряд"""
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+
+    _fail(breaker, ConnectionError("down"))
+    assert breaker.state == STATE_CLOSED
+
+    _fail(breaker, ConnectionError("down"))
+    assert breaker.state == STATE_OPEN
+
+    with pytest.raises(CircuitOpenError), breaker.call():
+        pass
+    stats = breaker.get_stats()
+    assert stats["opened"] == 1
+    assert stats["rejected"] == 1
+
+
+def test_success_resets_failures() -> None:
+    """Тест что успешный вызов обнуляет счетчик ошибок подряд"""
+    breaker = CircuitBreaker("test", failure_threshold=2)
+
+    _fail(breaker, ConnectionError("down"))
+    with breaker.call():
+        pass
+    _fail(breaker, ConnectionError("down"))
+
+    assert breaker.state == STATE_CLOSED
+    assert breaker.get_stats()["consecutive_failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe_success_closes() -> None:
+    """Тест что успешный пробный вызов замыкает breaker, а второй вызов ждет пробу"""
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.01)
+    _fail(breaker, ConnectionError("down"))
+    await asyncio.sleep(0.02)
+    assert breaker.state == STATE_HALF_OPEN
+
+    with breaker.call(), pytest.raises(CircuitOpenError), breaker.call():
+        pass
+
+    assert breaker.state == STATE_CLOSED
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe_failure_reopens() -> None:
+    """Тест что ошибка пробного вызова снова размыкает breaker"""
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=0.01)
+    for _ in range(3):
+        _fail(breaker, ConnectionError("down"))
+    await asyncio.sleep(0.02)
+
+    _fail(breaker, ConnectionError("still down"))
+
+    assert breaker.state == STATE_OPEN
+    assert breaker.get_stats()["opened"] == 2
+
+
+def test_non_failure_errors_ignored() -> None:
+    """Тест что ошибки запроса (не отказ сервиса) не размыкают breaker"""
+    breaker = CircuitBreaker(
+        "test", failure_threshold=1, is_failure=lambda e: isinstance(e, ConnectionError)
+    )
+
+    _fail(breaker, ValueError("bad request"))
+
+    assert breaker.state == STATE_CLOSED
+
+
+def test_invalid_threshold() -> None:
+    """Тест валидации failure_threshold"""
+    with pytest.raises(ValueError, match="failure_threshold"):
+        CircuitBreaker("test", failure_threshold=0)
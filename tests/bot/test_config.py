@@ -208,3 +208,228 @@ def test_config_whisper_defaults() -> None:
         config = Config()
         assert config.whisper_model == "base"
         assert config.whisper_device == "cpu"
+
+
+@patch("src.bot.config.load_dotenv")
+def test_config_polling_mode_by_default(mock_load_dotenv) -> None:
+    """Тест режима polling по умолчанию"""
+    with patch.dict(
+        "os.environ",
+        {
+            "TELEGRAM_BOT_TOKEN": "test_token",
+            "OPENROUTER_API_KEY": "test_key",
+            "OPENROUTER_MODEL": "test_model",
+        },
+        clear=True,
+    ):
+        config = Config()
+        assert config.bot_mode == "polling"
+        assert config.telegram_api_url is None
+
+
+@patch("src.bot.config.load_dotenv")
+def test_config_webhook_mode(mock_load_dotenv) -> None:
+    """Тест параметров webhook режима"""
+    with patch.dict(
+        "os.environ",
+        {
+            "TELEGRAM_BOT_TOKEN": "test_token",
+            "OPENROUTER_API_KEY": "test_key",
+            "OPENROUTER_MODEL": "test_model",
+            "BOT_MODE": "webhook",
+            "WEBHOOK_URL": "https://bot.example.com/webhook",
+            "WEBHOOK_SECRET": "secret",
+            "WEBHOOK_WORKERS": "4",
+        },
+        clear=True,
+    ):
+        config = Config()
+        assert config.bot_mode == "webhook"
+        assert config.webhook_url == "https://bot.example.com/webhook"
+        assert config.webhook_secret == "secret"
+        assert config.webhook_path == "/webhook"
+        assert config.webhook_port == 8080
+        assert config.webhook_workers == 4
+
+
+@patch("src.bot.config.load_dotenv")
+def test_config_webhook_mode_requires_secret(mock_load_dotenv) -> None:
+    """Тест что webhook режим требует WEBHOOK_SECRET"""
+    with (
+        patch.dict(
+            "os.environ",
+            {
+                "TELEGRAM_BOT_TOKEN": "test_token",
+                "OPENROUTER_API_KEY": "test_key",
+                "OPENROUTER_MODEL": "test_model",
+                "BOT_MODE": "webhook",
+                "WEBHOOK_URL": "https://bot.example.com/webhook",
+            },
+            clear=True,
+        ),
+        pytest.raises(ValueError, match="WEBHOOK_SECRET is required"),
+    ):
+        Config()
+
+
+@patch("src.bot.config.load_dotenv")
+def test_config_invalid_bot_mode(mock_load_dotenv) -> None:
+    """Тест неизвестного BOT_MODE"""
+    with (
+        patch.dict(
+            "os.environ",
+            {
+                "TELEGRAM_BOT_TOKEN": "test_token",
+                "OPENROUTER_API_KEY": "test_key",
+                "OPENROUTER_MODEL": "test_model",
+                "BOT_MODE": "push",
+            },
+            clear=True,
+        ),
+        pytest.raises(ValueError, match="BOT_MODE"),
+    ):
+        Config()
+
+
+@patch("src.bot.config.load_dotenv")
+def test_config_message_debounce(mock_load_dotenv) -> None:
+    """Тест окна объединения сообщений"""
+    env = {
+        "TELEGRAM_BOT_TOKEN": "test_token",
+        "OPENROUTER_API_KEY": "test_key",
+        "OPENROUTER_MODEL": "test_model",
+    }
+    with patch.dict("os.environ", env, clear=True):
+        assert Config().message_debounce_ms == 0
+        assert Config().cancel_on_message is False
+    with patch.dict("os.environ", {**env, "MESSAGE_DEBOUNCE_MS": "1500"}, clear=True):
+        assert Config().message_debounce_ms == 1500
+
+
+@patch("src.bot.config.load_dotenv")
+def test_config_cancel_on_message(mock_load_dotenv) -> None:
+    """Тест отмены ответа новым сообщением"""
+    with patch.dict(
+        "os.environ",
+        {
+            "TELEGRAM_BOT_TOKEN": "test_token",
+            "OPENROUTER_API_KEY": "test_key",
+            "OPENROUTER_MODEL": "test_model",
+            "CANCEL_ON_NEW_MESSAGE": "true",
+        },
+        clear=True,
+    ):
+        assert Config().cancel_on_message is True
+
+
+@patch("src.bot.config.load_dotenv")
+def test_config_admission(mock_load_dotenv) -> None:
+    """Тест параметров admission control"""
+    env = {
+        "TELEGRAM_BOT_TOKEN": "test_token",
+        "OPENROUTER_API_KEY": "test_key",
+        "OPENROUTER_MODEL": "test_model",
+    }
+    with patch.dict("os.environ", env, clear=True):
+        config = Config()
+        assert config.admission_max_concurrency == 10
+        assert config.admission_max_queue == 50
+        assert config.admission_queue_timeout == 10.0
+    overrides = {
+        "ADMISSION_MAX_CONCURRENCY": "4",
+        "ADMISSION_MAX_QUEUE": "8",
+        "ADMISSION_QUEUE_TIMEOUT": "2.5",
+    }
+    with patch.dict("os.environ", {**env, **overrides}, clear=True):
+        config = Config()
+        assert config.admission_max_concurrency == 4
+        assert config.admission_max_queue == 8
+        assert config.admission_queue_timeout == 2.5
+
+
+@patch("src.bot.config.load_dotenv")
+def test_config_fast_model(mock_load_dotenv) -> None:
+    """Тест быстрой модели для простых ходов"""
+    env = {
+        "TELEGRAM_BOT_TOKEN": "test_token",
+        "OPENROUTER_API_KEY": "test_key",
+        "OPENROUTER_MODEL": "model-a,model-b",
+    }
+    with patch.dict("os.environ", env, clear=True):
+        config = Config()
+        assert config.openrouter_model == "model-a,model-b"
+        assert config.fast_model is None
+    with patch.dict("os.environ", {**env, "LLM_FAST_MODEL": "fast-model"}, clear=True):
+        assert Config().fast_model == "fast-model"
+
+
+@patch("src.bot.config.load_dotenv")
+def test_config_context_token_budget(mock_load_dotenv) -> None:
+    """Тест бюджета токенов контекста"""
+    env = {
+        "TELEGRAM_BOT_TOKEN": "test_token",
+        "OPENROUTER_API_KEY": "test_key",
+        "OPENROUTER_MODEL": "test_model",
+    }
+    with patch.dict("os.environ", env, clear=True):
+        assert Config().context_token_budget == 8000
+    with patch.dict("os.environ", {**env, "CONTEXT_TOKEN_BUDGET": "0"}, clear=True):
+        assert Config().context_token_budget == 0
+
+
+@patch("src.bot.config.load_dotenv")
+def test_config_conversation_summary(mock_load_dotenv) -> None:
+    """Тест параметров фонового сжатия диалога"""
+    env = {
+        "TELEGRAM_BOT_TOKEN": "test_token",
+        "OPENROUTER_API_KEY": "test_key",
+        "OPENROUTER_MODEL": "test_model",
+    }
+    with patch.dict("os.environ", env, clear=True):
+        config = Config()
+        assert config.conversation_summary is False
+        assert config.summary_min_messages == 6
+    overrides = {"CONVERSATION_SUMMARY": "true", "SUMMARY_MIN_MESSAGES": "10"}
+    with patch.dict("os.environ", {**env, **overrides}, clear=True):
+        config = Config()
+        assert config.conversation_summary is True
+        assert config.summary_min_messages == 10
+
+
+@patch("src.bot.config.load_dotenv")
+def test_config_image_history_turns(mock_load_dotenv) -> None:
+    """Тест возраста изображений, после которого они заменяются описанием"""
+    env = {
+        "TELEGRAM_BOT_TOKEN": "test_token",
+        "OPENROUTER_API_KEY": "test_key",
+        "OPENROUTER_MODEL": "test_model",
+    }
+    with patch.dict("os.environ", env, clear=True):
+        assert Config().image_history_turns == 2
+    with patch.dict("os.environ", {**env, "IMAGE_HISTORY_TURNS": "0"}, clear=True):
+        assert Config().image_history_turns == 0
+
+
+@patch("src.bot.config.load_dotenv")
+def test_config_faq_cache(mock_load_dotenv) -> None:
+    """Тест параметров ответов на первый вопрос из FAQ"""
+    env = {
+        "TELEGRAM_BOT_TOKEN": "test_token",
+        "OPENROUTER_API_KEY": "test_key",
+        "OPENROUTER_MODEL": "test_model",
+    }
+    with patch.dict("os.environ", env, clear=True):
+        config = Config()
+        assert config.faq_cache is False
+        assert config.faq_min_similarity == 0.7
+        assert config.faq_collect_candidates is False
+    overrides = {
+        "FAQ_CACHE": "true",
+        "FAQ_MIN_SIMILARITY": "0.8",
+        "FAQ_COLLECT_CANDIDATES": "yes",
+    }
+    with patch.dict("os.environ", {**env, **overrides}, clear=True):
+        config = Config()
+        assert config.faq_cache is True
+        assert config.faq_min_similarity == 0.8
+        assert config.faq_collect_candidates is True
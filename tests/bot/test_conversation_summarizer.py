@@ -0,0 +1,146 @@
+"""Тесты для ConversationSummarizer."""
+
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.bot.conversation_summarizer import (
+    MAX_MESSAGE_CHARS,
+    ConversationSummarizer,
+    format_transcript,
+    load_summary_prompt,
+)
+from src.bot.llm_limiter import PRIORITY_ANALYTICS
+
+
+def _messages(count: int) -> list[dict[str, Any]]:
+    roles = ["user", "assistant"]
+    return [
+        {"id": index + 1, "role": roles[index % 2], "content": f"Сообщение {index + 1}"}
+        for index in range(count)
+    ]
+
+
+def _make_summarizer(
+    messages: list[dict[str, Any]], summary: str | None = None
+) -> tuple[ConversationSummarizer, Mock, Mock]:
+    llm = Mock()
+    llm.get_response = AsyncMock(return_value="  Новый конспект  ")
+    dialogue_manager = Mock()
+    dialogue_manager.get_messages_to_summarize = AsyncMock(return_value=(summary, messages))
+    dialogue_manager.save_summary = AsyncMock(return_value=True)
+    return ConversationSummarizer(llm, dialogue_manager, min_messages=4), llm, dialogue_manager
+
+
+def test_format_transcript() -> None:
+    """Тест текста переписки: роли, изображения и обрезка длинных сообщений"""
+    transcript = format_transcript(
+        [
+            {"role": "user", "content": {"text": "Комната 12 м²"}},
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": "Вот фото"},
+                    {"type": "image_url", "image_url": {"url": "data:image/jpeg;base64,..."}},
+                ],
+            },
+            {"role": "assistant", "content": "x" * (MAX_MESSAGE_CHARS + 100)},
+        ]
+    )
+
+    lines = transcript.split("\n")
+    assert lines[0] == "Клиент: Комната 12 м²"
+    assert lines[1] == "Клиент: Вот фото [изображение]"
+    assert lines[2] == "Дизайнер: " + "x" * MAX_MESSAGE_CHARS + "..."
+
+
+def test_load_summary_prompt() -> None:
+    """Тест загрузки prompt для сжатия"""
+    assert "конспект" in load_summary_prompt()
+
+
+@pytest.mark.asyncio
+async def test_summarize_saves_summary() -> None:
+    """Тест сжатия: предыдущий summary и переписка в запросе, сохранение до последнего id"""
+    summarizer, llm, dialogue_manager = _make_summarizer(_messages(5), summary="Старый")
+
+    assert await summarizer.summarize(42) is True
+
+    messages = llm.get_response.call_args.args[0]
+    assert "Старый" in messages[0]["content"]
+    assert "Дизайнер: Сообщение 2" in messages[0]["content"]
+    assert llm.get_response.call_args.kwargs["priority"] == PRIORITY_ANALYTICS
+    dialogue_manager.save_summary.assert_awaited_once_with(42, "Новый конспект", 5)
+    assert summarizer.get_stats()["summarized"] == 1
+
+
+@pytest.mark.asyncio
+async def test_summarize_waits_for_enough_messages() -> None:
+    """Тест что сжатие не вызывает LLM, пока за окном мало сообщений"""
+    summarizer, llm, dialogue_manager = _make_summarizer(_messages(3))
+
+    assert await summarizer.summarize(42) is False
+
+    llm.get_response.assert_not_called()
+    dialogue_manager.save_summary.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_schedule_runs_once_per_user() -> None:
+    """Тест что фоновое сжатие пользователя не запускается повторно, пока выполняется"""
+    summarizer, llm, _ = _make_summarizer(_messages(4))
+    release = asyncio.Event()
+
+    async def slow_response(*args: Any, **kwargs: Any) -> str:
+        await release.wait()
+        return "Конспект"
+
+    llm.get_response = AsyncMock(side_effect=slow_response)
+
+    summarizer.schedule(42)
+    summarizer.schedule(42)
+    await asyncio.sleep(0.01)
+    assert summarizer.get_stats()["running"] == 1
+
+    release.set()
+    await asyncio.sleep(0.01)
+    assert llm.get_response.await_count == 1
+    assert summarizer.get_stats() == {"running": 0, "summarized": 1, "failed": 0}
+
+
+@pytest.mark.asyncio
+async def test_schedule_logs_errors() -> None:
+    """Тест что ошибка фонового сжатия учитывается и не пробрасывается"""
+    summarizer, llm, _ = _make_summarizer(_messages(4))
+    llm.get_response = AsyncMock(side_effect=ConnectionError("down"))
+
+    summarizer.schedule(42)
+    await asyncio.sleep(0.01)
+
+    assert summarizer.get_stats()["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_running() -> None:
+    """Тест остановки: выполняющиеся сжатия отменяются"""
+    summarizer, llm, _ = _make_summarizer(_messages(4))
+
+    async def hanging_response(*args: Any, **kwargs: Any) -> str:
+        await asyncio.sleep(10)
+        return "Конспект"
+
+    llm.get_response = AsyncMock(side_effect=hanging_response)
+
+    summarizer.schedule(42)
+    await asyncio.sleep(0.01)
+    await summarizer.stop()
+
+    assert summarizer.get_stats()["running"] == 0
+
+
+def test_invalid_parameters() -> None:
+    """Тест валидации параметров"""
+    with pytest.raises(ValueError, match="min_messages"):
+        ConversationSummarizer(Mock(), Mock(), min_messages=10, batch_size=5)
@@ -0,0 +1,80 @@
+"""
+Тесты для DatabaseSessionMiddleware.
+
+Проверяем что обработчик update получает сессию, хранилища внутри обработчика
+используют ее же через unit_of_work, а commit/rollback выполняется один раз.
+"""
+
+from unittest.mock import AsyncMock, MagicMock, Mock
+
+import pytest
+
+from src.bot.database_middleware import DatabaseSessionMiddleware
+from src.bot.unit_of_work import release_connection, unit_of_work
+
+
+@pytest.fixture
+def session() -> AsyncMock:
+    """Мокированная AsyncSession."""
+    return AsyncMock()
+
+
+@pytest.fixture
+def session_factory(session: AsyncMock) -> MagicMock:
+    """Фабрика, возвращающая мокированную сессию."""
+    context = AsyncMock()
+    context.__aenter__.return_value = session
+    context.__aexit__.return_value = False
+    return MagicMock(return_value=context)
+
+
+@pytest.mark.asyncio
+async def test_one_session_per_update(session, session_factory) -> None:
+    """Тест что обработчик и хранилища используют одну сессию и один commit"""
+    middleware = DatabaseSessionMiddleware(session_factory)
+    seen_sessions = []
+
+    async def handler(event, data):  # type: ignore[no-untyped-def]
+        seen_sessions.append(data["session"])
+        # Хранилища (DialogueManager, _track_user) открывают вложенный unit of work
+        for _ in range(3):
+            async with unit_of_work(session_factory) as storage_session:
+                seen_sessions.append(storage_session)
+        return "handled"
+
+    result = await middleware(handler, Mock(), {})
+
+    assert result == "handled"
+    assert all(seen is session for seen in seen_sessions)
+    session_factory.assert_called_once()
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_rollback_on_handler_error(session, session_factory) -> None:
+    """Тест rollback при исключении в обработчике"""
+    middleware = DatabaseSessionMiddleware(session_factory)
+    handler = AsyncMock(side_effect=RuntimeError("boom"))
+
+    with pytest.raises(RuntimeError):
+        await middleware(handler, Mock(), {})
+
+    session.rollback.assert_awaited_once()
+    session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_connection_released_before_external_call(session, session_factory) -> None:
+    """Тест что перед внешним вызовом транзакция фиксируется, а сессия update остается"""
+    middleware = DatabaseSessionMiddleware(session_factory)
+
+    async def handler(event, data):  # type: ignore[no-untyped-def]
+        await release_connection()  # MessageHandler перед запросом к LLM
+        session.commit.assert_awaited_once()
+        async with unit_of_work(session_factory) as storage_session:
+            assert storage_session is data["session"]
+
+    await middleware(handler, Mock(), {})
+
+    session_factory.assert_called_once()
+    assert session.commit.await_count == 2
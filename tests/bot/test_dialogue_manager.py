@@ -165,3 +165,183 @@ async def test_mixed_text_and_multimodal_history(
     assert history[1]["content"] == "Hi there!"  # Простая строка
     assert isinstance(history[2]["content"], list)  # Список для мультимодального
     assert history[3]["content"] == "Nice photo!"  # Простая строка
+
+
+@pytest.mark.asyncio
+async def test_token_budget_keeps_newest_messages(
+    test_session_factory, test_users_mapping: dict[int, int]
+) -> None:
+    """Тест окна истории по бюджету токенов: новые сообщения, которые помещаются"""
+    from src.bot.dialogue_manager import DialogueManager
+    from src.bot.token_estimator import estimate_tokens
+
+    user_id = test_users_mapping[123]
+    long_text = "x" * 4000
+    message_tokens = estimate_tokens("short")
+    # Бюджет на 2 коротких сообщения после резерва под system prompt
+    dm = DialogueManager(
+        session_factory=test_session_factory,
+        max_history=20,
+        token_budget=estimate_tokens("prompt") + 2 * message_tokens,
+        system_prompt="prompt",
+    )
+
+    await dm.add_message(user_id, "user", "short")
+    await dm.add_message(user_id, "user", long_text)
+    await dm.add_message(user_id, "user", "short")
+    await dm.add_message(user_id, "user", "short")
+
+    history = await dm.get_history(user_id)
+    assert [message["content"] for message in history] == ["short", "short"]
+
+    # Последнее сообщение возвращается, даже если оно больше бюджета
+    await dm.add_message(user_id, "user", long_text)
+    history = await dm.get_history(user_id)
+    assert [message["content"] for message in history] == [long_text]
+
+
+@pytest.mark.asyncio
+async def test_token_count_stored_with_image_cost(
+    dialogue_manager: DialogueStorage, test_session_factory, test_users_mapping: dict[int, int]
+) -> None:
+    """Тест что оценка токенов сохраняется в БД с учетом изображения"""
+    from sqlalchemy import select
+
+    from src.bot.models import Message
+    from src.bot.token_estimator import IMAGE_TOKENS
+
+    user_id = test_users_mapping[123]
+    await dialogue_manager.add_message(
+        user_id,
+        "user",
+        [
+            {"type": "text", "text": "Что на фото?"},
+            {"type": "image_url", "image_url": {"url": "data:image/jpeg;base64,fake_data"}},
+        ],
+    )
+
+    async with test_session_factory() as session:
+        token_count = (await session.execute(select(Message.token_count))).scalar_one()
+    assert token_count > IMAGE_TOKENS
+
+
+@pytest.mark.asyncio
+async def test_aged_image_replaced_with_description(
+    test_session_factory, test_users_mapping: dict[int, int]
+) -> None:
+    """Тест: изображение старше image_history_turns ходов заменяется описанием"""
+    from typing import Any
+
+    from src.bot.dialogue_manager import DialogueManager
+
+    user_id = test_users_mapping[123]
+    dm = DialogueManager(
+        session_factory=test_session_factory, max_history=20, image_history_turns=1
+    )
+    photo: list[dict[str, Any]] = [
+        {"type": "text", "text": "Что на фото?"},
+        {"type": "image_url", "image_url": {"url": "data:image/jpeg;base64,photo_data"}},
+    ]
+    await dm.add_message(user_id, "user", photo)
+    await dm.add_message(user_id, "assistant", "Кухня в стиле лофт")
+    await dm.describe_last_image(user_id, "Кухня в стиле лофт")
+
+    # Фото в последнем ходе отправляется как есть
+    history = await dm.get_history(user_id)
+    assert history[0]["content"] == photo
+
+    # После следующего хода вместо фото - его описание
+    await dm.add_message(user_id, "user", "А что добавить?")
+    history = await dm.get_history(user_id)
+    content = history[0]["content"]
+    assert content[0] == photo[0]
+    assert content[1]["type"] == "text"
+    assert "Кухня в стиле лофт" in content[1]["text"]
+
+
+@pytest.mark.asyncio
+async def test_recent_image_counted_at_full_cost_in_budget(
+    test_session_factory, test_users_mapping: dict[int, int]
+) -> None:
+    """Тест: недавнее фото с описанием учитывается в бюджете по полной стоимости"""
+    from typing import Any
+
+    from src.bot.dialogue_manager import DialogueManager
+    from src.bot.token_estimator import IMAGE_TOKENS
+
+    user_id = test_users_mapping[123]
+    # Бюджет вмещает описание фото и короткие сообщения, но не само изображение
+    dm = DialogueManager(
+        session_factory=test_session_factory,
+        max_history=20,
+        token_budget=IMAGE_TOKENS // 2,
+        image_history_turns=2,
+    )
+    photo: list[dict[str, Any]] = [
+        {"type": "text", "text": "Что на фото?"},
+        {"type": "image_url", "image_url": {"url": "data:image/jpeg;base64,photo_data"}},
+    ]
+    await dm.add_message(user_id, "user", photo)
+    await dm.add_message(user_id, "assistant", "Кухня в стиле лофт")
+    await dm.describe_last_image(user_id, "Кухня в стиле лофт")
+    await dm.add_message(user_id, "user", "А что добавить?")
+
+    # Фото еще отправляется как есть и в бюджет не помещается
+    history = await dm.get_history(user_id)
+    assert [message["content"] for message in history] == ["Кухня в стиле лофт", "А что добавить?"]
+
+    # Фото заменяется описанием и помещается в бюджет
+    await dm.add_message(user_id, "user", "Какие цвета?")
+    history = await dm.get_history(user_id)
+    assert len(history) == 4
+    assert "Кухня в стиле лофт" in history[0]["content"][1]["text"]
+
+
+@pytest.mark.asyncio
+async def test_summary_of_messages_outside_window(
+    test_session_factory, test_users_mapping: dict[int, int]
+) -> None:
+    """Тест summary: сообщения вне окна отдаются на сжатие, summary идет первым в истории"""
+    from src.bot.dialogue_manager import DialogueManager
+
+    user_id = test_users_mapping[123]
+    dm = DialogueManager(session_factory=test_session_factory, max_history=2, use_summary=True)
+    for i in range(5):
+        await dm.add_message(user_id, "user", f"Message {i}")
+
+    summary, messages = await dm.get_messages_to_summarize(user_id, batch_size=10)
+    assert summary is None
+    assert [message["content"] for message in messages] == [
+        {"text": f"Message {i}"} for i in range(3)
+    ]
+
+    assert await dm.save_summary(user_id, "Summary", messages[-1]["id"]) is True
+    history = await dm.get_history(user_id)
+    assert history[0]["role"] == "system"
+    assert "Summary" in history[0]["content"]
+    assert [message["content"] for message in history[1:]] == ["Message 3", "Message 4"]
+
+    # Учтенные в summary сообщения повторно не отдаются
+    summary, messages = await dm.get_messages_to_summarize(user_id, batch_size=10)
+    assert summary == "Summary"
+    assert messages == []
+
+
+@pytest.mark.asyncio
+async def test_clear_history_removes_summary(
+    test_session_factory, test_users_mapping: dict[int, int]
+) -> None:
+    """Тест что /reset удаляет summary, а summary для удаленной истории не сохраняется"""
+    from src.bot.dialogue_manager import DialogueManager
+
+    user_id = test_users_mapping[123]
+    dm = DialogueManager(session_factory=test_session_factory, max_history=1, use_summary=True)
+    await dm.add_message(user_id, "user", "Old")
+    await dm.add_message(user_id, "user", "New")
+    _, messages = await dm.get_messages_to_summarize(user_id, batch_size=10)
+    await dm.save_summary(user_id, "Summary", messages[-1]["id"])
+
+    await dm.clear_history(user_id)
+
+    assert await dm.get_history(user_id) == []
+    assert await dm.save_summary(user_id, "Stale", messages[-1]["id"]) is False
@@ -0,0 +1,110 @@
+"""Тесты для FAQCache."""
+
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.bot.faq_cache import FAQCache
+
+
+def _entry(entry_id: int, question: str, answer: str) -> Mock:
+    return Mock(id=entry_id, question=question, answer=answer)
+
+
+@pytest.fixture
+def repository() -> Mock:
+    """Мок FAQRepository с одной одобренной записью."""
+    repository = Mock()
+    repository.get_entries = AsyncMock(
+        return_value=[_entry(1, "Какой стиль подойдет для маленькой кухни?", "Скандинавский")]
+    )
+    repository.has_question = AsyncMock(return_value=False)
+    repository.add_entry = AsyncMock()
+    return repository
+
+
+@pytest.fixture(autouse=True)
+def patch_database(repository: Mock) -> Any:
+    """Подменяет unit of work и FAQRepository."""
+
+    @asynccontextmanager
+    async def fake_unit_of_work(session_factory: Any) -> AsyncIterator[Mock]:
+        yield Mock()
+
+    with (
+        patch("src.bot.faq_cache.unit_of_work", fake_unit_of_work),
+        patch("src.bot.faq_cache.FAQRepository", return_value=repository),
+    ):
+        yield
+
+
+def test_faq_cache_validates_min_similarity() -> None:
+    """Тест валидации порога сходства"""
+    with pytest.raises(ValueError):
+        FAQCache(Mock(), min_similarity=0)
+
+
+@pytest.mark.asyncio
+async def test_match_loads_index_lazily(repository: Mock) -> None:
+    """Тест ответа из FAQ: индекс загружается при первом поиске"""
+    faq_cache = FAQCache(Mock(), min_similarity=0.7)
+
+    assert await faq_cache.match("Какой стиль подойдёт маленькой кухне?") == "Скандинавский"
+    assert await faq_cache.match("Как выбрать диван?") is None
+    repository.get_entries.assert_awaited_once_with(approved=True)
+
+    stats = faq_cache.get_stats()
+    assert stats["entries"] == 1
+    assert stats["lookups"] == 2
+    assert stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_load_syncs_added_and_removed_entries(repository: Mock) -> None:
+    """Тест синхронизации индекса с БД: новые добавляются, удаленные убираются"""
+    faq_cache = FAQCache(Mock(), reload_interval=0)
+    await faq_cache.load()
+
+    repository.get_entries.return_value = [_entry(2, "Как выбрать цвет стен?", "Светлые тона")]
+    assert await faq_cache.match("Как выбрать цвет стен?") == "Светлые тона"
+    assert faq_cache.index.entry_ids() == [2]
+
+
+@pytest.mark.asyncio
+async def test_match_keeps_index_when_reload_fails(repository: Mock) -> None:
+    """Тест что ошибка синхронизации не ломает поиск: используется прежний индекс"""
+    faq_cache = FAQCache(Mock(), reload_interval=0)
+    await faq_cache.load()
+
+    repository.get_entries.side_effect = ConnectionError("database is down")
+    assert await faq_cache.match("Какой стиль подойдёт маленькой кухне?") == "Скандинавский"
+    assert faq_cache.get_stats()["reload_errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_match_without_index_when_first_load_fails(repository: Mock) -> None:
+    """Тест что при недоступной БД вопрос уходит в LLM (нет ответа из FAQ)"""
+    repository.get_entries.side_effect = ConnectionError("database is down")
+    faq_cache = FAQCache(Mock())
+
+    assert await faq_cache.match("Какой стиль подойдёт маленькой кухне?") is None
+    assert faq_cache.get_stats()["lookups"] == 1
+
+
+@pytest.mark.asyncio
+async def test_add_candidate(repository: Mock) -> None:
+    """Тест сбора кандидатов: только при collect_candidates и без повторов"""
+    await FAQCache(Mock()).add_candidate("Вопрос", "Ответ")
+    repository.add_entry.assert_not_awaited()
+
+    faq_cache = FAQCache(Mock(), collect_candidates=True)
+    await faq_cache.add_candidate("Вопрос", "Ответ")
+    repository.add_entry.assert_awaited_once_with("Вопрос", "Ответ")
+
+    repository.has_question.return_value = True
+    await faq_cache.add_candidate("Вопрос", "Ответ")
+    assert repository.add_entry.await_count == 1
+    assert faq_cache.get_stats()["candidates"] == 1
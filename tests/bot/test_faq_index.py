@@ -0,0 +1,69 @@
+"""Тесты для FAQIndex."""
+
+from src.bot.faq_index import FAQIndex, normalize_text, stem
+
+QUESTIONS = [
+    "Какой стиль подойдет для маленькой кухни?",
+    "Как выбрать цвет стен в гостиной?",
+    "Какое освещение нужно в спальне?",
+    "Сколько стоит ремонт ванной комнаты?",
+]
+
+
+def _index() -> FAQIndex:
+    index = FAQIndex()
+    for entry_id, question in enumerate(QUESTIONS):
+        index.add(entry_id, question, f"Ответ {entry_id}")
+    return index
+
+
+def test_normalize_text_stems_and_drops_stop_words() -> None:
+    """Тест нормализации: регистр, ё, стоп-слова и окончания"""
+    assert normalize_text("Какой стиль подойдёт для маленькой кухни?") == [
+        "стил",
+        "подойд",
+        "маленьк",
+        "кухн",
+    ]
+    assert normalize_text("маленькая кухня") == normalize_text("маленькой кухне")
+
+
+def test_stem_keeps_short_words() -> None:
+    """Тест что у коротких слов окончание не отрезается"""
+    assert stem("дом") == "дом"
+    assert stem("дома") == "дом"
+
+
+def test_search_exact_and_paraphrased_question() -> None:
+    """Тест поиска: тот же вопрос - сходство 1, перефразированный - высокое"""
+    index = _index()
+
+    assert index.search("Как выбрать цвет стен в гостиной?") == (1, "Ответ 1", 1.0)
+    match = index.search("какой стиль подойдёт маленькой кухне")
+    assert match is not None
+    assert match[0] == 0
+    assert match[2] > 0.9
+
+
+def test_search_short_or_unrelated_query_has_low_similarity() -> None:
+    """Тест что одно общее слово не дает высокого сходства"""
+    index = _index()
+
+    match = index.search("кухня")
+    assert match is not None
+    assert match[2] < 0.5
+    assert index.search("Погода завтра") is None
+
+
+def test_incremental_add_and_remove() -> None:
+    """Тест добавления и удаления записей без перестроения индекса"""
+    index = _index()
+
+    index.remove(1)
+    assert 1 not in index
+    assert len(index) == 3
+    assert index.search("выбрать цвет стен в гостиной") is None
+
+    index.add(1, QUESTIONS[1], "Новый ответ")
+    assert index.search(QUESTIONS[1]) == (1, "Новый ответ", 1.0)
+    assert sorted(index.entry_ids()) == [0, 1, 2, 3]
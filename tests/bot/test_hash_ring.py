@@ -0,0 +1,57 @@
+"""Тесты для ConsistentHashRing."""
+
+from collections import Counter
+
+import pytest
+
+from src.bot.hash_ring import ConsistentHashRing
+
+WORKERS = ["worker-0", "worker-1", "worker-2", "worker-3"]
+
+
+def test_same_key_same_node() -> None:
+    """Тест что ключ всегда попадает на один узел, в том числе в другом экземпляре"""
+    ring = ConsistentHashRing(WORKERS)
+    other = ConsistentHashRing(list(reversed(WORKERS)))
+
+    for chat_id in range(100):
+        assert ring.get_node(str(chat_id)) == ring.get_node(str(chat_id))
+        assert ring.get_node(str(chat_id)) == other.get_node(str(chat_id))
+
+
+def test_keys_spread_across_nodes() -> None:
+    """Тест равномерного распределения ключей"""
+    ring = ConsistentHashRing(WORKERS)
+
+    counts = Counter(ring.get_node(str(chat_id)) for chat_id in range(10_000))
+
+    assert set(counts) == set(WORKERS)
+    assert min(counts.values()) > 10_000 / len(WORKERS) * 0.7
+
+
+def test_adding_node_moves_few_keys() -> None:
+    """Тест что при добавлении узла переезжает только часть ключей"""
+    ring = ConsistentHashRing(WORKERS)
+    before = {key: ring.get_node(key) for key in map(str, range(10_000))}
+
+    ring.add_node("worker-4")
+    moved = [key for key, node in before.items() if ring.get_node(key) != node]
+
+    assert all(ring.get_node(key) == "worker-4" for key in moved)
+    assert len(moved) < 10_000 * 0.35
+
+
+def test_remove_node() -> None:
+    """Тест что ключи удаленного узла переходят к оставшимся"""
+    ring = ConsistentHashRing(WORKERS)
+
+    ring.remove_node("worker-0")
+
+    assert ring.nodes == set(WORKERS[1:])
+    assert all(ring.get_node(str(key)) != "worker-0" for key in range(1000))
+
+
+def test_empty_ring() -> None:
+    """Тест ошибки для пустого кольца"""
+    with pytest.raises(ValueError, match="no nodes"):
+        ConsistentHashRing().get_node("1")
@@ -1,9 +1,19 @@
+import asyncio
 from typing import Any
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
+import httpx
+import openai
 import pytest
 
-from src.bot.llm_client import LLMClient
+from src.bot.circuit_breaker import CircuitBreaker, CircuitOpenError
+from src.bot.llm_client import (
+    LLMClient,
+    get_all_usage_stats,
+    get_llm_circuit_breaker,
+    record_usage,
+)
+from src.bot.llm_limiter import LLMLimiter
 
 
 def test_llm_client_initialization() -> None:
@@ -14,20 +24,21 @@ def test_llm_client_initialization() -> None:
     assert client.system_prompt == "Test prompt"
 
 
-def test_llm_client_adds_system_prompt() -> None:
+@pytest.mark.asyncio
+async def test_llm_client_adds_system_prompt() -> None:
     """Тест добавления system prompt в начало сообщений"""
-    with patch("src.bot.llm_client.OpenAI") as mock_openai:
+    with patch("src.bot.llm_client.AsyncOpenAI") as mock_openai:
         # Настраиваем мок
         mock_client = Mock()
         mock_response = Mock()
         mock_response.choices = [Mock(message=Mock(content="Test response"))]
-        mock_client.chat.completions.create.return_value = mock_response
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
         mock_openai.return_value = mock_client
 
         # Создаем клиент и вызываем метод
         client = LLMClient("key", "model", "System prompt")
         messages = [{"role": "user", "content": "Hello"}]
-        response = client.get_response(messages)
+        response = await client.get_response(messages)
 
         # Проверяем, что system prompt был добавлен
         call_args = mock_client.chat.completions.create.call_args
@@ -40,48 +51,51 @@ def test_llm_client_adds_system_prompt() -> None:
         assert response == "Test response"
 
 
-def test_llm_client_error_handling() -> None:
+@pytest.mark.asyncio
+async def test_llm_client_error_handling() -> None:
     """Тест обработки ошибок API"""
-    with patch("src.bot.llm_client.OpenAI") as mock_openai:
+    with patch("src.bot.llm_client.AsyncOpenAI") as mock_openai:
         mock_client = Mock()
-        mock_client.chat.completions.create.side_effect = Exception("API Error")
+        mock_client.chat.completions.create = AsyncMock(side_effect=Exception("API Error"))
         mock_openai.return_value = mock_client
 
         client = LLMClient("key", "model", "prompt")
         messages = [{"role": "user", "content": "test"}]
 
         with pytest.raises(Exception, match="API Error"):
-            client.get_response(messages)
+            await client.get_response(messages)
 
 
-def test_llm_client_empty_response() -> None:
+@pytest.mark.asyncio
+async def test_llm_client_empty_response() -> None:
     """Тест пустого ответа от LLM"""
-    with patch("src.bot.llm_client.OpenAI") as mock_openai:
+    with patch("src.bot.llm_client.AsyncOpenAI") as mock_openai:
         mock_client = Mock()
         mock_response = Mock()
         mock_response.choices = [Mock(message=Mock(content=None))]
-        mock_client.chat.completions.create.return_value = mock_response
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
         mock_openai.return_value = mock_client
 
         client = LLMClient("key", "model", "prompt")
         messages = [{"role": "user", "content": "test"}]
 
         with pytest.raises(ValueError, match="empty response"):
-            client.get_response(messages)
+            await client.get_response(messages)
 
 
-def test_llm_client_with_empty_messages() -> None:
+@pytest.mark.asyncio
+async def test_llm_client_with_empty_messages() -> None:
     """Тест с пустым списком сообщений"""
-    with patch("src.bot.llm_client.OpenAI") as mock_openai:
+    with patch("src.bot.llm_client.AsyncOpenAI") as mock_openai:
         mock_client = Mock()
         mock_response = Mock()
         mock_response.choices = [Mock(message=Mock(content="Response"))]
-        mock_client.chat.completions.create.return_value = mock_response
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
         mock_openai.return_value = mock_client
 
         client = LLMClient("key", "model", "System prompt")
         messages: list[dict[str, Any]] = []
-        response = client.get_response(messages)
+        response = await client.get_response(messages)
 
         # Проверяем, что был отправлен только system prompt
         call_args = mock_client.chat.completions.create.call_args
@@ -91,14 +105,15 @@ def test_llm_client_with_empty_messages() -> None:
         assert response == "Response"
 
 
-def test_llm_client_multimodal_message() -> None:
+@pytest.mark.asyncio
+async def test_llm_client_multimodal_message() -> None:
     """Тест: мультимодальное сообщение с изображением."""
-    with patch("src.bot.llm_client.OpenAI") as mock_openai:
+    with patch("src.bot.llm_client.AsyncOpenAI") as mock_openai:
         # Настраиваем мок
         mock_client = Mock()
         mock_response = Mock()
         mock_response.choices = [Mock(message=Mock(content="Image analyzed successfully"))]
-        mock_client.chat.completions.create.return_value = mock_response
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
         mock_openai.return_value = mock_client
 
         client = LLMClient("key", "model", "System prompt")
@@ -117,7 +132,7 @@ def test_llm_client_multimodal_message() -> None:
             }
         ]
 
-        response = client.get_response(messages)
+        response = await client.get_response(messages)
 
         # Проверяем, что сообщение было отправлено корректно
         call_args = mock_client.chat.completions.create.call_args
@@ -132,13 +147,14 @@ def test_llm_client_multimodal_message() -> None:
         assert response == "Image analyzed successfully"
 
 
-def test_llm_client_mixed_text_and_multimodal() -> None:
+@pytest.mark.asyncio
+async def test_llm_client_mixed_text_and_multimodal() -> None:
     """Тест: смешанные обычные и мультимодальные сообщения."""
-    with patch("src.bot.llm_client.OpenAI") as mock_openai:
+    with patch("src.bot.llm_client.AsyncOpenAI") as mock_openai:
         mock_client = Mock()
         mock_response = Mock()
         mock_response.choices = [Mock(message=Mock(content="Mixed response"))]
-        mock_client.chat.completions.create.return_value = mock_response
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
         mock_openai.return_value = mock_client
 
         client = LLMClient("key", "model", "System prompt")
@@ -159,7 +175,7 @@ def test_llm_client_mixed_text_and_multimodal() -> None:
             },
         ]
 
-        response = client.get_response(messages)
+        response = await client.get_response(messages)
 
         # Проверяем, что все сообщения переданы
         call_args = mock_client.chat.completions.create.call_args
@@ -171,3 +187,221 @@ def test_llm_client_mixed_text_and_multimodal() -> None:
         assert sent_messages[2]["content"] == "Hi there!"
         assert isinstance(sent_messages[3]["content"], list)
         assert response == "Mixed response"
+
+
+@pytest.mark.asyncio
+async def test_llm_client_cancellation() -> None:
+    """Тест что отмена задачи прерывает запрос к LLM"""
+    aborted: list[bool] = []
+
+    async def slow_create(**kwargs: Any) -> Mock:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            aborted.append(True)
+            raise
+        return Mock()
+
+    with patch("src.bot.llm_client.AsyncOpenAI") as mock_openai:
+        mock_client = Mock()
+        mock_client.chat.completions.create = slow_create
+        mock_openai.return_value = mock_client
+
+        client = LLMClient("key", "model", "prompt")
+        task = asyncio.create_task(client.get_response([{"role": "user", "content": "test"}]))
+        await asyncio.sleep(0.01)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    assert aborted == [True]
+
+
+def _status_error(status_code: int) -> openai.APIStatusError:
+    request = httpx.Request("POST", "https://openrouter.ai/api/v1/chat/completions")
+    response = httpx.Response(status_code, request=request)
+    return openai.InternalServerError("server error", response=response, body=None)
+
+
+def _make_client(create: Any) -> LLMClient:
+    with patch("src.bot.llm_client.AsyncOpenAI") as mock_openai:
+        mock_client = Mock()
+        mock_client.chat.completions.create = create
+        mock_openai.return_value = mock_client
+        client = LLMClient(
+            "key",
+            "model",
+            "prompt",
+            limiter=LLMLimiter(),
+            circuit_breaker=CircuitBreaker("test", failure_threshold=2, reset_timeout=60),
+        )
+    client.retry_base_delay = 0.001
+    return client
+
+
+def _response(content: str) -> Mock:
+    return Mock(choices=[Mock(message=Mock(content=content))])
+
+
+@pytest.mark.asyncio
+async def test_llm_client_retries_server_errors() -> None:
+    """Тест повтора временной ошибки провайдера"""
+    create = AsyncMock(side_effect=[_status_error(502), _response("OK")])
+    client = _make_client(create)
+
+    response = await client.get_response([{"role": "user", "content": "test"}])
+
+    assert response == "OK"
+    assert create.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_llm_client_does_not_retry_request_errors() -> None:
+    """Тест что ошибки запроса не повторяются"""
+    create = AsyncMock(side_effect=ValueError("bad request"))
+    client = _make_client(create)
+
+    with pytest.raises(ValueError, match="bad request"):
+        await client.get_response([{"role": "user", "content": "test"}])
+    assert create.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_llm_client_total_timeout() -> None:
+    """Тест что запрос завершается TimeoutError после LLM_TOTAL_TIMEOUT"""
+
+    async def slow_create(**kwargs: Any) -> Mock:
+        await asyncio.sleep(10)
+        return _response("late")
+
+    client = _make_client(slow_create)
+    client.total_timeout = 0.05
+
+    with pytest.raises(TimeoutError):
+        await client.get_response([{"role": "user", "content": "test"}])
+
+
+@pytest.mark.asyncio
+async def test_llm_client_circuit_open_fails_fast() -> None:
+    """Тест что после серии отказов провайдера запросы сразу отклоняются"""
+    create = AsyncMock(side_effect=_status_error(503))
+    client = _make_client(create)
+    client.max_retries = 0
+
+    for _ in range(2):
+        with pytest.raises(openai.InternalServerError):
+            await client.get_response([{"role": "user", "content": "test"}])
+
+    with pytest.raises(CircuitOpenError):
+        await client.get_response([{"role": "user", "content": "test"}])
+    assert create.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_llm_client_hedged_request() -> None:
+    """Тест что медленный ответ дублируется и используется первый полученный"""
+    calls = 0
+
+    async def create(**kwargs: Any) -> Mock:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(10)
+            return _response("slow")
+        return _response("fast")
+
+    client = _make_client(create)
+    client.hedge_percentile = 95
+    client._latencies.extend([0.01] * 20)
+
+    response = await client.get_response([{"role": "user", "content": "test"}])
+
+    assert response == "fast"
+    assert calls == 2
+    # Медленная попытка отменена и освобождает место в лимитере
+    await asyncio.sleep(0)
+    assert client.limiter.get_stats()["in_flight"] == 0
+
+
+def test_llm_circuit_breaker_per_model() -> None:
+    """Тест что breaker общий для клиентов одной модели и отдельный для разных"""
+    assert get_llm_circuit_breaker("model-a") is get_llm_circuit_breaker("model-a")
+    assert get_llm_circuit_breaker("model-a") is not get_llm_circuit_breaker("model-b")
+
+
+@pytest.mark.asyncio
+async def test_llm_client_cache_breakpoints() -> None:
+    """Тест точек cache_control на system prompt и последнем сообщении истории"""
+    create = AsyncMock(return_value=_response("ok"))
+    client = _make_client(create)
+    client.prompt_cache = True
+    history = [
+        {"role": "user", "content": "Привет"},
+        {"role": "assistant", "content": "Здравствуйте"},
+        {"role": "user", "content": "Какой стиль выбрать?"},
+    ]
+
+    await client.get_response(history)
+
+    sent = create.await_args.kwargs["messages"]
+    assert sent[0]["content"] == [
+        {"type": "text", "text": "prompt", "cache_control": {"type": "ephemeral"}}
+    ]
+    assert sent[1]["content"] == "Привет"
+    assert sent[-1]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+    # Сообщения вызывающего кода не изменяются
+    assert history[-1]["content"] == "Какой стиль выбрать?"
+
+    # Одиночный запрос: кэшируется только system prompt
+    await client.get_response([{"role": "user", "content": "SQL"}])
+    assert create.await_args.kwargs["messages"][1]["content"] == "SQL"
+
+
+def test_llm_client_prompt_cache_only_for_explicit_cache_models(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Тест что cache_control включается только для моделей с явным кэшированием"""
+    monkeypatch.setenv("LLM_PROMPT_CACHE", "true")
+    with patch("src.bot.llm_client.AsyncOpenAI"):
+        assert LLMClient("key", "anthropic/claude-sonnet-4", "prompt").prompt_cache
+        assert not LLMClient("key", "openai/gpt-4o", "prompt").prompt_cache
+        monkeypatch.setenv("LLM_PROMPT_CACHE", "false")
+        assert not LLMClient("key", "anthropic/claude-sonnet-4", "prompt").prompt_cache
+
+
+def test_record_usage_counts_cached_tokens() -> None:
+    """Тест учета входных токенов, прочитанных из кэша префикса"""
+    usage = Mock(
+        prompt_tokens=1000,
+        completion_tokens=50,
+        prompt_tokens_details=Mock(cached_tokens=800),
+    )
+    record_usage("usage/model", Mock(usage=usage))
+    record_usage("usage/model", Mock(usage=None))
+
+    stats = get_all_usage_stats()["usage/model"]
+    assert stats["requests"] == 1
+    assert stats["prompt_tokens"] == 1000
+    assert stats["cached_tokens"] == 800
+    assert stats["completion_tokens"] == 50
+    assert stats["cache_hit_ratio"] == 0.8
+
+
+@pytest.mark.asyncio
+async def test_llm_client_response_cache() -> None:
+    """Тест что повторный запрос с use_cache не отправляется провайдеру"""
+    from src.bot.llm_response_cache import LLMResponseCache
+
+    create = AsyncMock(return_value=_response("SELECT 1"))
+    client = _make_client(create)
+    client.response_cache = LLMResponseCache()
+    messages = [{"role": "user", "content": "Сколько пользователей?"}]
+
+    assert await client.get_response(messages, use_cache=True) == "SELECT 1"
+    assert await client.get_response(messages, use_cache=True) == "SELECT 1"
+    assert create.await_count == 1
+    assert client.response_cache.get_stats()["tokens_saved"] > 0
+
+    # Без use_cache запрос отправляется всегда
+    await client.get_response(messages)
+    assert create.await_count == 2
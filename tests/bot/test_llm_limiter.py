@@ -0,0 +1,159 @@
+"""Тесты для LLMLimiter."""
+
+import asyncio
+import time
+
+import httpx
+import openai
+import pytest
+
+from src.bot.llm_limiter import (
+    PRIORITY_ANALYTICS,
+    PRIORITY_CHAT,
+    PRIORITY_VOICE,
+    LLMLimiter,
+    get_llm_limiter,
+)
+
+
+def _status_error(status_code: int, headers: dict[str, str] | None = None) -> openai.APIStatusError:
+    request = httpx.Request("POST", "https://openrouter.ai/api/v1/chat/completions")
+    response = httpx.Response(status_code, headers=headers, request=request)
+    if status_code == 429:
+        return openai.RateLimitError("rate limited", response=response, body=None)
+    return openai.InternalServerError("server error", response=response, body=None)
+
+
+async def _request(limiter: LLMLimiter, priority: int, name: str, order: list[str]) -> None:
+    async with limiter.slot(priority):
+        order.append(name)
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_priority_order() -> None:
+    """Тест что ожидающие запросы получают место по приоритету"""
+    limiter = LLMLimiter(max_limit=1)
+    order: list[str] = []
+
+    async with limiter.slot():
+        tasks = [
+            asyncio.create_task(_request(limiter, PRIORITY_ANALYTICS, "analytics", order)),
+            asyncio.create_task(_request(limiter, PRIORITY_VOICE, "voice", order)),
+            asyncio.create_task(_request(limiter, PRIORITY_CHAT, "chat", order)),
+        ]
+        await asyncio.sleep(0.01)
+        assert limiter.get_stats()["waiting"] == 3
+    await asyncio.gather(*tasks)
+
+    assert order == ["chat", "voice", "analytics"]
+
+
+@pytest.mark.asyncio
+async def test_limits_concurrency() -> None:
+    """Тест что одновременно выполняется не больше limit запросов"""
+    limiter = LLMLimiter(max_limit=2)
+    peak = 0
+
+    async def request() -> None:
+        nonlocal peak
+        async with limiter.slot():
+            peak = max(peak, limiter.get_stats()["in_flight"])
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(request() for _ in range(6)))
+
+    assert peak == 2
+    assert limiter.get_stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_aimd_decrease_and_recover() -> None:
+    """Тест мультипликативного уменьшения при 5xx и аддитивного восстановления"""
+    limiter = LLMLimiter(max_limit=8)
+
+    for _ in range(2):
+        with pytest.raises(openai.InternalServerError):
+            async with limiter.slot():
+                raise _status_error(502)
+
+    # Вторая ошибка той же волны не уменьшает лимит повторно
+    assert limiter.limit == 4
+    assert limiter.get_stats()["overloaded"] == 2
+
+    for _ in range(30):
+        async with limiter.slot():
+            pass
+    assert limiter.limit == 8
+
+
+@pytest.mark.asyncio
+async def test_slow_response_decreases_limit() -> None:
+    """Тест что ответ медленнее latency_target уменьшает лимит"""
+    limiter = LLMLimiter(max_limit=4, latency_target=0.01)
+
+    async with limiter.slot():
+        await asyncio.sleep(0.03)
+
+    assert limiter.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_requests() -> None:
+    """Тест что Retry-After из 429 приостанавливает новые запросы"""
+    limiter = LLMLimiter(max_limit=4, min_limit=1)
+
+    with pytest.raises(openai.RateLimitError):
+        async with limiter.slot():
+            raise _status_error(429, {"retry-after": "0.1"})
+
+    started_at = time.monotonic()
+    async with limiter.slot():
+        waited = time.monotonic() - started_at
+
+    assert waited >= 0.09
+    stats = limiter.get_stats()
+    assert stats["throttled"] == 1
+    assert stats["decreases"] == 1
+
+
+@pytest.mark.asyncio
+async def test_client_errors_do_not_decrease_limit() -> None:
+    """Тест что ошибки запроса (не перегрузка) не меняют лимит"""
+    limiter = LLMLimiter(max_limit=4)
+
+    with pytest.raises(ValueError):
+        async with limiter.slot():
+            raise ValueError("LLM returned empty response")
+
+    assert limiter.limit == 4
+    assert limiter.get_stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak() -> None:
+    """Тест что отмененный в очереди запрос не занимает место"""
+    limiter = LLMLimiter(max_limit=1)
+
+    async with limiter.slot():
+        waiter = asyncio.create_task(_request(limiter, PRIORITY_CHAT, "cancelled", []))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    async with limiter.slot():
+        stats = limiter.get_stats()
+    assert stats["in_flight"] == 1
+    assert stats["waiting"] == 0
+
+
+def test_invalid_limits() -> None:
+    """Тест валидации лимитов"""
+    with pytest.raises(ValueError, match="min_limit"):
+        LLMLimiter(max_limit=1, min_limit=2)
+
+
+def test_shared_limiter() -> None:
+    """Тест что get_llm_limiter возвращает общий лимитер процесса"""
+    assert get_llm_limiter() is get_llm_limiter()
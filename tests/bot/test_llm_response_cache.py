@@ -0,0 +1,161 @@
+"""Тесты для LLMResponseCache."""
+
+import os
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from src.bot.llm_response_cache import LLMResponseCache, make_cache_key
+
+MESSAGES = [{"role": "user", "content": "Сколько пользователей?"}]
+
+
+def test_make_cache_key_depends_on_model_prompt_and_messages() -> None:
+    """Тест что ключ стабилен и различает модель, prompt и сообщения"""
+    key = make_cache_key("model", "prompt", MESSAGES)
+
+    assert key == make_cache_key("model", "prompt", [dict(MESSAGES[0])])
+    assert key != make_cache_key("other", "prompt", MESSAGES)
+    assert key != make_cache_key("model", "other", MESSAGES)
+    assert key != make_cache_key("model", "prompt", [{"role": "user", "content": "Другое"}])
+
+
+def test_cache_requires_positive_limits() -> None:
+    """Тест валидации параметров"""
+    with pytest.raises(ValueError):
+        LLMResponseCache(ttl_seconds=0)
+    with pytest.raises(ValueError):
+        LLMResponseCache(max_bytes=0)
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_and_miss_stats() -> None:
+    """Тест попадания, промаха и сэкономленных токенов"""
+    cache = LLMResponseCache()
+
+    assert await cache.get("key") is None
+    await cache.set("key", "SELECT 1", tokens=100)
+    assert await cache.get("key") == "SELECT 1"
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+    assert stats["tokens_saved"] == 100
+
+
+@pytest.mark.asyncio
+async def test_cache_entry_expires() -> None:
+    """Тест истечения TTL"""
+    cache = LLMResponseCache(ttl_seconds=10)
+    with patch("src.bot.llm_response_cache.time.time", return_value=1000.0):
+        await cache.set("key", "response", tokens=1)
+    with patch("src.bot.llm_response_cache.time.time", return_value=1010.0):
+        assert await cache.get("key") is None
+    assert cache.get_stats()["entries"] == 0
+    assert cache.get_stats()["bytes"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_evicts_least_recently_used_by_bytes() -> None:
+    """Тест вытеснения давно не использованных записей сверх max_bytes"""
+    # Ключ (1 байт) и ответ (9 байт): помещаются две записи
+    cache = LLMResponseCache(max_bytes=20)
+    await cache.set("a", "x" * 9, tokens=1)
+    await cache.set("b", "x" * 9, tokens=1)
+    await cache.get("a")
+    await cache.set("c", "x" * 9, tokens=1)
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") is not None
+    assert await cache.get("c") is not None
+    assert cache.get_stats()["evictions"] == 1
+    assert cache.get_stats()["bytes"] == 20
+
+    # Запись больше всего кэша в память не попадает
+    await cache.set("d", "x" * 100, tokens=1)
+    assert await cache.get("d") is None
+
+
+@pytest.mark.asyncio
+async def test_cache_disk_tier(tmp_path: Path) -> None:
+    """Тест дискового уровня: запись доступна новому экземпляру кэша"""
+    await LLMResponseCache(disk_dir=str(tmp_path)).set("key", "Ответ", tokens=5)
+
+    cache = LLMResponseCache(disk_dir=str(tmp_path))
+    assert await cache.get("key") == "Ответ"
+    assert cache.get_stats()["disk_hits"] == 1
+    assert cache.get_stats()["entries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_disk_entry_expires(tmp_path: Path) -> None:
+    """Тест удаления истекшей записи с диска"""
+    with patch("src.bot.llm_response_cache.time.time", return_value=1000.0):
+        await LLMResponseCache(ttl_seconds=10, disk_dir=str(tmp_path)).set("key", "x", tokens=1)
+    with patch("src.bot.llm_response_cache.time.time", return_value=1010.0):
+        assert await LLMResponseCache(disk_dir=str(tmp_path)).get("key") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "content",
+    [
+        "not json",
+        "[]",
+        '{"response": "x", "tokens": 1}',
+        '{"response": null, "expires_at": 9999999999, "tokens": 1}',
+        '{"response": "x", "expires_at": "soon", "tokens": 1}',
+    ],
+)
+async def test_cache_disk_malformed_entry_removed(tmp_path: Path, content: str) -> None:
+    """Тест что поврежденная запись на диске считается промахом и удаляется"""
+    (tmp_path / "key.json").write_text(content, encoding="utf-8")
+    cache = LLMResponseCache(disk_dir=str(tmp_path))
+
+    assert await cache.get("key") is None
+    assert cache.get_stats()["misses"] == 1
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_cache_disk_sweep_evicts_oldest_over_limit(tmp_path: Path) -> None:
+    """Тест что запись на диск удаляет самые старые по mtime файлы сверх лимита"""
+    now = time.time()
+    for age, key in [(30, "old"), (20, "middle"), (10, "recent")]:
+        path = tmp_path / f"{key}.json"
+        path.write_text("x" * 100, encoding="utf-8")
+        os.utime(path, (now - age, now - age))
+
+    cache = LLMResponseCache(disk_dir=str(tmp_path), disk_max_bytes=200)
+    await cache.set("new", "Ответ", tokens=1)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["new.json", "recent.json"]
+    assert cache.get_stats()["disk_evictions"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_disk_sweep_removes_expired(tmp_path: Path) -> None:
+    """Тест что очистка удаляет истекшие файлы, даже если лимит объема не превышен"""
+    expired = tmp_path / "expired.json"
+    expired.write_text("{}", encoding="utf-8")
+    os.utime(expired, (time.time() - 20, time.time() - 20))
+
+    cache = LLMResponseCache(ttl_seconds=10, disk_dir=str(tmp_path))
+    await cache.set("new", "Ответ", tokens=1)
+
+    assert [path.name for path in tmp_path.iterdir()] == ["new.json"]
+
+
+@pytest.mark.asyncio
+async def test_cache_disk_sweep_throttled(tmp_path: Path) -> None:
+    """Тест что очистка диска выполняется не чаще DISK_SWEEP_INTERVAL"""
+    cache = LLMResponseCache(disk_dir=str(tmp_path), disk_max_bytes=1)
+    await cache.set("first", "x", tokens=1)
+    await cache.set("second", "x", tokens=1)
+
+    # Первая запись очистила каталог (включая себя), вторая ждет интервала
+    assert [path.name for path in tmp_path.iterdir()] == ["second.json"]
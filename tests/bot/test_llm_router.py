@@ -0,0 +1,227 @@
+"""Тесты для LLMRouter."""
+
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.bot.circuit_breaker import CircuitBreaker, CircuitOpenError
+from src.bot.llm_router import (
+    LLMRouter,
+    create_llm_router,
+    is_simple_turn,
+    parse_models,
+)
+
+
+def _client(model: str, response: Any = None, side_effect: Any = None) -> Mock:
+    client = Mock()
+    client.model = model
+    client.circuit_breaker = CircuitBreaker(model, failure_threshold=1, reset_timeout=60)
+    client.get_response = AsyncMock(return_value=response, side_effect=side_effect)
+    return client
+
+
+MESSAGES = [{"role": "user", "content": "Привет"}]
+
+
+def test_parse_models() -> None:
+    """Тест разбора списка моделей через запятую"""
+    assert parse_models(" model-a , model-b,,") == ["model-a", "model-b"]
+
+
+def test_is_simple_turn() -> None:
+    """Тест эвристики простого хода"""
+    assert is_simple_turn(MESSAGES, max_chars=100)
+    assert not is_simple_turn([{"role": "user", "content": "x" * 101}], max_chars=100)
+    assert not is_simple_turn(MESSAGES * 3, max_chars=100)
+    image = [{"role": "user", "content": [{"type": "image_url", "image_url": {"url": "..."}}]}]
+    assert not is_simple_turn(image, max_chars=100)
+
+
+@pytest.mark.asyncio
+async def test_primary_model_used() -> None:
+    """Тест что запрос уходит первой модели, priority передается"""
+    primary = _client("primary", "primary answer")
+    backup = _client("backup", "backup answer")
+    router = LLMRouter([primary, backup])
+
+    assert await router.get_response(MESSAGES, priority=1) == "primary answer"
+    primary.get_response.assert_awaited_once_with(MESSAGES, priority=1, use_cache=False)
+    backup.get_response.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_fallback_on_error() -> None:
+    """Тест fallback на следующую модель при ошибке"""
+    primary = _client("primary", side_effect=ConnectionError("down"))
+    backup = _client("backup", "backup answer")
+    router = LLMRouter([primary, backup])
+
+    assert await router.get_response(MESSAGES) == "backup answer"
+    stats = router.get_stats()
+    assert stats["fallbacks"] == 1
+    assert stats["models"]["primary"]["error_rate"] == 1.0
+
+
+@pytest.mark.asyncio
+async def test_fallback_on_timeout() -> None:
+    """Тест fallback при ответе дольше fallback_timeout"""
+
+    async def slow(*args: Any, **kwargs: Any) -> str:
+        await asyncio.sleep(10)
+        return "late"
+
+    primary = _client("primary", side_effect=slow)
+    backup = _client("backup", "backup answer")
+    router = LLMRouter([primary, backup], fallback_timeout=0.01)
+
+    assert await router.get_response(MESSAGES) == "backup answer"
+    assert router.get_stats()["models"]["primary"]["requests"] == 1
+
+
+@pytest.mark.asyncio
+async def test_last_model_error_raised() -> None:
+    """Тест что ошибка последней модели пробрасывается"""
+    router = LLMRouter(
+        [
+            _client("primary", side_effect=ConnectionError("down")),
+            _client("backup", side_effect=CircuitOpenError("backup unavailable")),
+        ]
+    )
+
+    with pytest.raises(CircuitOpenError):
+        await router.get_response(MESSAGES)
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_model_demoted() -> None:
+    """Тест что модель с частыми ошибками опускается в конец списка"""
+    primary = _client("primary", side_effect=ConnectionError("down"))
+    backup = _client("backup", "backup answer")
+    router = LLMRouter([primary, backup])
+
+    for _ in range(5):
+        await router.get_response(MESSAGES)
+    primary.get_response.reset_mock()
+
+    assert await router.get_response(MESSAGES) == "backup answer"
+    primary.get_response.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_demoted_model_recovers_after_probe() -> None:
+    """Тест что опущенная модель получает пробу и после успеха возвращается на место"""
+    primary = _client("primary", side_effect=ConnectionError("down"))
+    backup = _client("backup", "backup answer")
+    router = LLMRouter([primary, backup], probe_interval=60)
+
+    for _ in range(5):
+        await router.get_response(MESSAGES)
+    assert router._get_candidates(MESSAGES) == [backup, primary]
+
+    # Модель восстановилась, но до конца интервала запросы к ней не идут
+    primary.get_response = AsyncMock(return_value="primary answer")
+    assert await router.get_response(MESSAGES) == "backup answer"
+    primary.get_response.assert_not_called()
+
+    router._last_called["primary"] -= 60
+    assert await router.get_response(MESSAGES) == "primary answer"
+    assert router.get_stats()["probes"] == 1
+
+    # После успешной пробы модель снова основная без ожидания
+    assert await router.get_response(MESSAGES) == "primary answer"
+    assert router._get_candidates(MESSAGES) == [primary, backup]
+
+
+@pytest.mark.asyncio
+async def test_failed_probe_falls_back() -> None:
+    """Тест что неудачная проба уходит следующей модели и откладывает следующую"""
+    primary = _client("primary", side_effect=ConnectionError("down"))
+    backup = _client("backup", "backup answer")
+    router = LLMRouter([primary, backup], probe_interval=60)
+
+    for _ in range(5):
+        await router.get_response(MESSAGES)
+    router._last_called["primary"] -= 60
+    primary.get_response.reset_mock()
+
+    assert await router.get_response(MESSAGES) == "backup answer"
+    assert await router.get_response(MESSAGES) == "backup answer"
+    primary.get_response.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_slower_model_demoted_by_latency() -> None:
+    """Тест что более медленная основная модель уступает место более быстрой"""
+    primary = _client("primary", "primary answer")
+    backup = _client("backup", "backup answer")
+    fresh = _client("fresh", "fresh answer")
+    router = LLMRouter([primary, fresh, backup])
+
+    # Без статистики задержки порядок из конфигурации
+    assert router._get_candidates(MESSAGES) == [primary, fresh, backup]
+
+    for _ in range(5):
+        router._record(primary, ok=True, latency=8.0)
+        router._record(backup, ok=True, latency=1.0)
+
+    # Измеренные модели меняются местами, модель без статистики остается на своем
+    assert router._get_candidates(MESSAGES) == [backup, fresh, primary]
+    assert await router.get_response(MESSAGES) == "backup answer"
+    primary.get_response.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_demoted() -> None:
+    """Тест что модель с разомкнутым breaker опускается в конец списка"""
+    primary = _client("primary", "primary answer")
+    backup = _client("backup", "backup answer")
+    with pytest.raises(ConnectionError), primary.circuit_breaker.call():
+        raise ConnectionError("down")
+    router = LLMRouter([primary, backup])
+
+    assert await router.get_response(MESSAGES) == "backup answer"
+    primary.get_response.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_fast_model_for_simple_turn() -> None:
+    """Тест что простой ход уходит быстрой модели, а сложный - основной"""
+    primary = _client("primary", "primary answer")
+    fast = _client("fast", "fast answer")
+    router = LLMRouter([primary], fast_client=fast, fast_max_chars=100)
+
+    assert await router.get_response(MESSAGES) == "fast answer"
+    history = [*MESSAGES, {"role": "assistant", "content": "..."}, *MESSAGES]
+    assert await router.get_response(history) == "primary answer"
+    assert router.get_stats()["fast_routed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fast_model_falls_back() -> None:
+    """Тест что при ошибке быстрой модели запрос уходит основной"""
+    primary = _client("primary", "primary answer")
+    fast = _client("fast", side_effect=ConnectionError("down"))
+    router = LLMRouter([primary], fast_client=fast)
+
+    assert await router.get_response(MESSAGES) == "primary answer"
+
+
+def test_with_system_prompt() -> None:
+    """Тест маршрутизатора с другим prompt: те же модели, без быстрой модели"""
+    router = create_llm_router("key", "model-a,model-b", "prompt", fast_model="fast")
+
+    text2sql = router.with_system_prompt("text2sql prompt")
+
+    assert [client.model for client in text2sql.clients] == ["model-a", "model-b"]
+    assert text2sql.clients[0].system_prompt == "text2sql prompt"
+    assert text2sql.clients[0].client is router.clients[0].client
+    assert text2sql.fast_client is None
+
+
+def test_empty_models() -> None:
+    """Тест валидации пустого списка моделей"""
+    with pytest.raises(ValueError, match="at least one model"):
+        create_llm_router("key", " , ", "prompt")
@@ -24,6 +24,8 @@ def test_setup_logging():
 @patch("src.bot.main.Config")
 @patch("src.bot.main.create_engine")
 @patch("src.bot.main.create_session_factory")
+@patch("src.bot.main.warm_up_pool", new_callable=AsyncMock)
+@patch("src.bot.main.dispose_engines", new_callable=AsyncMock)
 @patch("src.bot.main.MessageHandler")
 @patch("src.bot.main.CommandHandler")
 @patch("src.bot.main.TelegramBot")
@@ -31,6 +33,8 @@ async def test_main_initialization(
     mock_bot_class,
     mock_cmd_handler_class,
     mock_msg_handler_class,
+    mock_dispose_engines,
+    mock_warm_up_pool,
     mock_session_factory_func,
     mock_engine_func,
     mock_config_class,
@@ -41,11 +45,19 @@ async def test_main_initialization(
     mock_config.telegram_token = "test_token"
     mock_config.openrouter_api_key = "test_key"
     mock_config.openrouter_model = "test_model"
+    mock_config.fast_model = None
     mock_config.system_prompt = "test_prompt"
     mock_config.max_history = 20
+    mock_config.context_token_budget = 8000
+    mock_config.conversation_summary = False
+    mock_config.image_history_turns = 2
+    mock_config.faq_cache = False
     mock_config.whisper_model = "base"
     mock_config.whisper_device = "cpu"
     mock_config.database_url = "sqlite+aiosqlite:///:memory:"
+    mock_config.admission_max_concurrency = 4
+    mock_config.admission_max_queue = 8
+    mock_config.admission_queue_timeout = 2.0
     mock_config_class.return_value = mock_config
 
     mock_engine = AsyncMock()
@@ -91,6 +103,33 @@ async def test_main_initialization(
 
     # Проверяем, что TelegramBot был создан с правильными параметрами
     mock_bot_class.assert_called_once()
+    admission = mock_bot_class.call_args.kwargs["admission"]
+    assert admission.max_concurrency == 4
+    assert admission.max_queue == 8
 
-    # Проверяем, что engine.dispose был вызван при завершении
-    mock_engine.dispose.assert_awaited_once()
+    # Проверяем, что загрузка Whisper запускается в фоне после старта polling
+    mock_bot.dp.startup.register.assert_called_once()
+
+    # Проверяем, что пул прогрет при старте
+    mock_warm_up_pool.assert_awaited_once_with(mock_engine)
+
+    # Проверяем, что соединения закрыты при завершении
+    mock_dispose_engines.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@patch("src.bot.main.Config")
+@patch("src.bot.main.run_webhook", new_callable=AsyncMock)
+@patch("src.bot.main.create_telegram_bot", new_callable=AsyncMock)
+async def test_main_webhook_mode(mock_create_bot, mock_run_webhook, mock_config_class):
+    """Тест запуска webhook режима вместо polling"""
+    mock_config = Mock()
+    mock_config.bot_mode = "webhook"
+    mock_config_class.return_value = mock_config
+
+    from src.bot.main import main
+
+    await main()
+
+    mock_run_webhook.assert_awaited_once_with(mock_config)
+    mock_create_bot.assert_not_awaited()
@@ -90,15 +90,91 @@ async def test_download_photo_error() -> None:
 
 
 def test_media_processor_init_whisper() -> None:
-    """🔴 RED: Тест инициализации MediaProcessor с Faster-Whisper."""
+    """Тест: создание MediaProcessor не загружает модель Faster-Whisper."""
+    from unittest.mock import patch
+
     from src.bot.media_processor import MediaProcessor
 
     # Act - создание процессора с параметрами Whisper
-    processor = MediaProcessor(whisper_model="base", whisper_device="cpu")
+    with patch("faster_whisper.WhisperModel") as mock_whisper:
+        processor = MediaProcessor(whisper_model="base", whisper_device="cpu")
+
+    # Assert - модель не загружена до start_loading()
+    mock_whisper.assert_not_called()
+    assert processor.whisper is None
+    assert processor.is_ready is False
+
+
+@pytest.mark.asyncio
+async def test_start_loading_in_background() -> None:
+    """Тест: фоновая загрузка модели и флаг готовности."""
+    from unittest.mock import MagicMock, patch
+
+    from src.bot.media_processor import MediaProcessor
+
+    with patch("faster_whisper.WhisperModel") as mock_whisper:
+        mock_whisper.return_value = MagicMock()
+        processor = MediaProcessor(whisper_model="tiny", whisper_device="cpu")
+
+        task = processor.start_loading()
+        assert processor.start_loading() is task  # повторный вызов - та же задача
+        await task
+
+    mock_whisper.assert_called_once_with("tiny", device="cpu", compute_type="int8")
+    assert processor.is_ready is True
+
+
+@pytest.mark.asyncio
+async def test_voice_waits_for_model_loading() -> None:
+    """Тест: голосовое сообщение до готовности модели ждет окончания загрузки."""
+    import asyncio
+    import threading
+    from unittest.mock import MagicMock, patch
+
+    from src.bot.media_processor import MediaProcessor
+
+    model_can_load = threading.Event()
+    mock_whisper_instance = MagicMock()
+    mock_whisper_instance.transcribe.return_value = ([MagicMock(text="Привет")], MagicMock())
+
+    def slow_load(*args, **kwargs):  # type: ignore[no-untyped-def]
+        model_can_load.wait(timeout=5)
+        return mock_whisper_instance
+
+    with patch("faster_whisper.WhisperModel", side_effect=slow_load):
+        processor = MediaProcessor(whisper_model="base", whisper_device="cpu")
+        processor.start_loading()
+
+        transcription = asyncio.create_task(processor.transcribe_audio(b"fake_ogg"))
+        await asyncio.sleep(0.05)
+        assert not transcription.done()
+        assert processor.is_ready is False
+
+        model_can_load.set()
+        assert await transcription == "Привет"
+
+    assert processor.is_ready is True
+
+
+@pytest.mark.asyncio
+async def test_model_loading_error_is_retried() -> None:
+    """Тест: ошибка загрузки модели пробрасывается, следующий вызов повторяет загрузку."""
+    from unittest.mock import MagicMock, patch
+
+    from src.bot.media_processor import MediaProcessor
+
+    with patch(
+        "faster_whisper.WhisperModel", side_effect=[OSError("download failed"), MagicMock()]
+    ):
+        processor = MediaProcessor(whisper_model="base", whisper_device="cpu")
+
+        with pytest.raises(OSError, match="download failed"):
+            await processor.wait_ready()
+        assert processor.is_ready is False
+
+        await processor.wait_ready()
 
-    # Assert - проверяем что процессор создан и имеет whisper атрибут
-    assert hasattr(processor, "whisper")
-    assert processor.whisper is not None
+    assert processor.is_ready is True
 
 
 @pytest.mark.asyncio
@@ -137,7 +213,7 @@ async def test_transcribe_audio() -> None:
     from src.bot.media_processor import MediaProcessor
 
     # Arrange - мокируем Faster-Whisper
-    with patch("src.bot.media_processor.WhisperModel") as mock_whisper:
+    with patch("faster_whisper.WhisperModel") as mock_whisper:
         mock_whisper_instance = MagicMock()
 
         # Мокируем результат транскрибации
@@ -168,7 +244,7 @@ async def test_transcribe_audio_error_handling() -> None:
     from src.bot.media_processor import MediaProcessor
 
     # Arrange - мокируем Faster-Whisper с ошибкой
-    with patch("src.bot.media_processor.WhisperModel") as mock_whisper:
+    with patch("faster_whisper.WhisperModel") as mock_whisper:
         mock_whisper_instance = MagicMock()
         mock_whisper_instance.transcribe.side_effect = Exception("Whisper transcription error")
         mock_whisper.return_value = mock_whisper_instance
@@ -4,7 +4,8 @@ from unittest.mock import AsyncMock, Mock
 
 import pytest
 
-from src.bot.interfaces import DialogueStorage, LLMProvider, MediaProvider
+from src.bot.interfaces import DialogueStorage, FAQProvider, LLMProvider, MediaProvider
+from src.bot.llm_limiter import PRIORITY_CHAT, PRIORITY_VOICE
 from src.bot.message_handler import MessageHandler
 
 
@@ -77,7 +78,65 @@ async def test_handle_user_message(
     mock_dialogue_storage.add_message.assert_any_await(123, "user", "Hello")
     mock_dialogue_storage.add_message.assert_any_await(123, "assistant", "Test LLM response")
     mock_dialogue_storage.get_history.assert_awaited_once_with(123)
-    mock_llm_provider.get_response.assert_called_once()
+    mock_llm_provider.get_response.assert_called_once_with(
+        [], priority=PRIORITY_CHAT, use_cache=False
+    )
+
+
+@pytest.mark.asyncio
+async def test_handle_user_message_first_turn_uses_cache(
+    mock_llm_provider: Mock, mock_dialogue_storage: AsyncMock
+) -> None:
+    """Тест: первый вопрос без истории разрешено брать из кэша ответов."""
+    history = [{"role": "user", "content": "Hello"}]
+    mock_dialogue_storage.get_history = AsyncMock(return_value=history)
+    handler = MessageHandler(mock_llm_provider, mock_dialogue_storage)
+
+    await handler.handle_user_message(123, "testuser", "Hello")
+
+    mock_llm_provider.get_response.assert_called_once_with(
+        history, priority=PRIORITY_CHAT, use_cache=True
+    )
+
+
+@pytest.mark.asyncio
+async def test_handle_user_message_first_turn_answered_from_faq(
+    mock_llm_provider: Mock, mock_dialogue_storage: AsyncMock
+) -> None:
+    """Тест: ответ на первый вопрос из FAQ без запроса к LLM."""
+    mock_dialogue_storage.get_history = AsyncMock(return_value=[{"role": "user", "content": "Hi"}])
+    faq_provider = AsyncMock(spec=FAQProvider)
+    faq_provider.match.return_value = "FAQ answer"
+    handler = MessageHandler(mock_llm_provider, mock_dialogue_storage, faq_provider=faq_provider)
+
+    response = await handler.handle_user_message(123, "testuser", "Hi")
+
+    assert response == "FAQ answer"
+    faq_provider.match.assert_awaited_once_with("Hi")
+    mock_llm_provider.get_response.assert_not_called()
+    faq_provider.add_candidate.assert_not_awaited()
+    mock_dialogue_storage.add_message.assert_any_await(123, "assistant", "FAQ answer")
+
+
+@pytest.mark.asyncio
+async def test_handle_user_message_faq_miss_suggests_candidate(
+    mock_llm_provider: Mock, mock_dialogue_storage: AsyncMock
+) -> None:
+    """Тест: без ответа в FAQ ответ LLM предлагается кандидатом, FAQ только на первом ходе."""
+    mock_dialogue_storage.get_history = AsyncMock(return_value=[{"role": "user", "content": "Hi"}])
+    faq_provider = AsyncMock(spec=FAQProvider)
+    faq_provider.match.return_value = None
+    handler = MessageHandler(mock_llm_provider, mock_dialogue_storage, faq_provider=faq_provider)
+
+    response = await handler.handle_user_message(123, "testuser", "Hi")
+
+    assert response == "Test LLM response"
+    faq_provider.add_candidate.assert_awaited_once_with("Hi", "Test LLM response")
+
+    # Не первый ход: FAQ не используется
+    mock_dialogue_storage.get_history = AsyncMock(return_value=[{}, {}, {}])
+    await handler.handle_user_message(123, "testuser", "Hi again")
+    faq_provider.match.assert_awaited_once()
 
 
 @pytest.mark.asyncio
@@ -126,6 +185,9 @@ async def test_handle_photo_message_with_caption(
     assert content[1]["type"] == "image_url"
     assert "data:image/jpeg;base64,fake_base64_string" in content[1]["image_url"]["url"]
 
+    # Ответ на фото сохраняется как описание изображения
+    mock_dialogue_storage.describe_last_image.assert_awaited_once_with(123, "Test LLM response")
+
 
 @pytest.mark.asyncio
 async def test_handle_photo_message_without_caption(
@@ -235,6 +297,9 @@ async def test_handle_voice_message() -> None:
     assert user_message_call[0][1] == "user"  # role
     assert user_message_call[0][2] == "Привет HomeGuru, как дела?"  # transcribed text
 
+    # Голосовые идут к LLM с приоритетом ниже текстовых
+    assert mock_llm.get_response.call_args.kwargs["priority"] == PRIORITY_VOICE
+
 
 @pytest.mark.asyncio
 async def test_handle_voice_message_without_media_provider() -> None:
@@ -272,3 +337,148 @@ async def test_handle_voice_message_transcription_error() -> None:
         await handler.handle_voice_message(
             user_id=123, username="testuser", voice_file_id="voice123", bot=mock_bot
         )
+
+
+@pytest.mark.asyncio
+async def test_debounce_merges_consecutive_messages(
+    mock_llm_provider: Mock, mock_dialogue_storage: AsyncMock
+) -> None:
+    """Тест: быстрые сообщения подряд объединяются в один вызов on_ready."""
+    import asyncio
+
+    handler = MessageHandler(mock_llm_provider, mock_dialogue_storage, debounce_ms=50)
+    first_ready = AsyncMock()
+    last_ready = AsyncMock()
+
+    handler.debounce(1, "Привет", first_ready)
+    await asyncio.sleep(0.02)
+    handler.debounce(1, "Хочу обновить", first_ready)
+    await asyncio.sleep(0.02)
+    handler.debounce(1, "гостиную", last_ready)
+    await asyncio.sleep(0.1)
+
+    # Один ход с объединенным текстом, ответ - на последнее сообщение
+    first_ready.assert_not_awaited()
+    last_ready.assert_awaited_once_with("Привет\nХочу обновить\nгостиную")
+
+
+@pytest.mark.asyncio
+async def test_debounce_separates_users_and_windows(
+    mock_llm_provider: Mock, mock_dialogue_storage: AsyncMock
+) -> None:
+    """Тест: пачки разных пользователей и разделенные паузой сообщения не объединяются."""
+    import asyncio
+
+    handler = MessageHandler(mock_llm_provider, mock_dialogue_storage, debounce_ms=30)
+    on_ready = AsyncMock()
+
+    handler.debounce(1, "first user", on_ready)
+    handler.debounce(2, "second user", on_ready)
+    await asyncio.sleep(0.08)
+    handler.debounce(1, "after pause", on_ready)
+    await asyncio.sleep(0.08)
+
+    assert [c.args[0] for c in on_ready.await_args_list] == [
+        "first user",
+        "second user",
+        "after pause",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_debounce_runs_in_clean_context(
+    mock_llm_provider: Mock, mock_dialogue_storage: AsyncMock
+) -> None:
+    """Тест: on_ready не наследует unit of work обработчика update."""
+    import asyncio
+    from unittest.mock import MagicMock
+
+    from src.bot.unit_of_work import current_session, unit_of_work
+
+    handler = MessageHandler(mock_llm_provider, mock_dialogue_storage, debounce_ms=10)
+    sessions = []
+
+    async def on_ready(text: str) -> None:
+        sessions.append(current_session())
+
+    context = AsyncMock()
+    context.__aenter__.return_value = AsyncMock()
+    async with unit_of_work(MagicMock(return_value=context)):
+        handler.debounce(1, "text", on_ready)
+    await asyncio.sleep(0.05)
+
+    assert sessions == [None]
+
+
+@pytest.mark.asyncio
+async def test_transcribe_voice(
+    mock_llm_provider: Mock,
+    mock_dialogue_storage: AsyncMock,
+    mock_media_provider: AsyncMock,
+) -> None:
+    """Тест: распознавание голосового без хода диалога (для debounce)."""
+    handler = MessageHandler(
+        mock_llm_provider, mock_dialogue_storage, media_provider=mock_media_provider
+    )
+
+    text = await handler.transcribe_voice(1, "voice_file_id", Mock())
+
+    assert text == "Fake transcribed text"
+    mock_dialogue_storage.add_message.assert_not_called()
+    mock_llm_provider.get_response.assert_not_called()
+    # Соединение с БД не ждет скачивания и распознавания
+    mock_dialogue_storage.release_connection.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_save_user_message_before_turn(
+    mock_llm_provider: Mock, mock_dialogue_storage: AsyncMock
+) -> None:
+    """Тест: заранее сохраненное сообщение пользователя не добавляется повторно."""
+    handler = MessageHandler(mock_llm_provider, mock_dialogue_storage)
+
+    await handler.save_user_message(123, "Hi")
+    mock_dialogue_storage.release_connection.assert_awaited_once()
+    await handler.handle_user_message(123, "testuser", "Hi", user_message_saved=True)
+
+    user_messages = [
+        call for call in mock_dialogue_storage.add_message.await_args_list if call.args[1] == "user"
+    ]
+    assert len(user_messages) == 1
+
+
+@pytest.mark.asyncio
+async def test_handle_user_message_releases_connection_before_llm(
+    mock_llm_provider: Mock, mock_dialogue_storage: AsyncMock
+) -> None:
+    """Тест: сообщение пользователя фиксируется до ожидания ответа LLM."""
+
+    async def get_response(*args: object, **kwargs: object) -> str:
+        mock_dialogue_storage.release_connection.assert_awaited_once()
+        return "Test LLM response"
+
+    mock_llm_provider.get_response.side_effect = get_response
+    handler = MessageHandler(mock_llm_provider, mock_dialogue_storage)
+
+    response = await handler.handle_user_message(123, "testuser", "Hi")
+
+    assert response == "Test LLM response"
+    mock_dialogue_storage.add_message.assert_any_await(123, "user", "Hi")
+
+
+@pytest.mark.asyncio
+async def test_cancel_pending_drops_batch(
+    mock_llm_provider: Mock, mock_dialogue_storage: AsyncMock
+) -> None:
+    """Тест: накопленная пачка отменяется (/reset) и on_ready не вызывается."""
+    import asyncio
+
+    handler = MessageHandler(mock_llm_provider, mock_dialogue_storage, debounce_ms=20)
+    on_ready = AsyncMock()
+
+    handler.debounce(1, "old dialogue", on_ready)
+    handler.cancel_pending(1)
+    await asyncio.sleep(0.05)
+
+    on_ready.assert_not_awaited()
+    handler.cancel_pending(1)  # нет пачки - ничего не происходит
@@ -0,0 +1,31 @@
+"""Тесты для локальной оценки токенов."""
+
+from src.bot.token_estimator import (
+    IMAGE_TOKENS,
+    MESSAGE_OVERHEAD_TOKENS,
+    estimate_text_tokens,
+    estimate_tokens,
+)
+
+
+def test_estimate_text_tokens() -> None:
+    """Тест оценки текста: латиница ~4 символа на токен, кириллица ~2"""
+    assert estimate_text_tokens("") == 0
+    assert estimate_text_tokens("a" * 40) == 10
+    assert estimate_text_tokens("я" * 40) == 20
+
+
+def test_estimate_tokens_formats() -> None:
+    """Тест что строка и {"text": ...} оцениваются одинаково, с учетом служебных токенов"""
+    assert estimate_tokens("a" * 40) == 10 + MESSAGE_OVERHEAD_TOKENS
+    assert estimate_tokens({"text": "a" * 40}) == estimate_tokens("a" * 40)
+
+
+def test_estimate_tokens_with_images() -> None:
+    """Тест что изображение оценивается в vision токенах"""
+    content = [
+        {"type": "text", "text": "a" * 40},
+        {"type": "image_url", "image_url": {"url": "data:image/jpeg;base64," + "A" * 100000}},
+    ]
+
+    assert estimate_tokens(content) == 10 + IMAGE_TOKENS + MESSAGE_OVERHEAD_TOKENS
@@ -0,0 +1,93 @@
+"""
+Тесты для unit_of_work.
+
+Проверяем commit/rollback, переиспользование сессии во вложенных unit of work
+и работу репозиториев без auto commit.
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.bot.repository import MessageRepository
+from src.bot.unit_of_work import current_session, release_connection, unit_of_work
+
+
+@pytest.fixture
+def session() -> AsyncMock:
+    """Мокированная AsyncSession."""
+    session = AsyncMock()
+    session.add = MagicMock()
+    return session
+
+
+@pytest.fixture
+def session_factory(session: AsyncMock) -> MagicMock:
+    """Фабрика, возвращающая одну и ту же мокированную сессию."""
+    context = AsyncMock()
+    context.__aenter__.return_value = session
+    context.__aexit__.return_value = False
+    return MagicMock(return_value=context)
+
+
+@pytest.mark.asyncio
+async def test_commit_on_success(session, session_factory) -> None:
+    """Тест commit при успешном выходе"""
+    async with unit_of_work(session_factory) as uow_session:
+        assert uow_session is session
+        assert current_session() is session
+
+    session.commit.assert_awaited_once()
+    session.rollback.assert_not_awaited()
+    assert current_session() is None
+
+
+@pytest.mark.asyncio
+async def test_rollback_on_error(session, session_factory) -> None:
+    """Тест rollback при исключении"""
+    with pytest.raises(RuntimeError):
+        async with unit_of_work(session_factory):
+            raise RuntimeError("boom")
+
+    session.rollback.assert_awaited_once()
+    session.commit.assert_not_awaited()
+    assert current_session() is None
+
+
+@pytest.mark.asyncio
+async def test_nested_unit_of_work_reuses_session(session, session_factory) -> None:
+    """Тест что вложенный unit of work использует сессию внешнего и не коммитит"""
+    async with unit_of_work(session_factory) as outer:
+        async with unit_of_work(session_factory) as inner:
+            assert inner is outer
+        session.commit.assert_not_awaited()
+
+    session_factory.assert_called_once()
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_repository_flushes_inside_unit_of_work(session, session_factory) -> None:
+    """Тест что репозиторий без auto commit делает flush, а commit - unit of work"""
+    async with unit_of_work(session_factory) as uow_session:
+        repository = MessageRepository(uow_session, auto_commit=False)
+        await repository.add_message(1, "user", "Hello")
+        await repository.add_message(1, "assistant", "Hi")
+        assert session.flush.await_count == 2
+        session.commit.assert_not_awaited()
+
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_release_connection_commits_and_keeps_session(session, session_factory) -> None:
+    """Тест что release_connection фиксирует транзакцию, а сессия остается текущей"""
+    await release_connection()  # без unit of work ничего не делает
+
+    async with unit_of_work(session_factory) as uow_session:
+        await release_connection()
+        session.commit.assert_awaited_once()
+        assert current_session() is uow_session
+
+    assert session.commit.await_count == 2
+    session_factory.assert_called_once()
@@ -0,0 +1,124 @@
+"""
+Тесты для UserLockMiddleware.
+
+Используем настоящий Dispatcher: event_from_user заполняется aiogram до middleware.
+"""
+
+import asyncio
+from typing import Any
+
+import pytest
+from aiogram import Bot, Dispatcher
+from aiogram.types import Message
+
+from src.bot.user_lock_middleware import UserLockMiddleware, get_cancel_reason
+from src.bot.user_lock_registry import UserLockRegistry
+
+
+def _update(update_id: int, user_id: int, text: str) -> dict[str, Any]:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "Test"},
+            "text": text,
+        },
+    }
+
+
+def _dispatcher(cancel_on_message: bool = False) -> tuple[Dispatcher, UserLockRegistry, list[str]]:
+    registry = UserLockRegistry()
+    events: list[str] = []
+    dp = Dispatcher()
+    dp.update.outer_middleware(UserLockMiddleware(registry, cancel_on_message))
+
+    @dp.message()
+    async def handler(message: Message) -> None:
+        events.append(f"start {message.text}")
+        await asyncio.sleep(0.02)
+        events.append(f"end {message.text}")
+
+    return dp, registry, events
+
+
+@pytest.fixture
+def dispatcher_events() -> tuple[Dispatcher, UserLockRegistry, list[str]]:
+    """Dispatcher с UserLockMiddleware и обработчиком, записывающим события."""
+    return _dispatcher()
+
+
+@pytest.mark.asyncio
+async def test_messages_of_one_user_sequential(dispatcher_events) -> None:
+    """Тест что два быстрых сообщения пользователя обрабатываются по очереди"""
+    dp, registry, events = dispatcher_events
+    bot = Bot(token="123456:TEST")
+
+    await asyncio.gather(
+        dp.feed_raw_update(bot, _update(1, 10, "first")),
+        dp.feed_raw_update(bot, _update(2, 10, "second")),
+    )
+
+    assert events == ["start first", "end first", "start second", "end second"]
+    assert registry.get_stats()["active_users"] == 0
+
+
+@pytest.mark.asyncio
+async def test_messages_of_different_users_parallel(dispatcher_events) -> None:
+    """Тест что сообщения разных пользователей обрабатываются параллельно"""
+    dp, _, events = dispatcher_events
+    bot = Bot(token="123456:TEST")
+
+    await asyncio.gather(
+        dp.feed_raw_update(bot, _update(1, 10, "first")),
+        dp.feed_raw_update(bot, _update(2, 20, "second")),
+    )
+
+    assert events[:2] == ["start first", "start second"]
+
+
+async def _feed_with_delay(dp: Dispatcher, bot: Bot, update: dict[str, Any]) -> None:
+    await asyncio.sleep(0.01)
+    await dp.feed_raw_update(bot, update)
+
+
+@pytest.mark.asyncio
+async def test_reset_cancels_in_flight_message() -> None:
+    """Тест что /reset отменяет обработку предыдущего сообщения, а не ждет ее"""
+    dp, registry, events = _dispatcher()
+    bot = Bot(token="123456:TEST")
+
+    await asyncio.gather(
+        dp.feed_raw_update(bot, _update(1, 10, "question")),
+        _feed_with_delay(dp, bot, _update(2, 10, "/reset")),
+    )
+
+    assert events == ["start question", "start /reset", "end /reset"]
+    assert registry.get_stats()["cancelled_reset"] == 1
+
+
+@pytest.mark.asyncio
+async def test_new_message_supersedes_when_enabled() -> None:
+    """Тест что с cancel_on_message новое сообщение отменяет обработку предыдущего"""
+    dp, registry, events = _dispatcher(cancel_on_message=True)
+    bot = Bot(token="123456:TEST")
+
+    await asyncio.gather(
+        dp.feed_raw_update(bot, _update(1, 10, "first")),
+        _feed_with_delay(dp, bot, _update(2, 10, "second")),
+    )
+
+    assert events == ["start first", "start second", "end second"]
+    assert registry.get_stats()["cancelled_superseded"] == 1
+
+
+def test_cancel_reason() -> None:
+    """Тест причины отмены для разных сообщений"""
+    assert get_cancel_reason("/reset", False) == "reset"
+    assert get_cancel_reason("/reset@HomeGuruBot", False) == "reset"
+    assert get_cancel_reason("/resetting", False) is None
+    assert get_cancel_reason("Привет", False) is None
+    assert get_cancel_reason(None, False) is None
+    assert get_cancel_reason("Привет", True) == "superseded"
+    assert get_cancel_reason("/reset", True) == "reset"
@@ -0,0 +1,147 @@
+"""Тесты для UserLockRegistry."""
+
+import asyncio
+
+import pytest
+
+from src.bot.user_lock_registry import UserLockRegistry
+
+
+async def _hold(registry: UserLockRegistry, user_id: int, name: str, events: list[str]) -> None:
+    async with registry.lock(user_id):
+        events.append(f"start {name}")
+        await asyncio.sleep(0.02)
+        events.append(f"end {name}")
+
+
+@pytest.mark.asyncio
+async def test_same_user_sequential() -> None:
+    """Тест что обработчики одного пользователя выполняются по очереди в порядке вызова"""
+    registry = UserLockRegistry()
+    events: list[str] = []
+
+    await asyncio.gather(*(_hold(registry, 1, name, events) for name in ("a", "b", "c")))
+
+    assert events == ["start a", "end a", "start b", "end b", "start c", "end c"]
+
+
+@pytest.mark.asyncio
+async def test_different_users_parallel() -> None:
+    """Тест что разные пользователи обрабатываются параллельно"""
+    registry = UserLockRegistry()
+    events: list[str] = []
+
+    await asyncio.gather(_hold(registry, 1, "a", events), _hold(registry, 2, "b", events))
+
+    assert events[:2] == ["start a", "start b"]
+
+
+@pytest.mark.asyncio
+async def test_idle_locks_removed() -> None:
+    """Тест что блокировки удаляются, когда у пользователя нет сообщений в обработке"""
+    registry = UserLockRegistry()
+    events: list[str] = []
+
+    await asyncio.gather(*(_hold(registry, user_id, "x", events) for user_id in range(100)))
+
+    assert registry.get_stats()["active_users"] == 0
+
+
+@pytest.mark.asyncio
+async def test_lock_released_on_error() -> None:
+    """Тест что блокировка освобождается и удаляется при исключении"""
+    registry = UserLockRegistry()
+
+    with pytest.raises(RuntimeError):
+        async with registry.lock(1):
+            raise RuntimeError("boom")
+
+    assert registry.get_stats()["active_users"] == 0
+    async with registry.lock(1):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_stats_waiting() -> None:
+    """Тест статистики ожидающих сообщений"""
+    registry = UserLockRegistry()
+    events: list[str] = []
+
+    tasks = [asyncio.create_task(_hold(registry, 1, name, events)) for name in ("a", "b", "c")]
+    await asyncio.sleep(0.005)
+    stats = registry.get_stats()
+    await asyncio.gather(*tasks)
+
+    assert stats == {"active_users": 1, "waiting": 2, "max_waiting": 2, "cancelled": 0}
+
+
+@pytest.mark.asyncio
+async def test_run_returns_result() -> None:
+    """Тест что run выполняет обработку под блокировкой и возвращает результат"""
+    registry = UserLockRegistry()
+
+    async def work() -> str:
+        return "done"
+
+    assert await registry.run(1, work()) == "done"
+    assert registry.get_stats()["active_users"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancel_in_flight() -> None:
+    """Тест что cancel прерывает выполняющуюся обработку, run возвращает None"""
+    registry = UserLockRegistry()
+    finished: list[str] = []
+
+    async def slow() -> str:
+        await asyncio.sleep(1)
+        finished.append("slow")
+        return "slow"
+
+    task = asyncio.create_task(registry.run(1, slow()))
+    await asyncio.sleep(0.01)
+
+    assert registry.cancel(1, "reset") is True
+    assert await task is None
+    assert finished == []
+    assert registry.cancel(1, "reset") is False
+    stats = registry.get_stats()
+    assert stats["cancelled"] == 1
+    assert stats["cancelled_reset"] == 1
+    assert stats["active_users"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancel_does_not_touch_waiting() -> None:
+    """Тест что отменяется только выполняющаяся обработка, следующая выполняется"""
+    registry = UserLockRegistry()
+
+    async def work(name: str, delay: float) -> str:
+        await asyncio.sleep(delay)
+        return name
+
+    first = asyncio.create_task(registry.run(1, work("first", 1)))
+    second = asyncio.create_task(registry.run(1, work("second", 0)))
+    await asyncio.sleep(0.01)
+    registry.cancel(1, "superseded")
+
+    assert await asyncio.gather(first, second) == [None, "second"]
+
+
+@pytest.mark.asyncio
+async def test_outer_cancellation_propagates() -> None:
+    """Тест что отмена вызывающей задачи (остановка бота) пробрасывается"""
+    registry = UserLockRegistry()
+
+    task = asyncio.create_task(registry.run(1, asyncio.sleep(1)))
+    await asyncio.sleep(0.01)
+    task.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert registry.get_stats() == {
+        "active_users": 0,
+        "waiting": 0,
+        "max_waiting": 0,
+        "cancelled": 0,
+    }
@@ -0,0 +1,103 @@
+"""
+Тесты для WebhookServer.
+
+Updates отправляются через FakeTelegram на запущенный локально сервер.
+"""
+
+from collections.abc import AsyncIterator
+from typing import Any
+
+import pytest
+
+from src.bot.fake_telegram import FakeTelegram
+from src.bot.webhook_server import WebhookServer, get_route_key
+
+SECRET = "test-secret"
+WORKERS = ["worker-0", "worker-1", "worker-2"]
+
+
+@pytest.fixture
+async def routed() -> list[tuple[str, dict[str, Any]]]:
+    """Список (worker, update), переданных сервером."""
+    return []
+
+
+@pytest.fixture
+async def fake_telegram(routed) -> AsyncIterator[FakeTelegram]:
+    """Запущенный WebhookServer и FakeTelegram, отправляющий на него updates."""
+    server = WebhookServer(SECRET, lambda worker, update: routed.append((worker, update)), WORKERS)
+    port = await server.start("127.0.0.1", 0)
+    fake = FakeTelegram(f"http://127.0.0.1:{port}/webhook", secret_token=SECRET)
+    fake.server = server  # type: ignore[attr-defined]
+    yield fake
+    await fake.stop()
+    await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_update_routed_to_worker(fake_telegram, routed) -> None:
+    """Тест что update с верным секретом передается worker"""
+    status = await fake_telegram.send_text(chat_id=42, text="Привет")
+
+    assert status == 200
+    assert len(routed) == 1
+    worker, update = routed[0]
+    assert worker in WORKERS
+    assert update["message"]["text"] == "Привет"
+    assert fake_telegram.server.get_stats()["received"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_secret_rejected(fake_telegram, routed) -> None:
+    """Тест что update с неверным секретом отклоняется"""
+    fake_telegram.secret_token = "wrong-secret"
+
+    status = await fake_telegram.send_text(chat_id=42, text="Привет")
+
+    assert status == 401
+    assert routed == []
+    assert fake_telegram.server.get_stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_missing_secret_rejected(fake_telegram, routed) -> None:
+    """Тест что update без секретного заголовка отклоняется"""
+    fake_telegram.secret_token = None
+
+    assert await fake_telegram.send_text(chat_id=42, text="Привет") == 401
+    assert routed == []
+
+
+@pytest.mark.asyncio
+async def test_same_chat_same_worker(fake_telegram, routed) -> None:
+    """Тест что все updates одного чата попадают в один worker"""
+    for chat_id in (1, 2, 3):
+        for index in range(5):
+            await fake_telegram.send_text(chat_id=chat_id, text=f"message {index}")
+
+    workers_by_chat: dict[int, set[str]] = {}
+    for worker, update in routed:
+        workers_by_chat.setdefault(update["message"]["chat"]["id"], set()).add(worker)
+    assert all(len(workers) == 1 for workers in workers_by_chat.values())
+    # Порядок updates чата сохраняется
+    texts = [u["message"]["text"] for _, u in routed if u["message"]["chat"]["id"] == 1]
+    assert texts == [f"message {index}" for index in range(5)]
+
+
+def test_route_key() -> None:
+    """Тест ключа маршрутизации для разных типов updates"""
+    assert get_route_key({"update_id": 1, "message": {"chat": {"id": 10}}}) == "10"
+    assert get_route_key({"update_id": 2, "edited_message": {"chat": {"id": 11}}}) == "11"
+    callback = {
+        "update_id": 3,
+        "callback_query": {"from": {"id": 5}, "message": {"chat": {"id": 12}}},
+    }
+    assert get_route_key(callback) == "12"
+    assert get_route_key({"update_id": 4, "inline_query": {"from": {"id": 13}}}) == "13"
+    assert get_route_key({"update_id": 5}) == "5"
+
+
+def test_secret_required() -> None:
+    """Тест что сервер не создается без секрета"""
+    with pytest.raises(ValueError, match="secret_token"):
+        WebhookServer("", lambda worker, update: None, WORKERS)
@@ -0,0 +1,184 @@
+"""
+Тесты для WebhookWorker.
+
+Проверяем порядок обработки внутри чата, конкурентность между чатами и полный
+путь update: FakeTelegram → WebhookServer → WebhookWorker → aiogram → Bot API.
+"""
+
+import asyncio
+import queue
+from collections.abc import AsyncIterator
+from typing import Any
+
+import pytest
+from aiogram import Dispatcher
+from aiogram.types import Message
+
+from src.bot.bot import create_aiogram_bot
+from src.bot.fake_telegram import FakeTelegram
+from src.bot.user_lock_middleware import UserLockMiddleware
+from src.bot.user_lock_registry import UserLockRegistry
+from src.bot.webhook_server import WebhookServer
+from src.bot.webhook_worker import WebhookWorker
+
+SECRET = "test-secret"
+
+
+class RecordingBot:
+    """Бот, записывающий порядок обработки updates."""
+
+    def __init__(self, delays: dict[int, float] | None = None) -> None:
+        self.delays = delays or {}
+        self.events: list[tuple[str, int, str]] = []
+
+    async def feed_update(self, update: dict[str, Any]) -> None:
+        message = update["message"]
+        chat_id = message["chat"]["id"]
+        self.events.append(("start", chat_id, message["text"]))
+        await asyncio.sleep(self.delays.get(chat_id, 0))
+        self.events.append(("end", chat_id, message["text"]))
+
+
+def _update(update_id: int, chat_id: int, text: str) -> dict[str, Any]:
+    return {"update_id": update_id, "message": {"chat": {"id": chat_id}, "text": text}}
+
+
+@pytest.mark.asyncio
+async def test_updates_of_one_chat_processed_in_order() -> None:
+    """Тест что updates одного чата обрабатываются строго последовательно"""
+    bot = RecordingBot(delays={1: 0.01})
+    worker = WebhookWorker(bot)  # type: ignore[arg-type]
+
+    for index in range(5):
+        worker.submit(_update(index, 1, f"m{index}"))
+    await worker.drain()
+
+    expected = []
+    for index in range(5):
+        expected += [("start", 1, f"m{index}"), ("end", 1, f"m{index}")]
+    assert bot.events == expected
+
+
+@pytest.mark.asyncio
+async def test_different_chats_processed_concurrently() -> None:
+    """Тест что медленный чат не задерживает другие чаты"""
+    bot = RecordingBot(delays={1: 0.2})
+    worker = WebhookWorker(bot)  # type: ignore[arg-type]
+
+    worker.submit(_update(1, 1, "slow"))
+    worker.submit(_update(2, 2, "fast"))
+    await worker.drain()
+
+    assert bot.events.index(("end", 2, "fast")) < bot.events.index(("end", 1, "slow"))
+
+
+@pytest.mark.asyncio
+async def test_error_does_not_block_chat() -> None:
+    """Тест что ошибка обработки не блокирует следующие updates чата"""
+    bot = RecordingBot()
+    original_feed = bot.feed_update
+
+    async def failing_feed(update: dict[str, Any]) -> None:
+        if update["message"]["text"] == "boom":
+            raise RuntimeError("boom")
+        await original_feed(update)
+
+    bot.feed_update = failing_feed  # type: ignore[method-assign]
+    worker = WebhookWorker(bot)  # type: ignore[arg-type]
+
+    worker.submit(_update(1, 1, "boom"))
+    worker.submit(_update(2, 1, "next"))
+    await worker.drain()
+
+    assert ("end", 1, "next") in bot.events
+
+
+@pytest.mark.asyncio
+async def test_run_until_sentinel() -> None:
+    """Тест чтения очереди до None и обработки всех updates"""
+    bot = RecordingBot()
+    worker = WebhookWorker(bot)  # type: ignore[arg-type]
+    updates: queue.Queue[dict[str, Any] | None] = queue.Queue()
+    for index in range(3):
+        updates.put(_update(index, index, "hi"))
+    updates.put(None)
+
+    await asyncio.wait_for(worker.run(updates), timeout=5)  # type: ignore[arg-type]
+
+    assert len(bot.events) == 6
+
+
+class EchoBot:
+    """Минимальный aiogram бот, отвечающий тем же текстом."""
+
+    def __init__(self, api_url: str, delay: float = 0) -> None:
+        self.bot = create_aiogram_bot("123456:TEST", api_url)
+        self.delay = delay
+        self.user_locks = UserLockRegistry()
+        self.cancel_on_message = False
+        self.dp = Dispatcher()
+        self.dp.update.outer_middleware(UserLockMiddleware(self.user_locks))
+        self.dp.message()(self.echo)
+
+    async def echo(self, message: Message) -> None:
+        # Имитация долгого ответа LLM
+        await asyncio.sleep(self.delay)
+        await message.answer(f"echo: {message.text}")
+
+    async def feed_update(self, update: dict[str, Any]) -> None:
+        await self.dp.feed_raw_update(self.bot, update)
+
+
+@pytest.fixture
+async def webhook_stack() -> AsyncIterator[FakeTelegram]:
+    """FakeTelegram, WebhookServer и два worker в одном event loop."""
+    fake = FakeTelegram("", secret_token=SECRET)
+    api_url = await fake.start()
+    bot = EchoBot(api_url)
+    workers = {name: WebhookWorker(bot) for name in ("worker-0", "worker-1")}  # type: ignore[arg-type]
+    server = WebhookServer(SECRET, lambda name, update: workers[name].submit(update), list(workers))
+    port = await server.start("127.0.0.1", 0)
+    fake.webhook_url = f"http://127.0.0.1:{port}/webhook"
+    yield fake
+    for worker in workers.values():
+        await worker.drain()
+    await server.stop()
+    await bot.bot.session.close()
+    await fake.stop()
+
+
+@pytest.mark.asyncio
+async def test_end_to_end_with_fake_telegram(webhook_stack: FakeTelegram) -> None:
+    """Тест полного пути update через webhook и ответа боту через Bot API"""
+    for chat_id in (1, 2):
+        for index in range(3):
+            assert await webhook_stack.send_text(chat_id, f"{chat_id}-{index}") == 200
+
+    messages = await webhook_stack.wait_for_messages(6)
+
+    for chat_id in (1, 2):
+        replies = [m["text"] for m in messages if m["chat"]["id"] == chat_id]
+        assert replies == [f"echo: {chat_id}-{index}" for index in range(3)]
+
+
+@pytest.mark.asyncio
+async def test_reset_cancels_in_flight_update() -> None:
+    """Тест что /reset не ждет в очереди чата, а отменяет обработку предыдущего update"""
+    fake = FakeTelegram("", secret_token=SECRET)
+    api_url = await fake.start()
+    bot = EchoBot(api_url, delay=0.5)
+    worker = WebhookWorker(bot)  # type: ignore[arg-type]
+
+    try:
+        worker.submit(fake.make_message_update(1, "long question"))
+        await asyncio.sleep(0.05)
+        bot.delay = 0
+        worker.submit(fake.make_message_update(1, "/reset"))
+        await asyncio.wait_for(worker.drain(), timeout=0.3)
+        messages = await fake.wait_for_messages(1)
+    finally:
+        await bot.bot.session.close()
+        await fake.stop()
+
+    assert [m["text"] for m in messages] == ["echo: /reset"]
+    assert bot.user_locks.get_stats()["cancelled_reset"] == 1